@@ -0,0 +1,143 @@
+# resistor_adc.py
+# ADC 分辨率感知的分压器优化 - 一次向量化计算全部标准 R1/R2 组合在多个 ADC 位数下的可用码数并排名
+# 依赖：numpy
+#
+# 可用码数 = 信号范围在 ADC 引脚上的跨度 / 等效分辨步长，
+#   步长 = √12 · √(LSB²/12 + 噪声²)，没有噪声时就是 LSB；
+#   噪声 = 给定的 ADC 前端噪声底 (µV rms) 与分压器源阻抗 R1∥R2 的热噪声 √(4kTRB) 的平方和。
+# 约束：Vin 最大时 Vout ≤ min(安全上限 - 裕量, 参考电压)；R1+R2 范围；静态电流；源阻抗上限；
+#   给出采样电容与采集时间时，要求 (R1∥R2)·C·ln(2^(N+1)) ≤ t_acq (采样电容在采集时间内建立到 ½ LSB)。
+# 位数越高噪声与建立时间越占主导，不同位数的最优组合因此不同。
+# 候选组合只计算一次，各位数的码数是 (位数 × 组合) 的二维数组，16 位与 12 位的耗时相同。
+# 电阻单位 kΩ (与 resistor_engine 一致)。
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from resistor_engine import VADC_SAFE
+from resistor_series import series_index
+
+DEFAULT_BITS = (10, 12, 14, 16)
+BOLTZMANN = 1.380649e-23
+CODES_REL = 1e-9  # 码数比较的相对精度，小于它的差别视为并列
+RATIO_TOL = 1e-12  # 分压比相差小于它视为同一比例 (不同十倍程的同一组合)
+
+
+def _quantize(codes):
+    """码数按 CODES_REL 相对精度取整，-inf (不可行) 保持不变"""
+    finite = np.isfinite(codes) & (codes > 0)
+    step = np.ones_like(codes)
+    step[finite] = 10.0 ** np.floor(np.log10(codes[finite] * CODES_REL))
+    return np.where(finite, np.round(codes / step) * step, codes)
+
+
+def _pairs(series: str, r_total_min: float, r_total_max: float):
+    """全部 (R1, R2) 标准值组合 (Ω)，先按单个阻值上限裁掉不可能的值"""
+    values = np.asarray(series_index(series).values, dtype=np.float64)
+    values = values[values < r_total_max]
+    r1, r2 = np.meshgrid(values, values, indexing="ij")
+    r1, r2 = r1.ravel(), r2.ravel()
+    total = r1 + r2
+    keep = (total >= r_total_min) & (total <= r_total_max)
+    return r1[keep], r2[keep]
+
+
+def optimize_adc_divider(vin_min: float, vin_max: float, bits: Sequence[int] = DEFAULT_BITS,
+                         vref: float = 3.3, vadc_safe: float = VADC_SAFE, min_margin: float = 0.0,
+                         noise_uv: float = 0.0, series: str = "E96", k: int = 10,
+                         r_total_min_k: float = 1.0, r_total_max_k: float = 1000.0,
+                         i_max_ua: Optional[float] = None, max_source_k: Optional[float] = None,
+                         c_sample_pf: Optional[float] = None, t_acq_us: Optional[float] = None,
+                         bandwidth_hz: Optional[float] = None, temp_c: float = 25.0) -> Dict[str, object]:
+    """对每个 ADC 位数给出可用码数最多的前 k 个标准分压组合
+
+    返回 {"tables": {bits: [方案...]}, "candidates": 组合总数, "feasible": {bits: 满足约束的组合数}}。
+    方案字段：r1, r2 (kΩ), ratio, vout_min, vout_max, margin (V), current_ua, source_k,
+              usable_codes, usable_bits (log2), vin_step_mv (每个可用码对应的输入电压), noise_uv, settle_us。
+    排序：可用码数降序 (按 CODES_REL 相对精度比较)，码数相同时静态电流升序；
+    同一分压比只保留电流最小的十倍程，feasible 计数仍按全部组合。
+    """
+    if not 0 <= vin_min < vin_max:
+        raise ValueError("输入电压范围无效 (需要 0 ≤ Vmin < Vmax)")
+    if vref <= 0:
+        raise ValueError("参考电压必须 > 0")
+    bits = sorted({int(b) for b in bits})
+    if not bits or bits[0] < 1 or bits[-1] > 32:
+        raise ValueError("ADC 位数必须在 1~32 之间")
+    if (c_sample_pf is None) != (t_acq_us is None):
+        raise ValueError("建立时间约束需要同时给出采样电容与采集时间")
+    v_limit = min(vadc_safe - min_margin, vref)
+    if v_limit <= 0:
+        raise ValueError("安全上限减去裕量后必须 > 0")
+
+    r1, r2 = _pairs(series, r_total_min_k * 1000, r_total_max_k * 1000)
+    candidates = r1.size
+    total = r1 + r2
+    ratio = r2 / total
+    source = r1 * r2 / total
+
+    ok = ratio * vin_max <= v_limit + 1e-12
+    if i_max_ua is not None:
+        ok &= vin_max / total * 1e6 <= i_max_ua + 1e-9
+    if max_source_k is not None:
+        ok &= source <= max_source_k * 1000
+    r1, r2, total, ratio, source = r1[ok], r2[ok], total[ok], ratio[ok], source[ok]
+
+    # (位数 × 组合) 二维计算：LSB 与建立时间随位数变化，噪声与跨度只随组合变化
+    b = np.asarray(bits, dtype=np.float64)[:, None]
+    lsb = vref / 2.0 ** b
+    noise_sq = np.full(ratio.shape, (noise_uv * 1e-6) ** 2)
+    if bandwidth_hz:
+        noise_sq = noise_sq + 4 * BOLTZMANN * (temp_c + 273.15) * source * bandwidth_hz
+    step = np.sqrt(lsb ** 2 + 12 * noise_sq)
+    codes = ratio * (vin_max - vin_min) / step
+    feasible = np.ones(codes.shape, dtype=bool)
+    settle = None
+    if c_sample_pf is not None:
+        # 一阶 RC 建立到 ½ LSB 需要 τ·ln(2^(N+1))
+        settle = source * c_sample_pf * 1e-12 * (b + 1) * math.log(2)
+        feasible = settle <= t_acq_us * 1e-6
+    codes = np.where(feasible, codes, -np.inf)
+    current = vin_max / total
+    ratio_key = np.round(ratio / RATIO_TOL).astype(np.int64)
+
+    tables: Dict[int, List[Dict[str, float]]] = {}
+    counts: Dict[int, int] = {}
+    for row, n_bits in enumerate(bits):
+        n_ok = int(feasible[row].sum())
+        counts[n_bits] = n_ok
+        if n_ok == 0 or k <= 0:
+            tables[n_bits] = []
+            continue
+        # 码数按相对精度量化后再排序，浮点舍入噪声不再抢在电流之前决定名次；
+        # 同一分压比的各个十倍程只留码数最多、电流最小的一组，前 k 名都是不同的分压比
+        idx = np.flatnonzero(feasible[row])
+        q = _quantize(codes[row])
+        idx = idx[np.lexsort((current[idx], -q[idx], ratio_key[idx]))]
+        _, first = np.unique(ratio_key[idx], return_index=True)
+        idx = idx[first]
+        top = min(k, idx.size)
+        part = idx[np.argpartition(-q[idx], top - 1)[:top]] if top < idx.size else idx
+        part = part[np.lexsort((current[part], -q[part]))]
+        rows = []
+        for i in part:
+            c = float(codes[row, i])
+            rows.append({
+                "r1": float(r1[i]) / 1000,
+                "r2": float(r2[i]) / 1000,
+                "ratio": float(ratio[i]),
+                "vout_min": float(ratio[i] * vin_min),
+                "vout_max": float(ratio[i] * vin_max),
+                "margin": float(vadc_safe - ratio[i] * vin_max),
+                "current_ua": float(current[i] * 1e6),
+                "source_k": float(source[i] / 1000),
+                "usable_codes": c,
+                "usable_bits": math.log2(c) if c > 1 else 0.0,
+                "vin_step_mv": (vin_max - vin_min) / c * 1000,
+                "noise_uv": float(math.sqrt(noise_sq[i]) * 1e6),
+                "settle_us": float(settle[row, i] * 1e6) if settle is not None else None,
+            })
+        tables[n_bits] = rows
+    return {"tables": tables, "candidates": int(candidates), "feasible": counts}
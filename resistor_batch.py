@@ -0,0 +1,153 @@
+# resistor_batch.py
+# 向量化批量求值 - 同一拓扑 × 大量阻值组合，一次性得到 R1_eq/R2_eq/Vout/各元件功耗
+# 依赖：numpy
+#
+# 列顺序：先 R1 网络的全部电阻，再 R2 网络的全部电阻，
+#         每侧按网络列表从左到右、并联分支从上到下展开（与 resistor_network.leaves 一致）。
+
+from typing import Dict, List
+
+import numpy as np
+
+from resistor_network import Resistor, Series, compile_branch, leaves
+
+_LEAF, _SERIES, _PARALLEL = 0, 1, 2
+
+
+class _Program:
+    """把编译树展平成后序指令表，求值时只按节点循环，不按样本循环"""
+    __slots__ = ('kinds', 'children', 'columns', 'n_leaves')
+
+    def __init__(self, root, col_offset: int):
+        self.kinds: List[int] = []
+        self.children: List[List[int]] = []
+        self.columns: List[int] = []
+
+        leaf_cols = {id(leaf): col_offset + i for i, leaf in enumerate(leaves(root))}
+        self.n_leaves = len(leaf_cols)
+
+        # 迭代后序遍历：子节点索引总是小于父节点
+        index = {}
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if isinstance(node, Resistor):
+                index[id(node)] = self._emit(_LEAF, [], leaf_cols[id(node)])
+            elif expanded:
+                kind = _SERIES if isinstance(node, Series) else _PARALLEL
+                index[id(node)] = self._emit(kind, [index[id(c)] for c in node.children], -1)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children))
+
+    def _emit(self, kind, children, column) -> int:
+        self.kinds.append(kind)
+        self.children.append(children)
+        self.columns.append(column)
+        return len(self.kinds) - 1
+
+    def equivalents(self, values: np.ndarray) -> List[np.ndarray]:
+        """自底向上计算每个节点的等效阻值 (每项 shape = (samples,))"""
+        n = values.shape[0]
+        r: List[np.ndarray] = []
+        for kind, children, column in zip(self.kinds, self.children, self.columns):
+            if kind == _LEAF:
+                r.append(values[:, column])
+            elif kind == _SERIES:
+                total = np.zeros(n)
+                for c in children:
+                    total += r[c]
+                r.append(total)
+            else:
+                g = np.zeros(n)
+                for c in children:
+                    g += _conductance(r[c])
+                r.append(_conductance(g))
+        return r
+
+    def leaf_power(self, r: List[np.ndarray], current: np.ndarray, power: np.ndarray):
+        """自顶向下分配电流：串联同电流，并联按电导分流；写入每个叶的 I²R"""
+        currents = [None] * len(self.kinds)
+        currents[-1] = current
+        for i in range(len(self.kinds) - 1, -1, -1):
+            i_node = currents[i]
+            kind = self.kinds[i]
+            if kind == _LEAF:
+                power[:, self.columns[i]] = i_node**2 * r[i]
+            elif kind == _SERIES:
+                for c in self.children[i]:
+                    currents[c] = i_node
+            else:
+                v_node = i_node * r[i]
+                for c in self.children[i]:
+                    currents[c] = v_node * _conductance(r[c])
+
+
+def _conductance(r: np.ndarray) -> np.ndarray:
+    # 与 resistor_network 一致：零阻值视为不存在
+    out = np.zeros_like(r, dtype=float)
+    np.divide(1.0, r, out=out, where=r > 0)
+    return out
+
+
+class BatchTopology:
+    """R1/R2 网络拓扑的向量化求值器"""
+
+    def __init__(self, r1_network, r2_network):
+        r1_root = compile_branch(r1_network)
+        r2_root = compile_branch(r2_network)
+        self._r1 = _Program(r1_root, 0)
+        self._r2 = _Program(r2_root, self._r1.n_leaves)
+        self.n_r1 = self._r1.n_leaves
+        self.n_r2 = self._r2.n_leaves
+        self.n_resistors = self.n_r1 + self.n_r2
+        self._nominal = np.array([leaf.value for leaf in leaves(r1_root)] +
+                                 [leaf.value for leaf in leaves(r2_root)], dtype=float)
+
+    def nominal(self) -> np.ndarray:
+        """标称阻值向量 (kΩ)，shape = (n_resistors,)"""
+        return self._nominal.copy()
+
+    def _check(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.ndim != 2 or values.shape[1] != self.n_resistors:
+            raise ValueError(f"阻值数组形状应为 (samples, {self.n_resistors})，实际为 {values.shape}")
+        return values
+
+    def equivalents(self, values):
+        """只计算 (R1_eq, R2_eq)，空网络按 0.001kΩ 处理（与 calculate_equivalent 一致）"""
+        values = self._check(values)
+        r1_eq = self._r1.equivalents(values)[-1]
+        r2_eq = self._r2.equivalents(values)[-1]
+        return np.where(r1_eq > 0, r1_eq, 0.001), np.where(r2_eq > 0, r2_eq, 0.001)
+
+    def evaluate(self, values, vin) -> Dict[str, np.ndarray]:
+        """批量分压分析
+
+        values: (samples, n_resistors) 阻值 (kΩ)
+        vin:    标量或 (samples,) 输入电压 (V)
+        返回 r1_eq / r2_eq (kΩ), vout (V), current_ma (mA),
+             power_mw (samples, n_resistors) 各电阻功耗 (mW)
+        """
+        values = self._check(values)
+        vin = np.broadcast_to(np.asarray(vin, dtype=float), (values.shape[0],))
+
+        r1_nodes = self._r1.equivalents(values)
+        r2_nodes = self._r2.equivalents(values)
+        r1_eq = np.where(r1_nodes[-1] > 0, r1_nodes[-1], 0.001)
+        r2_eq = np.where(r2_nodes[-1] > 0, r2_nodes[-1], 0.001)
+
+        current = vin / (r1_eq + r2_eq)
+        power = np.zeros_like(values)
+        self._r1.leaf_power(r1_nodes, current, power)
+        self._r2.leaf_power(r2_nodes, current, power)
+
+        return {
+            "r1_eq": r1_eq,
+            "r2_eq": r2_eq,
+            "vout": vin * r2_eq / (r1_eq + r2_eq),
+            "current_ma": current,
+            "power_mw": power,
+        }
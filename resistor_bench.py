@@ -0,0 +1,341 @@
+# resistor_bench.py
+# 基准测试 - 热点路径的吞吐量与延迟分位数，JSON 记录并与基线比较，超出阈值判为回归
+# 依赖：标准库；NTC 向量化用例需要 numpy (缺少时跳过)
+#
+# 用例输入由固定种子生成，每次运行完全相同；计时前先预热，
+# 每个用例至少运行 min_rounds 轮且累计不少于 min_time 秒，按轮记录耗时。
+# 引擎的缓存函数测 .uncached (真实计算量)，另设一个缓存命中用例；
+# 运行期间使用独立的内存缓存，不读写用户的磁盘缓存。
+#
+# 比较以 p50 为准 (比均值更抗干扰)：当前 / 基线 - 1 > threshold 即为回归；
+# 为排除机器整体变慢 (降频、其他负载) 造成的误报，还要求最小耗时同样变慢超过阈值。
+# 基线与当前结果的环境 (Python 版本、numpy、组合索引) 不同时给出提示，数字不宜直接比较。
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import resistor_cache
+import resistor_engine as engine
+from resistor_network import CompiledNetwork
+
+BENCH_VERSION = 1
+DEFAULT_THRESHOLD = 0.20
+SEED = 20240601
+
+# 用例注册表：name -> (说明, 准备函数)；准备函数接收 random.Random，返回 (op, 每轮处理的项目数)
+CASES: Dict[str, Tuple[str, Callable]] = {}
+
+
+def case(name: str, doc: str):
+    def register(prepare):
+        CASES[name] = (doc, prepare)
+        return prepare
+    return register
+
+
+class Skip(Exception):
+    """当前环境无法运行该用例 (例如缺少 numpy)"""
+
+
+# ---------------------------------------------------------------------------
+# 用例
+# ---------------------------------------------------------------------------
+
+def nested_network(rng: random.Random, depth: int, fanout: int, per_branch: int) -> List:
+    """生成深度为 depth 的串并联嵌套网络列表 (kΩ)，每条支路 per_branch 个串联电阻 + 一个并联块"""
+    branch = [(round(rng.uniform(0.1, 100), 3), 'series') for _ in range(per_branch)]
+    if depth > 0:
+        branch.append(('parallel', [nested_network(rng, depth - 1, fanout, per_branch)
+                                    for _ in range(fanout)]))
+    return branch
+
+
+@case("equivalent_nested", "calculate_equivalent：约 3.9 万个电阻的 8 层嵌套网络 (每轮重新编译)")
+def _equivalent_nested(rng):
+    network = nested_network(rng, 8, 3, 4)
+    return (lambda: engine.calculate_equivalent(network)), 1
+
+
+@case("equivalent_edit", "CompiledNetwork.set_leaf：深层叶节点改值后的增量重算 (每轮 1000 次)")
+def _equivalent_edit(rng):
+    from resistor_network import leaves
+    compiled = CompiledNetwork(nested_network(rng, 8, 3, 4))
+    targets = rng.sample(list(leaves(compiled.root)), 1000)
+    values = [round(rng.uniform(0.1, 100), 3) for _ in targets]
+
+    def op():
+        for leaf, value in zip(targets, values):
+            compiled.set_leaf(leaf, value)
+        return compiled.equivalent
+    return op, len(targets)
+
+
+@case("nearest_e24", "find_nearest_e24：1 万次随机阻值取整")
+def _nearest_e24(rng):
+    values = [10 ** rng.uniform(0, 7) for _ in range(10000)]
+    find = engine.find_nearest_e24
+
+    def op():
+        for v in values:
+            find(v)
+    return op, len(values)
+
+
+@case("recommend_standard", "recommend_standard：随机 Vin/Vout 的推荐方案 (不经缓存)")
+def _recommend_standard(rng):
+    queries = [(rng.uniform(3.5, 24), rng.uniform(0.1, 0.9), rng.choice([4.7, 10, 15, 47]))
+               for _ in range(50)]
+    queries = [(vin, vin * frac, r1) for vin, frac, r1 in queries]
+    recommend = engine.recommend_standard.uncached
+
+    def op():
+        for q in queries:
+            recommend(*q)
+    return op, len(queries)
+
+
+@case("recommend_cached", "recommend_standard：缓存命中 (内存 LRU)")
+def _recommend_cached(rng):
+    query = (12.0, 3.25, 15.0)
+    engine.recommend_standard(*query)
+    return (lambda: engine.recommend_standard(*query)), 1
+
+
+@case("parallel_pairs", "parallel_combinations：E96 两电阻并联前 5 组 (不经缓存)")
+def _parallel_pairs(rng):
+    targets = [10 ** rng.uniform(-1, 3) for _ in range(50)]
+    search = engine.parallel_combinations.uncached
+
+    def op():
+        for t in targets:
+            search(t, 2, "E96", 5)
+    return op, len(targets)
+
+
+@case("parallel_triples", "parallel_combinations：E24 三电阻并联前 5 组 (不经缓存)")
+def _parallel_triples(rng):
+    targets = [10 ** rng.uniform(-1, 3) for _ in range(10)]
+    search = engine.parallel_combinations.uncached
+
+    def op():
+        for t in targets:
+            search(t, 3, "E24", 5)
+    return op, len(targets)
+
+
+@case("ntc_table", "engine.ntc_table：-40~125°C 步长 1°C 的对照表")
+def _ntc_table(rng):
+    return (lambda: engine.ntc_table(3.3, 10000, 10000, 3950, step=1)), 166
+
+
+@case("ntc_table_numpy", "resistor_ntc：-55~150°C 步长 0.01°C 的分块对照表 + CSV 导出 (需要 numpy)")
+def _ntc_table_numpy(rng):
+    try:
+        import resistor_ntc
+    except ImportError:
+        raise Skip("需要 numpy: pip install numpy")
+    table = resistor_ntc.NtcTable(3.3, 10000, 10000, 3950, -55, 150, 0.01)
+    return (lambda: resistor_ntc.write_csv(table, os.devnull)), len(table)
+
+
+def resistor_grid(rng: random.Random, n: int):
+    """n×n 随机电阻网格 (kΩ)：角上接电压源 V1，对角经 1kΩ 接地，中心注入电流源 I1"""
+    from resistor_mna import Netlist
+    net = Netlist()
+    for i in range(n):
+        for j in range(n):
+            if i + 1 < n:
+                net.add_resistor(f"RV{i}_{j}", f"n{i}_{j}", f"n{i + 1}_{j}", round(rng.uniform(1, 10), 3))
+            if j + 1 < n:
+                net.add_resistor(f"RH{i}_{j}", f"n{i}_{j}", f"n{i}_{j + 1}", round(rng.uniform(1, 10), 3))
+    net.add_voltage_source("V1", "n0_0", "0", 5.0)
+    net.add_resistor("RG", f"n{n - 1}_{n - 1}", "0", 1.0)
+    net.add_current_source("I1", "0", f"n{n // 2}_{n // 2}", 0.5)
+    return net
+
+
+@case("mna_factor", "resistor_mna：40×40 电阻网格 (1600 节点) 组装 + 稀疏 LU 分解 + 求解")
+def _mna_factor(rng):
+    net = resistor_grid(rng, 40)
+
+    def op():
+        net._lu = None
+        return net.solve()
+    return op, 1
+
+
+@case("mna_resolve", "resistor_mna：同一网格只改电源数值的重复求解 (复用分解，每轮 20 次)")
+def _mna_resolve(rng):
+    net = resistor_grid(rng, 40)
+    net.factor()
+    values = [rng.uniform(0, 24) for _ in range(20)]
+
+    def op():
+        for v in values:
+            net.solve({"V1": v})
+    return op, len(values)
+
+
+@case("cli_battery", "命令行 battery 模式：E96 全组合 Pareto 搜索与输出 (不经缓存)")
+def _cli_battery(rng):
+    from resistor_divider_cli import battery_mode
+    args = ["3.0", "4.5", "--max-ua", "20", "--top", "0"]
+
+    def op():
+        resistor_cache.default_cache().clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            battery_mode(args)
+    return op, 1
+
+
+# ---------------------------------------------------------------------------
+# 运行与统计
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """线性插值分位数 (sorted_values 已升序)"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def run_case(op: Callable, items: int, min_time: float, min_rounds: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        op()
+    gc.collect()
+    timings = []
+    clock = time.perf_counter
+    deadline = clock() + min_time
+    while len(timings) < min_rounds or clock() < deadline:
+        start = clock()
+        op()
+        timings.append(clock() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "rounds": len(timings),
+        "items": items,
+        "mean_ms": mean * 1e3,
+        "min_ms": timings[0] * 1e3,
+        "p50_ms": percentile(timings, 50) * 1e3,
+        "p90_ms": percentile(timings, 90) * 1e3,
+        "p99_ms": percentile(timings, 99) * 1e3,
+        "items_per_s": items / mean if mean > 0 else float("inf"),
+    }
+
+
+def environment() -> Dict[str, object]:
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    from resistor_index import pair_index
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+        "pair_index": pair_index() is not None,
+        "engine_version": engine.ENGINE_VERSION,
+    }
+
+
+def run(names: Optional[List[str]] = None, min_time: float = 1.0, min_rounds: int = 10,
+        warmup: int = 2, progress: Optional[Callable[[str, Optional[Dict]], None]] = None) -> Dict[str, object]:
+    """运行选定用例 (默认全部)，返回可直接写成 JSON 的结果
+
+    progress(name, stats) 在每个用例结束后调用；跳过的用例 stats 为 None。
+    """
+    unknown = [n for n in names or [] if n not in CASES]
+    if unknown:
+        raise ValueError(f"未知用例: {', '.join(unknown)} (可选: {', '.join(CASES)})")
+    saved = resistor_cache._default
+    resistor_cache._default = resistor_cache.ResultCache(None)
+    results, skipped = {}, {}
+    try:
+        for name in names or list(CASES):
+            doc, prepare = CASES[name]
+            try:
+                op, items = prepare(random.Random(f"{SEED}:{name}"))
+            except Skip as e:
+                skipped[name] = str(e)
+                if progress:
+                    progress(name, None)
+                continue
+            stats = run_case(op, items, min_time, min_rounds, warmup)
+            stats["doc"] = doc
+            results[name] = stats
+            if progress:
+                progress(name, stats)
+    finally:
+        resistor_cache._default = saved
+    return {
+        "bench_version": BENCH_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "settings": {"min_time": min_time, "min_rounds": min_rounds, "warmup": warmup},
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, object]:
+    """按 p50 比较当前结果与基线 (回归还要求最小耗时同样变慢超过阈值)
+
+    返回 rows (name, base_ms, cur_ms, change, status)、regressions (用例名列表) 与环境差异 env_diff。
+    status: 'regression' / 'improved' / 'ok' / 'new' / 'missing'
+    """
+    rows, regressions = [], []
+    cur, base = current["results"], baseline.get("results", {})
+    for name in list(cur) + [n for n in base if n not in cur]:
+        if name not in base:
+            rows.append((name, None, cur[name]["p50_ms"], None, "new"))
+            continue
+        if name not in cur:
+            rows.append((name, base[name]["p50_ms"], None, None, "missing"))
+            continue
+        b, c = base[name]["p50_ms"], cur[name]["p50_ms"]
+        change = c / b - 1 if b > 0 else 0.0
+        min_change = cur[name]["min_ms"] / base[name]["min_ms"] - 1 if base[name]["min_ms"] > 0 else 0.0
+        if change > threshold and min_change > threshold:
+            status = "regression"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, b, c, change, status))
+    env_cur, env_base = current.get("environment", {}), baseline.get("environment", {})
+    env_diff = {k: (env_base.get(k), env_cur.get(k)) for k in ("python", "implementation", "machine",
+                                                              "numpy", "pair_index", "engine_version")
+                if env_base.get(k) != env_cur.get(k)}
+    return {"threshold": threshold, "rows": rows, "regressions": regressions, "env_diff": env_diff}
+
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("bench_version") != BENCH_VERSION:
+        raise ValueError(f"基准结果格式版本不符: {path}")
+    return data
+
+
+def save(data: Dict, path: str):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
@@ -0,0 +1,254 @@
+# resistor_bom.py
+# 合并 BOM - 逐个设计流式求每个元件的实际功耗/电压，按 类型+阻值+额定功率+封装 合并成采购行
+# 依赖：标准库 csv/json
+#
+# 功耗来自网络解：支路电流 I = Vin / (R1_eq + R2_eq)，叶电阻分到的电流 I_i = I·√(∂R_eq/∂R_i)
+# (串联系数 1，并联系数 (R/R_child)²，见 resistor_sensitivity.leaf_derivatives)，
+# P_i = I_i²·R_i，单位 mA、kΩ → mW、V。NTC 按网络中的标称值 (25°C) 计算。
+# 封装按降额后的功率与最高工作电压从小到大选择第一个满足的 (默认不小于 0603)。
+# 位号在全部设计中连续编号 (R1, R2, ... / NTC1 ... / C1 ...)，合并行的位号压缩为区间 "R1-R4, R9"。
+# 内存只保存合并行 (每行一组位号整数)；逐元件明细可边算边写到 parts_path，不在内存中积累。
+
+import csv
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from resistor_network import Resistor, compile_branch, leaves
+from resistor_sensitivity import leaf_derivatives
+
+# (封装, 额定功率 W, 最高工作电压 V)
+PACKAGES = [
+    ("0402", 1 / 16, 50.0),
+    ("0603", 1 / 10, 75.0),
+    ("0805", 1 / 8, 150.0),
+    ("1206", 1 / 4, 200.0),
+    ("2010", 1 / 2, 200.0),
+    ("2512", 1.0, 200.0),
+]
+_PACKAGE_NAMES = [p[0] for p in PACKAGES]
+DEFAULT_DERATING = 0.5
+DEFAULT_MIN_PACKAGE = "0603"
+RATING_TEXT = {1 / 16: "1/16W", 1 / 10: "1/10W", 1 / 8: "1/8W", 1 / 4: "1/4W", 1 / 2: "1/2W", 1.0: "1W"}
+# 每个设计的 ADC 输入滤波电容 (与旧版单设计 BOM 一致)
+CAPACITOR = {"kind": "capacitor", "value": "0.1µF", "rating": "10V", "package": "0603", "note": "X7R"}
+
+PART_FIELDS = ("design", "ref", "kind", "branch", "value", "value_ohm", "power_mw", "voltage_v",
+               "rating", "package", "note")
+LINE_FIELDS = ("kind", "value", "value_ohm", "rating", "package", "qty", "refs", "designs",
+               "max_power_mw", "max_voltage_v", "note")
+_PREFIX = {"resistor": "R", "ntc": "NTC", "capacitor": "C"}
+_KIND_ORDER = {"resistor": 0, "ntc": 1, "capacitor": 2}
+
+
+def format_ohms(value_k: float) -> str:
+    """kΩ 数值 → 采购用的阻值文本：470Ω、4.7kΩ、1MΩ"""
+    ohm = value_k * 1000
+    if ohm >= 1e6:
+        return f"{ohm / 1e6:g}MΩ"
+    if ohm >= 1e3:
+        return f"{value_k:g}kΩ"
+    return f"{round(ohm, 6):g}Ω"
+
+
+def choose_package(power_mw: float, voltage_v: float, derating: float = DEFAULT_DERATING,
+                   min_package: str = DEFAULT_MIN_PACKAGE) -> Tuple[Optional[str], Optional[float]]:
+    """满足 功耗 ≤ 降额 × 额定功率 且 电压 ≤ 最高工作电压 的最小封装；都不满足时返回 (None, None)"""
+    if min_package not in _PACKAGE_NAMES:
+        raise ValueError(f"未知封装: {min_package} (可选: {', '.join(_PACKAGE_NAMES)})")
+    for name, rating_w, v_max in PACKAGES[_PACKAGE_NAMES.index(min_package):]:
+        if power_mw <= rating_w * 1000 * derating and voltage_v <= v_max:
+            return name, rating_w
+    return None, None
+
+
+def compress_refs(prefix: str, numbers: List[int]) -> str:
+    """[1, 2, 3, 4, 9] → 'R1-R4, R9'"""
+    numbers = sorted(numbers)
+    parts = []
+    start = prev = None
+    for n in numbers + [None]:
+        if prev is not None and n == prev + 1:
+            prev = n
+            continue
+        if start is not None:
+            parts.append(f"{prefix}{start}" if start == prev else f"{prefix}{start}-{prefix}{prev}")
+        start = prev = n
+    return ", ".join(parts)
+
+
+def design_parts(config: Dict, derating: float = DEFAULT_DERATING,
+                 min_package: str = DEFAULT_MIN_PACKAGE) -> List[Dict[str, object]]:
+    """一个设计 (save_config / 设计库格式) 的全部电阻及其实际功耗、端电压与所选封装 (不含位号)
+
+    网络为空或 Vin 无效时抛出 ValueError。
+    """
+    try:
+        vin = float(config.get("vin"))
+    except (TypeError, ValueError):
+        raise ValueError(f"Vin 无效: {config.get('vin')!r}")
+    if not math.isfinite(vin) or vin < 0:
+        raise ValueError(f"Vin 无效: {vin}")
+    roots = {"R1": compile_branch(config.get("r1_network") or []),
+             "R2": compile_branch(config.get("r2_network") or [])}
+    total = roots["R1"].r + roots["R2"].r
+    if roots["R1"].r <= 0 or roots["R2"].r <= 0:
+        raise ValueError("R1/R2 网络为空")
+    current_ma = vin / total
+
+    # 旧约定：使用 NTC 时 R2 的第一个串联电阻就是 NTC
+    ntc_leaf = None
+    if config.get("use_ntc") and roots["R2"].children and isinstance(roots["R2"].children[0], Resistor):
+        ntc_leaf = roots["R2"].children[0]
+
+    parts = []
+    for branch, root in roots.items():
+        for leaf, k in zip(leaves(root), leaf_derivatives(root)):
+            value = leaf.value
+            value_ohm = round(value * 1000, 6)
+            i_leaf = current_ma * math.sqrt(k)
+            power_mw = i_leaf * i_leaf * value
+            voltage_v = i_leaf * value
+            package, rating_w = choose_package(power_mw, voltage_v, derating, min_package)
+            is_ntc = leaf is ntc_leaf
+            if is_ntc:
+                note = "NTC 热敏电阻"
+            elif package is None:
+                note = "超出单个电阻额定值，需要并联分担"
+            else:
+                note = "并联分担" if leaf.parent is not root else ""
+            parts.append({
+                "branch": branch,
+                "kind": "ntc" if is_ntc else "resistor",
+                "value": format_ohms(value),
+                "value_ohm": int(value_ohm) if value_ohm == int(value_ohm) else value_ohm,
+                "power_mw": power_mw,
+                "voltage_v": voltage_v,
+                "rating": RATING_TEXT[rating_w] if rating_w else "",
+                "package": package or "",
+                "note": note,
+            })
+    return parts
+
+
+class BomBuilder:
+    """逐个加入设计，分配全局连续位号并合并相同的采购行"""
+
+    def __init__(self, derating: float = DEFAULT_DERATING, min_package: str = DEFAULT_MIN_PACKAGE,
+                 capacitor: bool = True):
+        choose_package(0.0, 0.0, derating, min_package)   # 提前检查 min_package
+        self.derating = derating
+        self.min_package = min_package
+        self.capacitor = capacitor
+        self.designs = 0
+        self.parts = 0
+        self.errors: List[Tuple[str, str]] = []
+        self._counters = {prefix: 0 for prefix in _PREFIX.values()}
+        self._lines: Dict[Tuple, Dict[str, object]] = {}
+
+    def add(self, config: Dict, design: str = "") -> List[Dict[str, object]]:
+        """加入一个设计，返回带位号的元件明细；设计无效时记入 errors 并返回 []"""
+        try:
+            parts = design_parts(config, self.derating, self.min_package)
+        except ValueError as e:
+            self.errors.append((design, str(e)))
+            return []
+        if self.capacitor:
+            parts.append(dict(CAPACITOR, branch="", value_ohm="", power_mw=0.0, voltage_v=0.0))
+        self.designs += 1
+        for part in parts:
+            prefix = _PREFIX[part["kind"]]
+            self._counters[prefix] += 1
+            number = self._counters[prefix]
+            part["design"] = design
+            part["ref"] = f"{prefix}{number}"
+            key = (part["kind"], part["value_ohm"] if part["kind"] != "capacitor" else part["value"],
+                   part["rating"], part["package"])
+            line = self._lines.get(key)
+            if line is None:
+                line = self._lines[key] = {"kind": part["kind"], "value": part["value"],
+                                           "value_ohm": part["value_ohm"], "rating": part["rating"],
+                                           "package": part["package"], "numbers": [], "designs": set(),
+                                           "max_power_mw": 0.0, "max_voltage_v": 0.0, "note": part["note"]}
+            elif line["note"] != part["note"]:
+                line["note"] = ""
+            line["numbers"].append(number)
+            line["designs"].add(self.designs)
+            line["max_power_mw"] = max(line["max_power_mw"], part["power_mw"])
+            line["max_voltage_v"] = max(line["max_voltage_v"], part["voltage_v"])
+        self.parts += len(parts)
+        return parts
+
+    def lines(self) -> List[Dict[str, object]]:
+        """合并后的采购行：电阻按阻值升序，其后 NTC、电容"""
+        result = []
+        for line in self._lines.values():
+            row = {k: v for k, v in line.items() if k not in ("numbers", "designs")}
+            row["qty"] = len(line["numbers"])
+            row["refs"] = compress_refs(_PREFIX[line["kind"]], line["numbers"])
+            row["designs"] = len(line["designs"])
+            row["max_power_mw"] = round(line["max_power_mw"], 6)
+            row["max_voltage_v"] = round(line["max_voltage_v"], 6)
+            result.append({k: row[k] for k in LINE_FIELDS})
+        result.sort(key=lambda r: (_KIND_ORDER[r["kind"]], r["value_ohm"] if r["value_ohm"] != "" else 0,
+                                   r["package"] == "", r["package"]))
+        return result
+
+
+def _format_for(path: str, fmt: Optional[str]) -> str:
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".") or "csv").lower()
+    if fmt not in ("csv", "json"):
+        raise ValueError(f"不支持的 BOM 格式: {fmt} (可选 csv / json)")
+    return fmt
+
+
+def export_bom(designs: Iterable[Tuple[str, Dict]], path: str, fmt: Optional[str] = None,
+               parts_path: Optional[str] = None, progress=None, **options) -> Dict[str, object]:
+    """把多个设计 (名称, 配置) 流式合并为一份 BOM，写出 CSV 或 JSON (按扩展名或 fmt)
+
+    parts_path 给出时同时写出逐元件明细 CSV (边算边写)。options 传给 BomBuilder。
+    progress(已处理设计数) 每个设计后调用，抛出异常可中止 (例如后台任务取消)。
+    返回 designs / parts / lines / errors。
+    """
+    fmt = _format_for(path, fmt)
+    builder = BomBuilder(**options)
+    parts_file = writer = None
+    try:
+        if parts_path:
+            parts_file = open(f"{parts_path}.tmp{os.getpid()}", "w", newline="", encoding="utf-8-sig")
+            writer = csv.DictWriter(parts_file, PART_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        for n, (name, config) in enumerate(designs, 1):
+            parts = builder.add(config, name)
+            if writer is not None:
+                for part in parts:
+                    writer.writerow(dict(part, power_mw=round(part["power_mw"], 6),
+                                         voltage_v=round(part["voltage_v"], 6)))
+            if progress:
+                progress(n)
+        if parts_file is not None:
+            parts_file.close()
+            os.replace(parts_file.name, parts_path)
+            parts_file = None
+    finally:
+        if parts_file is not None:
+            parts_file.close()
+            os.remove(parts_file.name)
+
+    lines = builder.lines()
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", newline="", encoding="utf-8-sig" if fmt == "csv" else "utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, LINE_FIELDS)
+            writer.writeheader()
+            writer.writerows(lines)
+        else:
+            json.dump({"generated": datetime.now().isoformat(timespec="seconds"), "designs": builder.designs,
+                       "parts": builder.parts, "derating": builder.derating, "lines": lines,
+                       "errors": [{"design": d, "error": e} for d, e in builder.errors]},
+                      f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    os.replace(tmp, path)
+    return {"designs": builder.designs, "parts": builder.parts, "lines": len(lines), "errors": builder.errors}
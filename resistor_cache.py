@@ -0,0 +1,302 @@
+# resistor_cache.py
+# 结果缓存 - 内存 LRU + 磁盘 SQLite，命令行与图形界面共享，重启后仍然有效
+# 依赖：标准库 sqlite3/json
+#
+# 键：函数名 + 引擎版本 + 规范化参数 (按签名绑定、补全默认值，浮点取 12 位有效数字)，
+#     因此位置参数与关键字参数、3.3 与 3.30 得到同一个键；引擎算法变化时升级版本号即可整体失效。
+# 值：以 JSON 保存，元组带标记还原 (网络列表中的 (value, 'series') 必须保持为元组)；
+#     每次命中都重新解码，调用方修改返回值不会污染缓存。
+# 磁盘路径：环境变量 RESISTOR_CACHE 指定文件；设为 off 时只用内存。
+#           磁盘不可用 (只读目录等) 时自动退回内存缓存。
+# 写入：put 先进入本进程的写缓冲，攒满 FLUSH_ENTRIES 条或距上次提交超过 FLUSH_SECONDS 时一次事务提交；
+#       进程退出时 (含进程池工作进程，经 multiprocessing 的退出钩子) 以及 stats/clear 前也会提交。
+# 淘汰：每条记录保存最近使用时间与字节数；打开时与每提交 EVICT_EVERY 条后，
+#       先删除超过 max_age 未使用的记录，总量仍超过 max_bytes 时按最近使用时间从旧到新删到 80%。
+
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import util as mp_util
+from typing import Callable, Dict, Optional
+
+MEMORY_SIZE = 1024
+DISK_MAX_BYTES = 64 * 1024 * 1024
+DISK_MAX_AGE = 30 * 24 * 3600       # 秒
+FLUSH_ENTRIES = 64
+FLUSH_SECONDS = 2.0
+EVICT_EVERY = 512
+SCHEMA_VERSION = 1
+
+
+def default_path() -> Optional[str]:
+    """磁盘缓存文件位置；返回 None 表示只用内存"""
+    env = os.environ.get("RESISTOR_CACHE")
+    if env is not None:
+        return None if env.strip().lower() in ("", "0", "off", "none") else env
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "resistor_expert", "results.sqlite3")
+
+
+def _normalize(value):
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(f"{value:.12g}")
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    raise TypeError(f"无法作为缓存键: {type(value).__name__}")
+
+
+def _encode(value):
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if len(value) == 1 and "__tuple__" in value:
+            return tuple(_decode(v) for v in value["__tuple__"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class ResultCache:
+    """内存 LRU + 可选的磁盘 SQLite 存储 (多进程可同时读写)"""
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = MEMORY_SIZE,
+                 max_bytes: int = DISK_MAX_BYTES, max_age: float = DISK_MAX_AGE):
+        self.path = path
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        self._conn_pid = None
+        # 写缓冲：键 → (值, 使用时间)；值为 None 表示只更新使用时间 (磁盘命中)
+        self._pending: Dict[str, tuple] = {}
+        self._last_flush = time.monotonic()
+        self._since_evict = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        # 连接不能跨进程使用：fork 出的工作进程各自重新连接，继承来的写缓冲归父进程提交
+        if self.path is None:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        self._pending.clear()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            # WAL：读写互不阻塞；synchronous=NORMAL 时提交不做 fsync，丢失最近结果只会导致重新计算
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # 旧版缓存表没有使用时间与大小，直接丢弃重建 (只是缓存)
+                conn.execute("DROP TABLE IF EXISTS results")
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+                conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                             "used REAL NOT NULL, size INTEGER NOT NULL)")
+                conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except (sqlite3.Error, OSError):
+            self.path = None
+            return None
+        self._conn, self._conn_pid = conn, os.getpid()
+        # 进程退出时提交写缓冲；multiprocessing 的退出钩子在主进程 (atexit) 与工作进程中都会执行
+        mp_util.Finalize(self, self.flush, exitpriority=10)
+        self._evict(conn)
+        return conn
+
+    def _evict(self, db: sqlite3.Connection):
+        """删除过期记录，总量超过 max_bytes 时按最近使用时间删到 80%"""
+        self._since_evict = 0
+        try:
+            with db:
+                removed = db.execute("DELETE FROM results WHERE used < ?", (time.time() - self.max_age,)).rowcount
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                if total > self.max_bytes:
+                    keep, cutoff = self.max_bytes * 0.8, None
+                    for used, size in db.execute("SELECT used, size FROM results ORDER BY used DESC"):
+                        keep -= size
+                        if keep < 0:
+                            cutoff = used
+                            break
+                    if cutoff is not None:
+                        removed += db.execute("DELETE FROM results WHERE used <= ?", (cutoff,)).rowcount
+            if removed:
+                self.evicted += removed
+                db.execute("PRAGMA incremental_vacuum").fetchall()
+        except sqlite3.Error:
+            pass
+
+    def flush(self):
+        """把写缓冲一次事务提交到磁盘"""
+        with self._lock:
+            db = self._db()
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if db is None or not pending:
+                return
+            rows = [(k, v, t, len(k) + len(v.encode("utf-8"))) for k, (v, t) in pending.items() if v is not None]
+            touched = [(t, k) for k, (v, t) in pending.items() if v is None]
+            try:
+                with db:
+                    db.executemany("INSERT OR REPLACE INTO results (key, value, used, size) VALUES (?, ?, ?, ?)",
+                                   rows)
+                    db.executemany("UPDATE results SET used = ? WHERE key = ?", touched)
+            except sqlite3.Error:
+                return
+            self._since_evict += len(rows)
+            if self._since_evict >= EVICT_EVERY:
+                self._evict(db)
+
+    def _maybe_flush(self):
+        if len(self._pending) >= FLUSH_ENTRIES or time.monotonic() - self._last_flush >= FLUSH_SECONDS:
+            self.flush()
+
+    def _remember(self, key: str, blob: str):
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return _decode(json.loads(blob))
+            db = self._db()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    self._remember(key, row[0])
+                    self._pending.setdefault(key, (None, time.time()))
+                    self._maybe_flush()
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return _decode(json.loads(row[0]))
+            self.misses += 1
+            return default
+
+    def put(self, key: str, value):
+        blob = json.dumps(_encode(value), ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._remember(key, blob)
+            if self._db() is not None:
+                self._pending[key] = (blob, time.time())
+                self._maybe_flush()
+
+    def clear(self) -> Optional[str]:
+        """清空内存与磁盘缓存，统计归零；磁盘清空失败 (被锁定、只读等) 时返回错误信息
+
+        失败后本进程退回只用内存，不再读到未清掉的旧结果。
+        """
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+            self.hits = self.disk_hits = self.misses = self.evicted = 0
+            db = self._db()
+            if db is None:
+                return None
+            try:
+                with db:
+                    db.execute("DELETE FROM results")
+                db.execute("PRAGMA incremental_vacuum").fetchall()
+            except sqlite3.Error as e:
+                self.path = None
+                self._conn = None
+                db.close()
+                return str(e)
+            return None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self.flush()
+            lookups = self.hits + self.misses
+            disk_entries = disk_bytes = None
+            db = self._db()
+            if db is not None:
+                try:
+                    disk_entries, disk_bytes = db.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                except sqlite3.Error:
+                    pass
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate_pct": self.hits / lookups * 100 if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "max_bytes": self.max_bytes,
+                "max_age_days": self.max_age / 86400,
+                "evicted": self.evicted,
+                "path": self.path,
+            }
+
+
+_default: Optional[ResultCache] = None
+
+
+def default_cache() -> ResultCache:
+    """进程内共享的缓存实例 (首次使用时创建)"""
+    global _default
+    if _default is None:
+        _default = ResultCache(default_path())
+    return _default
+
+
+def memoize(version: str) -> Callable:
+    """装饰器工厂：按规范化参数缓存函数结果，键中包含 version
+
+    结果必须可 JSON 化 (数值、字符串、列表、元组、字典)；None 结果同样缓存。
+    """
+    missing = object()
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps([name, version, _normalize(dict(bound.arguments))],
+                             ensure_ascii=False, separators=(",", ":"))
+            cache = default_cache()
+            result = cache.get(key, missing)
+            if result is missing:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
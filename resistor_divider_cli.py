@@ -3,24 +3,16 @@
 # 命令行版电阻分压计算器
 
 import sys
-import math
+
+import resistor_engine as engine
+
+# 批处理输出中追加的结果列
+BATCH_FIELDS = ["mode", "r1", "r2", "vout_actual", "error_pct", "current_ua",
+                "vout_min", "vout_max", "margin", "lsb_mv", "error"]
 
 def find_nearest_e24(value):
-    """在 E24 系列中查找最接近的值"""
-    e24 = [1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
-           3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1]
-    decades = [1e-3, 1e-2, 1e-1, 1, 10, 100, 1000, 1e6]
-    
-    best_diff = float('inf')
-    best_val = None
-    for base in e24:
-        for dec in decades:
-            cand = base * dec
-            diff = abs(cand - value)
-            if diff < best_diff:
-                best_diff = diff
-                best_val = cand
-    return best_val
+    """在 E24 系列中查找最接近的值 (kΩ)"""
+    return engine.nearest_e24_k(value)
 
 def calculate(vin, vout, r1=None, r2=None):
     """计算缺失的电阻值"""
@@ -34,7 +26,7 @@ def calculate(vin, vout, r1=None, r2=None):
     
     if r1 is not None and r2 is None:
         # 已知 R1，求 R2
-        r2_calc = r1 * vout / (vin - vout)
+        r2_calc = engine.solve_r2(vin, vout, r1)
         r2_std = find_nearest_e24(r2_calc)
         vout_actual = vin * r2_std / (r1 + r2_std)
         error = (vout_actual - vout) / vout * 100
@@ -48,7 +40,7 @@ def calculate(vin, vout, r1=None, r2=None):
     
     elif r2 is not None and r1 is None:
         # 已知 R2，求 R1
-        r1_calc = r2 * (vin - vout) / vout
+        r1_calc = engine.solve_r1(vin, vout, r2)
         r1_std = find_nearest_e24(r1_calc)
         vout_actual = vin * r2 / (r1_std + r2)
         error = (vout_actual - vout) / vout * 100
@@ -60,51 +52,637 @@ def calculate(vin, vout, r1=None, r2=None):
         print(f"   实际 Vout = {vout_actual:.3f}V (误差 {error:+.2f}%)")
         print(f"   静态电流 = {vin/(r1_std+r2):.3f}mA")
 
-def battery_mode(vmin, vmax, vadc_safe=3.25):
-    """电池监测模式"""
-    print(f"\n🔋 电池监测配置 (范围 {vmin}V – {vmax}V, ADC 安全上限 {vadc_safe}V)")
+def battery_mode(args):
+    """电池监测模式：在整个 E 系列中搜索分辨率与静态电流的 Pareto 最优分压器"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py battery",
+                                     description="电池电压监测分压器搜索 (全部 R1/R2 组合的 Pareto 集)")
+    parser.add_argument("vmin", type=float, help="电池最低电压 (V)")
+    parser.add_argument("vmax", type=float, help="电池最高电压 (V)")
+    parser.add_argument("vadc", type=float, nargs="?", default=3.25, help="ADC 安全上限 (V，默认 3.25)")
+    parser.add_argument("--series", default="E96", choices=list(engine.SERIES_BASES), help="标准值系列 (默认 E96)")
+    parser.add_argument("--margin", type=float, default=0.05, help="最小安全裕量 V (默认 0.05)")
+    parser.add_argument("--max-ua", type=float, help="静态电流上限 (µA)")
+    parser.add_argument("--max-lsb", type=float, help="电池电压分辨率上限 (mV/LSB)")
+    parser.add_argument("--bits", type=int, default=12, help="ADC 位数 (默认 12)")
+    parser.add_argument("--vref", type=float, default=3.3, help="ADC 满量程电压 (V，默认 3.3)")
+    parser.add_argument("--max-total", type=float, default=1000.0, help="R1+R2 上限 kΩ (默认 1000)")
+    parser.add_argument("--min-total", type=float, default=10.0, help="R1+R2 下限 kΩ (默认 10)")
+    parser.add_argument("--top", type=int, default=5, help="显示方案数 (默认 5，0 为全部)")
+    opts = parser.parse_args(args)
+    
+    print(f"\n🔋 电池监测配置 (范围 {opts.vmin}V – {opts.vmax}V, ADC 安全上限 {opts.vadc}V, {opts.series})")
     print("="*60)
+    try:
+        results = engine.battery_search(opts.vmin, opts.vmax, opts.vadc, opts.series, opts.margin,
+                                        opts.max_ua, opts.max_lsb, opts.bits, opts.vref, opts.max_total,
+                                        opts.min_total)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        return
+    if not results:
+        print("❌ 没有满足约束的组合，请放宽电流/分辨率/裕量要求")
+        return
     
-    ratio = vadc_safe / vmax
-    r2_r1 = ratio / (1 - ratio)
+    print(f"   Pareto 最优 {len(results)} 组 (分辨率越好电流越大，按分辨率排列)")
+    for i, s in enumerate(results[:opts.top or None]):
+        print(f"\n【方案 #{i+1}】R1={s['r1']:g}kΩ + R2={s['r2']:g}kΩ")
+        print(f"   • {opts.vmax}V 时: {s['vout_max']:.3f}V (安全裕量 {s['margin']*1000:.0f}mV) ✅")
+        print(f"   • {opts.vmin}V 时: {s['vout_min']:.3f}V")
+        print(f"   • 分辨率: {s['lsb_mv']:.4f}mV/LSB ({opts.bits}-bit)")
+        print(f"   • 静态功耗: {s['current_ua']:.1f}μA, 源阻抗 {s['source_k']:.2f}kΩ")
+
+def adc_mode(args):
+    """ADC 分辨率感知的分压器优化：多个位数下可用码数最多的标准 R1/R2 组合"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py adc",
+                                     description="按 ADC 位数/参考电压/噪声底排名标准分压组合 (需要 numpy)")
+    parser.add_argument("vmin", type=float, help="信号最低电压 (V)")
+    parser.add_argument("vmax", type=float, help="信号最高电压 (V)")
+    parser.add_argument("--bits", type=int, nargs="+", default=[10, 12, 14, 16], help="ADC 位数 (默认 10 12 14 16)")
+    parser.add_argument("--vref", type=float, default=3.3, help="ADC 参考电压 (V，默认 3.3)")
+    parser.add_argument("--vadc", type=float, default=engine.VADC_SAFE, help=f"过压安全上限 (V，默认 {engine.VADC_SAFE})")
+    parser.add_argument("--margin", type=float, default=0.0, help="安全上限以下的裕量 (V，默认 0)")
+    parser.add_argument("--noise", type=float, default=0.0, help="ADC 前端噪声底 (µV rms，默认 0)")
+    parser.add_argument("--bandwidth", type=float, help="噪声带宽 (Hz)，给出时计入分压电阻热噪声")
+    parser.add_argument("--c-sample", type=float, help="ADC 采样电容 (pF)，与 --t-acq 一起检查建立时间")
+    parser.add_argument("--t-acq", type=float, help="采集时间 (µs)")
+    parser.add_argument("--series", default="E96", choices=list(engine.SERIES_BASES), help="标准值系列 (默认 E96)")
+    parser.add_argument("--max-ua", type=float, help="静态电流上限 (µA)")
+    parser.add_argument("--max-source", type=float, help="源阻抗 R1∥R2 上限 (kΩ)")
+    parser.add_argument("--min-total", type=float, default=1.0, help="R1+R2 下限 kΩ (默认 1)")
+    parser.add_argument("--max-total", type=float, default=1000.0, help="R1+R2 上限 kΩ (默认 1000)")
+    parser.add_argument("--top", type=int, default=5, help="每个位数显示的方案数 (默认 5)")
+    opts = parser.parse_args(args)
     
-    candidates = [15, 18, 20, 22, 39, 47, 51]
-    results = []
+    try:
+        import resistor_adc
+    except ImportError:
+        print("❌ ADC 优化需要 numpy: pip install numpy")
+        sys.exit(1)
+    try:
+        result = resistor_adc.optimize_adc_divider(
+            opts.vmin, opts.vmax, opts.bits, opts.vref, opts.vadc, opts.margin, opts.noise, opts.series, opts.top,
+            opts.min_total, opts.max_total, opts.max_ua, opts.max_source, opts.c_sample, opts.t_acq, opts.bandwidth)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
     
-    for r1 in candidates:
-        r2_calc = r1 * r2_r1
-        r2_std = find_nearest_e24(r2_calc)
-        vout_max = vmax * r2_std / (r1 + r2_std)
-        vout_min = vmin * r2_std / (r1 + r2_std)
-        margin = vadc_safe - vout_max
-        current = vmax / (r1 + r2_std)
+    print(f"\n📐 ADC 分压优化 (信号 {opts.vmin}V – {opts.vmax}V, 参考 {opts.vref}V, 安全上限 {opts.vadc}V, {opts.series})")
+    print(f"   候选组合 {result['candidates']:,} 个")
+    print("="*78)
+    for bits, rows in result["tables"].items():
+        print(f"\n【{bits}-bit】满足约束 {result['feasible'][bits]:,} 组")
+        if not rows:
+            print("   ❌ 没有满足约束的组合")
+            continue
+        print(f"   {'R1(kΩ)':>8} {'R2(kΩ)':>8} {'Vout最大':>8} {'可用码':>9} {'有效位':>6} {'mV/码':>8} {'电流µA':>9} {'源阻抗kΩ':>9}")
+        for s in rows:
+            print(f"   {s['r1']:8g} {s['r2']:8g} {s['vout_max']:8.3f} {s['usable_codes']:9.0f} "
+                  f"{s['usable_bits']:6.2f} {s['vin_step_mv']:8.3f} {s['current_ua']:9.1f} {s['source_k']:9.3f}")
+
+def lut_mode(args):
+    """生成固件用 NTC ADC 码 → 温度查找表"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py lut",
+                                     description="生成 NTC ADC 码 → 温度查找表 (需要 numpy)")
+    parser.add_argument("bits", type=int, choices=[10, 12, 14, 16], help="ADC 位数")
+    # 单位沿用各自的习惯 (R1 与其他命令一致用 kΩ，NTC 标称值按规格书用 Ω)，在参数名中写明
+    parser.add_argument("r1", type=float, metavar="R1_kΩ", help="上拉电阻 R1，单位 kΩ (例如 10 表示 10kΩ)")
+    parser.add_argument("r25", type=float, metavar="R25_Ω", help="NTC 25°C 标称阻值，单位 Ω (例如 10000 表示 10kΩ)")
+    parser.add_argument("b", type=float, metavar="B_K", help="NTC B 值，单位 K")
+    parser.add_argument("output", help="输出文件: .h/.c 为 C 数组, .npy 为 NumPy, 其他为裸二进制")
+    parser.add_argument("--mode", choices=["full", "uniform", "pwl"], default="pwl", help="表格形式 (默认 pwl)")
+    parser.add_argument("--max-err", type=float, default=0.1, help="最大插值误差 °C (默认 0.1)")
+    parser.add_argument("--scale", type=int, default=100, help="定点倍数 (默认 100 即 0.01°C)")
+    parser.add_argument("--vref", type=float, help="ADC 参考电压 (V)；给出时为绝对参考，需同时给出 --vin")
+    parser.add_argument("--vin", type=float, help="分压供电电压 (V)")
+    parser.add_argument("--range", type=float, nargs=2, default=(-55.0, 150.0), metavar=("TMIN", "TMAX"))
+    parser.add_argument("--name", default="ntc_lut", help="C 数组名 (默认 ntc_lut)")
+    opts = parser.parse_args(args)
+    
+    try:
+        import resistor_ntc
+    except ImportError:
+        print("❌ NTC 查找表需要 numpy: pip install numpy")
+        sys.exit(1)
+    try:
+        lut = resistor_ntc.build_adc_lut(opts.bits, opts.r1 * 1000, opts.r25, opts.b, opts.mode, opts.max_err,
+                                         opts.scale, opts.vref, opts.vin, *opts.range)
+    except ValueError as e:
+        print(f"❌ 错误: {e}")
+        return
+    if opts.output.lower().endswith((".h", ".c")):
+        resistor_ntc.write_lut_c(lut, opts.output, opts.name)
+    else:
+        resistor_ntc.write_lut_binary(lut, opts.output)
+    
+    print(f"\n🌡️ NTC 查找表 ({opts.bits}-bit, {'比例测量' if opts.vref is None else f'绝对参考 {opts.vref}V'})")
+    print(f"   • 模式 {lut.mode}: {len(lut)} 项 (全表 {2**opts.bits} 项)")
+    print(f"   • 最大误差: {lut.max_error_c:.4f}°C")
+    print(f"   • 已写入: {opts.output}")
+
+def _field(row, name, cast=float, default=None):
+    value = row.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    return cast(value)
+
+def solve_row(row):
+    """批处理单行：按给出的字段选择模式，返回结果列 (电阻 kΩ)
+
+    vmin + vmax          → 电池监测 (battery_search 分辨率最好的方案，r_total_min_k / r_total_max_k 可选)
+    vin + vout + r1/r2   → 求缺失电阻 (E24，与单次计算相同)
+    vin + vout           → 全十倍程标准值分压对 (series / i_max_ua / r_total_max_k 可选)
+    """
+    row = {str(k).strip().lower(): v for k, v in row.items()}
+    try:
+        if _field(row, "vmin") is not None and _field(row, "vmax") is not None:
+            vmin, vmax = _field(row, "vmin"), _field(row, "vmax")
+            results = engine.battery_search(
+                vmin, vmax, _field(row, "vadc", default=engine.VADC_SAFE), _field(row, "series", str, "E96"),
+                _field(row, "margin", default=0.05), _field(row, "i_max_ua"), _field(row, "max_lsb_mv"),
+                _field(row, "bits", int, 12), _field(row, "vref", default=3.3),
+                _field(row, "r_total_max_k", default=1000.0), _field(row, "r_total_min_k", default=10.0))
+            if not results:
+                return {"mode": "battery", "error": "没有满足约束的组合"}
+            best = results[0]
+            return {"mode": "battery", "r1": best["r1"], "r2": best["r2"], "vout_min": best["vout_min"],
+                    "vout_max": best["vout_max"], "margin": best["margin"],
+                    "current_ua": best["current_ua"], "lsb_mv": best["lsb_mv"]}
+        
+        vin, vout = _field(row, "vin"), _field(row, "vout")
+        if vin is None or vout is None:
+            return {"error": "缺少 vin/vout 或 vmin/vmax"}
+        if not 0 < vout < vin:
+            return {"error": "Vout 必须小于 Vin"}
+        r1, r2 = _field(row, "r1"), _field(row, "r2")
+        if r1 is not None and r2 is None:
+            r2 = find_nearest_e24(engine.solve_r2(vin, vout, r1))
+            mode = "solve_r2"
+        elif r2 is not None and r1 is None:
+            r1 = find_nearest_e24(engine.solve_r1(vin, vout, r2))
+            mode = "solve_r1"
+        elif r1 is None and r2 is None:
+            pairs = engine.divider_pairs(vin, vout, _field(row, "series", str, "E24"), k=1,
+                                         r_total_max_k=_field(row, "r_total_max_k", default=1000.0),
+                                         i_max_ua=_field(row, "i_max_ua"))
+            if not pairs:
+                return {"mode": "pair", "error": "没有满足约束的组合"}
+            r1, r2 = pairs[0]["r1"], pairs[0]["r2"]
+            mode = "pair"
+        else:
+            mode = "check"
+        vout_actual = engine.divider_vout(vin, r1, r2)
+        return {"mode": mode, "r1": r1, "r2": r2, "vout_actual": vout_actual,
+                "error_pct": (vout_actual - vout) / vout * 100, "current_ua": vin / (r1 + r2) * 1000}
+    except (ValueError, ZeroDivisionError) as e:
+        return {"error": str(e)}
+
+class _BadRow(dict):
+    """无法解析的输入行 ({line, error})，不求解，原样作为该行的出错结果"""
+
+def _solve_chunk(rows):
+    """工作进程入口：处理一块输入行"""
+    return [dict(row) if isinstance(row, _BadRow) else solve_row(row) for row in rows]
+
+def _read_rows(stream, fmt):
+    """逐行读取 CSV / JSONL 输入，不整体载入；JSONL 中解析失败的行产出带行号的 _BadRow"""
+    import csv
+    import json
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for lineno, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line.rstrip("\r\n"))
+            except json.JSONDecodeError as e:
+                yield _BadRow(line=lineno, error=f"第 {lineno} 行 JSON 解析失败: {e.msg} (第 {e.colno} 列)")
+                continue
+            if not isinstance(row, dict):
+                yield _BadRow(line=lineno, error=f"第 {lineno} 行不是 JSON 对象")
+                continue
+            yield row
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _solve_stream(rows, workers, chunk_size):
+    """按输入顺序产出 (输入行, 结果)；同时在途的块数有上限，内存与输入规模无关"""
+    import collections
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = _chunks(rows, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from zip(chunk, _solve_chunk(chunk))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_solve_chunk, chunk)))
+            # 每个进程保持两块在途，既不空闲也不无限排队
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+
+def _detect_format(name, first_line=""):
+    lower = name.lower()
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith((".jsonl", ".json", ".ndjson")):
+        return "jsonl"
+    return "jsonl" if first_line.lstrip().startswith("{") else "csv"
+
+def batch_mode(args):
+    """批处理模式：CSV/JSONL 设计表 → 进程池 → 按输入顺序流式输出 JSONL/CSV"""
+    import argparse
+    import csv
+    import io
+    import itertools
+    import json
+    import os
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py batch",
+                                     description="批量计算分压设计 (每行一个设计，结果按输入顺序输出)")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件 (.csv/.jsonl)，- 为标准输入 (默认)")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，- 为标准输出 (默认)")
+    parser.add_argument("--in-format", choices=["csv", "jsonl"], help="输入格式 (默认按扩展名或首行判断)")
+    parser.add_argument("--out-format", choices=["csv", "jsonl"], help="输出格式 (默认按扩展名，否则 jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数 (默认 CPU 核数)")
+    parser.add_argument("--chunk", type=int, default=256, help="每个任务的行数 (默认 256)")
+    opts = parser.parse_args(args)
+    
+    src = sys.stdin if opts.input == "-" else open(opts.input, newline="", encoding="utf-8-sig")
+    dst = sys.stdout if opts.output == "-" else open(opts.output, "w", newline="", encoding="utf-8")
+    try:
+        # 只窥视首行用于判断格式，随后接回流中
+        first = src.readline()
+        in_fmt = opts.in_format or _detect_format(opts.input, first)
+        out_fmt = opts.out_format or ("csv" if opts.output.lower().endswith(".csv") else "jsonl")
+        rows = _read_rows(itertools.chain([first], src), in_fmt)
+        # CSV 输出的表头 = 输入列 + 结果列：CSV 输入取输入表头；JSONL 输入取第一条可解析行的键，
+        # 在它出现之前的出错行先缓存 (出错行本身不含输入列，不能决定表头)
+        in_fields = next(csv.reader([first]), []) if in_fmt == "csv" else None
+        
+        writer = None
+        held = []
+        count = errors = 0
         
-        if margin > 0.05:  # 至少 50mV 裕量
-            results.append((margin, r1, r2_std, vout_min, vout_max, current))
+        def open_writer(keys):
+            extra = [] if in_fmt == "csv" else ["line"]
+            fields = list(keys) + [f for f in BATCH_FIELDS + extra if f not in keys]
+            out = csv.DictWriter(dst, fields, extrasaction="ignore")
+            out.writeheader()
+            return out
+        
+        for row, result in _solve_stream(rows, max(opts.workers, 1), max(opts.chunk, 1)):
+            record = dict(row)
+            record.update(result)
+            if out_fmt == "jsonl":
+                dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                if writer is None:
+                    if in_fields is None and isinstance(row, _BadRow):
+                        held.append(record)
+                    else:
+                        writer = open_writer(in_fields if in_fields is not None else list(row))
+                        writer.writerows(held)
+                if writer is not None:
+                    writer.writerow(record)
+            count += 1
+            errors += "error" in result
+        if out_fmt == "csv" and writer is None:
+            # 空输入或全部行都无法解析
+            open_writer(in_fields or []).writerows(held)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"✅ 批处理完成: {count} 行, {errors} 行出错", file=sys.stderr)
+
+def cache_mode(args):
+    """查看或清空推荐/搜索结果缓存"""
+    if args and args[0] == "--clear":
+        error = engine.clear_cache()
+        if error:
+            print(f"❌ 磁盘缓存清空失败: {error} (内存缓存已清空)")
+            sys.exit(1)
+        print("🗑️ 结果缓存已清空")
+        return
+    stats = engine.cache_stats()
+    print(f"\n🗄️ 结果缓存 (引擎版本 {engine.ENGINE_VERSION})")
+    print(f"   • 磁盘文件: {stats['path'] or '未启用 (仅内存)'}")
+    if stats["disk_entries"] is not None:
+        print(f"   • 已缓存查询: {stats['disk_entries']:,} ({stats['disk_bytes'] / 2**20:.1f} MB)")
+        print(f"   • 淘汰策略: 超过 {stats['max_age_days']:g} 天未使用，或总量超过 "
+              f"{stats['max_bytes'] / 2**20:g} MB 时按最近使用时间删除")
+    print("   清空: python resistor_divider_cli.py cache --clear")
+
+def library_mode(args):
+    """设计库：批量导入 JSON 配置、按条件检索、查看单个设计"""
+    import argparse
+    import glob
+    import json
+    import os
+    import resistor_bom
+    import resistor_library
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py library",
+                                     description=f"分压设计库 (默认 {resistor_library.default_path()})")
+    parser.add_argument("--db", help="设计库文件 (默认 RESISTOR_LIBRARY 或上述位置)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="批量导入 resistor_config_*.json (可用通配符或目录)")
+    p_import.add_argument("paths", nargs="+")
+    p_query = sub.add_parser("query", help="检索设计")
+    p_query.add_argument("--ratio", type=float, help="分压比")
+    p_query.add_argument("--tol", type=float, default=1.0, help="分压比容差 %% (默认 1)")
+    p_query.add_argument("--vin", type=float, nargs=2, metavar=("MIN", "MAX"), help="Vin 范围")
+    p_query.add_argument("--vout", type=float, nargs=2, metavar=("MIN", "MAX"), help="实际 Vout 范围")
+    p_query.add_argument("--max-ua", type=float, help="静态电流上限 (µA)")
+    p_query.add_argument("--max-parts", type=int, help="元件数上限")
+    p_query.add_argument("--name", help="名称包含")
+    p_query.add_argument("--order", default="created", choices=list(resistor_library.ORDERS), help="排序 (默认 created)")
+    p_query.add_argument("--limit", type=int, default=50, help="最多显示条数 (默认 50，0 为全部)")
+    p_show = sub.add_parser("show", help="显示一个设计的完整内容 (JSON)")
+    p_show.add_argument("id", type=int)
+    p_bom = sub.add_parser("bom", help="多个设计合并为一份 BOM (按实际功耗选型，相同元件合并并列出位号)")
+    p_bom.add_argument("ids", type=int, nargs="*", help="设计编号 (默认全部)")
+    p_bom.add_argument("-o", "--output", required=True, help="输出文件 (.csv 或 .json)")
+    p_bom.add_argument("--format", choices=["csv", "json"], help="输出格式 (默认按扩展名)")
+    p_bom.add_argument("--parts", help="同时写出逐元件明细 CSV")
+    p_bom.add_argument("--derating", type=float, default=resistor_bom.DEFAULT_DERATING,
+                       help=f"功率降额系数 (默认 {resistor_bom.DEFAULT_DERATING})")
+    p_bom.add_argument("--min-package", default=resistor_bom.DEFAULT_MIN_PACKAGE,
+                       choices=[p[0] for p in resistor_bom.PACKAGES],
+                       help=f"最小封装 (默认 {resistor_bom.DEFAULT_MIN_PACKAGE})")
+    p_bom.add_argument("--no-cap", action="store_true", help="不为每个设计添加 0.1µF 滤波电容")
+    opts = parser.parse_args(args)
     
-    results.sort(reverse=True)
+    try:
+        library = resistor_library.DesignLibrary(opts.db)
+    except (OSError, ValueError, resistor_library.sqlite3.Error) as e:
+        print(f"❌ 无法打开设计库: {e}")
+        sys.exit(1)
+    with library:
+        if opts.command == "import":
+            paths = []
+            for pattern in opts.paths:
+                if os.path.isdir(pattern):
+                    paths += sorted(glob.glob(os.path.join(pattern, "*.json")))
+                else:
+                    paths += sorted(glob.glob(pattern)) or [pattern]
+            result = library.import_json(paths)
+            print(f"\n📥 导入 {result['imported']} 个设计，重复 {result['duplicates']} 个，共 {library.count()} 个")
+            for path, reason in result["errors"]:
+                print(f"   ❌ {path}: {reason}")
+        elif opts.command == "query":
+            rows = library.query(opts.ratio, opts.tol, opts.vin, opts.vout, opts.max_ua, opts.max_parts,
+                                 opts.name, opts.order, opts.limit or None)
+            print(f"\n📂 {len(rows)} 个设计 (库中共 {library.count()} 个)")
+            print(f"   {'#':>6} {'Vin':>6} {'Vout':>7} {'分压比':>8} {'电流µA':>9} {'元件':>4}  名称")
+            for r in rows:
+                vout = f"{r['vout']:7.3f}" if r["vout"] is not None else " " * 7
+                ratio = f"{r['ratio']:8.5f}" if r["ratio"] is not None else " " * 8
+                current = f"{r['current_ua']:9.1f}" if r["current_ua"] is not None else " " * 9
+                print(f"   {r['id']:6d} {r['vin'] or 0:6g} {vout} {ratio} {current} {r['part_count']:4d}  {r['name']}")
+        elif opts.command == "bom":
+            designs = ((f"#{d['id']} {d['name']}", d) for d in library.iter_designs(opts.ids or None))
+            try:
+                result = resistor_bom.export_bom(designs, opts.output, opts.format, opts.parts,
+                                                 derating=opts.derating, min_package=opts.min_package,
+                                                 capacitor=not opts.no_cap)
+            except (OSError, ValueError) as e:
+                print(f"❌ BOM 导出失败: {e}")
+                sys.exit(1)
+            print(f"\n📋 {result['designs']} 个设计，{result['parts']} 个元件 → {result['lines']} 个采购行: {opts.output}")
+            if opts.parts:
+                print(f"   逐元件明细: {opts.parts}")
+            for design, reason in result["errors"]:
+                print(f"   ⚠️ 跳过 {design}: {reason}")
+        else:
+            design = library.get(opts.id)
+            if design is None:
+                print(f"❌ 没有设计 #{opts.id}")
+                sys.exit(1)
+            json.dump(design, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+
+def mna_mode(args):
+    """任意电阻网表的节点分析：节点电压、元件电流与功耗，可扫描电源 (复用矩阵分解)"""
+    import argparse
+    import time
+    import resistor_mna
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py mna",
+                                     description="稀疏改进节点分析 (SPICE 风格网表：R/V/I 行，阻值 Ω，电流 A)")
+    parser.add_argument("netlist", help="网表文件 (- 为标准输入)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="修改电源数值 (V / A，可重复)")
+    parser.add_argument("--sweep", nargs=4, metavar=("NAME", "START", "STOP", "STEPS"),
+                        help="扫描一个电源 (共用一次分解)")
+    parser.add_argument("--probe", nargs="+", help="显示/扫描的节点 (默认全部，最多 40 个)")
+    parser.add_argument("--top", type=int, default=20, help="按功耗列出的元件数 (默认 20，0 为全部)")
+    opts = parser.parse_args(args)
+    
+    try:
+        if opts.netlist == "-":
+            text = sys.stdin.read()
+        else:
+            with open(opts.netlist, encoding="utf-8") as f:
+                text = f.read()
+        net = resistor_mna.Netlist.parse(text)
+        for item in opts.set:
+            name, _, raw = item.partition("=")
+            value = resistor_mna.parse_value(raw)
+            net.set_source(name, value * 1000 if name in net.isources else value)
+        start = time.perf_counter()
+        lu = net.factor()
+        factor_ms = (time.perf_counter() - start) * 1000
+        probes = opts.probe or list(net.nodes)[:40]
+        unknown = [p for p in probes if resistor_mna.node_name(p) not in net.nodes and resistor_mna.node_name(p) != "0"]
+        if unknown:
+            raise ValueError(f"没有节点: {', '.join(unknown)}")
+        
+        print(f"\n🔌 节点分析: {len(net.nodes)} 个节点, {len(net.resistors)} 个电阻, "
+              f"{len(net.vsources)} 个电压源, {len(net.isources)} 个电流源")
+        print(f"   矩阵 {lu.n}×{lu.n}, 分解后非零 {lu.nnz:,} 个, 分解 {factor_ms:.1f} ms")
+        
+        if opts.sweep:
+            name, lo, hi, steps = opts.sweep
+            lo, hi, steps = resistor_mna.parse_value(lo), resistor_mna.parse_value(hi), int(steps)
+            if steps < 1:
+                raise ValueError("扫描点数必须 ≥ 1")
+            if name not in net.vsources and name not in net.isources:
+                raise KeyError(f"没有电源: {name}")
+            scale = 1000 if name in net.isources else 1
+            values = [lo + (hi - lo) * k / max(steps - 1, 1) for k in range(steps)]
+            start = time.perf_counter()
+            print(f"\n   {name:>10} " + " ".join(f"{p:>10}" for p in probes))
+            for value, sol in net.sweep(name, [v * scale for v in values]):
+                print(f"   {value / scale:10.4g} " + " ".join(f"{sol.v(p):10.5f}" for p in probes))
+            print(f"\n   {steps} 点扫描 {(time.perf_counter() - start) * 1000:.1f} ms (复用分解)")
+            return
+        
+        sol = net.solve()
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
     
-    for i, (margin, r1, r2, vmin_out, vmax_out, curr) in enumerate(results[:3]):
-        print(f"\n【方案 #{i+1}】R1={r1}kΩ + R2={r2:.1f}kΩ")
-        print(f"   • {vmax}V 时: {vmax_out:.3f}V (安全裕量 {margin*1000:.0f}mV) ✅")
-        print(f"   • {vmin}V 时: {vmin_out:.3f}V")
-        print(f"   • 静态功耗: {curr*1000:.1f}μA")
+    print()
+    print(resistor_mna.format_report(sol, probes, opts.top))
+
+def index_mode(args):
+    """构建标准值组合索引 (两电阻分压与并联查询改为内存映射 + 二分查找)"""
+    import argparse
+    import time
+    import resistor_index
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py index",
+                                     description="预计算标准值两电阻组合索引 (需要 numpy)")
+    parser.add_argument("--series", nargs="+", help="只包含这些系列 (默认 E3 ~ E192 全部)")
+    parser.add_argument("-o", "--output", help="索引文件 (默认 RESISTOR_INDEX 或程序目录下 resistor_index.bin)")
+    opts = parser.parse_args(args)
+    
+    start = time.perf_counter()
+    try:
+        info = resistor_index.build_index(opts.output, opts.series)
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"\n📇 组合索引已写入 {info['path']}")
+    print(f"   • 组合数: {info['pairs']:,}  大小: {info['bytes'] / 1e6:.1f} MB  用时: {time.perf_counter() - start:.1f} s")
+    if opts.output and opts.output != resistor_index.default_path():
+        print(f"   使用该文件: export RESISTOR_INDEX={info['path']}")
+
+def bench_mode(args):
+    """运行基准测试，可与基线比较 (出现回归时退出码为 1)"""
+    import argparse
+    import json
+    import resistor_bench
+    parser = argparse.ArgumentParser(prog="resistor_divider_cli.py bench",
+                                     description="热点路径基准测试 (吞吐量与延迟分位数，按 p50 与基线比较)")
+    parser.add_argument("cases", nargs="*", help=f"只运行这些用例 (默认全部: {', '.join(resistor_bench.CASES)})")
+    parser.add_argument("-o", "--output", help="结果写入 JSON 文件 (- 为标准输出)")
+    parser.add_argument("--baseline", help="与该基线 JSON 比较")
+    parser.add_argument("--save-baseline", metavar="PATH", help="把本次结果另存为基线")
+    parser.add_argument("--threshold", type=float, default=resistor_bench.DEFAULT_THRESHOLD * 100,
+                        help=f"p50 变慢超过该百分比判为回归 (默认 {resistor_bench.DEFAULT_THRESHOLD * 100:g})")
+    parser.add_argument("--time", type=float, default=1.0, help="每个用例最少计时秒数 (默认 1.0)")
+    parser.add_argument("--rounds", type=int, default=10, help="每个用例最少轮数 (默认 10)")
+    parser.add_argument("--quick", action="store_true", help="快速模式 (0.2 秒 / 3 轮，只用于冒烟检查)")
+    parser.add_argument("--list", action="store_true", help="列出用例后退出")
+    opts = parser.parse_args(args)
+    
+    if opts.list:
+        for name, (doc, _) in resistor_bench.CASES.items():
+            print(f"{name:20s} {doc}")
+        return
+    baseline = None
+    if opts.baseline:
+        try:
+            baseline = resistor_bench.load(opts.baseline)
+        except (OSError, ValueError) as e:
+            print(f"❌ 无法读取基线: {e}", file=sys.stderr)
+            sys.exit(2)
+    # JSON 写到标准输出时，进度与报告改走标准错误
+    out = sys.stderr if opts.output == "-" else sys.stdout
+    
+    def progress(name, stats):
+        if stats is None:
+            print(f"   {name:20s} 跳过", file=out)
+        else:
+            print(f"   {name:20s} p50 {stats['p50_ms']:9.3f}ms  p90 {stats['p90_ms']:9.3f}ms  "
+                  f"p99 {stats['p99_ms']:9.3f}ms  {stats['items_per_s']:12,.0f}/s  ({stats['rounds']} 轮)", file=out)
+    
+    print(f"\n⏱️ 基准测试 (引擎版本 {engine.ENGINE_VERSION})", file=out)
+    try:
+        data = resistor_bench.run(opts.cases or None, 0.2 if opts.quick else opts.time,
+                                  3 if opts.quick else opts.rounds, progress=progress)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+    for name, reason in data["skipped"].items():
+        print(f"   ⚠️ {name}: {reason}", file=out)
+    
+    if opts.output == "-":
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif opts.output:
+        resistor_bench.save(data, opts.output)
+        print(f"💾 结果已写入 {opts.output}", file=out)
+    if opts.save_baseline:
+        resistor_bench.save(data, opts.save_baseline)
+        print(f"💾 基线已保存到 {opts.save_baseline}", file=out)
+    if baseline is None:
+        return
+    
+    if opts.cases:
+        # 只运行了部分用例时，基线中其余用例不算缺失
+        baseline["results"] = {k: v for k, v in baseline["results"].items() if k in opts.cases}
+    report = resistor_bench.compare(data, baseline, opts.threshold / 100)
+    print(f"\n📊 与基线比较 ({opts.baseline}，阈值 ±{opts.threshold:g}%)", file=out)
+    for key, (old, new) in report["env_diff"].items():
+        print(f"   ⚠️ 环境不同 {key}: {old} → {new}", file=out)
+    marks = {"regression": "❌ 回归", "improved": "🚀 提升", "ok": "✅", "new": "🆕 新用例", "missing": "⚠️ 未运行"}
+    for name, old, new, change, status in report["rows"]:
+        old_s = f"{old:9.3f}ms" if old is not None else " " * 11
+        new_s = f"{new:9.3f}ms" if new is not None else " " * 11
+        change_s = f"{change * 100:+7.1f}%" if change is not None else " " * 8
+        print(f"   {name:20s} {old_s} → {new_s}  {change_s}  {marks[status]}", file=out)
+    if report["regressions"]:
+        print(f"❌ {len(report['regressions'])} 个用例出现回归: {', '.join(report['regressions'])}", file=out)
+        sys.exit(1)
+    print("✅ 没有回归", file=out)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # 批处理结果可能写到标准输出，不打印横幅
+        batch_mode(sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        # 结果可能以 JSON 写到标准输出，不打印横幅
+        bench_mode(sys.argv[2:])
+        sys.exit(0)
+    
     print("⚡ 电阻分压计算器 (命令行版)")
     print("用法示例:")
     print("  1. 已知 Vin/Vout/R1 求 R2:  python resistor_divider_cli.py 4.2 3.25 15")
     print("  2. 已知 Vin/Vout/R2 求 R1:  python resistor_divider_cli.py 4.2 3.25 - 51")
-    print("  3. 电池监测模式:           python resistor_divider_cli.py battery 3.0 4.5")
+    print("  3. 电池监测模式:           python resistor_divider_cli.py battery 3.0 4.5 --max-ua 20")
+    print("  4. NTC 固件查找表:         python resistor_divider_cli.py lut 12 10 10000 3950 ntc_lut.h  (位数 R1[kΩ] R25[Ω] B[K] 输出)")
+    print("  5. 批量计算:               python resistor_divider_cli.py batch channels.csv -o results.csv")
+    print("  6. ADC 分压优化:           python resistor_divider_cli.py adc 0 24 --bits 12 16 --max-ua 100")
+    print("  7. 设计库检索:             python resistor_divider_cli.py library query --ratio 0.3 --max-ua 50")
+    print("  8. 网表节点分析:           python resistor_divider_cli.py mna bridge.cir --sweep V1 0 24 7")
+    print("  9. 构建组合索引:           python resistor_divider_cli.py index")
+    print(" 10. 基准测试:               python resistor_divider_cli.py bench --baseline bench_baseline.json")
     
     if len(sys.argv) < 2:
         sys.exit(1)
     
-    if sys.argv[1] == "battery" and len(sys.argv) >= 4:
-        vmin = float(sys.argv[2])
-        vmax = float(sys.argv[3])
-        vadc = float(sys.argv[4]) if len(sys.argv) > 4 else 3.25
-        battery_mode(vmin, vmax, vadc)
+    if sys.argv[1] == "battery":
+        battery_mode(sys.argv[2:])
+    elif sys.argv[1] == "cache":
+        cache_mode(sys.argv[2:])
+    elif sys.argv[1] == "adc":
+        adc_mode(sys.argv[2:])
+    elif sys.argv[1] == "library":
+        library_mode(sys.argv[2:])
+    elif sys.argv[1] == "mna":
+        mna_mode(sys.argv[2:])
+    elif sys.argv[1] == "index":
+        index_mode(sys.argv[2:])
+    elif sys.argv[1] == "lut":
+        lut_mode(sys.argv[2:])
     elif len(sys.argv) >= 4:
         vin = float(sys.argv[1])
         vout = float(sys.argv[2])
@@ -7,8 +7,71 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, simpledialog, filedialog
 import math
 import json
+import os
 from datetime import datetime
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+
+import resistor_engine as engine
+import resistor_scene
+from resistor_tasks import BackgroundTask
+from resistor_trace import traced, tracer
+
+TASK_POLL_MS = 100  # 后台任务轮询间隔
+TIMING_SEP = " | ⏱ "  # 状态栏中最近一次操作耗时的分隔符
+
+
+def timed(op: str):
+    """界面操作埋点：记录耗时与调用次数，并把最外层操作的耗时显示在状态栏"""
+    return traced(op, on_done=lambda args, name, seconds: args[0].show_timing(name, seconds))
+
+class VirtualTable(ttk.Frame):
+    """只读的虚拟化表格：文本框只保留可见行，滚动时按需调用 render(start, stop) 取行"""
+    
+    def __init__(self, parent, n_rows, render, header, height=30, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.n_rows = n_rows
+        self.render = render
+        self.height = height
+        self.first = 0
+        
+        ttk.Label(self, text=header, font=("Courier", 9, "bold")).grid(row=0, column=0, sticky=tk.W)
+        self.text = tk.Text(self, font=("Courier", 9), width=65, height=height, wrap=tk.NONE)
+        self.text.grid(row=1, column=0, sticky=(tk.N, tk.S, tk.W, tk.E))
+        self.scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scroll.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_wheel)
+        self.refresh()
+    
+    def yview(self, *args):
+        """滚动条回调：('moveto', 比例) 或 ('scroll', n, 'units'/'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.n_rows))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.height if args[2] == 'pages' else 1)
+            self.scroll_to(self.first + step)
+    
+    def scroll_to(self, first):
+        self.first = max(0, min(first, self.n_rows - self.height))
+        self.refresh()
+    
+    def refresh(self):
+        stop = min(self.first + self.height, self.n_rows)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(self.render(self.first, stop)))
+        self.text.config(state=tk.DISABLED)
+        if self.n_rows:
+            self.scroll.set(self.first / self.n_rows, stop / self.n_rows)
+    
+    def _on_wheel(self, event):
+        up = getattr(event, 'delta', 0) > 0 or getattr(event, 'num', 0) == 4
+        self.scroll_to(self.first + (-3 if up else 3))
+        return "break"
+
 
 class ResistorNetworkCalculator:
     def __init__(self, root):
@@ -26,16 +89,8 @@ class ResistorNetworkCalculator:
             print(f"Logo load failed: {e}")
         
         # 标准电阻库 (kΩ)
-        self.e24_values = [1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
-                          3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1]
-        self.e96_values = [1.00, 1.02, 1.05, 1.07, 1.10, 1.13, 1.15, 1.18, 1.21, 1.24, 1.27, 1.30,
-                          1.33, 1.37, 1.40, 1.43, 1.47, 1.50, 1.54, 1.58, 1.62, 1.65, 1.69, 1.74,
-                          1.78, 1.82, 1.87, 1.91, 1.96, 2.00, 2.05, 2.10, 2.15, 2.21, 2.26, 2.32,
-                          2.37, 2.43, 2.49, 2.55, 2.61, 2.67, 2.74, 2.80, 2.87, 2.94, 3.01, 3.09,
-                          3.16, 3.24, 3.32, 3.40, 3.48, 3.57, 3.65, 3.74, 3.83, 3.92, 4.02, 4.12,
-                          4.22, 4.32, 4.42, 4.53, 4.64, 4.75, 4.87, 4.99, 5.11, 5.23, 5.36, 5.49,
-                          5.62, 5.76, 5.90, 6.04, 6.19, 6.34, 6.49, 6.65, 6.81, 6.98, 7.15, 7.32,
-                          7.50, 7.68, 7.87, 8.06, 8.25, 8.45, 8.66, 8.87, 9.09, 9.31, 9.53, 9.76]
+        self.e24_values = engine.E24_VALUES
+        self.e96_values = engine.E96_VALUES
         
         # NTC 型号库
         self.ntc_models = {
@@ -84,11 +139,34 @@ class ResistorNetworkCalculator:
         self.r1_network: List = []
         self.r2_network: List = []
         self.use_ntc_r2 = False  # R2 是否使用 NTC
-        
+        # 编译后的网络树缓存 (side -> CompiledNetwork)，列表被整体替换时自动重建
+        self._trees: Dict[str, engine.CompiledNetwork] = {}
+        # 合并到空闲时执行的重算/重绘请求 (after_idle id)，以及正在运行的后台任务
+        self._calc_job = None
+        self._calc_status: Optional[str] = None
+        self._redraw_job = None
+        self._last_report = None
+        self._tasks: Dict[str, BackgroundTask] = {}
+        
+        self.create_menu()
         self.create_widgets()
         self.create_circuit_canvas()
         self.load_template("🔋 电池监测 (3.0-4.2V)")
     
+    def create_menu(self):
+        menubar = tk.Menu(self.root)
+        diag_menu = tk.Menu(menubar, tearoff=0)
+        self.profile_var = tk.BooleanVar(value=tracer().profiling)
+        diag_menu.add_checkbutton(label="cProfile 性能剖析", variable=self.profile_var,
+                                  command=self.toggle_profile)
+        diag_menu.add_command(label="耗时统计...", command=self.show_timing_stats)
+        diag_menu.add_command(label="清空耗时统计", command=tracer().reset)
+        menubar.add_cascade(label="诊断", menu=diag_menu)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="🔌 网表节点分析...", command=self.open_netlist_solver)
+        menubar.add_cascade(label="工具", menu=tools_menu)
+        self.root.config(menu=menubar)
+    
     def create_widgets(self):
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -128,6 +206,15 @@ class ResistorNetworkCalculator:
         self.adc_range_var = tk.StringVar(value="3.3")
         ttk.Entry(param_frame, textvariable=self.adc_range_var, width=12).grid(row=2, column=1, pady=3)
         
+        ttk.Label(param_frame, text="ADC 位数:", foreground="#2980b9").grid(row=3, column=0, sticky=tk.W, pady=3)
+        self.adc_bits_var = tk.StringVar(value="12")
+        adc_bits_combo = ttk.Combobox(param_frame, textvariable=self.adc_bits_var, width=10,
+                                      values=["8", "10", "12", "14", "16", "18", "24"])
+        adc_bits_combo.grid(row=3, column=1, pady=3)
+        adc_bits_combo.bind("<<ComboboxSelected>>", lambda e: self.schedule_calculate())
+        ttk.Button(param_frame, text="📐 ADC 分压优化", command=self.open_adc_optimizer).grid(
+            row=4, column=0, columnspan=2, pady=(6, 0), sticky=(tk.W, tk.E))
+        
         # NTC 配置
         ntc_frame = ttk.LabelFrame(control_frame, text="🌡️ NTC 热敏电阻", padding="10")
         ntc_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
@@ -138,6 +225,7 @@ class ResistorNetworkCalculator:
                                 values=list(self.ntc_models.keys()), width=20, state="readonly")
         ntc_combo.grid(row=0, column=1, columnspan=2, pady=2, sticky=(tk.W, tk.E))
         ntc_combo.bind("<<ComboboxSelected>>", self.update_ntc_params)
+        self.ntc_combo = ntc_combo
         
         ttk.Label(ntc_frame, text="R25 (Ω):").grid(row=1, column=0, sticky=tk.W, pady=2)
         self.ntc_r25_var = tk.StringVar(value="10000")
@@ -153,6 +241,8 @@ class ResistorNetworkCalculator:
         
         ttk.Button(ntc_frame, text="NTC 计算器", command=self.open_ntc_calculator, 
                   style="Accent.TButton").grid(row=4, column=0, columnspan=2, pady=8, sticky=(tk.W, tk.E))
+        ttk.Button(ntc_frame, text="导入 R-T 数据拟合", 
+                  command=self.import_ntc_rt_data).grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E))
         
         # 并联专用工具
         parallel_frame = ttk.LabelFrame(control_frame, text="🔀 并联专用工具", padding="10")
@@ -164,6 +254,8 @@ class ResistorNetworkCalculator:
                   command=self.open_power_analyzer).grid(row=1, column=0, pady=3, sticky=(tk.W, tk.E))
         ttk.Button(parallel_frame, text="精度优化建议", 
                   command=self.open_precision_optimizer).grid(row=2, column=0, pady=3, sticky=(tk.W, tk.E))
+        ttk.Button(parallel_frame, text="R2 混合网络综合", 
+                  command=self.synthesize_network).grid(row=3, column=0, pady=3, sticky=(tk.W, tk.E))
         
         # === 左侧底部信息区 (Logo & Info) ===
         # 使用 main_frame 的 row=1 来放置，确保始终位于底部
@@ -242,8 +334,8 @@ class ResistorNetworkCalculator:
         ttk.Button(btn_frame, text="🎯 推荐标准值", command=self.recommend_standard).grid(row=0, column=1, padx=4)
         ttk.Button(btn_frame, text="📊 网络分析", command=self.calculate_network).grid(row=0, column=2, padx=4)
         ttk.Button(btn_frame, text="📋 导出 BOM", command=self.export_bom).grid(row=0, column=3, padx=4)
-        ttk.Button(btn_frame, text="💾 保存配置", command=self.save_config).grid(row=0, column=4, padx=4)
-        ttk.Button(btn_frame, text="📂 加载配置", command=self.load_config).grid(row=0, column=5, padx=4)
+        ttk.Button(btn_frame, text="💾 保存设计", command=self.save_config).grid(row=0, column=4, padx=4)
+        ttk.Button(btn_frame, text="📂 设计库", command=self.load_config).grid(row=0, column=5, padx=4)
         
         # 结果显示区
         result_frame = ttk.LabelFrame(work_frame, text="📈 计算结果与工程分析", padding="10")
@@ -268,27 +360,40 @@ class ResistorNetworkCalculator:
         self.status_var = tk.StringVar(value="✅ 就绪 | 支持串并联混合网络 | 双击电阻值可编辑")
         ttk.Label(status_frame, textvariable=self.status_var, 
                  font=("Arial", 9), foreground="#7f8c8d").grid(row=0, column=0, sticky=tk.W)
+        status_frame.columnconfigure(0, weight=1)
+        ttk.Button(status_frame, text="⏹ 取消", command=self.cancel_tasks).grid(row=0, column=1, sticky=tk.E)
+        self.root.bind("<Escape>", self.cancel_tasks)
     
     def create_circuit_canvas(self):
         self.canvas = tk.Canvas(self.canvas_frame, bg="#f8f9fa", height=320)
         self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        self.canvas.bind("<Configure>", lambda e: self.draw_circuit())
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        # 拖动平移、滚轮缩放、双击恢复
+        self.scene_renderer = resistor_scene.SceneRenderer(self.canvas)
+        self._pan_anchor = (0, 0)
+        self.canvas.bind("<ButtonPress-1>", self._on_canvas_press)
+        self.canvas.bind("<B1-Motion>", self._on_canvas_drag)
+        self.canvas.bind("<Double-Button-1>", self._on_canvas_reset)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(sequence, self._on_canvas_wheel)
+    
+    def schedule_redraw(self):
+        """合并重绘请求：连续的尺寸变化事件只在空闲时重绘一次"""
+        if self._redraw_job is None:
+            self._redraw_job = self.root.after_idle(self.draw_circuit)
     
+    @timed("draw_circuit")
     def draw_circuit(self):
-        """绘制支持并联分支的电路拓扑图"""
-        self.canvas.delete("all")
+        """绘制支持并联分支的电路拓扑图 (保留式场景，只更新变化的图元)"""
+        if self._redraw_job is not None:
+            self.root.after_cancel(self._redraw_job)
+            self._redraw_job = None
         
-        # 获取当前画布宽度
+        # 获取当前画布尺寸
         canvas_width = self.canvas.winfo_width()
         if canvas_width < 100: canvas_width = 1060 # 默认值
-        
-        # 参数
-        x_start = max(60, int(canvas_width * 0.08))
-        y_center = 160
-        y_top_branch = 90
-        y_bottom_branch = 230
-        resistor_w = 45
-        resistor_h = 16
+        canvas_height = self.canvas.winfo_height()
+        if canvas_height < 100: canvas_height = 320
         
         try:
             vin = float(self.vin_var.get())
@@ -299,120 +404,32 @@ class ResistorNetworkCalculator:
         except:
             vin, vout, r1_eq, r2_eq, is_ntc = 4.2, 3.25, 15, 51, False
         
-        # 电源符号
-        self.canvas.create_line(x_start, y_center, x_start+35, y_center, width=3, arrow=tk.LAST, fill="#e74c3c")
-        self.canvas.create_text(x_start-20, y_center-30, text=f"{vin}V", 
-                               font=("Arial", 14, "bold"), fill="#c0392b")
-        self.canvas.create_text(x_start-20, y_center+20, text="Vin", font=("Arial", 10))
-        
-        # 绘制 R1 网络
-        x_pos = x_start + 50
-        x_pos = self._draw_resistor_network(self.canvas, self.r1_network, x_pos, y_center, y_top_branch, "#3498db", "R1")
-        
-        # Vout 采样点 (突出显示)
-        x_vout = x_pos + 25
-        self.canvas.create_line(x_vout, y_center, x_vout, y_center-55, width=3, dash=(5,3), fill="#27ae60")
-        self.canvas.create_oval(x_vout-8, y_center-62, x_vout+8, y_center-46, fill="#e74c3c", outline="white", width=2)
-        self.canvas.create_text(x_vout+35, y_center-78, text=f"Vout = {vout:.2f}V", 
-                               font=("Arial", 12, "bold"), fill="#27ae60")
-        self.canvas.create_text(x_vout+35, y_center-63, text="ADC_IN", 
-                               font=("Arial", 9, "italic"), fill="#7f8c8d")
-        
-        # 绘制 R2 网络
-        x_pos = x_vout + 50
-        x_pos = self._draw_resistor_network(self.canvas, self.r2_network, x_pos, y_center, y_bottom_branch, 
-                                           "#e67e22" if not is_ntc else "#8e44ad", "R2/NTC", is_ntc)
-        
-        # GND 符号
-        x_gnd = x_pos + 35
-        self.canvas.create_line(x_gnd, y_center, x_gnd+30, y_center, width=3, fill="#7f8c8d")
-        self.canvas.create_line(x_gnd+30, y_center-15, x_gnd+30, y_center+15, width=3, fill="#7f8c8d")
-        self.canvas.create_line(x_gnd+30, y_center+15, x_gnd+42, y_center+15, width=3, fill="#7f8c8d")
-        self.canvas.create_text(x_gnd+60, y_center+30, text="GND", 
-                               font=("Arial", 13, "bold"), fill="#7f8c8d")
-        
-        # 保护电容
-        cap_x = x_vout - 10
-        self.canvas.create_line(cap_x, y_center+40, cap_x+20, y_center+40, width=2, fill="#546e7a")
-        self.canvas.create_line(cap_x, y_center+52, cap_x+20, y_center+52, width=2, fill="#546e7a")
-        self.canvas.create_line(cap_x+10, y_center+40, cap_x+10, y_center+52, width=2, fill="#546e7a")
-        self.canvas.create_text(cap_x+10, y_center+68, text="0.1μF", font=("Arial", 9), fill="#546e7a")
-        
-        # 标题与安全指示
-        safety_color = "#27ae60" if vout <= 3.25 else "#f39c12" if vout <= 3.3 else "#e74c3c"
-        safety_text = "✅ 安全" if vout <= 3.25 else "⚠️ 临界" if vout <= 3.3 else "❌ 过压"
-        
-        self.canvas.create_text(canvas_width / 2, 25, text="🔋 电阻分压网络拓扑图 (支持串并联混合)", 
-                               font=("Arial", 15, "bold"), fill="#1a237e")
-        self.canvas.create_text(canvas_width - 110, 25, text=safety_text, 
-                               font=("Arial", 12, "bold"), fill=safety_color)
-        
-        # 网络等效值标注
-        if r1_eq > 0:
-            self.canvas.create_text(x_start+50 + (x_vout - x_start - 50)/2, y_center-120, 
-                                   text=f"R1_eq = {r1_eq:.2f}kΩ", 
-                                   font=("Arial", 10, "bold"), fill="#3498db")
-        if r2_eq > 0:
-            self.canvas.create_text(x_vout+50 + (x_gnd - x_vout - 50)/2, y_center+120, 
-                                   text=f"R2_eq = {r2_eq:.2f}kΩ", 
-                                   font=("Arial", 10, "bold"), fill="#e67e22")
-    
-    def _draw_resistor_network(self, canvas, network, x_start, y_main, y_branch, color, label, is_ntc=False):
-        """递归绘制电阻网络（支持嵌套并联）"""
-        x_pos = x_start
-        resistor_w = 45
-        resistor_h = 16
-        
-        for i, element in enumerate(network):
-            if isinstance(element, tuple) and element[0] == 'parallel':
-                # 绘制并联组
-                branches = element[1]
-                branch_spacing = 40
-                
-                # 绘制并联入口连线
-                canvas.create_line(x_pos, y_main, x_pos+15, y_main, width=2.5, fill=color)
-                
-                # 绘制各分支
-                for j, branch in enumerate(branches):
-                    y_offset = y_branch + (j - len(branches)/2 + 0.5) * branch_spacing
-                    
-                    # 分支垂直连线
-                    canvas.create_line(x_pos+15, y_main, x_pos+15, y_offset, width=1.5, dash=(3,2), fill=color)
-                    
-                    # 分支电阻（简化：只画一个代表电阻）
-                    if branch:
-                        r_val = branch[0][0] if isinstance(branch[0], tuple) else branch[0]
-                        canvas.create_rectangle(x_pos+20, y_offset-resistor_h/2, 
-                                              x_pos+20+resistor_w, y_offset+resistor_h/2,
-                                              fill="#ecf0f1", outline=color, width=2)
-                        canvas.create_text(x_pos+20+resistor_w/2, y_offset-25,
-                                         text=f"{r_val}kΩ", font=("Arial", 7), fill=color)
-                    
-                    # 分支返回连线
-                    canvas.create_line(x_pos+20+resistor_w+5, y_offset, x_pos+20+resistor_w+5, y_main, 
-                                     width=1.5, dash=(3,2), fill=color)
-                
-                # 并联出口连线
-                x_pos += 55
-                
-                # 并联标识 (根据分支方向调整标签位置，避免重叠)
-                label_y_offset = -25 if y_branch > y_main else 25
-                canvas.create_text(x_pos-20, y_main+label_y_offset, text=f"║║ {label}_{i+1}", 
-                                 font=("Arial", 8, "bold"), fill=color)
-            
-            elif isinstance(element, tuple) and element[1] == 'series':
-                # 绘制串联电阻
-                r_val = element[0]
-                canvas.create_rectangle(x_pos, y_main-resistor_h/2, 
-                                      x_pos+resistor_w, y_main+resistor_h/2,
-                                      fill="#ecf0f1", outline=color, width=2)
-                
-                tag = "NTC" if (is_ntc and i == 0) else f"{label}_{i+1}"
-                canvas.create_text(x_pos+resistor_w/2, y_main-28,
-                                 text=f"{tag}\n{r_val}kΩ", font=("Arial", 8), fill=color)
-                x_pos += resistor_w + 20
-        
-        return x_pos
+        scene = resistor_scene.circuit_scene(self.r1_network, self.r2_network, vin, vout, r1_eq, r2_eq,
+                                             is_ntc, canvas_width)
+        self.scene_renderer.render(scene, canvas_width, canvas_height)
+    
+    def _render_view(self):
+        """平移/缩放后按当前视图重新同步 (不重建场景)"""
+        self.scene_renderer.render(None, self.canvas.winfo_width(), self.canvas.winfo_height())
+    
+    def _on_canvas_press(self, event):
+        self._pan_anchor = (event.x, event.y)
+    
+    def _on_canvas_drag(self, event):
+        x0, y0 = self._pan_anchor
+        self._pan_anchor = (event.x, event.y)
+        self.scene_renderer.view.pan(event.x - x0, event.y - y0)
+        self._render_view()
+    
+    def _on_canvas_wheel(self, event):
+        up = getattr(event, 'delta', 0) > 0 or getattr(event, 'num', None) == 4
+        self.scene_renderer.view.zoom_at(1.2 if up else 1 / 1.2, event.x, event.y)
+        self._render_view()
+    
+    def _on_canvas_reset(self, event=None):
+        """双击恢复自动适应视图"""
+        self.scene_renderer.view.reset()
+        self._render_view()
     
     def add_resistor(self, side, r_type):
         """添加单个电阻到网络"""
@@ -421,10 +438,9 @@ class ResistorNetworkCalculator:
             if value <= 0:
                 raise ValueError("电阻值必须 > 0")
             
-            target = self.r1_network if side == 'r1' else self.r2_network
-            target.append((value, r_type))
+            self._network_tree(side).append((value, r_type))
             self.update_listbox(side)
-            self.calculate_network()
+            self.schedule_calculate()
             
         except ValueError as e:
             messagebox.showerror("输入错误", str(e))
@@ -467,10 +483,9 @@ class ResistorNetworkCalculator:
                 messagebox.showerror("错误", "至少需要一个有效电阻值")
                 return
             
-            target = self.r1_network if side == 'r1' else self.r2_network
-            target.append(('parallel', branches))
+            self._network_tree(side).append(('parallel', branches))
             self.update_listbox(side)
-            self.calculate_network()
+            self.schedule_calculate()
             dialog.destroy()
         
         btn_frame = ttk.Frame(dialog)
@@ -490,9 +505,9 @@ class ResistorNetworkCalculator:
             
         idx = selection[0]
         if 0 <= idx < len(network):
-            network.pop(idx)
+            self._network_tree(side).pop(idx)
             self.update_listbox(side)
-            self.calculate_network()
+            self.schedule_calculate()
 
     def edit_resistor(self, side):
         """双击编辑电阻值"""
@@ -519,10 +534,11 @@ class ResistorNetworkCalculator:
         new_val = simpledialog.askfloat("编辑电阻值", f"输入新的电阻值 (kΩ):", 
                                        initialvalue=current_val, parent=self.root)
         if new_val is not None and new_val > 0:
-            network[idx] = (new_val, element[1])
+            self._network_tree(side).set_value(idx, new_val)
             self.update_listbox(side)
-            self.calculate_network()
+            self.schedule_calculate()
     
+    @timed("update_listbox")
     def update_listbox(self, side):
         """更新列表框显示（支持并联组可视化）"""
         listbox = self.r1_listbox if side == 'r1' else self.r2_listbox
@@ -536,8 +552,11 @@ class ResistorNetworkCalculator:
                 branches = element[1]
                 branch_vals = []
                 for branch in branches:
-                    if branch:
+                    if len(branch) == 1 and branch[0][1] == 'series':
                         branch_vals.append(str(branch[0][0]))
+                    elif branch:
+                        # 多电阻支路显示支路等效值
+                        branch_vals.append(f"({engine.calculate_equivalent(branch):.2f})")
                 listbox.insert(tk.END, f"[{i+1}] ║║ 并联组: {' // '.join(branch_vals)} kΩ")
                 listbox.itemconfig(i, {'bg': '#e3f2fd'})
             else:
@@ -555,75 +574,221 @@ class ResistorNetworkCalculator:
         else:
             self.r2_network = []
             self.r2_listbox.delete(0, tk.END)
-        self.calculate_network()
+        self.schedule_calculate()
+    
+    def _network_tree(self, side) -> engine.CompiledNetwork:
+        """返回与当前网络列表同步的编译树（列表被整体替换时重新编译）"""
+        network = self.r1_network if side == 'r1' else self.r2_network
+        tree = self._trees.get(side)
+        if tree is None or tree.source is not network:
+            tree = engine.CompiledNetwork(network)
+            self._trees[side] = tree
+        return tree
     
     def calculate_equivalent(self, network) -> float:
-        """精确计算串并联混合网络的等效阻值"""
-        if not network:
-            return 0.001  # 避免除零
+        """精确计算串并联混合网络的等效阻值（R1/R2 使用缓存的编译树）"""
+        if network is self.r1_network:
+            network = self._network_tree('r1')
+        elif network is self.r2_network:
+            network = self._network_tree('r2')
+        return engine.calculate_equivalent(network)
+    
+    def schedule_calculate(self, status: Optional[str] = None):
+        """合并重算请求：同一轮事件中的多次修改只在空闲时计算一次
+
+        status: 计算完成后显示在状态栏的提示 (取最后一次请求的值)
+        """
+        if status is not None:
+            self._calc_status = status
+        if self._calc_job is None:
+            self._calc_job = self.root.after_idle(self._run_scheduled_calculate)
+    
+    def _run_scheduled_calculate(self):
+        self._calc_job = None
+        status, self._calc_status = self._calc_status, None
+        self.calculate_network()
+        if status:
+            self.status_var.set(status)
+    
+    def run_in_background(self, name: str, func, on_done, on_error=None) -> BackgroundTask:
+        """在后台线程运行耗时分析 func(progress)，完成后在主线程调用 on_done(result)
+
+        同名任务再次提交时取消旧任务；状态栏显示进度，Esc 或「取消」按钮终止。
+        """
+        old = self._tasks.get(name)
+        if old is not None:
+            old.cancel()
+        def work(progress):
+            with tracer().span(name, background=True):
+                return func(progress)
+        
+        task = BackgroundTask(work)
+        self._tasks[name] = task
+        self.status_var.set(f"⏳ {name}... (Esc 取消)")
+        self.root.after(TASK_POLL_MS, self._poll_task, name, task, on_done, on_error)
+        return task
+    
+    def _poll_task(self, name, task, on_done, on_error):
+        state, fraction = task.poll()
+        if state == "running":
+            if fraction is not None and not task.cancelled:
+                self.status_var.set(f"⏳ {name}: {fraction * 100:.0f}% (Esc 取消)")
+            self.root.after(TASK_POLL_MS, self._poll_task, name, task, on_done, on_error)
+            return
+        if self._tasks.get(name) is task:
+            del self._tasks[name]
+        if state == "done":
+            on_done(task.result)
+            self.show_timing(name, task.elapsed)
+        elif state == "error":
+            if on_error:
+                on_error(task.error)
+            else:
+                self.status_var.set(f"❌ {name}失败: {task.error}")
+                messagebox.showerror(f"{name}错误", str(task.error))
+        elif not self._tasks:
+            self.status_var.set(f"⏹ 已取消: {name}")
+    
+    def cancel_tasks(self, event=None):
+        """取消所有后台任务"""
+        for task in self._tasks.values():
+            task.cancel()
+        if self._tasks:
+            self.status_var.set("⏹ 正在取消...")
+    
+    def show_timing(self, op: str, seconds: float):
+        """在状态栏末尾显示最近一次操作的耗时 (替换上一次的耗时)"""
+        text = self.status_var.get().split(TIMING_SEP)[0]
+        self.status_var.set(f"{text}{TIMING_SEP}{op} {seconds * 1e3:.1f} ms")
+    
+    def toggle_profile(self):
+        """菜单开关：开启 cProfile；关闭时保存 .prof 文件并显示累计耗时最多的函数"""
+        if self.profile_var.get():
+            tracer().start_profile()
+            self.status_var.set("🔬 性能剖析已开启，再次点击菜单项结束并查看结果")
+            return
+        report = tracer().stop_profile(tracer().profile_path())
+        self.status_var.set("🔬 性能剖析已结束")
+        self._show_text_window("🔬 性能剖析 (按累计耗时)", report or "")
+    
+    def show_timing_stats(self):
+        """显示各操作的调用次数与耗时"""
+        t = tracer()
+        lines = [f"{'操作':24s} {'次数':>6s} {'总计 ms':>10s} {'平均 ms':>9s} {'最长 ms':>9s}", "-" * 64]
+        for op, s in t.stats().items():
+            lines.append(f"{op:24s} {s['calls']:6d} {s['total_ms']:10.1f} {s['mean_ms']:9.2f} {s['max_ms']:9.2f}")
+        if len(lines) == 2:
+            lines.append("(还没有记录)")
+        lines.append("")
+        lines.append(f"跟踪文件: {t.path or '未启用 (RESISTOR_TRACE=off)'}")
+        self._show_text_window("⏱ 耗时统计", "\n".join(lines))
+    
+    def _show_text_window(self, title: str, text: str):
+        win = tk.Toplevel(self.root)
+        win.title(title)
+        win.geometry("760x480")
+        box = scrolledtext.ScrolledText(win, font=("Courier", 9), wrap=tk.NONE)
+        box.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        box.insert(tk.END, text)
+        box.config(state=tk.DISABLED)
+        ttk.Button(win, text="关闭", command=win.destroy).pack(pady=5)
+    
+    def open_netlist_solver(self):
+        """任意电阻网表 (电桥、多抽头梯形网络、挂负载的分压点等) 的节点分析；默认填入当前分压器"""
+        import resistor_mna
+        win = tk.Toplevel(self.root)
+        win.title("🔌 网表节点分析")
+        win.geometry("820x640")
+        ttk.Label(win, text="网表 (每行 R名/V名/I名 节点 节点 数值；阻值 Ω、电流 A，可用 10k / 4k7 / 1meg；0 或 gnd 为地)",
+                  foreground="#7f8c8d").pack(anchor=tk.W, padx=8, pady=(8, 2))
+        source = scrolledtext.ScrolledText(win, font=("Courier", 9), height=14, wrap=tk.NONE)
+        source.pack(fill=tk.BOTH, expand=True, padx=8)
+        output = scrolledtext.ScrolledText(win, font=("Courier", 9), height=16, wrap=tk.NONE)
+        
+        def from_divider():
+            try:
+                net = resistor_mna.Netlist.from_divider(float(self.vin_var.get()), self._network_tree('r1'),
+                                                        self._network_tree('r2'))
+            except ValueError as e:
+                messagebox.showerror("生成网表错误", str(e), parent=win)
+                return
+            source.delete(1.0, tk.END)
+            source.insert(1.0, net.to_text("当前分压器 (可在 vout 与 0 之间添加负载等元件)"))
         
-        total = 0.0
-        i = 0
+        def open_file():
+            path = filedialog.askopenfilename(parent=win, filetypes=[("网表", "*.cir *.net *.sp *.txt"),
+                                                                     ("所有文件", "*.*")])
+            if path:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        text = f.read()
+                except (OSError, UnicodeDecodeError) as e:
+                    messagebox.showerror("打开网表错误", str(e), parent=win)
+                    return
+                source.delete(1.0, tk.END)
+                source.insert(1.0, text)
         
-        while i < len(network):
-            element = network[i]
+        def solve():
+            text = source.get(1.0, "end-1c")
             
-            if isinstance(element, tuple) and element[0] == 'parallel':
-                # 处理并联组
-                branches = element[1]
-                conductance_sum = 0.0
-                
-                for branch in branches:
-                    # 简化：每个分支只取第一个电阻（实际可递归计算分支等效）
-                    if branch:
-                        r_val = branch[0][0] if isinstance(branch[0], tuple) else branch[0]
-                        conductance_sum += 1.0 / r_val
-                
-                if conductance_sum > 0:
-                    r_parallel = 1.0 / conductance_sum
-                    total += r_parallel
-                i += 1
+            def work(progress):
+                net = resistor_mna.Netlist.parse(text)
+                lu = net.factor()
+                header = (f"{len(net.nodes)} 个节点, {len(net.resistors)} 个电阻, {len(net.vsources)} 个电压源, "
+                          f"{len(net.isources)} 个电流源 | 矩阵 {lu.n}×{lu.n}, 分解后非零 {lu.nnz:,} 个\n\n")
+                return header + resistor_mna.format_report(net.solve())
             
-            elif isinstance(element, tuple) and element[1] == 'series':
-                # 串联电阻
-                total += element[0]
-                i += 1
+            def show(report):
+                output.delete(1.0, tk.END)
+                output.insert(1.0, report)
+                self.status_var.set("✅ 网表分析完成")
             
-            else:
-                # 兼容旧格式
-                total += element[0] if isinstance(element, tuple) else element
-                i += 1
-        
-        return total if total > 0 else 0.001
+            def failed(error):
+                output.delete(1.0, tk.END)
+                output.insert(1.0, f"❌ {error}")
+                self.status_var.set(f"❌ 网表分析失败: {error}")
+            self.run_in_background("网表节点分析", work, show, failed)
+        
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(pady=6)
+        ttk.Button(btn_frame, text="▶ 求解", command=solve, style="Accent.TButton").pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="从当前分压器生成", command=from_divider).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="打开网表...", command=open_file).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="关闭", command=win.destroy).pack(side=tk.LEFT, padx=4)
+        output.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
+        from_divider()
     
+    @timed("calculate_network")
     def calculate_network(self):
         """全面网络分析：等效值、功耗、精度、安全边界"""
+        if self._calc_job is not None:
+            # 直接调用时顺带完成已排队的重算
+            self.root.after_cancel(self._calc_job)
+            self._calc_job = None
         try:
             vin = float(self.vin_var.get())
             vadc_max = float(self.adc_range_var.get())
+            adc_bits = int(self.adc_bits_var.get())
             r1_eq = self.calculate_equivalent(self.r1_network)
             r2_eq = self.calculate_equivalent(self.r2_network)
             
-            if r1_eq < 0.01 or r2_eq < 0.01:
-                raise ValueError("R1 和 R2 均需 > 0")
-            
-            vout = vin * r2_eq / (r1_eq + r2_eq)
-            current_ma = vin / (r1_eq + r2_eq)  # mA (因电阻为 kΩ)
-            power_r1_mw = (vin * r2_eq / (r1_eq + r2_eq))**2 / r1_eq  # mW
-            power_r2_mw = vout**2 / r2_eq  # mW
+            result = engine.analyze_divider(vin, r1_eq, r2_eq, vadc_max, adc_bits)
+            vout = result["vout"]
+            current_ma = result["current_ma"]
+            power_r1_mw = result["power_r1_mw"]
+            power_r2_mw = result["power_r2_mw"]
             
             # 安全检查
-            if vout > 3.25:
-                safety = "❌ 过压危险!" if vout >= vadc_max else "⚠️ 接近极限 (建议 ≤3.25V)"
-                safety_color = "#e74c3c" if vout >= vadc_max else "#f39c12"
+            if result["safety"] == 'over':
+                safety = "❌ 过压危险!"
+            elif result["safety"] == 'warn':
+                safety = "⚠️ 接近极限 (建议 ≤3.25V)"
             else:
-                safety = f"✅ 安全 (裕量 {3.25 - vout:.2f}V)"
-                safety_color = "#27ae60"
+                safety = f"✅ 安全 (裕量 {engine.VADC_SAFE - vout:.2f}V)"
             
             # ADC 分辨率分析
-            adc_bits = 12
-            adc_lsb_mv = vadc_max * 1000 / (2**adc_bits)
-            batt_lsb_mv = adc_lsb_mv * (r1_eq + r2_eq) / r2_eq
+            adc_lsb_mv = result["adc_lsb_mv"]
+            batt_lsb_mv = result["vin_lsb_mv"]
             
             # 并联网络分析
             parallel_analysis = self.analyze_parallel_network()
@@ -639,21 +804,37 @@ class ResistorNetworkCalculator:
             if power_r1_mw > 0.125 or power_r2_mw > 0.125:
                 report += f"  ⚠️  提示: 单电阻功耗 > 1/8W，建议使用 1/4W 电阻或并联分担!\n"
             
-            report += f"\n【📐 ADC 分辨率】(假设 {adc_bits}-bit ADC, 量程 {vadc_max}V)\n"
-            report += f"  ADC LSB: {adc_lsb_mv:.2f} mV  →  电池电压分辨率: {batt_lsb_mv:.2f} mV/LSB\n"
+            report += f"\n【📐 ADC 分辨率】({adc_bits}-bit ADC, 量程 {vadc_max}V)\n"
+            report += f"  ADC LSB: {adc_lsb_mv:.4g} mV  →  电池电压分辨率: {batt_lsb_mv:.4g} mV/LSB\n"
             
             if parallel_analysis:
                 report += f"\n{parallel_analysis}"
             
+            # 容差最坏情况 (解析灵敏度，O(N)，每次编辑都可以重算)
+            if self.r1_network and self.r2_network:
+                wc = engine.divider_sensitivity(self._network_tree('r1'), self._network_tree('r2'), vin, 1.0)
+                report += f"\n【🎯 容差最坏情况】(每个电阻 ±1%)\n"
+                report += f"  Vout: {wc['vout_min']:.3f}V ~ {wc['vout_max']:.3f}V "
+                report += f"({(wc['vout_min']/vout - 1)*100:+.2f}% / {(wc['vout_max']/vout - 1)*100:+.2f}%)"
+                report += f"  |  RSS: ±{wc['rss_pct']:.2f}%\n"
+                report += "  主要误差来源: " + "  ".join(
+                    f"{p['ref']}({p['value']:g}kΩ) {p['share_pct']:.0f}%" for p in engine.top_contributors(wc)) + "\n"
+            
             # NTC 特殊分析
             if self.use_ntc_var.get():
                 report += f"\n【🌡️ NTC 特性】\n"
                 report += f"  型号: {self.ntc_model_var.get()}\n"
                 report += f"  25°C 电阻: {float(self.ntc_r25_var.get())/1000:.1f}kΩ  |  B 值: {self.ntc_b_var.get()}K\n"
+                fitted = self._ntc_fitted_model()
+                if fitted:
+                    report += f"  模型: {fitted['form']} 拟合 ({fitted['points']} 点, 残差 RMS {fitted['rms_c']:.3f}°C)\n"
                 report += f"  ⚠️  注意: NTC 阻值随温度变化，Vout 非线性，请使用查表法或 Steinhart-Hart 公式校准!\n"
             
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(1.0, report)
+            # 报告未变化时不重写文本框 (保留滚动位置，避免闪烁)
+            if report != self._last_report or self.result_text.get(1.0, "end-1c") != report:
+                self.result_text.delete(1.0, tk.END)
+                self.result_text.insert(1.0, report)
+                self._last_report = report
             self.status_var.set(f"✅ 计算完成 | Vout={vout:.3f}V | R1_eq={r1_eq:.2f}kΩ | R2_eq={r2_eq:.2f}kΩ")
             
             # 更新电路图
@@ -661,6 +842,7 @@ class ResistorNetworkCalculator:
             
         except Exception as e:
             error_msg = f"计算错误: {str(e)}"
+            self._last_report = None
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(1.0, error_msg)
             self.status_var.set(f"❌ {error_msg}")
@@ -672,28 +854,26 @@ class ResistorNetworkCalculator:
         has_parallel = False
         
         for side, network, name in [('r1', self.r1_network, 'R1'), ('r2', self.r2_network, 'R2')]:
-            for element in network:
-                if isinstance(element, tuple) and element[0] == 'parallel':
-                    has_parallel = True
-                    branches = element[1]
-                    r_vals = [branch[0][0] for branch in branches if branch]
-                    r_eq = 1.0 / sum(1.0/r for r in r_vals) if r_vals else 0
-                    
-                    analysis += f"\n【{name} 并联组分析】等效 {r_eq:.2f}kΩ\n"
-                    analysis += f"  电阻组成: {' // '.join(f'{r}kΩ' for r in r_vals)}\n"
-                    
-                    # 功率分配（假设总功耗 0.25W）
-                    total_power_mw = 250  # 假设总功耗 250mW 用于演示
-                    for r in r_vals:
-                        i_branch = math.sqrt(total_power_mw / 1000 / r_eq) * (r_eq / r)  # 分支电流比例
-                        p_branch = (i_branch**2) * r
-                        analysis += f"    • {r}kΩ: 功耗 {p_branch:.1f}mW ({p_branch/total_power_mw*100:.1f}%)\n"
-                    
-                    # 精度分析
-                    analysis += f"  精度增益: 并联可降低温漂影响，等效温度系数 ≈ 单电阻的 1/√N\n"
+            for r_vals in engine.parallel_groups(network):
+                has_parallel = True
+                r_eq = engine.parallel_equivalent(r_vals)
+                
+                analysis += f"\n【{name} 并联组分析】等效 {r_eq:.2f}kΩ\n"
+                analysis += f"  电阻组成: {' // '.join(f'{r}kΩ' for r in r_vals)}\n"
+                
+                # 功率分配（假设总功耗 0.25W）
+                total_power_mw = 250  # 假设总功耗 250mW 用于演示
+                for r in r_vals:
+                    i_branch = math.sqrt(total_power_mw / 1000 / r_eq) * (r_eq / r)  # 分支电流比例
+                    p_branch = (i_branch**2) * r
+                    analysis += f"    • {r}kΩ: 功耗 {p_branch:.1f}mW ({p_branch/total_power_mw*100:.1f}%)\n"
+                
+                # 精度分析
+                analysis += f"  精度增益: 并联可降低温漂影响，等效温度系数 ≈ 单电阻的 1/√N\n"
         
         return analysis if has_parallel else ""
     
+    @timed("calculate_missing")
     def calculate_missing(self):
         """智能计算缺失电阻（支持网络约束）"""
         try:
@@ -726,7 +906,7 @@ class ResistorNetworkCalculator:
             
             if r1_eq < 0.01:
                 # R1 未知
-                r1_calc = r2_eq * (vin - vout_target) / vout_target
+                r1_calc = engine.solve_r1(vin, vout_target, r2_eq)
                 if r1_calc <= 0:
                     raise ValueError("计算出的 R1 ≤ 0，检查参数")
                 self.r1_network = [(r1_calc, 'series')]
@@ -734,7 +914,7 @@ class ResistorNetworkCalculator:
             
             elif r2_eq < 0.01:
                 # R2 未知
-                r2_calc = r1_eq * vout_target / (vin - vout_target)
+                r2_calc = engine.solve_r2(vin, vout_target, r1_eq)
                 if r2_calc <= 0:
                     raise ValueError("计算出的 R2 ≤ 0，检查参数")
                 self.r2_network = [(r2_calc, 'series')]
@@ -754,100 +934,112 @@ class ResistorNetworkCalculator:
             messagebox.showerror("计算错误", str(e))
     
     def recommend_standard(self):
-        """智能推荐标准电阻组合（含并联方案）"""
+        """智能推荐标准电阻组合（含并联方案），标准值搜索在后台进行"""
         try:
             vin = float(self.vin_var.get())
             vout = float(self.vout_var.get())
-            ratio = vout / vin
-            r2_r1 = ratio / (1 - ratio)
+        except ValueError as e:
+            messagebox.showerror("推荐错误", str(e))
+            return
+        self.run_in_background("推荐标准值", lambda progress: engine.recommend_standard(vin, vout),
+                               lambda rec: self._show_recommendation(vin, vout, rec))
+    
+    def _show_recommendation(self, vin, vout, rec):
+        try:
+            r1_base = rec["r1_base"]
             
             report = f"🎯 标准电阻推荐 (Vin={vin}V → Vout={vout}V)\n"
-            report += f"   理论分压比: {ratio:.4f}  |  R2/R1 = {r2_r1:.4f}\n"
+            report += f"   理论分压比: {rec['ratio']:.4f}  |  R2/R1 = {rec['r2_r1']:.4f}\n"
             report += "="*72 + "\n\n"
             
             # 方案1: 单电阻 E24
-            r1_base = 15.0
-            r2_calc = r1_base * r2_r1
-            r2_e24 = self.find_nearest_e24(r2_calc * 1000) / 1000
-            vout_e24 = vin * r2_e24 / (r1_base + r2_e24)
-            err_e24 = (vout_e24 - vout) / vout * 100
-            
-            report += f"【方案1】单电阻 (E24 标准值) - 简单可靠\n"
-            report += f"  R1 = {r1_base}kΩ + R2 = {r2_e24:.2f}kΩ\n"
-            report += f"  → Vout = {vout_e24:.3f}V (误差 {err_e24:+.2f}%)  电流 {vin/(r1_base+r2_e24):.3f}mA\n\n"
+            single = rec["single"]
+            single_e96 = rec["single_e96"]
+            report += f"【方案1】单电阻 (E24 标准值，全十倍程搜索) - 简单可靠\n"
+            report += f"  R1 = {single['r1']:g}kΩ + R2 = {single['r2']:g}kΩ\n"
+            report += f"  → Vout = {single['vout']:.3f}V (误差 {single['error_pct']:+.2f}%)  电流 {single['current_ma']:.3f}mA\n"
+            report += f"  E96 最佳: R1 = {single_e96['r1']:g}kΩ + R2 = {single_e96['r2']:g}kΩ"
+            report += f" → Vout = {single_e96['vout']:.3f}V (误差 {single_e96['error_pct']:+.3f}%)\n\n"
             
             # 方案2: 串联组合（提高精度）
-            r2_s1 = self.find_nearest_e24(r2_calc * 1000 * 0.7) / 1000
-            r2_s2 = self.find_nearest_e24((r2_calc - r2_s1) * 1000) / 1000
-            r2_series = r2_s1 + r2_s2
-            vout_s = vin * r2_series / (r1_base + r2_series)
-            err_s = (vout_s - vout) / vout * 100
-            
+            series = rec["series"]
+            r2_s1, r2_s2 = series["parts"]
             report += f"【方案2】R2 串联组合 - 精度提升\n"
             report += f"  R1 = {r1_base}kΩ + R2 = {r2_s1:.2f}kΩ ── {r2_s2:.2f}kΩ\n"
-            report += f"  → 等效 {r2_series:.2f}kΩ → Vout = {vout_s:.3f}V (误差 {err_s:+.2f}%)\n\n"
+            report += f"  → 等效 {series['r2']:.2f}kΩ → Vout = {series['vout']:.3f}V (误差 {series['error_pct']:+.2f}%)\n\n"
             
             # 方案3: 并联组合（实现低阻值/功率分配）
-            # 寻找两个标准值并联接近目标
-            best_err = float('inf')
-            best_pair = None
-            for r_a in [r * 10 for r in self.e24_values]:  # 10k~100k 范围
-                for r_b in [r * 10 for r in self.e24_values]:
-                    r_eq = 1 / (1/r_a + 1/r_b)
-                    err = abs(r_eq - r2_calc)
-                    if err < best_err and r_eq > 0:
-                        best_err = err
-                        best_pair = (r_a, r_b, r_eq)
-            
-            if best_pair:
-                r_a, r_b, r_eq = best_pair
-                vout_p = vin * r_eq / (r1_base + r_eq)
-                err_p = (vout_p - vout) / vout * 100
+            parallel = rec["parallel"]
+            if parallel:
+                r_a, r_b = parallel["parts"]
                 report += f"【方案3】R2 并联组合 - 功率分配/非标阻值\n"
                 report += f"  R1 = {r1_base}kΩ + R2 = {r_a:.0f}kΩ ║ {r_b:.0f}kΩ\n"
-                report += f"  → 等效 {r_eq:.2f}kΩ → Vout = {vout_p:.3f}V (误差 {err_p:+.2f}%)\n"
+                report += f"  → 等效 {parallel['r2']:.2f}kΩ → Vout = {parallel['vout']:.3f}V (误差 {parallel['error_pct']:+.2f}%)\n"
                 report += f"  💡 优势: 功耗均分，单电阻功耗降至 50%，提升可靠性!\n\n"
             
             # 电池监测安全配置
-            if vin >= 4.0:
-                safe_vout = 3.25
-                safe_ratio = safe_vout / vin
-                safe_r2_r1 = safe_ratio / (1 - safe_ratio)
-                r1_safe = 18.0 if vin >= 4.5 else 15.0
-                r2_safe = r1_safe * safe_r2_r1
-                r2_safe_std = self.find_nearest_e24(r2_safe * 1000) / 1000
-                vout_safe = vin * r2_safe_std / (r1_safe + r2_safe_std)
-                
+            safe = rec["battery_safe"]
+            if safe:
                 report += f"⚠️  🔋 电池监测安全配置 (Vin={vin}V → Vout≤3.25V):\n"
-                report += f"   R1 = {r1_safe}kΩ + R2 = {r2_safe_std:.2f}kΩ → Vout = {vout_safe:.3f}V ✅\n"
-                report += f"   安全裕量: {3.25 - vout_safe:.2f}V (可承受电池瞬时过冲至 {vin + 0.1:.2f}V)\n"
+                report += f"   R1 = {safe['r1']}kΩ + R2 = {safe['r2']:.2f}kΩ → Vout = {safe['vout']:.3f}V ✅\n"
+                report += f"   安全裕量: {safe['margin']:.2f}V (可承受电池瞬时过冲至 {vin + 0.1:.2f}V)\n"
             
+            best_err = min(abs(s["error_pct"]) for s in (single, single_e96, series, parallel) if s)
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(1.0, report)
-            self.status_var.set(f"✅ 推荐完成 | 最佳方案误差 {min(abs(err_e24), abs(err_s), abs(err_p) if best_pair else 999):.2f}%")
+            cache = engine.cache_stats()
+            self.status_var.set(f"✅ 推荐完成 | 最佳方案误差 {best_err:.2f}% | "
+                                f"缓存命中 {cache['hits']}/{cache['hits'] + cache['misses']}")
         
         except Exception as e:
             messagebox.showerror("推荐错误", str(e))
     
+    def synthesize_network(self):
+        """按当前 R1 与 Vout 目标，综合元件数最少的 R2 串并联网络并载入 (搜索在后台进行)"""
+        try:
+            vin = float(self.vin_var.get())
+            vout = float(self.vout_var.get())
+            if not 0 < vout < vin:
+                raise ValueError("Vout 必须 < Vin")
+            if not self.r1_network:
+                raise ValueError("请先配置 R1 网络")
+            
+            r1_eq = self.calculate_equivalent(self.r1_network)
+            target_k = engine.solve_r2(vin, vout, r1_eq)
+        except Exception as e:
+            messagebox.showerror("综合错误", str(e))
+            return
+        self.run_in_background(
+            "网络综合", lambda progress: engine.synthesize_network(target_k, "E24", max_parts=4, tolerance_pct=0.1),
+            lambda result: self._apply_synthesis(target_k, result))
+    
+    def _apply_synthesis(self, target_k, result):
+        try:
+            if result is None:
+                raise ValueError(f"目标 {target_k:.3f}kΩ 附近没有可用的标准值")
+            
+            self.use_ntc_var.set(False)
+            self.r2_network = result["network"]
+            self.update_listbox('r2')
+            self.calculate_network()
+            
+            status = "✅" if result["within_tol"] else "⚠️ 未达到 ±0.1%，已给出最接近方案"
+            self.result_text.insert(tk.END, 
+                f"\n🧩 R2 网络综合: 目标 {target_k:.3f}kΩ → {result['text']} = {result['eq']:.3f}kΩ "
+                f"({result['parts']} 个 E24 电阻, 误差 {result['error_pct']:+.3f}%) {status}\n")
+        
+        except Exception as e:
+            messagebox.showerror("综合错误", str(e))
+    
     def find_nearest_e24(self, value_ohm: float) -> float:
         """在 E24 系列中查找最接近的值（单位：Ω）"""
-        best_diff = float('inf')
-        best_val = None
-        
-        for base in self.e24_values:
-            for exp in range(-1, 6):  # 0.1Ω 到 1MΩ
-                candidate = base * (10 ** exp)
-                diff = abs(candidate - value_ohm)
-                if diff < best_diff:
-                    best_diff = diff
-                    best_val = candidate
-        return best_val
+        return engine.find_nearest_e24(value_ohm)
     
     def open_parallel_calculator(self):
         """专用并联计算器：输入目标阻值，推荐并联组合"""
         dialog = tk.Toplevel(self.root)
         dialog.title("🔀 并联电阻计算器")
-        dialog.geometry("500x450")
+        dialog.geometry("500x520")
         dialog.transient(self.root)
         dialog.grab_set()
         
@@ -857,7 +1049,11 @@ class ResistorNetworkCalculator:
         
         ttk.Label(dialog, text="并联电阻数量:", font=("Arial", 10)).pack(pady=(10,5))
         count_var = tk.StringVar(value="2")
-        ttk.Combobox(dialog, textvariable=count_var, values=["2", "3", "4"], width=5, state="readonly").pack()
+        ttk.Combobox(dialog, textvariable=count_var, values=["2", "3", "4", "5"], width=5, state="readonly").pack()
+        
+        ttk.Label(dialog, text="标准系列:", font=("Arial", 10)).pack(pady=(10,5))
+        series_var = tk.StringVar(value="E24")
+        ttk.Combobox(dialog, textvariable=series_var, values=list(engine.SERIES_BASES), width=6, state="readonly").pack()
         
         result_text = scrolledtext.ScrolledText(dialog, height=15, width=60, font=("Courier", 10))
         result_text.pack(padx=15, pady=15, fill=tk.BOTH, expand=True)
@@ -866,45 +1062,32 @@ class ResistorNetworkCalculator:
             try:
                 target_k = float(target_var.get())
                 count = int(count_var.get())
+                series = series_var.get()
                 target_ohm = target_k * 1000
                 
                 result_text.delete(1.0, tk.END)
                 result_text.insert(tk.END, f"目标等效阻值: {target_k}kΩ ({target_ohm:.0f}Ω)\n")
-                result_text.insert(tk.END, f"寻找 {count} 个 E24 标准电阻并联组合...\n")
+                result_text.insert(tk.END, f"寻找 {count} 个 {series} 标准电阻并联组合...\n")
                 result_text.insert(tk.END, "="*56 + "\n\n")
                 
                 # 简化算法：使用相同阻值并联（最实用）
-                single_r = target_k * count
-                std_r = self.find_nearest_e24(single_r * 1000) / 1000
-                
-                eq_calc = std_r / count
-                error_pct = (eq_calc - target_k) / target_k * 100
+                identical = engine.parallel_identical(target_k, count)
+                std_r = identical["r"]
+                eq_calc = identical["eq"]
+                error_pct = identical["error_pct"]
                 
                 result_text.insert(tk.END, f"【推荐方案】{count} 个相同电阻并联\n")
                 result_text.insert(tk.END, f"  单个电阻: {std_r:.2f}kΩ (E24 标准值)\n")
                 result_text.insert(tk.END, f"  并联等效: {eq_calc:.3f}kΩ (目标 {target_k}kΩ, 误差 {error_pct:+.2f}%)\n")
                 result_text.insert(tk.END, f"  💡 优势: 采购简单，功率自动均分\n\n")
                 
-                # 备选：不同阻值组合（穷举前3名）
-                if count == 2:
-                    result_text.insert(tk.END, "【备选方案】2 个不同阻值并联:\n")
-                    candidates = []
-                    for r1_base in self.e24_values:
-                        for exp1 in [1, 10, 100]:  # kΩ 范围
-                            r1 = r1_base * exp1
-                            if r1 < target_k * 1.5:  # 合理范围
-                                r2 = 1 / (1/target_k - 1/r1) if (1/target_k - 1/r1) > 0 else 0
-                                if r2 > target_k and r2 < 1000:
-                                    r2_std = self.find_nearest_e24(r2 * 1000) / 1000
-                                    eq = 1 / (1/r1 + 1/r2_std)
-                                    err = abs(eq - target_k)
-                                    candidates.append((err, r1, r2_std, eq))
-                    
-                    candidates.sort(key=lambda x: x[0])
-                    for i, (err, r1, r2, eq) in enumerate(candidates[:3]):
-                        err_pct = (eq - target_k) / target_k * 100
+                # 备选：任意阻值组合（折半搜索前5名）
+                if count >= 2:
+                    result_text.insert(tk.END, f"【备选方案】{count} 个 {series} 阻值并联 (单个 ≤ {4 * count}× 目标范围内最优前 5 名):\n")
+                    for i, combo in enumerate(engine.parallel_combinations(target_k, count, series, k=5)):
+                        parts = " ║ ".join(f"{r:g}kΩ" for r in combo["values"])
                         result_text.insert(tk.END, 
-                            f"  {i+1}. {r1:.1f}kΩ ║ {r2:.1f}kΩ → {eq:.3f}kΩ (误差 {err_pct:+.2f}%)\n")
+                            f"  {i+1}. {parts} → {combo['eq']:.3f}kΩ (误差 {combo['error_pct']:+.4f}%)\n")
                 
                 result_text.insert(tk.END, "\n" + "="*56 + "\n")
                 result_text.insert(tk.END, "💡 工程建议:\n")
@@ -991,11 +1174,116 @@ class ResistorNetworkCalculator:
                   style="Accent.TButton").grid(row=4, column=0, columnspan=2, pady=10)
         ttk.Button(dialog, text="关闭", command=dialog.destroy).grid(row=5, column=0, columnspan=2)
     
+    def open_adc_optimizer(self):
+        """ADC 分辨率感知的分压优化：多个位数下可用码数最多的标准 R1/R2 组合 (后台计算，需要 numpy)"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📐 ADC 分压优化")
+        dialog.geometry("820x620")
+        dialog.transient(self.root)
+        
+        form = ttk.Frame(dialog, padding="10")
+        form.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        fields = [
+            ("信号最低 (V):", "vmin", "0"),
+            ("信号最高 (V):", "vmax", self.vin_var.get()),
+            ("ADC 位数:", "bits", "10 12 14 16"),
+            ("参考电压 (V):", "vref", self.adc_range_var.get()),
+            ("噪声底 (µV rms):", "noise", "0"),
+            ("噪声带宽 (Hz):", "bandwidth", ""),
+            ("采样电容 (pF):", "c_sample", ""),
+            ("采集时间 (µs):", "t_acq", ""),
+            ("电流上限 (µA):", "max_ua", ""),
+            ("R1+R2 上限 (kΩ):", "max_total", "1000"),
+        ]
+        entries = {}
+        for i, (label, key, default) in enumerate(fields):
+            ttk.Label(form, text=label).grid(row=i // 2, column=(i % 2) * 2, sticky=tk.W, padx=5, pady=3)
+            entries[key] = tk.StringVar(value=default)
+            ttk.Entry(form, textvariable=entries[key], width=14).grid(row=i // 2, column=(i % 2) * 2 + 1, pady=3)
+        ttk.Label(form, text="系列:").grid(row=len(fields) // 2, column=0, sticky=tk.W, padx=5, pady=3)
+        series_var = tk.StringVar(value="E96")
+        ttk.Combobox(form, textvariable=series_var, values=list(engine.SERIES_BASES), width=11,
+                     state="readonly").grid(row=len(fields) // 2, column=1, pady=3)
+        
+        result_text = scrolledtext.ScrolledText(dialog, height=24, width=100, font=("Courier", 9))
+        result_text.grid(row=1, column=0, padx=10, pady=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+        dialog.columnconfigure(0, weight=1)
+        dialog.rowconfigure(1, weight=1)
+        best = {}
+        
+        def number(key):
+            text = entries[key].get().strip()
+            return float(text) if text else None
+        
+        def optimize():
+            try:
+                import resistor_adc
+            except ImportError:
+                messagebox.showerror("缺少依赖", "ADC 分压优化需要 numpy: pip install numpy", parent=dialog)
+                return
+            try:
+                params = dict(vin_min=number("vmin") or 0.0, vin_max=number("vmax"),
+                              bits=[int(b) for b in entries["bits"].get().replace(",", " ").split()],
+                              vref=number("vref"), vadc_safe=engine.VADC_SAFE, noise_uv=number("noise") or 0.0,
+                              series=series_var.get(), k=8, r_total_max_k=number("max_total") or 1000.0,
+                              i_max_ua=number("max_ua"), c_sample_pf=number("c_sample"),
+                              t_acq_us=number("t_acq"), bandwidth_hz=number("bandwidth"))
+            except (TypeError, ValueError) as e:
+                messagebox.showerror("参数错误", str(e), parent=dialog)
+                return
+            self.run_in_background("ADC 分压优化", lambda progress: resistor_adc.optimize_adc_divider(**params),
+                                   lambda result: show(params, result),
+                                   lambda e: messagebox.showerror("优化错误", str(e), parent=dialog))
+        
+        def show(params, result):
+            if not dialog.winfo_exists():
+                return
+            best.clear()
+            result_text.delete(1.0, tk.END)
+            result_text.insert(tk.END, f"【📐 ADC 分压优化】信号 {params['vin_min']}V – {params['vin_max']}V, "
+                                       f"参考 {params['vref']}V, 安全上限 {engine.VADC_SAFE}V, {params['series']}, "
+                                       f"候选 {result['candidates']:,} 组\n")
+            for bits, rows in result["tables"].items():
+                result_text.insert(tk.END, f"\n{bits}-bit  (满足约束 {result['feasible'][bits]:,} 组)\n")
+                if not rows:
+                    result_text.insert(tk.END, "   ❌ 没有满足约束的组合\n")
+                    continue
+                best[bits] = rows[0]
+                result_text.insert(tk.END, f"   {'R1(kΩ)':>8} {'R2(kΩ)':>8} {'Vout最大':>8} {'可用码':>9} {'有效位':>6} "
+                                           f"{'mV/码':>8} {'电流µA':>9} {'源阻抗kΩ':>9}\n")
+                for r in rows:
+                    result_text.insert(tk.END, f"   {r['r1']:8g} {r['r2']:8g} {r['vout_max']:8.3f} "
+                                               f"{r['usable_codes']:9.0f} {r['usable_bits']:6.2f} {r['vin_step_mv']:8.3f} "
+                                               f"{r['current_ua']:9.1f} {r['source_k']:9.3f}\n")
+        
+        def apply_best():
+            """把当前 ADC 位数下的最佳组合应用到 R1/R2"""
+            try:
+                bits = int(self.adc_bits_var.get())
+            except ValueError:
+                bits = None
+            row = best.get(bits) or (best[max(best)] if best else None)
+            if row is None:
+                messagebox.showinfo("提示", "请先运行优化", parent=dialog)
+                return
+            self.use_ntc_var.set(False)
+            self.r1_network = [(row["r1"], 'series')]
+            self.r2_network = [(row["r2"], 'series')]
+            self.update_listbox('r1')
+            self.update_listbox('r2')
+            self.schedule_calculate(status=f"✅ 已应用 ADC 优化方案 R1={row['r1']:g}kΩ, R2={row['r2']:g}kΩ")
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.grid(row=2, column=0, pady=8)
+        ttk.Button(btn_frame, text="开始优化", command=optimize, style="Accent.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="应用当前位数最佳方案", command=apply_best).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="关闭", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
     def open_precision_optimizer(self):
-        """精度优化建议（利用并联降低容差）"""
+        """精度优化建议（蒙特卡洛评估各方案容差 + 当前分压网络良率）"""
         dialog = tk.Toplevel(self.root)
         dialog.title("🎯 精度优化建议")
-        dialog.geometry("520x420")
+        dialog.geometry("560x560")
         dialog.transient(self.root)
         dialog.grab_set()
         
@@ -1007,79 +1295,171 @@ class ResistorNetworkCalculator:
         tol_var = tk.StringVar(value="1")
         ttk.Combobox(dialog, textvariable=tol_var, values=["0.1", "0.5", "1", "5"], width=6, state="readonly").grid(row=1, column=1, padx=5, pady=8)
         
-        result_text = scrolledtext.ScrolledText(dialog, height=16, width=65, font=("Courier", 9))
-        result_text.grid(row=2, column=0, columnspan=2, padx=15, pady=15)
+        ttk.Label(dialog, text="容差分布:", font=("Arial", 10)).grid(row=2, column=0, padx=15, pady=8, sticky=tk.W)
+        dist_var = tk.StringVar(value="normal")
+        ttk.Combobox(dialog, textvariable=dist_var, values=["normal", "uniform"], width=8, state="readonly").grid(row=2, column=1, padx=5, pady=8)
+        
+        ttk.Label(dialog, text="Vout 规格 (± %):", font=("Arial", 10)).grid(row=3, column=0, padx=15, pady=8, sticky=tk.W)
+        spec_var = tk.StringVar(value="1")
+        ttk.Entry(dialog, textvariable=spec_var, width=12).grid(row=3, column=1, padx=5, pady=8)
+        
+        result_text = scrolledtext.ScrolledText(dialog, height=18, width=70, font=("Courier", 9))
+        result_text.grid(row=4, column=0, columnspan=2, padx=15, pady=15)
+        
+        def load_montecarlo():
+            try:
+                import resistor_montecarlo
+            except ImportError:
+                result_text.delete(1.0, tk.END)
+                result_text.insert(tk.END, "蒙特卡洛分析需要 numpy: pip install numpy\n")
+                return None
+            return resistor_montecarlo
+        
+        # 两项分析都在后台线程运行；关闭对话框或按 Esc 取消
+        dialog_tasks = ("精度优化", "蒙特卡洛")
+        
+        def run(name, work, show):
+            result_text.delete(1.0, tk.END)
+            result_text.insert(tk.END, f"⏳ {name}计算中... (Esc 或「取消」终止)\n")
+            
+            def on_error(e):
+                result_text.delete(1.0, tk.END)
+                result_text.insert(tk.END, f"{name}错误: {str(e)}")
+            self.run_in_background(name, work, show, on_error)
+        
+        def cancel(event=None):
+            for name in dialog_tasks:
+                task = self._tasks.get(name)
+                if task is not None and not task.cancelled:
+                    task.cancel()
+                    result_text.insert(tk.END, f"⏹ 已取消{name}\n")
+        
+        def close():
+            cancel()
+            dialog.destroy()
         
         def optimize():
+            mc = load_montecarlo()
+            if mc is None:
+                return
             try:
                 target_k = float(target_var.get())
                 tol_pct = float(tol_var.get())
+                dist = dist_var.get()
                 
-                result_text.delete(1.0, tk.END)
-                result_text.insert(tk.END, f"【精度优化分析】目标 {target_k}kΩ, 单电阻容差 ±{tol_pct}%\n")
-                result_text.insert(tk.END, "="*60 + "\n\n")
-                
-                # 方案1: 单电阻
+                # 三种方案的网络 (kΩ)
                 std_val = self.find_nearest_e24(target_k * 1000) / 1000
-                err_single = abs(std_val - target_k) / target_k * 100
-                total_tol_single = err_single + tol_pct
-                
-                result_text.insert(tk.END, f"方案1: 单电阻 {std_val:.2f}kΩ (E24)\n")
-                result_text.insert(tk.END, f"  • 标称误差: {err_single:+.2f}%\n")
-                result_text.insert(tk.END, f"  • 总容差: ±{total_tol_single:.2f}% (标称误差 + 电阻容差)\n\n")
-                
-                # 方案2: 串联组合
                 r1 = self.find_nearest_e24(target_k * 1000 * 0.7) / 1000
                 r2 = self.find_nearest_e24((target_k - r1) * 1000) / 1000
-                eq_series = r1 + r2
-                err_series = abs(eq_series - target_k) / target_k * 100
-                # 串联容差：近似相加（最坏情况）
-                total_tol_series = err_series + tol_pct * 2
-                
-                result_text.insert(tk.END, f"方案2: 串联组合 {r1:.2f}kΩ + {r2:.2f}kΩ\n")
-                result_text.insert(tk.END, f"  • 标称误差: {err_series:+.2f}%\n")
-                result_text.insert(tk.END, f"  • 总容差: ±{total_tol_series:.2f}% (两个电阻容差累积)\n\n")
-                
-                # 方案3: 并联组合（精度优势）
-                # 使用两个相同电阻并联：R_eq = R/2
-                r_parallel_single = target_k * 2
-                r_p_std = self.find_nearest_e24(r_parallel_single * 1000) / 1000
-                eq_parallel = r_p_std / 2
-                err_parallel = abs(eq_parallel - target_k) / target_k * 100
-                # 并联容差：统计上降低（假设独立正态分布）
-                total_tol_parallel = math.sqrt(err_parallel**2 + (tol_pct / math.sqrt(2))**2)
-                
-                result_text.insert(tk.END, f"方案3: 并联组合 2×{r_p_std:.2f}kΩ\n")
-                result_text.insert(tk.END, f"  • 标称误差: {err_parallel:+.2f}%\n")
-                result_text.insert(tk.END, f"  • 总容差: ±{total_tol_parallel:.2f}% (并联降低容差影响!)\n")
-                result_text.insert(tk.END, f"  💡 原理: 并联时随机误差部分抵消，等效容差 ≈ 单电阻/√N\n\n")
+                r_p_std = self.find_nearest_e24(target_k * 2 * 1000) / 1000
+                schemes = [
+                    ("单电阻", f"{std_val:.2f}kΩ (E24)", [(std_val, 'series')]),
+                    ("串联", f"{r1:.2f}kΩ + {r2:.2f}kΩ", [(r1, 'series'), (r2, 'series')]),
+                    ("并联", f"2×{r_p_std:.2f}kΩ", [('parallel', [[(r_p_std, 'series')], [(r_p_std, 'series')]])]),
+                ]
+            except Exception as e:
+                result_text.delete(1.0, tk.END)
+                result_text.insert(tk.END, f"优化错误: {str(e)}")
+                return
+            
+            def work(progress):
+                spreads = []
+                for i, (_, _, network) in enumerate(schemes):
+                    progress(i, len(schemes))
+                    spreads.append(mc.resistance_spread(network, tol_pct, dist))
+                return spreads
+            
+            def show(spreads):
+                result_text.delete(1.0, tk.END)
+                result_text.insert(tk.END, f"【精度优化分析】目标 {target_k}kΩ, 单电阻容差 ±{tol_pct}% ({dist})\n")
+                result_text.insert(tk.END, "="*60 + "\n\n")
                 
-                # 推荐
-                best_scheme = min([
-                    (total_tol_single, "单电阻", std_val),
-                    (total_tol_series, "串联", eq_series),
-                    (total_tol_parallel, "并联", eq_parallel)
-                ], key=lambda x: x[0])
+                ranked = []
+                for i, ((name, desc, _), spread) in enumerate(zip(schemes, spreads), 1):
+                    err_nominal = (spread["nominal"] - target_k) / target_k * 100
+                    # 总容差：标称误差 + 99.73% 样本覆盖的偏差
+                    total_tol = max(abs(err_nominal + spread["lo_pct"]), abs(err_nominal + spread["hi_pct"]))
+                    ranked.append((total_tol, name, spread["nominal"]))
+                    
+                    result_text.insert(tk.END, f"方案{i}: {name} {desc}\n")
+                    result_text.insert(tk.END, f"  • 标称误差: {err_nominal:+.2f}%\n")
+                    result_text.insert(tk.END, f"  • 容差分布: σ = {spread['std_pct']:.3f}%, "
+                                               f"99.73% 区间 [{spread['lo_pct']:+.2f}%, {spread['hi_pct']:+.2f}%]\n")
+                    result_text.insert(tk.END, f"  • 总容差: ±{total_tol:.2f}%\n\n")
                 
+                best_scheme = min(ranked, key=lambda x: x[0])
                 result_text.insert(tk.END, "="*60 + "\n")
                 result_text.insert(tk.END, f"🏆 推荐方案: {best_scheme[1]} (总容差 ±{best_scheme[0]:.2f}%)\n")
+                result_text.insert(tk.END, "💡 原理: 多个电阻组合时随机误差部分抵消，串联与并联都会降低等效容差\n")
+                self.status_var.set(f"✅ 精度优化完成 | 推荐 {best_scheme[1]}")
+            
+            run("精度优化", work, show)
+        
+        def divider_montecarlo():
+            mc = load_montecarlo()
+            if mc is None:
+                return
+            try:
+                if not self.r1_network or not self.r2_network:
+                    raise ValueError("请先配置 R1 和 R2 网络")
+                vin = float(self.vin_var.get())
+                tol_pct = float(tol_var.get())
+                spec_pct = float(spec_var.get())
+                dist = dist_var.get()
                 
-                if best_scheme[1] == "并联":
-                    result_text.insert(tk.END, "✅ 并联方案在精度和功率分配上均有优势!\n")
-                
+                r1_eq = self.calculate_equivalent(self.r1_network)
+                r2_eq = self.calculate_equivalent(self.r2_network)
+                vout_nom = engine.divider_vout(vin, r1_eq, r2_eq)
+                spec = (vout_nom * (1 - spec_pct / 100), vout_nom * (1 + spec_pct / 100))
+                # 工作线程使用网络快照，计算期间继续编辑不影响结果
+                r1_network, r2_network = self._network_tree('r1').to_list(), self._network_tree('r2').to_list()
             except Exception as e:
                 result_text.delete(1.0, tk.END)
-                result_text.insert(tk.END, f"优化错误: {str(e)}")
+                result_text.insert(tk.END, f"蒙特卡洛错误: {str(e)}")
+                return
+            
+            def work(progress):
+                result = mc.monte_carlo(r1_network, r2_network, vin, tol_pct, dist,
+                                        samples=1_000_000, spec=spec, progress=progress)
+                wc = engine.divider_sensitivity(r1_network, r2_network, vin, tol_pct)
+                return result, wc
+            
+            def show(outcome):
+                result, wc = outcome
+                result_text.delete(1.0, tk.END)
+                result_text.insert(tk.END, f"【分压网络蒙特卡洛】{result['samples']:,} 个样本, "
+                                           f"每个电阻 ±{tol_pct}% ({dist})\n")
+                result_text.insert(tk.END, "="*60 + "\n")
+                result_text.insert(tk.END, f"  标称 Vout: {result['nominal']:.4f}V\n")
+                result_text.insert(tk.END, f"  均值/σ:    {result['mean']:.4f}V / {result['std']*1000:.3f}mV\n")
+                result_text.insert(tk.END, f"  范围:      {result['min']:.4f}V ~ {result['max']:.4f}V\n\n")
+                result_text.insert(tk.END, "  百分位:\n")
+                for q, v in result["percentiles"].items():
+                    result_text.insert(tk.END, f"    P{q:<7g} {v:.4f}V ({(v / result['nominal'] - 1) * 100:+.3f}%)\n")
+                result_text.insert(tk.END, "\n" + "="*60 + "\n")
+                result_text.insert(tk.END, f"🎯 规格 {spec[0]:.4f}V ~ {spec[1]:.4f}V (±{spec_pct}%) "
+                                           f"良率: {result['yield_pct']:.3f}%\n")
+                result_text.insert(tk.END, f"📐 解析最坏情况: {wc['vout_min']:.4f}V ~ {wc['vout_max']:.4f}V "
+                                           f"(全部电阻同时处于容差极限)\n")
+                self.status_var.set(f"✅ 蒙特卡洛完成 | 良率 {result['yield_pct']:.3f}%")
+            
+            run("蒙特卡洛", work, show)
         
-        ttk.Button(dialog, text="优化精度", command=optimize, 
-                  style="Accent.TButton").grid(row=3, column=0, columnspan=2, pady=10)
-        ttk.Button(dialog, text="关闭", command=dialog.destroy).grid(row=4, column=0, columnspan=2)
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.grid(row=5, column=0, columnspan=2, pady=10)
+        ttk.Button(btn_frame, text="优化精度", command=optimize, 
+                  style="Accent.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="🎲 当前分压网络良率", command=divider_montecarlo).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="⏹ 取消", command=cancel).pack(side=tk.LEFT, padx=5)
+        ttk.Button(dialog, text="关闭", command=close).grid(row=6, column=0, columnspan=2)
+        dialog.bind("<Escape>", cancel)
+        dialog.protocol("WM_DELETE_WINDOW", close)
     
     def open_ntc_calculator(self):
         """增强版 NTC 计算器"""
         ntc_win = tk.Toplevel(self.root)
         ntc_win.title("🌡️ NTC 温度-电阻-电压计算器")
-        ntc_win.geometry("550x550")
+        ntc_win.geometry("550x640")
         ntc_win.transient(self.root)
         ntc_win.grab_set()
         
@@ -1103,6 +1483,8 @@ class ResistorNetworkCalculator:
         ttk.Label(param_frame, text="上拉电阻 R1 (kΩ):").grid(row=4, column=0, sticky=tk.W, pady=5)
         r1_var = tk.StringVar(value="10")
         ttk.Entry(param_frame, textvariable=r1_var, width=15).grid(row=4, column=1, sticky=tk.W, pady=5)
+        ttk.Button(param_frame, text="🎯 优化 R1", width=10,
+                  command=lambda: self.optimize_ntc_pullup(vin_var, r1_var, t_start_var, t_stop_var)).grid(row=4, column=2, padx=5)
         
         # 温度↔电阻转换
         convert_frame = ttk.LabelFrame(param_frame, text="🌡️ ↔ Ω 双向转换", padding="10")
@@ -1120,11 +1502,7 @@ class ResistorNetworkCalculator:
         def temp_to_res():
             try:
                 t_c = float(temp_var.get())
-                r25 = float(self.ntc_r25_var.get())
-                b = float(self.ntc_b_var.get())
-                t_k = t_c + 273.15
-                t0_k = 25 + 273.15
-                r_t = r25 * math.exp(b * (1/t_k - 1/t0_k))
+                r_t = engine.ntc_model_resistance(t_c, self._ntc_model())
                 res_var.set(f"{r_t:.1f}")
             except:
                 res_var.set("错误")
@@ -1132,11 +1510,7 @@ class ResistorNetworkCalculator:
         def res_to_temp():
             try:
                 r_t = float(res_var.get())
-                r25 = float(self.ntc_r25_var.get())
-                b = float(self.ntc_b_var.get())
-                t0_k = 25 + 273.15
-                t_k = 1 / (1/t0_k + (1/b) * math.log(r_t/r25))
-                t_c = t_k - 273.15
+                t_c = engine.ntc_model_temperature(r_t, self._ntc_model())
                 temp_var.set(f"{t_c:.1f}")
             except:
                 temp_var.set("错误")
@@ -1163,13 +1537,8 @@ class ResistorNetworkCalculator:
                 vin = float(vin_var.get())
                 r1 = float(r1_var.get()) * 1000  # 转为Ω
                 
-                # NTC 电阻
-                t_k = t_c + 273.15
-                t0_k = 25 + 273.15
-                r_ntc = r25 * math.exp(b * (1/t_k - 1/t0_k))
-                
                 # 分压 (NTC 在下方)
-                vout = vin * r_ntc / (r1 + r_ntc)
+                r_ntc, vout = engine.ntc_divider_vout(t_c, vin, r1, r25, b, self._ntc_fitted_model())
                 
                 result_label.config(text=f"NTC 电阻: {r_ntc/1000:.2f}kΩ  →  ADC 电压: {vout:.3f}V")
             except Exception as e:
@@ -1179,57 +1548,178 @@ class ResistorNetworkCalculator:
                   style="Accent.TButton").grid(row=0, column=2, padx=10)
         
         # 温度表生成
-        table_btn = ttk.Button(param_frame, text="📊 生成 -40~125°C 完整对照表", 
-                              command=lambda: self.generate_ntc_full_table(ntc_win, vin_var, r1_var),
+        table_frame = ttk.LabelFrame(param_frame, text="📊 温度-电压对照表", padding="10")
+        table_frame.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        
+        t_start_var = tk.StringVar(value="-40")
+        t_stop_var = tk.StringVar(value="125")
+        step_var = tk.StringVar(value="5")
+        ttk.Label(table_frame, text="范围 (°C):").grid(row=0, column=0, sticky=tk.W)
+        ttk.Entry(table_frame, textvariable=t_start_var, width=7).grid(row=0, column=1, padx=2)
+        ttk.Label(table_frame, text="~").grid(row=0, column=2)
+        ttk.Entry(table_frame, textvariable=t_stop_var, width=7).grid(row=0, column=3, padx=2)
+        ttk.Label(table_frame, text="步长:").grid(row=0, column=4, padx=(10, 2))
+        ttk.Combobox(table_frame, textvariable=step_var, values=["5", "1", "0.5", "0.1", "0.01"], width=6).grid(row=0, column=5)
+        
+        table_btn = ttk.Button(table_frame, text="📊 生成完整对照表", 
+                              command=lambda: self.generate_ntc_full_table(ntc_win, vin_var, r1_var,
+                                                                           t_start_var, t_stop_var, step_var),
                               style="Accent.TButton")
-        table_btn.grid(row=7, column=0, columnspan=3, pady=15, sticky=(tk.W, tk.E))
+        table_btn.grid(row=1, column=0, columnspan=6, pady=(10, 0), sticky=(tk.W, tk.E))
+        
+        ttk.Label(table_frame, text="ADC 位数:").grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
+        lut_bits_var = tk.StringVar(value="12")
+        ttk.Combobox(table_frame, textvariable=lut_bits_var, values=["10", "12", "14", "16"], width=5,
+                     state="readonly").grid(row=2, column=1, pady=(10, 0))
+        ttk.Button(table_frame, text="🔧 导出固件查找表 (±0.1°C)", 
+                  command=lambda: self.export_ntc_lut(r1_var, lut_bits_var)).grid(row=2, column=2, columnspan=4,
+                                                                                  pady=(10, 0), sticky=(tk.W, tk.E))
         
         ttk.Button(param_frame, text="关闭", command=ntc_win.destroy).grid(row=8, column=0, columnspan=3, pady=10)
     
-    def generate_ntc_full_table(self, parent, vin_var, r1_var):
-        """生成完整 NTC 温度-电压对照表"""
+    def generate_ntc_full_table(self, parent, vin_var, r1_var, t_start_var, t_stop_var, step_var):
+        """生成完整 NTC 温度-电压对照表（向量化计算，只渲染可见行）"""
+        try:
+            import resistor_ntc
+        except ImportError:
+            messagebox.showerror("错误", "对照表生成需要 numpy: pip install numpy")
+            return
         try:
             vin = float(vin_var.get())
             r1 = float(r1_var.get()) * 1000  # Ω
             r25 = float(self.ntc_r25_var.get())
             b = float(self.ntc_b_var.get())
+            table = resistor_ntc.NtcTable(vin, r1, r25, b, float(t_start_var.get()),
+                                          float(t_stop_var.get()), float(step_var.get()),
+                                          model=self._ntc_fitted_model())
+            t_first, t_last = table.temps(0, 1)[0], table.temps(len(table) - 1)[0]
             
             table_win = tk.Toplevel(parent)
-            table_win.title("NTC 温度-电压对照表 (-40~125°C)")
-            table_win.geometry("500x600")
+            table_win.title(f"NTC 温度-电压对照表 ({t_first:g}~{t_last:g}°C, {len(table):,} 行)")
+            table_win.geometry("560x640")
             
-            text = scrolledtext.ScrolledText(table_win, font=("Courier", 9), width=65, height=38)
-            text.pack(padx=10, pady=10)
+            info = (f"NTC: {self.ntc_model_var.get()}\n"
+                    f"R25={r25}Ω, B={b}K | 电路: {r1/1000:.1f}kΩ ── NTC ── GND, Vin={vin}V")
+            ttk.Label(table_win, text=info, font=("Courier", 9)).pack(padx=10, pady=(10, 0), anchor=tk.W)
             
-            text.insert(tk.END, f"NTC: {self.ntc_model_var.get()}\n")
-            text.insert(tk.END, f"R25={r25}Ω, B={b}K | 电路: {r1/1000:.1f}kΩ ── NTC ── GND, Vin={vin}V\n")
-            text.insert(tk.END, "="*65 + "\n")
-            text.insert(tk.END, f"{'Temp(°C)':<10} {'R_NTC(kΩ)':<15} {'Vout(V)':<12} {'ADC(12bit)':<15}\n")
-            text.insert(tk.END, "="*65 + "\n")
+            def render(start, stop):
+                cols = table.rows(start, stop)
+                return [f"{t:<10.{table.decimals}f} {r/1000:<15.2f} {v:<12.3f} {a:<15}"
+                        for t, r, v, a in zip(cols["temp_c"], cols["r_ntc_ohm"], cols["vout_v"], cols["adc"])]
             
-            for temp in range(-40, 126, 5):
-                t_k = temp + 273.15
-                t0_k = 25 + 273.15
-                r_ntc = r25 * math.exp(b * (1/t_k - 1/t0_k))
-                vout = vin * r_ntc / (r1 + r_ntc)
-                adc_val = int(vout / vin * 4095)
-                text.insert(tk.END, f"{temp:<10} {r_ntc/1000:<15.2f} {vout:<12.3f} {adc_val:<15}\n")
+            header = f"{'Temp(°C)':<10} {'R_NTC(kΩ)':<15} {'Vout(V)':<12} {f'ADC({table.adc_bits}bit)':<15}"
+            view = VirtualTable(table_win, len(table), render, header, height=32)
+            view.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
             
-            text.config(state=tk.DISABLED)
-            
-            # 添加导出按钮
+            # 导出直接从参数分块生成，不经过文本框
             btn_frame = ttk.Frame(table_win)
             btn_frame.pack(pady=5)
             ttk.Button(btn_frame, text="导出 CSV", 
-                      command=lambda: self.export_ntc_csv(temp, r_ntc, vout, adc_val, vin, r1, r25, b)).pack(side=tk.LEFT, padx=5)
+                      command=lambda: self.export_ntc_csv(table)).pack(side=tk.LEFT, padx=5)
+            ttk.Button(btn_frame, text="导出二进制", 
+                      command=lambda: self.export_ntc_binary(table)).pack(side=tk.LEFT, padx=5)
             ttk.Button(btn_frame, text="关闭", command=table_win.destroy).pack(side=tk.LEFT, padx=5)
         
         except Exception as e:
             messagebox.showerror("错误", str(e))
     
-    def export_ntc_csv(self, *args):
-        """导出 NTC 表到 CSV（简化实现）"""
-        messagebox.showinfo("提示", "CSV 导出功能将在完整版中提供。\n当前可复制表格内容到 Excel。")
+    def export_ntc_csv(self, table):
+        """把 NTC 对照表流式导出为 CSV"""
+        import resistor_ntc
+        filename = filedialog.asksaveasfilename(defaultextension=".csv", 
+                                               filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not filename:
+            return
+        try:
+            rows = resistor_ntc.write_csv(table, filename)
+            self.status_var.set(f"✅ NTC 对照表已导出: {filename} ({rows:,} 行)")
+            messagebox.showinfo("成功", f"已导出 {rows:,} 行:\n{filename}")
+        except Exception as e:
+            messagebox.showerror("导出错误", str(e))
+    
+    def export_ntc_binary(self, table):
+        """把 NTC 对照表流式导出为 .npy（可直接 np.load）或裸二进制记录"""
+        import resistor_ntc
+        filename = filedialog.asksaveasfilename(defaultextension=".npy", 
+                                               filetypes=[("NumPy files", "*.npy"), ("Binary files", "*.bin"),
+                                                          ("All files", "*.*")])
+        if not filename:
+            return
+        try:
+            rows = resistor_ntc.write_binary(table, filename)
+            self.status_var.set(f"✅ NTC 对照表已导出: {filename} ({rows:,} 行)")
+            messagebox.showinfo("成功", f"已导出 {rows:,} 行:\n{filename}\n"
+                                       f"记录格式: {resistor_ntc.TABLE_DTYPE.descr}")
+        except Exception as e:
+            messagebox.showerror("导出错误", str(e))
+    
+    def optimize_ntc_pullup(self, vin_var, r1_var, t_start_var, t_stop_var):
+        """在对照表温度范围内扫描 E96 上拉电阻，取最差分辨率最高者填入 R1"""
+        try:
+            import resistor_ntc
+        except ImportError:
+            messagebox.showerror("错误", "上拉电阻优化需要 numpy: pip install numpy")
+            return
+        try:
+            t_min, t_max = float(t_start_var.get()), float(t_stop_var.get())
+            common = dict(vin=float(vin_var.get()), r25=float(self.ntc_r25_var.get()),
+                          b=float(self.ntc_b_var.get()), model=self._ntc_fitted_model())
+        except Exception as e:
+            messagebox.showerror("优化错误", str(e))
+            return
+        
+        def work(progress):
+            by_resolution = resistor_ntc.optimize_pullup(t_min, t_max, "E96", **common)
+            progress(1, 2)
+            by_linearity = resistor_ntc.optimize_pullup(t_min, t_max, "E96", objective="linearity", k=1, **common)
+            return by_resolution, by_linearity
+        
+        self.run_in_background("上拉电阻优化", work,
+                               lambda ranked: self._show_pullup(r1_var, t_min, t_max, *ranked))
+    
+    def _show_pullup(self, r1_var, t_min, t_max, by_resolution, by_linearity):
+        try:
+            best = by_resolution[0]
+            r1_var.set(f"{best['r1_ohm'] / 1000:g}")
+            lines = [f"温度范围 {t_min:g}~{t_max:g}°C, 12-bit 比例测量, E96 全系列扫描", "",
+                     "【最差分辨率最高】"]
+            for i, c in enumerate(by_resolution, 1):
+                lines.append(f"  {i}. R1={c['r1_ohm']/1000:g}kΩ: ≥{c['min_counts_per_c']:.2f} 码/°C "
+                             f"(最差点 {c['worst_temp_c']:g}°C), 非线性 {c['nonlinearity_c']:.1f}°C")
+            lin = by_linearity[0]
+            lines += ["", "【线性度最好】",
+                      f"  R1={lin['r1_ohm']/1000:g}kΩ: 非线性 {lin['nonlinearity_c']:.1f}°C, "
+                      f"≥{lin['min_counts_per_c']:.2f} 码/°C",
+                      "", f"已填入 R1 = {best['r1_ohm']/1000:g}kΩ (NTC 最大自热 {best['ntc_power_max_mw']:.2f}mW)"]
+            messagebox.showinfo("上拉电阻优化", "\n".join(lines))
+        except Exception as e:
+            messagebox.showerror("优化错误", str(e))
+    
+    def export_ntc_lut(self, r1_var, bits_var):
+        """导出 ADC 码 → 温度的分段线性查找表 (比例测量，最大误差 0.1°C)"""
+        try:
+            import resistor_ntc
+        except ImportError:
+            messagebox.showerror("错误", "查找表生成需要 numpy: pip install numpy")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".h", 
+                                               filetypes=[("C header", "*.h"), ("NumPy files", "*.npy"),
+                                                          ("Binary files", "*.bin"), ("All files", "*.*")])
+        if not filename:
+            return
+        try:
+            lut = resistor_ntc.build_adc_lut(int(bits_var.get()), float(r1_var.get()) * 1000,
+                                             float(self.ntc_r25_var.get()), float(self.ntc_b_var.get()),
+                                             model=self._ntc_fitted_model())
+            if filename.lower().endswith((".h", ".c")):
+                resistor_ntc.write_lut_c(lut, filename)
+            else:
+                resistor_ntc.write_lut_binary(lut, filename)
+            self.status_var.set(f"✅ NTC 查找表已导出: {filename}")
+            messagebox.showinfo("成功", f"{lut.bits}-bit 查找表: {len(lut)} 个节点 (全表 {2**lut.bits} 项)\n"
+                                       f"最大插值误差 {lut.max_error_c:.4f}°C\n{filename}")
+        except Exception as e:
+            messagebox.showerror("导出错误", str(e))
     
     def toggle_ntc_mode(self):
         """切换 R2 为 NTC 模式"""
@@ -1237,8 +1727,8 @@ class ResistorNetworkCalculator:
         if is_ntc:
             # 保存当前 R2 网络
             self.r2_backup = self.r2_network.copy()
-            # 设置典型 NTC 配置
-            r25_k = float(self.ntc_r25_var.get()) / 1000
+            # 设置典型 NTC 配置 (25°C 阻值，拟合模型按模型计算)
+            r25_k = round(engine.ntc_model_resistance(25.0, self._ntc_model()) / 1000, 3)
             self.r2_network = [(r25_k, 'series')]
             self.update_listbox('r2')
         else:
@@ -1248,17 +1738,61 @@ class ResistorNetworkCalculator:
             else:
                 self.r2_network = [(51, 'series')]
             self.update_listbox('r2')
-        self.calculate_network()
+        self.schedule_calculate()
     
     def update_ntc_params(self, event=None):
         """更新 NTC 参数"""
         model = self.ntc_model_var.get()
         params = self.ntc_models.get(model, {"r25": 10000, "b": 3950})
-        self.ntc_r25_var.set(str(params["r25"]))
-        self.ntc_b_var.set(str(params["b"]))
+        self.ntc_r25_var.set(f"{params['r25']:g}")
+        self.ntc_b_var.set(f"{params['b']:g}")
         if self.use_ntc_var.get():
             self.toggle_ntc_mode()  # 刷新 R2 值
     
+    def _ntc_fitted_model(self) -> Optional[Dict]:
+        """当前选中的拟合模型；R25/B 被手动修改过时返回 None，改用 R25/B 计算"""
+        model = self.ntc_models.get(self.ntc_model_var.get())
+        if (model and "coeffs" in model and self.ntc_r25_var.get() == f"{model['r25']:g}"
+                and self.ntc_b_var.get() == f"{model['b']:g}"):
+            return model
+        return None
+    
+    def _ntc_model(self) -> Dict:
+        """当前 NTC 模型：优先使用拟合模型，否则由 R25/B 构造"""
+        return self._ntc_fitted_model() or engine.ntc_beta_model(float(self.ntc_r25_var.get()),
+                                                                 float(self.ntc_b_var.get()))
+    
+    def import_ntc_rt_data(self):
+        """导入 R-T 数据 (数据手册表格或温箱日志)，批量拟合 Steinhart–Hart 模型并加入型号列表"""
+        try:
+            import resistor_ntc
+        except ImportError:
+            messagebox.showerror("错误", "R-T 数据拟合需要 numpy: pip install numpy")
+            return
+        filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not filename:
+            return
+        try:
+            models = resistor_ntc.fit_ntc_models(resistor_ntc.load_rt_csv(filename), "sh")
+            names = []
+            for sensor, model in models.items():
+                name = f"{sensor} (SH 拟合, ±{model['max_err_c']:.2f}°C)"
+                self.ntc_models[name] = model
+                names.append(name)
+            self.ntc_combo.config(values=list(self.ntc_models.keys()))
+            self.ntc_model_var.set(names[0])
+            self.update_ntc_params()
+            
+            worst = max(models.values(), key=lambda m: m["max_err_c"])
+            self.status_var.set(f"✅ 已导入并拟合 {len(models)} 个 NTC 模型: {filename}")
+            messagebox.showinfo("拟合完成", 
+                f"已拟合 {len(models)} 个传感器 (Steinhart–Hart)\n"
+                f"最大拟合残差: {worst['max_err_c']:.3f}°C\n"
+                f"当前选中: {names[0]}\n"
+                f"等效 R25={self.ntc_r25_var.get()}Ω, B25/85={self.ntc_b_var.get()}K")
+        except Exception as e:
+            messagebox.showerror("导入错误", str(e))
+    
     def load_template(self, template_name):
         """加载模板并配置网络"""
         tmpl = self.templates[template_name]
@@ -1270,15 +1804,10 @@ class ResistorNetworkCalculator:
             self.adc_range_var.set("3.3")
             self.use_ntc_var.set(False)
             
-            vin_max = tmpl["vin_max"]
-            ratio = 3.25 / vin_max
-            r2_r1 = ratio / (1 - ratio)
-            r1_val = 18.0 if vin_max >= 4.5 else 15.0
-            r2_val = r1_val * r2_r1
-            r2_std = self.find_nearest_e24(r2_val * 1000) / 1000
+            safe = engine.battery_safe_config(tmpl["vin_max"], tmpl["vadc_safe"])
             
-            self.r1_network = [(r1_val, 'series')]
-            self.r2_network = [(r2_std, 'series')]
+            self.r1_network = [(safe["r1"], 'series')]
+            self.r2_network = [(safe["r2"], 'series')]
             self.update_listbox('r1')
             self.update_listbox('r2')
         
@@ -1309,7 +1838,17 @@ class ResistorNetworkCalculator:
             self.ntc_model_var.set("MF52-103 (10k@25°C, B=3950)")
             self.update_ntc_params()
             
-            self.r1_network = [(10, 'series')]  # 10k 上拉
+            # 上拉电阻：在模板温度范围内取最差分辨率最高的 E24 值 (无 numpy 时用模板默认值)
+            r_fixed = tmpl["r_fixed"]
+            try:
+                import resistor_ntc
+                t_min, t_max = (float(t) for t in tmpl["temp_range"].rstrip("°C").split("~"))
+                r_fixed = resistor_ntc.optimize_pullup(t_min, t_max, "E24", r25=float(self.ntc_r25_var.get()),
+                                                       b=float(self.ntc_b_var.get()), k=1)[0]["r1_ohm"] / 1000
+            except ImportError:
+                pass
+            
+            self.r1_network = [(r_fixed, 'series')]
             self.r2_network = [(10, 'series')]  # NTC 25°C 时 10k
             self.update_listbox('r1')
             self.update_listbox('r2')
@@ -1346,98 +1885,73 @@ class ResistorNetworkCalculator:
             self.update_listbox('r1')
             self.update_listbox('r2')
         
-        self.calculate_network()
-        self.status_var.set(f"✅ 已加载模板: {template_name}")
+        self.schedule_calculate(status=f"✅ 已加载模板: {template_name}")
     
     def export_bom(self):
-        """导出增强版 BOM（含并联分支）"""
+        """当前设计的 BOM：每个电阻按网络解的实际功耗与端电压选择额定功率和封装"""
+        import resistor_bom
         try:
+            config = self.current_config()
+            parts = resistor_bom.design_parts(config)
             r1_eq = self.calculate_equivalent(self.r1_network)
             r2_eq = self.calculate_equivalent(self.r2_network)
             vin = float(self.vin_var.get())
-            vout = vin * r2_eq / (r1_eq + r2_eq) if (r1_eq + r2_eq) > 0 else 0
+            vout = vin * r2_eq / (r1_eq + r2_eq)
             
             bom_lines = []
-            bom_lines.append("="*70)
-            bom_lines.append("📋 BOM 清单 (Bill of Materials) - 支持并联网络")
-            bom_lines.append("="*70)
+            bom_lines.append("="*78)
+            bom_lines.append("📋 BOM 清单 (Bill of Materials) - 按实际功耗选型")
+            bom_lines.append("="*78)
             bom_lines.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            bom_lines.append(f"电路类型: 电阻分压网络 (Vin={vin}V → Vout={vout:.3f}V)")
+            bom_lines.append(f"电路类型: 电阻分压网络 (Vin={vin}V → Vout={vout:.3f}V, I={vin / (r1_eq + r2_eq) * 1000:.1f}µA)")
             bom_lines.append(f"R1_eq={r1_eq:.2f}kΩ | R2_eq={r2_eq:.2f}kΩ | 安全裕量: {max(0, 3.25-vout):.2f}V")
-            bom_lines.append("-"*70)
-            bom_lines.append(f"{'Ref':<10} {'Value':<15} {'Type':<20} {'Power':<12} {'Notes'}")
-            bom_lines.append("-"*70)
-            
-            # 解析 R1 网络
-            r1_items = self._flatten_network(self.r1_network, "R1")
-            for ref, val, typ, power in r1_items:
-                notes = "功率分担" if "parallel" in typ.lower() else ""
-                bom_lines.append(f"{ref:<10} {val:<15} {typ:<20} {power:<12} {notes}")
-            
-            # 解析 R2 网络
-            is_ntc = self.use_ntc_var.get()
-            r2_items = self._flatten_network(self.r2_network, "R2", is_ntc)
-            for ref, val, typ, power in r2_items:
-                notes = "NTC 热敏电阻" if is_ntc and "NTC" in ref else "功率分担" if "parallel" in typ.lower() else ""
-                bom_lines.append(f"{ref:<10} {val:<15} {typ:<20} {power:<12} {notes}")
+            bom_lines.append("-"*78)
+            bom_lines.append(f"{'Ref':<8} {'Value':<10} {'功耗':>10} {'端电压':>9}  {'Power':<7} {'封装':<6} {'Notes'}")
+            bom_lines.append("-"*78)
+            counters = {}
+            for part in parts:
+                prefix = "NTC" if part["kind"] == "ntc" else part["branch"]
+                counters[prefix] = counters.get(prefix, 0) + 1
+                ref = f"{prefix}_{counters[prefix]}" if prefix != "NTC" else f"NTC{counters[prefix]}"
+                bom_lines.append(f"{ref:<8} {part['value']:<10} {part['power_mw']:>8.3f}mW {part['voltage_v']:>8.3f}V"
+                                 f"  {part['rating'] or '-':<7} {part['package'] or '-':<6} {part['note']}")
             
             # 保护元件
-            bom_lines.append(f"{'C1':<10} {'0.1μF':<15} {'Ceramic Cap':<20} {'10V':<12} X7R, 0603")
-            bom_lines.append("="*70)
+            bom_lines.append(f"{'C1':<8} {'0.1μF':<10} {'':>10} {'':>9}  {'10V':<7} {'0603':<6} X7R 陶瓷电容")
+            bom_lines.append("="*78)
             bom_lines.append("\n💡 采购建议:")
-            bom_lines.append("   • 电阻: 1% 精度金属膜电阻 (Yageo RC0603FR-07xxxL)")
-            bom_lines.append("   • 功率: 单电阻功耗 > 125mW 时，必须使用 1/4W 或并联分担")
+            bom_lines.append(f"   • 电阻: 1% 精度金属膜电阻，额定功率按实际功耗 {resistor_bom.DEFAULT_DERATING:.0%} 降额选型")
             bom_lines.append("   • NTC:  MF52 系列径向引线型，焊接方便")
             bom_lines.append("   • 电容: 0603 封装 0.1μF X7R 陶瓷电容 (Murata GRM188R71H104KA01D)")
+            bom_lines.append("   • 多个设计合并采购: 「📂 设计库」选中设计后「📋 合并 BOM...」")
             
             output = "\n".join(bom_lines)
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(1.0, output)
             
-            if messagebox.askyesno("导出 BOM", "是否保存 BOM 到文件?"):
-                filename = f"resistor_bom_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(output)
+            if messagebox.askyesno("导出 BOM", "是否保存 BOM 到文件 (CSV)?"):
+                filename = f"resistor_bom_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                resistor_bom.export_bom([("当前设计", config)], filename)
                 messagebox.showinfo("成功", f"BOM 已保存:\n{filename}")
                 self.status_var.set(f"✅ BOM 已导出到 {filename}")
         
         except Exception as e:
             messagebox.showerror("BOM 导出错误", str(e))
     
-    def _flatten_network(self, network, prefix, is_ntc=False):
-        """扁平化网络为 BOM 条目列表"""
-        items = []
-        idx = 1
-        
-        for element in network:
-            if isinstance(element, tuple) and element[0] == 'parallel':
-                # 并联组
-                branches = element[1]
-                for branch in branches:
-                    if branch:
-                        r_val = branch[0][0]
-                        ref = f"{prefix}_P{idx}"
-                        typ = "Resistor (Parallel Branch)"
-                        power = "1/8W" if r_val > 10 else "1/4W"
-                        items.append((ref, f"{r_val}kΩ", typ, power))
-                        idx += 1
-            else:
-                # 串联电阻
-                r_val = element[0]
-                ref = "NTC1" if (is_ntc and prefix == "R2" and idx == 1) else f"{prefix}_{idx}"
-                typ = "NTC Thermistor" if ref == "NTC1" else "Resistor"
-                power = "1/8W" if r_val > 10 else "1/4W"
-                items.append((ref, f"{r_val}kΩ", typ, power))
-                idx += 1
-        
-        return items
+    def _library(self):
+        """设计库连接 (首次使用时打开)"""
+        if getattr(self, "_design_library", None) is None:
+            import resistor_library
+            self._design_library = resistor_library.DesignLibrary()
+        return self._design_library
     
-    def save_config(self):
-        """保存当前配置到文件"""
-        config = {
+    def current_config(self) -> Dict:
+        """当前界面状态 (设计库与 JSON 配置共用的字段格式)"""
+        return {
             "vin": self.vin_var.get(),
             "vout_target": self.vout_var.get(),
             "adc_range": self.adc_range_var.get(),
+            "adc_bits": self.adc_bits_var.get(),
             "r1_network": self.r1_network,
             "r2_network": self.r2_network,
             "use_ntc": self.use_ntc_var.get(),
@@ -1446,50 +1960,181 @@ class ResistorNetworkCalculator:
             "ntc_b": self.ntc_b_var.get(),
             "timestamp": datetime.now().isoformat()
         }
-        
-        filename = f"resistor_config_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    
+    def apply_config(self, config: Dict, status: str):
+        """把配置/设计恢复到界面 (网络经 network_from_json 还原元组)"""
+        self.vin_var.set(config.get("vin", "4.2"))
+        self.vout_var.set(config.get("vout_target", "3.25"))
+        self.adc_range_var.set(config.get("adc_range", "3.3"))
+        self.adc_bits_var.set(config.get("adc_bits", "12"))
+        self.r1_network = engine.network_from_json(config.get("r1_network", [(15, 'series')]))
+        self.r2_network = engine.network_from_json(config.get("r2_network", [(51, 'series')]))
+        self.use_ntc_var.set(config.get("use_ntc", False))
+        self.ntc_model_var.set(config.get("ntc_model", "MF52-103 (10k@25°C, B=3950)"))
+        self.ntc_r25_var.set(config.get("ntc_r25", "10000"))
+        self.ntc_b_var.set(config.get("ntc_b", "3950"))
+        
+        self.update_listbox('r1')
+        self.update_listbox('r2')
+        self.update_ntc_params()
+        self.schedule_calculate(status=status)
+    
+    def save_config(self):
+        """把当前设计保存到设计库"""
+        name = simpledialog.askstring("保存设计", "设计名称:",
+                                      initialvalue=f"设计 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if name is None:
+            return
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-            messagebox.showinfo("成功", f"配置已保存到:\n{filename}")
-            self.status_var.set(f"✅ 配置已保存到 {filename}")
+            design_id, added = self._library().save(self.current_config(), name.strip() or None)
         except Exception as e:
             messagebox.showerror("保存错误", str(e))
+            return
+        if added:
+            self.status_var.set(f"✅ 设计已保存到设计库 (#{design_id} {name})")
+        else:
+            self.status_var.set(f"ℹ️ 设计库中已有相同设计 (#{design_id})，未重复保存")
     
     def load_config(self):
-        """从文件加载配置"""
+        """打开设计库：按分压比/电流/元件数等条件检索，加载、删除或批量导入 JSON 配置"""
         try:
-            filename = filedialog.askopenfilename(
-                title="选择配置文件",
-                filetypes=[("JSON 配置", "*.json"), ("所有文件", "*.*")]
-            )
+            library = self._library()
+        except Exception as e:
+            messagebox.showerror("设计库错误", str(e))
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📂 设计库")
+        dialog.geometry("900x560")
+        dialog.transient(self.root)
+        
+        filter_frame = ttk.Frame(dialog, padding="8")
+        filter_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        filters = {}
+        for i, (label, key, default) in enumerate([("分压比:", "ratio", ""), ("容差 %:", "tol", "1"),
+                                                   ("电流上限 µA:", "max_ua", ""), ("元件数 ≤:", "max_parts", ""),
+                                                   ("名称包含:", "name", "")]):
+            ttk.Label(filter_frame, text=label).grid(row=0, column=i * 2, sticky=tk.W, padx=(8, 2))
+            filters[key] = tk.StringVar(value=default)
+            ttk.Entry(filter_frame, textvariable=filters[key], width=10 if key != "name" else 16).grid(
+                row=0, column=i * 2 + 1)
+        
+        columns = ("id", "name", "vin", "vout", "ratio", "current", "parts", "created")
+        headings = ("#", "名称", "Vin (V)", "Vout (V)", "分压比", "电流 µA", "元件数", "保存时间")
+        widths = (50, 220, 70, 70, 80, 90, 60, 150)
+        tree = ttk.Treeview(dialog, columns=columns, show="headings", height=18)
+        for col, heading, width in zip(columns, headings, widths):
+            tree.heading(col, text=heading)
+            tree.column(col, width=width, anchor=tk.W if col == "name" else tk.E)
+        tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=8)
+        scroll = ttk.Scrollbar(dialog, orient=tk.VERTICAL, command=tree.yview)
+        scroll.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        tree.configure(yscrollcommand=scroll.set)
+        dialog.columnconfigure(0, weight=1)
+        dialog.rowconfigure(1, weight=1)
+        summary_var = tk.StringVar()
+        ttk.Label(dialog, textvariable=summary_var, foreground="#7f8c8d").grid(row=2, column=0, sticky=tk.W, padx=8)
+        
+        def number(key, cast=float):
+            text = filters[key].get().strip()
+            return cast(text) if text else None
+        
+        def fmt(value, spec):
+            return "" if value is None else format(value, spec)
+        
+        def refresh():
+            try:
+                rows = library.query(ratio=number("ratio"), ratio_tol_pct=number("tol") or 0.0,
+                                     max_current_ua=number("max_ua"), max_parts=number("max_parts", int),
+                                     name=filters["name"].get().strip() or None)
+            except ValueError as e:
+                messagebox.showerror("条件错误", str(e), parent=dialog)
+                return
+            tree.delete(*tree.get_children())
+            for r in rows:
+                tree.insert("", tk.END, iid=str(r["id"]), values=(
+                    r["id"], r["name"], fmt(r["vin"], "g"), fmt(r["vout"], ".3f"), fmt(r["ratio"], ".5f"),
+                    fmt(r["current_ua"], ".1f"), r["part_count"], r["created"][:19].replace("T", " ")))
+            summary_var.set(f"显示 {len(rows)} 个 / 共 {library.count()} 个设计  ({library.path})")
+        
+        def selected_ids():
+            return [int(iid) for iid in tree.selection()]
+        
+        def load_selected(event=None):
+            ids = selected_ids()
+            if not ids:
+                return
+            config = library.get(ids[0])
+            if config is None:
+                refresh()
+                return
+            self.apply_config(config, status=f"✅ 已从设计库加载 #{config['id']} {config['name']}")
+            dialog.destroy()
+        
+        def delete_selected():
+            ids = selected_ids()
+            if ids and messagebox.askyesno("删除设计", f"从设计库删除选中的 {len(ids)} 个设计?", parent=dialog):
+                for design_id in ids:
+                    library.delete(design_id)
+                refresh()
+        
+        def import_files():
+            paths = filedialog.askopenfilenames(parent=dialog, title="导入 JSON 配置 (可多选)",
+                                                filetypes=[("JSON 配置", "*.json"), ("所有文件", "*.*")])
+            if not paths:
+                return
+            result = library.import_json(paths)
+            message = f"导入 {result['imported']} 个，重复 {result['duplicates']} 个"
+            if result["errors"]:
+                message += f"，失败 {len(result['errors'])} 个:\n" + "\n".join(
+                    f"{os.path.basename(p)}: {reason}" for p, reason in result["errors"][:10])
+            messagebox.showinfo("导入完成", message, parent=dialog)
+            refresh()
+        
+        def export_merged_bom():
+            """选中的设计 (未选中时为当前查询结果) 合并为一份 BOM，后台流式计算"""
+            import resistor_bom
+            import resistor_library
+            ids = selected_ids() or [int(iid) for iid in tree.get_children()]
+            if not ids:
+                return
+            filename = filedialog.asksaveasfilename(parent=dialog, title=f"合并 BOM ({len(ids)} 个设计)",
+                                                    defaultextension=".csv",
+                                                    filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
             if not filename:
                 return
+            parts_path = os.path.splitext(filename)[0] + "_parts.csv"
+            path = library.path
             
-            with open(filename, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            # 恢复配置
-            self.vin_var.set(config.get("vin", "4.2"))
-            self.vout_var.set(config.get("vout_target", "3.25"))
-            self.adc_range_var.set(config.get("adc_range", "3.3"))
-            self.r1_network = config.get("r1_network", [(15, 'series')])
-            self.r2_network = config.get("r2_network", [(51, 'series')])
-            self.use_ntc_var.set(config.get("use_ntc", False))
-            self.ntc_model_var.set(config.get("ntc_model", "MF52-103 (10k@25°C, B=3950)"))
-            self.ntc_r25_var.set(config.get("ntc_r25", "10000"))
-            self.ntc_b_var.set(config.get("ntc_b", "3950"))
+            def work(progress):
+                # sqlite 连接不能跨线程使用，后台任务单独打开
+                with resistor_library.DesignLibrary(path) as lib:
+                    designs = ((f"#{d['id']} {d['name']}", d) for d in lib.iter_designs(ids))
+                    return resistor_bom.export_bom(designs, filename, parts_path=parts_path,
+                                                   progress=lambda n: progress(n / len(ids)))
             
-            self.update_listbox('r1')
-            self.update_listbox('r2')
-            self.update_ntc_params()
-            self.calculate_network()
+            def done(result):
+                message = (f"{result['designs']} 个设计，{result['parts']} 个元件 → {result['lines']} 个采购行\n"
+                           f"{filename}\n逐元件明细: {parts_path}")
+                if result["errors"]:
+                    message += f"\n跳过 {len(result['errors'])} 个:\n" + "\n".join(
+                        f"{d}: {reason}" for d, reason in result["errors"][:10])
+                self.status_var.set(f"✅ 合并 BOM 已导出: {filename}")
+                messagebox.showinfo("合并 BOM", message, parent=dialog if dialog.winfo_exists() else None)
             
-            self.status_var.set(f"✅ 配置已从 {filename} 加载")
-            messagebox.showinfo("成功", f"配置已加载:\n{filename}")
+            self.run_in_background("合并 BOM", work, done)
         
-        except Exception as e:
-            messagebox.showerror("加载错误", str(e))
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.grid(row=3, column=0, pady=8)
+        ttk.Button(btn_frame, text="🔍 查询", command=refresh).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="加载选中", command=load_selected, style="Accent.TButton").pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="删除选中", command=delete_selected).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="导入 JSON 配置...", command=import_files).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="📋 合并 BOM...", command=export_merged_bom).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btn_frame, text="关闭", command=dialog.destroy).pack(side=tk.LEFT, padx=4)
+        tree.bind("<Double-1>", load_selected)
+        dialog.bind("<Return>", lambda e: refresh())
+        refresh()
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,383 @@
+# resistor_engine.py
+# 电阻网络计算核心 - 无界面依赖，供 GUI / CLI / 批处理脚本共用
+# 依赖：标准库 math，以及轻量的 resistor_network / resistor_series / resistor_sensitivity；
+#       结果缓存 (sqlite3)、标准值搜索与网络综合在首次调用相应函数时才导入，导入本模块不加载它们。
+#
+# 单位约定：网络中的电阻值以 kΩ 表示（与 GUI 网络数据结构一致），
+#           标准值查找 find_nearest_e24 以 Ω 为单位。
+
+import functools
+import math
+from typing import List, Tuple, Dict, Optional
+
+from resistor_network import CompiledNetwork, compile_branch, network_from_json
+from resistor_series import E24_VALUES, E96_VALUES, SERIES_BASES, series_index
+from resistor_sensitivity import divider_sensitivity, top_contributors
+
+# ADC 安全上限 (V)，超过即提示过压
+VADC_SAFE = 3.25
+T0_K = 25 + 273.15
+
+# 引擎版本：作为结果缓存键的一部分，搜索/推荐算法的结果变化时必须升级
+ENGINE_VERSION = "3.1.2"
+
+
+def cached(func):
+    """resistor_cache.memoize(ENGINE_VERSION)，在首次调用时才导入缓存模块"""
+    memoized = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal memoized
+        if memoized is None:
+            from resistor_cache import memoize
+            memoized = memoize(ENGINE_VERSION)(func)
+        return memoized(*args, **kwargs)
+
+    wrapper.uncached = func
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# 标准值
+# ---------------------------------------------------------------------------
+
+def find_nearest_e24(value_ohm: float) -> float:
+    """在 E24 系列中查找最接近的值（单位：Ω，范围 1Ω ~ 10MΩ）"""
+    return series_index("E24").nearest(value_ohm)
+
+
+def find_nearest_standard(value_ohm: float, series: str = "E24") -> float:
+    """在任意 E 系列 (E3 ~ E192) 中查找最接近的值（单位：Ω）"""
+    return series_index(series).nearest(value_ohm)
+
+
+def nearest_e24_k(value_k: float) -> float:
+    """kΩ 版本的 E24 取整"""
+    return find_nearest_e24(value_k * 1000) / 1000
+
+
+# ---------------------------------------------------------------------------
+# 网络等效值
+# ---------------------------------------------------------------------------
+
+def calculate_equivalent(network) -> float:
+    """精确计算串并联混合网络的等效阻值 (kΩ)，并联分支按整条支路递归计算"""
+    if isinstance(network, CompiledNetwork):
+        total = network.equivalent
+    elif not network:
+        return 0.001  # 避免除零
+    else:
+        total = compile_branch(network).r
+    return total if total > 0 else 0.001
+
+
+def parallel_equivalent(values: List[float]) -> float:
+    """若干电阻并联的等效阻值"""
+    conductance = sum(1.0 / r for r in values if r > 0)
+    return 1.0 / conductance if conductance > 0 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# 分压计算
+# ---------------------------------------------------------------------------
+
+def divider_vout(vin: float, r1: float, r2: float) -> float:
+    """分压输出电压"""
+    return vin * r2 / (r1 + r2) if (r1 + r2) > 0 else 0.0
+
+
+def solve_r2(vin: float, vout: float, r1: float) -> float:
+    """已知 R1 求 R2"""
+    return r1 * vout / (vin - vout)
+
+
+def solve_r1(vin: float, vout: float, r2: float) -> float:
+    """已知 R2 求 R1"""
+    return r2 * (vin - vout) / vout
+
+
+def safety_level(vout: float, vadc_max: float) -> str:
+    """返回 'safe' / 'warn' / 'over' 三档安全状态"""
+    if vout <= VADC_SAFE:
+        return 'safe'
+    return 'over' if vout >= vadc_max else 'warn'
+
+
+def analyze_divider(vin: float, r1_eq: float, r2_eq: float,
+                    vadc_max: float = 3.3, adc_bits: int = 12) -> Dict[str, float]:
+    """分压器全面分析：输出电压、电流、功耗、ADC 分辨率 (电阻单位 kΩ)"""
+    if r1_eq < 0.01 or r2_eq < 0.01:
+        raise ValueError("R1 和 R2 均需 > 0")
+
+    r_total = r1_eq + r2_eq
+    vout = vin * r2_eq / r_total
+    adc_lsb_mv = vadc_max * 1000 / (2**adc_bits)
+
+    return {
+        "vin": vin,
+        "vout": vout,
+        "r1_eq": r1_eq,
+        "r2_eq": r2_eq,
+        "ratio": r2_eq / r_total,
+        "current_ma": vin / r_total,                       # mA (因电阻为 kΩ)
+        "power_r1_mw": (vin - vout)**2 / r1_eq,            # mW
+        "power_r2_mw": vout**2 / r2_eq,                    # mW
+        "adc_bits": adc_bits,
+        "adc_lsb_mv": adc_lsb_mv,
+        "vin_lsb_mv": adc_lsb_mv * r_total / r2_eq,
+        "safety": safety_level(vout, vadc_max),
+    }
+
+
+def analyze_network(vin: float, r1_network, r2_network,
+                    vadc_max: float = 3.3, adc_bits: int = 12) -> Dict[str, float]:
+    """对 R1/R2 网络做分压分析"""
+    return analyze_divider(vin, calculate_equivalent(r1_network),
+                           calculate_equivalent(r2_network), vadc_max, adc_bits)
+
+
+def parallel_groups(network) -> List[List[float]]:
+    """提取网络中各并联组的分支等效阻值 (kΩ)"""
+    groups = []
+    for element in network:
+        if isinstance(element, tuple) and element[0] == 'parallel':
+            groups.append([compile_branch(branch).r for branch in element[1] if branch])
+    return groups
+
+
+# ---------------------------------------------------------------------------
+# 标准值推荐 (搜索结果经 resistor_cache 缓存，内存 LRU + 磁盘，CLI 与 GUI 共享)
+# ---------------------------------------------------------------------------
+
+def cache_stats() -> Dict[str, object]:
+    """结果缓存的命中/未命中统计"""
+    from resistor_cache import default_cache
+    return default_cache().stats()
+
+
+def clear_cache() -> Optional[str]:
+    """清空结果缓存；磁盘缓存清空失败时返回错误信息 (此后本进程只用内存缓存)"""
+    from resistor_cache import default_cache
+    return default_cache().clear()
+
+
+def _scheme(vin: float, vout: float, r1: float, r2: float, **extra) -> Dict[str, float]:
+    vout_actual = divider_vout(vin, r1, r2)
+    scheme = {
+        "r1": r1,
+        "r2": r2,
+        "vout": vout_actual,
+        "error_pct": (vout_actual - vout) / vout * 100,
+        "current_ma": vin / (r1 + r2),
+    }
+    scheme.update(extra)
+    return scheme
+
+
+@cached
+def divider_pairs(vin: float, vout: float, series: str = "E24", k: int = 5,
+                  r_total_min_k: float = 10.0, r_total_max_k: float = 1000.0,
+                  i_max_ua: Optional[float] = None) -> List[Dict[str, float]]:
+    """两电阻分压的前 k 组标准值方案 (kΩ)，按分压比误差升序"""
+    from resistor_search import search_divider
+    pairs = search_divider(vout / vin, series, k,
+                           r_total_min=r_total_min_k * 1000, r_total_max=r_total_max_k * 1000,
+                           vin=vin, i_max_ua=i_max_ua)
+    return [_scheme(vin, vout, p["r1"] / 1000, p["r2"] / 1000) for p in pairs]
+
+
+@cached
+def recommend_standard(vin: float, vout: float, r1_base: float = 15.0) -> Dict[str, object]:
+    """推荐标准电阻组合：单电阻 / R2 串联 / R2 并联，以及电池安全配置 (kΩ)"""
+    if not 0 < vout < vin:
+        raise ValueError("Vout 必须 < Vin")
+
+    ratio = vout / vin
+    r2_r1 = ratio / (1 - ratio)
+    r2_calc = r1_base * r2_r1
+
+    result = {"ratio": ratio, "r2_r1": r2_r1, "r1_base": r1_base}
+
+    # 方案1: 单电阻 E24 —— 在 10k~1MΩ 总阻值范围内全十倍程搜索最佳 R1/R2 组合
+    result["single"] = divider_pairs(vin, vout, "E24", k=1)[0]
+    result["single_e96"] = divider_pairs(vin, vout, "E96", k=1)[0]
+
+    # 方案2: 串联组合 (70/30 拆分)
+    r2_s1 = nearest_e24_k(r2_calc * 0.7)
+    r2_s2 = nearest_e24_k(r2_calc - r2_s1)
+    result["series"] = _scheme(vin, vout, r1_base, r2_s1 + r2_s2, parts=(r2_s1, r2_s2))
+
+    # 方案3: 并联组合 (10k~100k 范围内两个 E24 值)
+    best_err = float('inf')
+    best_pair = None
+    decade = [r * 10 for r in E24_VALUES]
+    for r_a in decade:
+        for r_b in decade:
+            r_eq = 1 / (1/r_a + 1/r_b)
+            err = abs(r_eq - r2_calc)
+            if err < best_err:
+                best_err = err
+                best_pair = (r_a, r_b, r_eq)
+    if best_pair:
+        r_a, r_b, r_eq = best_pair
+        result["parallel"] = _scheme(vin, vout, r1_base, r_eq, parts=(r_a, r_b))
+    else:
+        result["parallel"] = None
+
+    # 电池监测安全配置
+    if vin >= 4.0:
+        result["battery_safe"] = battery_safe_config(vin)
+    else:
+        result["battery_safe"] = None
+
+    return result
+
+
+def battery_safe_config(vin_max: float, vadc_safe: float = VADC_SAFE) -> Dict[str, float]:
+    """电池监测典型配置：R1 取 15k/18k，R2 取最接近的 E24 值"""
+    safe_ratio = vadc_safe / vin_max
+    r2_r1 = safe_ratio / (1 - safe_ratio)
+    r1 = 18.0 if vin_max >= 4.5 else 15.0
+    r2 = nearest_e24_k(r1 * r2_r1)
+    vout = divider_vout(vin_max, r1, r2)
+    return {"r1": r1, "r2": r2, "vout": vout, "margin": vadc_safe - vout}
+
+
+@cached
+def battery_search(vmin: float, vmax: float, vadc_safe: float = VADC_SAFE, series: str = "E96",
+                   min_margin: float = 0.05, i_max_ua: Optional[float] = None,
+                   max_lsb_mv: Optional[float] = None, adc_bits: int = 12, vadc_max: float = 3.3,
+                   r_total_max_k: float = 1000.0, r_total_min_k: float = 10.0) -> List[Dict[str, float]]:
+    """电池监测分压器搜索：series 中全部 R1/R2 组合的 Pareto 集 (分辨率 vs 静态电流)
+
+    返回按电池电压分辨率从好到差排列的方案，电阻单位 kΩ：
+    r1, r2, vout_min, vout_max, margin (V), current_ua, lsb_mv (电池 mV/LSB), source_k (ADC 看到的源阻抗)
+    """
+    from resistor_search import search_battery
+    results = search_battery(vmin, vmax, vadc_safe, series, min_margin, i_max_ua, max_lsb_mv,
+                             adc_lsb_mv=vadc_max * 1000 / 2**adc_bits, r_total_max=r_total_max_k * 1000,
+                             r_total_min=r_total_min_k * 1000)
+    for item in results:
+        item["r1"] /= 1000
+        item["r2"] /= 1000
+        item["source_k"] = item.pop("source_ohm") / 1000
+    return results
+
+
+def parallel_identical(target_k: float, count: int) -> Dict[str, float]:
+    """N 个相同 E24 电阻并联逼近目标阻值"""
+    std_r = nearest_e24_k(target_k * count)
+    eq = std_r / count
+    return {"r": std_r, "eq": eq, "error_pct": (eq - target_k) / target_k * 100}
+
+
+@cached
+def parallel_combinations(target_k: float, count: int, series: str = "E24",
+                          k: int = 5, distinct: bool = False,
+                          max_ratio: Optional[float] = None) -> List[Dict[str, object]]:
+    """count 个标准电阻并联逼近目标阻值的前 k 种组合 (kΩ)，单个阻值 ≤ max_ratio·目标 (默认 4·count，见 search_parallel)"""
+    from resistor_search import search_parallel
+    combos = search_parallel(target_k * 1000, count, series, k, max_ratio=max_ratio, distinct=distinct)
+    return [{"values": tuple(v / 1000 for v in c["values"]),
+             "eq": c["eq"] / 1000,
+             "error_pct": c["error_pct"]} for c in combos]
+
+
+@cached
+def synthesize_network(target_k: float, series: str = "E24", max_parts: int = 4,
+                       tolerance_pct: float = 0.1) -> Optional[Dict[str, object]]:
+    """综合元件数最少的串并联网络，network 可直接作为 r1_network / r2_network 使用"""
+    from resistor_synthesis import synthesize
+    result = synthesize(target_k * 1000, series, max_parts, tolerance_pct)
+    if result is not None:
+        result["eq"] = result["eq"] / 1000
+    return result
+
+
+# ---------------------------------------------------------------------------
+# NTC 热敏电阻 (B 值模型)
+# ---------------------------------------------------------------------------
+
+def ntc_resistance(temp_c: float, r25: float, b: float) -> float:
+    """温度 (°C) → NTC 阻值 (单位同 r25)"""
+    t_k = temp_c + 273.15
+    return r25 * math.exp(b * (1/t_k - 1/T0_K))
+
+
+def ntc_temperature(r_t: float, r25: float, b: float) -> float:
+    """NTC 阻值 → 温度 (°C)"""
+    t_k = 1 / (1/T0_K + (1/b) * math.log(r_t/r25))
+    return t_k - 273.15
+
+
+def ntc_divider_vout(temp_c: float, vin: float, r1_ohm: float, r25: float, b: float,
+                     model: Optional[Dict] = None) -> Tuple[float, float]:
+    """NTC 位于下方的分压输出，返回 (r_ntc, vout)；给出 model 时用拟合模型代替 R25/B"""
+    r_ntc = ntc_model_resistance(temp_c, model) if model else ntc_resistance(temp_c, r25, b)
+    return r_ntc, vin * r_ntc / (r1_ohm + r_ntc)
+
+
+def ntc_table(vin: float, r1_ohm: float, r25: float, b: float,
+              t_start: int = -40, t_stop: int = 125, step: int = 5,
+              adc_bits: int = 12) -> List[Tuple[float, float, float, int]]:
+    """NTC 温度-电压对照表：(temp, r_ntc_ohm, vout, adc_code)"""
+    full_scale = 2**adc_bits - 1
+    rows = []
+    for temp in range(t_start, t_stop + 1, step):
+        r_ntc, vout = ntc_divider_vout(temp, vin, r1_ohm, r25, b)
+        rows.append((temp, r_ntc, vout, int(vout / vin * full_scale)))
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# NTC 拟合模型 (Steinhart–Hart / 扩展 B 值)
+# ---------------------------------------------------------------------------
+#
+# 所有模型统一表示为 1/T = Σ c_i · u^i,  u = ln(R / ref)，T 单位 K：
+#   B 值:           ref = R25, c = [1/T0, 1/B, 0, 0]
+#   Steinhart–Hart: ref = 1Ω,  c = [A, B, 0, C]
+#   扩展 B 值:      ref = R25, c = [a, b, c, d]
+# 模型字典同时保留等效的 r25 / b，供只认 R25/B 的旧代码和界面显示使用。
+
+def ntc_beta_model(r25: float, b: float) -> Dict[str, object]:
+    """由 R25/B 构造模型"""
+    return {"form": "beta", "r25": r25, "b": b, "ref": r25, "coeffs": [1 / T0_K, 1 / b, 0.0, 0.0]}
+
+
+def ntc_model_coeffs(model: Dict) -> Tuple[List[float], float]:
+    if "coeffs" in model:
+        return model["coeffs"], model["ref"]
+    return [1 / T0_K, 1 / model["b"], 0.0, 0.0], model["r25"]
+
+
+def ntc_model_temperature(r_t: float, model: Dict) -> float:
+    """NTC 阻值 → 温度 (°C)"""
+    coeffs, ref = ntc_model_coeffs(model)
+    u = math.log(r_t / ref)
+    inv_t = sum(c * u**i for i, c in enumerate(coeffs))
+    return 1 / inv_t - 273.15
+
+
+def ntc_model_resistance(temp_c: float, model: Dict) -> float:
+    """温度 (°C) → NTC 阻值：对 u 解三次方程 (牛顿法，从 B 值近似出发)"""
+    coeffs, ref = ntc_model_coeffs(model)
+    target = 1 / (temp_c + 273.15)
+    u = (target - coeffs[0]) / coeffs[1]
+    if any(coeffs[2:]):
+        for _ in range(50):
+            f = sum(c * u**i for i, c in enumerate(coeffs)) - target
+            df = sum(i * c * u**(i - 1) for i, c in enumerate(coeffs) if i)
+            step = f / df
+            u -= step
+            if abs(step) < 1e-13:
+                break
+    return ref * math.exp(u)
+
+
+def ntc_effective_beta(model: Dict, t1_c: float = 25.0, t2_c: float = 85.0) -> float:
+    """模型在 t1~t2 之间的等效 B 值 (数据手册常用 B25/85)"""
+    r1 = ntc_model_resistance(t1_c, model)
+    r2 = ntc_model_resistance(t2_c, model)
+    return math.log(r1 / r2) / (1 / (t1_c + 273.15) - 1 / (t2_c + 273.15))
+
@@ -0,0 +1,206 @@
+# resistor_index.py
+# 预计算的标准值两电阻组合索引 - 构建一次写入二进制文件，查询时内存映射 + 二分查找
+# 依赖：查询只用标准库 mmap/bisect；构建 (build_index) 需要 numpy
+#
+# 每个系列两张表 (只建有查询方的表：分压对搜索与两电阻并联搜索)，均按键升序排列 (键相同按 i、j 升序)：
+#   ratio     全部有序对 (R1=values[i], R2=values[j]) 的分压比 R2/(R1+R2)
+#   parallel  i ≤ j 的并联等效值 1/(1/R_i + 1/R_j)
+# 表按列存储：键 float64[n]、i uint16[n]、j uint16[n]，8 字节对齐，
+# memoryview.cast 直接把映射区当作数组，bisect 在其上二分，操作系统按需调页，多进程共享同一份页缓存。
+#
+# 文件格式：8 字节魔数 + 4 字节头长度 + JSON 头 (字节序、各系列的标准值与表偏移) + 数据区。
+# 打开时核对标准值，与 resistor_series 不一致的系列不使用 (回退到在线搜索)。
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from resistor_series import SERIES_BASES, series_index
+
+MAGIC = b"RNIDX\x00\x01\x00"
+INDEX_VERSION = 1
+KINDS = ("ratio", "parallel")
+
+
+def default_path() -> Optional[str]:
+    """索引文件位置：环境变量 RESISTOR_INDEX，否则为本模块旁的 resistor_index.bin；设为 off 时不使用"""
+    env = os.environ.get("RESISTOR_INDEX")
+    if env is not None:
+        return None if env.strip().lower() in ("", "0", "off", "none") else env
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "resistor_index.bin")
+
+
+# ---------------------------------------------------------------------------
+# 构建
+# ---------------------------------------------------------------------------
+
+def _pair_tables(values):
+    """计算一个系列的各张表 (numpy)，键的运算顺序与 resistor_search 在线计算完全一致"""
+    import numpy as np
+    v = np.asarray(values, dtype=np.float64)
+    n = v.size
+    i, j = np.divmod(np.arange(n * n, dtype=np.int64), n)
+    tables = {"ratio": (v[j] / (v[i] + v[j]), i, j)}
+    iu, ju = np.triu_indices(n)
+    tables["parallel"] = (1.0 / (1.0 / v[iu] + 1.0 / v[ju]), iu, ju)
+    for kind, (key, a, b) in tables.items():
+        order = np.lexsort((b, a, key))
+        tables[kind] = (key[order], a[order].astype(np.uint16), b[order].astype(np.uint16))
+    return tables
+
+
+def build_index(path: Optional[str] = None, series: Optional[List[str]] = None) -> Dict[str, object]:
+    """构建索引文件 (需要 numpy)，默认包含 E3 ~ E192 全部系列
+
+    先写入临时文件再原子替换，正在使用旧索引的进程不受影响。返回 path、bytes、pairs。
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("构建组合索引需要 numpy: pip install numpy")
+    path = path or default_path()
+    if path is None:
+        raise ValueError("索引已通过 RESISTOR_INDEX=off 禁用")
+    names = [series_index(s).name for s in (series or list(SERIES_BASES))]
+
+    # 第一遍只算布局 (偏移)，第二遍逐个系列计算并写入，同一时刻只有一个系列的表在内存中
+    entries = {}
+    offset = 0
+    for name in names:
+        n = len(series_index(name).values)
+        tables = {}
+        for kind in KINDS:
+            count = n * n if kind == "ratio" else n * (n + 1) // 2
+            tables[kind] = {"count": count, "keys": offset, "i": offset + 8 * count,
+                            "j": offset + 10 * count}
+            offset += -(-12 * count // 8) * 8
+        entries[name] = {"values": series_index(name).values, "tables": tables}
+    header = json.dumps({"version": INDEX_VERSION, "byteorder": sys.byteorder, "series": entries},
+                        separators=(",", ":")).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    pairs = 0
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for name in names:
+            computed = _pair_tables(entries[name]["values"])
+            for kind in KINDS:
+                layout = entries[name]["tables"][kind]
+                key, a, b = computed[kind]
+                f.seek(data_start + layout["keys"])
+                f.write(key.astype(np.float64).tobytes())
+                f.write(a.tobytes())
+                f.write(b.tobytes())
+                pairs += key.size
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return {"path": path, "bytes": data_start + offset, "pairs": pairs}
+
+
+# ---------------------------------------------------------------------------
+# 查询
+# ---------------------------------------------------------------------------
+
+class PairTable:
+    """一张已映射的表：keys / i / j 均为 memoryview 数组"""
+    __slots__ = ('keys', 'i', 'j', 'values')
+
+    def __init__(self, keys, i, j, values):
+        self.keys = keys
+        self.i = i
+        self.j = j
+        self.values = values
+
+    def __len__(self):
+        return len(self.keys)
+
+    def nearest(self, target: float, accept: Optional[Callable[[int, int], bool]] = None,
+                limit: Optional[int] = None) -> Iterator[Tuple[float, int, int]]:
+        """从 target 出发向两侧扩展，按 |key - target| 升序产出 (误差, i, j)
+
+        accept(i, j) 为 False 的组合跳过；检查 limit 个组合后产出 None 并停止 (约束过严时由调用方回退)。
+        """
+        keys, ia, ja = self.keys, self.i, self.j
+        hi = bisect.bisect_left(keys, target)
+        lo = hi - 1
+        n = len(keys)
+        checked = 0
+        while lo >= 0 or hi < n:
+            if hi >= n or (lo >= 0 and target - keys[lo] <= keys[hi] - target):
+                pos, lo = lo, lo - 1
+            else:
+                pos, hi = hi, hi + 1
+            checked += 1
+            if limit is not None and checked > limit:
+                yield None
+                return
+            i, j = ia[pos], ja[pos]
+            if accept is None or accept(i, j):
+                yield abs(keys[pos] - target), i, j
+
+
+class PairIndex:
+    """内存映射的组合索引文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        head = self._mm[:len(MAGIC) + 4]
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"不是组合索引文件: {path}")
+        (header_len,) = struct.unpack("<I", head[len(MAGIC):])
+        header = json.loads(self._mm[len(MAGIC) + 4:len(MAGIC) + 4 + header_len])
+        if header.get("version") != INDEX_VERSION or header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"组合索引版本或字节序不匹配，请重新构建: {path}")
+        data_start = -(-(len(MAGIC) + 4 + header_len) // 8) * 8
+        view = memoryview(self._mm)
+        self._tables: Dict[Tuple[str, str], PairTable] = {}
+        for name, entry in header["series"].items():
+            values = series_index(name).values
+            if entry["values"] != values:
+                continue
+            for kind, layout in entry["tables"].items():
+                count = layout["count"]
+
+                def column(offset, width, fmt):
+                    start = data_start + offset
+                    return view[start:start + width * count].cast(fmt)
+                self._tables[(name, kind)] = PairTable(column(layout["keys"], 8, 'd'),
+                                                       column(layout["i"], 2, 'H'),
+                                                       column(layout["j"], 2, 'H'), values)
+
+    def table(self, series: str, kind: str) -> Optional[PairTable]:
+        return self._tables.get((series_index(series).name, kind))
+
+    def series_names(self) -> List[str]:
+        return sorted({name for name, _ in self._tables}, key=list(SERIES_BASES).index)
+
+
+_index = None
+_index_loaded = False
+
+
+def pair_index() -> Optional[PairIndex]:
+    """进程内共享的索引 (首次调用时映射)；文件不存在或无效时返回 None"""
+    global _index, _index_loaded
+    if not _index_loaded:
+        _index_loaded = True
+        path = default_path()
+        if path and os.path.exists(path):
+            try:
+                _index = PairIndex(path)
+            except (OSError, ValueError):
+                _index = None
+    return _index
+
+
+def pair_table(series: str, kind: str) -> Optional[PairTable]:
+    index = pair_index()
+    return index.table(series, kind) if index is not None else None
@@ -0,0 +1,271 @@
+# resistor_library.py
+# 设计库 - 本地 SQLite 保存分压设计，按 Vin/Vout/分压比/电流/元件数建索引，支持批量导入旧的 JSON 配置
+# 依赖：标准库 sqlite3/json
+#
+# 每个设计一行：检索用的数值列 (由网络计算得出) + 网络列表 JSON + 其余界面字段 JSON。
+# 网络读回时经 network_from_json 还原元组，与保存前的 r1_network/r2_network 完全相同。
+# 内容摘要 (不含名称与时间) 唯一：同一设计重复保存或重复导入只保留一份。
+# 库文件：环境变量 RESISTOR_LIBRARY，默认 ~/.local/share/resistor_expert/designs.sqlite3。
+# 表结构带版本号 (PRAGMA user_version)，打开时按 MIGRATIONS 顺序升级。
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import resistor_engine as engine
+from resistor_network import compile_branch, leaves, network_from_json
+
+# 第 i 项把表结构从版本 i 升级到 i+1
+MIGRATIONS = [
+    """
+    CREATE TABLE designs (
+        id          INTEGER PRIMARY KEY,
+        name        TEXT NOT NULL,
+        created     TEXT NOT NULL,
+        digest      TEXT NOT NULL UNIQUE,
+        vin         REAL,
+        vout        REAL,
+        vout_target REAL,
+        ratio       REAL,
+        current_ua  REAL,
+        r1_eq       REAL,
+        r2_eq       REAL,
+        part_count  INTEGER NOT NULL,
+        r1_network  TEXT NOT NULL,
+        r2_network  TEXT NOT NULL,
+        settings    TEXT NOT NULL,
+        source      TEXT
+    );
+    CREATE INDEX designs_vin ON designs (vin);
+    CREATE INDEX designs_vout ON designs (vout);
+    CREATE INDEX designs_ratio ON designs (ratio);
+    CREATE INDEX designs_current ON designs (current_ua);
+    CREATE INDEX designs_parts ON designs (part_count);
+    """,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+SUMMARY_COLUMNS = ("id", "name", "created", "vin", "vout", "vout_target", "ratio", "current_ua",
+                   "r1_eq", "r2_eq", "part_count", "source")
+ORDERS = {
+    "created": "created DESC, id DESC",
+    "ratio": "ratio, id",
+    "current": "current_ua, id",
+    "parts": "part_count, current_ua, id",
+    "name": "name, id",
+}
+_NETWORK_KEYS = ("r1_network", "r2_network")
+
+
+def default_path() -> str:
+    env = os.environ.get("RESISTOR_LIBRARY")
+    if env:
+        return env
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "resistor_expert", "designs.sqlite3")
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _metrics(settings: Dict, r1_network: List, r2_network: List) -> Dict[str, Optional[float]]:
+    """检索用的数值列：等效阻值 (kΩ)、分压比、实际 Vout、静态电流 (µA)、元件数"""
+    r1_eq = engine.calculate_equivalent(r1_network) if r1_network else None
+    r2_eq = engine.calculate_equivalent(r2_network) if r2_network else None
+    vin = _float(settings.get("vin"))
+    ratio = vout = current_ua = None
+    if r1_eq and r2_eq:
+        ratio = r2_eq / (r1_eq + r2_eq)
+        if vin is not None:
+            vout = vin * ratio
+            current_ua = vin / (r1_eq + r2_eq) * 1000
+    parts = sum(1 for _ in leaves(compile_branch(r1_network))) + sum(1 for _ in leaves(compile_branch(r2_network)))
+    return {"vin": vin, "vout": vout, "vout_target": _float(settings.get("vout_target")), "ratio": ratio,
+            "current_ua": current_ua, "r1_eq": r1_eq, "r2_eq": r2_eq, "part_count": parts}
+
+
+def _digest(settings: Dict, r1_json: str, r2_json: str) -> str:
+    blob = json.dumps([settings, r1_json, r2_json], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class DesignLibrary:
+    """SQLite 设计库 (多个进程可同时打开)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=5.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"设计库由更新的版本创建 (表结构 v{version} > v{SCHEMA_VERSION}): {self.path}")
+        for target in range(version, SCHEMA_VERSION):
+            # 每一步升级连同版本号在一个显式事务中完成，失败时整体回滚
+            self.conn.execute("BEGIN")
+            try:
+                for statement in MIGRATIONS[target].split(";"):
+                    if statement.strip():
+                        self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version = {target + 1}")
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- 写入 ----------------------------------------------------------------
+
+    def _row(self, config: Dict, name: Optional[str], source: Optional[str]) -> Tuple:
+        r1_network = network_from_json(config.get("r1_network", []))
+        r2_network = network_from_json(config.get("r2_network", []))
+        settings = {k: v for k, v in config.items() if k not in _NETWORK_KEYS + ("timestamp", "name", "id")}
+        r1_json = json.dumps(r1_network, ensure_ascii=False)
+        r2_json = json.dumps(r2_network, ensure_ascii=False)
+        m = _metrics(settings, r1_network, r2_network)
+        created = config.get("timestamp") or datetime.now().isoformat()
+        name = name or config.get("name") or f"设计 {created[:19].replace('T', ' ')}"
+        return (name, created, _digest(settings, r1_json, r2_json), m["vin"], m["vout"], m["vout_target"],
+                m["ratio"], m["current_ua"], m["r1_eq"], m["r2_eq"], m["part_count"], r1_json, r2_json,
+                json.dumps(settings, ensure_ascii=False), source)
+
+    _INSERT = ("INSERT OR IGNORE INTO designs (name, created, digest, vin, vout, vout_target, ratio, current_ua, "
+               "r1_eq, r2_eq, part_count, r1_network, r2_network, settings, source) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+    def save(self, config: Dict, name: Optional[str] = None, source: Optional[str] = None) -> Tuple[int, bool]:
+        """保存一个设计 (save_config 的字段格式)，返回 (id, 是否新增)；相同设计已存在时返回已有 id"""
+        row = self._row(config, name, source)
+        with self.conn:
+            cur = self.conn.execute(self._INSERT, row)
+            if cur.rowcount:
+                return cur.lastrowid, True
+            return self.conn.execute("SELECT id FROM designs WHERE digest = ?", (row[2],)).fetchone()[0], False
+
+    def import_json(self, paths: Iterable[str]) -> Dict[str, object]:
+        """批量导入 resistor_config_*.json，整批一个事务；返回 imported / duplicates / errors [(path, 原因)]"""
+        imported = duplicates = 0
+        errors: List[Tuple[str, str]] = []
+        with self.conn:
+            for path in paths:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        config = json.load(f)
+                    if not isinstance(config, dict):
+                        raise ValueError("不是配置对象")
+                    name = os.path.splitext(os.path.basename(path))[0]
+                    row = self._row(config, name, os.path.abspath(path))
+                except (OSError, ValueError, TypeError) as e:
+                    errors.append((path, str(e)))
+                    continue
+                if self.conn.execute(self._INSERT, row).rowcount:
+                    imported += 1
+                else:
+                    duplicates += 1
+        return {"imported": imported, "duplicates": duplicates, "errors": errors}
+
+    def rename(self, design_id: int, name: str):
+        with self.conn:
+            self.conn.execute("UPDATE designs SET name = ? WHERE id = ?", (name, design_id))
+
+    def delete(self, design_id: int) -> bool:
+        with self.conn:
+            return self.conn.execute("DELETE FROM designs WHERE id = ?", (design_id,)).rowcount > 0
+
+    # -- 查询 ----------------------------------------------------------------
+
+    def get(self, design_id: int) -> Optional[Dict]:
+        """读回完整设计：save_config 格式的字典 (网络为元组格式) + id / name"""
+        row = self.conn.execute("SELECT id, name, created, r1_network, r2_network, settings FROM designs "
+                                "WHERE id = ?", (design_id,)).fetchone()
+        if row is None:
+            return None
+        design_id, name, created, r1_json, r2_json, settings = row
+        config = json.loads(settings)
+        config.update({"id": design_id, "name": name, "timestamp": created,
+                       "r1_network": network_from_json(json.loads(r1_json)),
+                       "r2_network": network_from_json(json.loads(r2_json))})
+        return config
+
+    def query(self, ratio: Optional[float] = None, ratio_tol_pct: float = 1.0,
+              vin: Optional[Tuple[Optional[float], Optional[float]]] = None,
+              vout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+              max_current_ua: Optional[float] = None, max_parts: Optional[int] = None,
+              name: Optional[str] = None, order: str = "created", limit: Optional[int] = 500) -> List[Dict]:
+        """按条件检索设计摘要，例如 query(ratio=0.3, ratio_tol_pct=1, max_current_ua=50)
+
+        vin / vout 为 (下限, 上限)，任一端可为 None；name 为名称子串。
+        """
+        where, params = [], []
+        if ratio is not None:
+            tol = abs(ratio) * ratio_tol_pct / 100
+            where.append("ratio BETWEEN ? AND ?")
+            params += [ratio - tol, ratio + tol]
+        for column, bounds in (("vin", vin), ("vout", vout)):
+            lo, hi = bounds or (None, None)
+            if lo is not None:
+                where.append(f"{column} >= ?")
+                params.append(lo)
+            if hi is not None:
+                where.append(f"{column} <= ?")
+                params.append(hi)
+        if max_current_ua is not None:
+            where.append("current_ua <= ?")
+            params.append(max_current_ua)
+        if max_parts is not None:
+            where.append("part_count <= ?")
+            params.append(max_parts)
+        if name:
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append("%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if order not in ORDERS:
+            raise ValueError(f"未知排序: {order} (可选: {', '.join(ORDERS)})")
+        sql = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM designs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {ORDERS[order]}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in self.conn.execute(sql, params)]
+
+    def iter_designs(self, ids: Optional[Iterable[int]] = None) -> Iterable[Dict]:
+        """逐个产出完整设计 (格式同 get)；ids 为 None 时按 id 顺序遍历全库，游标分批读取，不一次载入"""
+        if ids is not None:
+            for design_id in ids:
+                design = self.get(design_id)
+                if design is not None:
+                    yield design
+            return
+        last = 0
+        while True:
+            batch = [row[0] for row in self.conn.execute(
+                "SELECT id FROM designs WHERE id > ? ORDER BY id LIMIT 256", (last,))]
+            if not batch:
+                return
+            for design_id in batch:
+                design = self.get(design_id)
+                if design is not None:
+                    yield design
+            last = batch[-1]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM designs").fetchone()[0]
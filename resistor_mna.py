@@ -0,0 +1,423 @@
+# resistor_mna.py
+# 稀疏改进节点分析 (MNA) - 任意电阻网络 + 电压源/电流源：节点电压、支路电流与功耗
+# 依赖：无 (纯 Python 稀疏 LU)
+#
+# 未知量为除地以外的节点电压 v 与每个电压源的电流 j：
+#   [G  B] [v]   [i]
+#   [Bᵀ 0] [j] = [e]
+# G 为节点电导矩阵 (逐个电阻盖印)，B 为电压源关联矩阵，i 为电流源注入，e 为电压源电压。
+# 矩阵按行存为 {列: 值}，LU 分解用 Markowitz 策略选主元：先取非零最少的列，
+# 再在满足 |a| ≥ PIVOT_THRESHOLD·列最大值 的行中取非零最少的一行，兼顾填充与数值稳定；
+# 电压源列只有两个非零，会被优先消去，零对角不需要特殊处理。
+# 分解只取决于拓扑与阻值：只改电源数值时复用分解，每次求解只是一次前代 + 回代 (O(非零数))。
+# 单位与引擎一致：kΩ、V、mA、mW。
+# 串并联分压网络是特例：from_divider 把网络列表展开成网表，结果与 calculate_equivalent 一致。
+#
+# 文本网表 (SPICE 子集，每行一个元件，* 或 ; 开头为注释，. 开头的控制行忽略)：
+#   R名 节点1 节点2 阻值(Ω)    V名 正 负 电压(V)    I名 从 到 电流(A，经电源从前一节点流向后一节点)
+#   数值可带 SPICE 后缀 (f p n u m k meg g t) 或 4k7 写法；节点 0 / gnd 为地。
+
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from resistor_network import CompiledNetwork, Parallel, Resistor, Series, compile_branch, leaves
+
+GROUND = "0"
+GROUND_NAMES = ("0", "gnd")
+PIVOT_THRESHOLD = 0.1
+
+_SUFFIX = {"f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "m": 1e-3,
+           "k": 1e3, "meg": 1e6, "g": 1e9, "t": 1e12}
+_NUMBER = re.compile(r"^([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|[fpnuµmkgt])?[a-zΩ]*$", re.IGNORECASE)
+_RKM = re.compile(r"^(\d+)([rkmg])(\d+)[a-zΩ]*$", re.IGNORECASE)
+
+
+def parse_value(text: str) -> float:
+    """SPICE 风格数值：'10k' → 10000，'4k7' → 4700，'2.5m' → 0.0025，'1meg' → 1e6"""
+    s = text.strip()
+    m = _RKM.match(s)
+    if m:
+        scale = {"r": 1.0, "k": 1e3, "m": 1e6, "g": 1e9}[m.group(2).lower()]
+        return float(f"{m.group(1)}.{m.group(3)}") * scale
+    m = _NUMBER.match(s)
+    if not m:
+        raise ValueError(f"无法解析数值: {text!r}")
+    return float(m.group(1)) * (_SUFFIX[m.group(2).lower()] if m.group(2) else 1.0)
+
+
+class SingularCircuit(ValueError):
+    """电路无唯一解 (节点悬空、电压源回路等)"""
+
+
+# ---------------------------------------------------------------------------
+# 稀疏 LU
+# ---------------------------------------------------------------------------
+
+class SparseLU:
+    """稀疏 LU 分解 (行字典存储，Markowitz 选主元)，分解一次后可对任意右端项求解
+
+    steps 中每一步为 (主元行, 主元列, 主元, L 列 {行: 乘数}, U 行 {列: 值})。
+    """
+    __slots__ = ('n', 'steps', 'nnz')
+
+    def __init__(self, rows: List[Dict[int, float]], labels: Optional[List[str]] = None):
+        n = len(rows)
+        rows = [dict(row) for row in rows]
+        cols: List[set] = [set() for _ in range(n)]
+        for r, row in enumerate(rows):
+            for c in row:
+                cols[c].add(r)
+        heap = [(len(cols[c]), c) for c in range(n)]
+        heapq.heapify(heap)
+        eliminated = [False] * n
+        steps = []
+        nnz = 0
+        while heap:
+            count, c = heapq.heappop(heap)
+            if eliminated[c] or count != len(cols[c]):
+                continue   # 过期的堆项 (列非零数已变化)
+            candidates = [(r, rows[r][c]) for r in cols[c]]
+            biggest = max((abs(v) for _, v in candidates), default=0.0)
+            if biggest == 0.0:
+                raise SingularCircuit(f"矩阵奇异: {labels[c] if labels else c} 无法确定")
+            limit = PIVOT_THRESHOLD * biggest
+            p = min((r for r, v in candidates if abs(v) >= limit), key=lambda r: (len(rows[r]), r))
+            upper = rows[p]
+            rows[p] = None
+            pivot = upper.pop(c)
+            eliminated[c] = True
+            cols[c].discard(p)
+            for c2 in upper:
+                cols[c2].discard(p)
+            lower = {}
+            for r in cols[c]:
+                row = rows[r]
+                factor = row.pop(c) / pivot
+                lower[r] = factor
+                for c2, v in upper.items():
+                    if c2 in row:
+                        row[c2] -= factor * v
+                    else:
+                        row[c2] = -factor * v
+                        cols[c2].add(r)
+            cols[c] = set()
+            for c2 in upper:
+                heapq.heappush(heap, (len(cols[c2]), c2))
+            steps.append((p, c, pivot, lower, upper))
+            nnz += 1 + len(lower) + len(upper)
+        self.n = n
+        self.steps = steps
+        self.nnz = nnz
+
+    def solve(self, b: List[float]) -> List[float]:
+        """解 A·x = b (前代 + 回代)"""
+        y = list(b)
+        for p, c, pivot, lower, upper in self.steps:
+            yp = y[p]
+            if yp:
+                for r, factor in lower.items():
+                    y[r] -= factor * yp
+        x = [0.0] * self.n
+        for p, c, pivot, lower, upper in reversed(self.steps):
+            s = y[p]
+            for c2, v in upper.items():
+                s -= v * x[c2]
+            x[c] = s / pivot
+        return x
+
+
+# ---------------------------------------------------------------------------
+# 网表
+# ---------------------------------------------------------------------------
+
+class Solution:
+    """一次求解的结果
+
+    voltages: 节点 → 电压 (V，地为 0)
+    currents: 元件 → 电流 (mA)；电阻为从第一个节点流向第二个节点，电压源为从正端流出到外电路，
+              电流源为其设定值
+    powers:   元件 → 吸收功率 (mW)；电阻即功耗，正在供电的电源为负，全部之和为 0
+    """
+    __slots__ = ('voltages', 'currents', 'powers', 'sources')
+
+    def __init__(self, voltages: Dict[str, float], currents: Dict[str, float], powers: Dict[str, float],
+                 sources: frozenset = frozenset()):
+        self.voltages = voltages
+        self.currents = currents
+        self.powers = powers
+        self.sources = sources
+
+    def v(self, a: str, b: str = GROUND) -> float:
+        """节点 a 相对节点 b 的电压"""
+        return self.voltages[node_name(a)] - self.voltages[node_name(b)]
+
+    @property
+    def dissipation_mw(self) -> float:
+        """全部电阻的总功耗 (mW)"""
+        return sum(p for name, p in self.powers.items() if name not in self.sources)
+
+
+def node_name(name) -> str:
+    """规范化节点名：0 / gnd (不分大小写) 都是地"""
+    name = str(name).strip()
+    return GROUND if name.lower() in GROUND_NAMES else name
+
+
+class Netlist:
+    """电阻 + 独立电压源/电流源网表；元件名全局唯一"""
+
+    def __init__(self):
+        self.nodes: Dict[str, int] = {}                       # 节点名 → 未知量序号 (地不在其中)
+        self.resistors: Dict[str, Tuple[str, str, float]] = {}
+        self.vsources: Dict[str, Tuple[str, str, float]] = {}
+        self.isources: Dict[str, Tuple[str, str, float]] = {}
+        self._lu: Optional[SparseLU] = None
+
+    # -- 构建 ----------------------------------------------------------------
+
+    def _add_node(self, name) -> str:
+        name = node_name(name)
+        if name != GROUND and name not in self.nodes:
+            self.nodes[name] = len(self.nodes)
+            self._lu = None
+        return name
+
+    def _check_name(self, name: str):
+        if name in self.resistors or name in self.vsources or name in self.isources:
+            raise ValueError(f"元件名重复: {name}")
+
+    def add_resistor(self, name: str, a, b, value_k: float):
+        """电阻 (kΩ)，必须 > 0；短路请用 0 V 电压源"""
+        self._check_name(name)
+        if not value_k > 0:
+            raise ValueError(f"{name}: 阻值必须 > 0 (实际 {value_k})")
+        self.resistors[name] = (self._add_node(a), self._add_node(b), float(value_k))
+        self._lu = None
+
+    def add_voltage_source(self, name: str, pos, neg, volts: float):
+        self._check_name(name)
+        self.vsources[name] = (self._add_node(pos), self._add_node(neg), float(volts))
+        self._lu = None
+
+    def add_current_source(self, name: str, frm, to, ma: float):
+        """电流源：ma 毫安经电源从 frm 节点流向 to 节点 (即注入 to)"""
+        self._check_name(name)
+        self.isources[name] = (self._add_node(frm), self._add_node(to), float(ma))
+
+    def set_source(self, name: str, value: float):
+        """修改电源数值 (V 或 mA)，不影响已有分解"""
+        for table in (self.vsources, self.isources):
+            if name in table:
+                a, b, _ = table[name]
+                table[name] = (a, b, float(value))
+                return
+        raise KeyError(f"没有电源: {name}")
+
+    def set_resistor(self, name: str, value_k: float):
+        """修改阻值 (下次求解时重新分解)"""
+        if not value_k > 0:
+            raise ValueError(f"{name}: 阻值必须 > 0 (实际 {value_k})")
+        a, b, _ = self.resistors[name]
+        self.resistors[name] = (a, b, float(value_k))
+        self._lu = None
+
+    @classmethod
+    def parse(cls, text: str) -> "Netlist":
+        """从文本网表构建 (格式见模块说明)"""
+        net = cls()
+        for lineno, line in enumerate(text.splitlines(), 1):
+            line = line.split(";")[0].strip()
+            if not line or line[0] in "*.":
+                continue
+            fields = line.split()
+            if len(fields) == 5 and fields[3].lower() == "dc":
+                del fields[3]
+            if len(fields) != 4:
+                raise ValueError(f"第 {lineno} 行: 需要 '名称 节点 节点 数值'，实际 {line!r}")
+            name, a, b, raw = fields
+            try:
+                value = parse_value(raw)
+                kind = name[0].upper()
+                if kind == "R":
+                    net.add_resistor(name, a, b, value / 1000)
+                elif kind == "V":
+                    net.add_voltage_source(name, a, b, value)
+                elif kind == "I":
+                    net.add_current_source(name, a, b, value * 1000)
+                else:
+                    raise ValueError(f"不支持的元件类型: {name} (只支持 R/V/I)")
+            except ValueError as e:
+                raise ValueError(f"第 {lineno} 行: {e}") from None
+        return net
+
+    def to_text(self, title: Optional[str] = None) -> str:
+        """写成 parse 可读回的文本网表 (阻值 Ω、电流 A)"""
+        lines = [f"* {title}"] if title else []
+        lines += [f"{name} {pos} {neg} {volts:.12g}" for name, (pos, neg, volts) in self.vsources.items()]
+        lines += [f"{name} {frm} {to} {ma / 1000:.12g}" for name, (frm, to, ma) in self.isources.items()]
+        lines += [f"{name} {a} {b} {value * 1000:.12g}" for name, (a, b, value) in self.resistors.items()]
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_divider(cls, vin: float, r1_network, r2_network, load_k: Optional[float] = None) -> "Netlist":
+        """把串并联分压器 (网络列表或已编译的树) 展开成网表：节点 vin / vout / 0，电源 VIN，可选负载 RLOAD
+
+        电阻命名与 divider_sensitivity 一致 (R1_1, R1_2, ..., R2_1, ...，按 leaves 顺序)；
+        0 Ω 电阻 (以及空支路、全部支路为 0 的并联组) 按短路处理，为名称前加 V 的 0 V 电压源 (如 VR1_3)；
+        阻值为 0 的并联支路忽略，与 calculate_equivalent 的约定相同。
+        """
+        net = cls()
+        net.add_voltage_source("VIN", "vin", GROUND, vin)
+        for side, network, a, b in (("R1", r1_network, "vin", "vout"), ("R2", r2_network, "vout", GROUND)):
+            if isinstance(network, CompiledNetwork):
+                root = network.root
+            else:
+                root = network if isinstance(network, Series) else compile_branch(network)
+            counter = [0, 0]   # 电阻序号、内部节点序号
+
+            def new_node():
+                counter[1] += 1
+                return f"{side}.n{counter[1]}"
+
+            # 显式栈展开 (避免深层嵌套触发递归上限)；先压入的后处理，因此反向压栈以保持 leaves 顺序
+            stack = [(root, a, b)]
+            while stack:
+                node, na, nb = stack.pop()
+                if isinstance(node, Resistor):
+                    counter[0] += 1
+                    ref = f"{side}_{counter[0]}"
+                    if node.value > 0:
+                        net.add_resistor(ref, na, nb, node.value)
+                    else:
+                        net.add_voltage_source(f"V{ref}", na, nb, 0.0)
+                elif isinstance(node, Parallel):
+                    branches = [child for child in node.children if child.g > 0]
+                    if not branches:
+                        counter[1] += 1
+                        net.add_voltage_source(f"V{side}.short{counter[1]}", na, nb, 0.0)
+                    for child in reversed(node.children):
+                        if child.g > 0:
+                            stack.append((child, na, nb))
+                        else:
+                            # 被忽略的支路中的电阻仍占序号 (与 leaves 顺序对应)
+                            counter[0] += sum(1 for _ in leaves(child))
+                else:
+                    children = node.children
+                    if not children:
+                        counter[1] += 1
+                        net.add_voltage_source(f"V{side}.short{counter[1]}", na, nb, 0.0)
+                        continue
+                    taps = [na] + [new_node() for _ in children[:-1]] + [nb]
+                    for k in reversed(range(len(children))):
+                        stack.append((children[k], taps[k], taps[k + 1]))
+        if load_k is not None:
+            net.add_resistor("RLOAD", "vout", GROUND, load_k)
+        return net
+
+    # -- 求解 ----------------------------------------------------------------
+
+    def _check_connected(self):
+        """每个节点都必须经电阻或电压源连到地，否则电压无法确定"""
+        parent = {name: name for name in self.nodes}
+        parent[GROUND] = GROUND
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        for a, b, _ in list(self.resistors.values()) + list(self.vsources.values()):
+            parent[find(a)] = find(b)
+        root = find(GROUND)
+        floating = [name for name in self.nodes if find(name) != root]
+        if floating:
+            shown = ", ".join(floating[:10]) + (" ..." if len(floating) > 10 else "")
+            raise SingularCircuit(f"节点悬空 (与地之间没有电阻或电压源通路): {shown}")
+
+    def factor(self) -> SparseLU:
+        """组装 MNA 矩阵并分解 (拓扑与阻值不变时复用)"""
+        if self._lu is None:
+            self._check_connected()
+            n = len(self.nodes)
+            rows: List[Dict[int, float]] = [{} for _ in range(n + len(self.vsources))]
+
+            def stamp(r, c, v):
+                rows[r][c] = rows[r].get(c, 0.0) + v
+            for a, b, value in self.resistors.values():
+                g = 1.0 / value
+                ia, ib = self.nodes.get(a), self.nodes.get(b)
+                if ia is not None:
+                    stamp(ia, ia, g)
+                if ib is not None:
+                    stamp(ib, ib, g)
+                if ia is not None and ib is not None:
+                    stamp(ia, ib, -g)
+                    stamp(ib, ia, -g)
+            for k, (pos, neg, _) in enumerate(self.vsources.values()):
+                row = n + k
+                for node, sign in ((pos, 1.0), (neg, -1.0)):
+                    i = self.nodes.get(node)
+                    if i is not None:
+                        stamp(i, row, sign)
+                        stamp(row, i, sign)
+            labels = [f"节点 {name}" for name in self.nodes] + \
+                     [f"电压源 {name} 的电流 (是否与其他电压源构成回路?)" for name in self.vsources]
+            self._lu = SparseLU(rows, labels)
+        return self._lu
+
+    def solve(self, sources: Optional[Dict[str, float]] = None) -> Solution:
+        """求解；sources 可临时覆盖部分电源数值 (V / mA)，用于扫描，不影响分解"""
+        sources = sources or {}
+        unknown = [name for name in sources if name not in self.vsources and name not in self.isources]
+        if unknown:
+            raise KeyError(f"没有电源: {', '.join(unknown)}")
+        lu = self.factor()
+        n = len(self.nodes)
+        rhs = [0.0] * (n + len(self.vsources))
+        for name, (frm, to, ma) in self.isources.items():
+            ma = sources.get(name, ma)
+            if frm != GROUND:
+                rhs[self.nodes[frm]] -= ma
+            if to != GROUND:
+                rhs[self.nodes[to]] += ma
+        for k, (name, (_, _, volts)) in enumerate(self.vsources.items()):
+            rhs[n + k] = sources.get(name, volts)
+        x = lu.solve(rhs)
+
+        voltages = {GROUND: 0.0}
+        voltages.update((name, x[i]) for name, i in self.nodes.items())
+        currents, powers = {}, {}
+        for name, (a, b, value) in self.resistors.items():
+            dv = voltages[a] - voltages[b]
+            currents[name] = dv / value
+            powers[name] = dv * dv / value
+        for k, (name, (pos, neg, volts)) in enumerate(self.vsources.items()):
+            # x 中的电流为从正端流入电源，取反即为对外输出
+            currents[name] = -x[n + k]
+            powers[name] = (voltages[pos] - voltages[neg]) * x[n + k]
+        for name, (frm, to, ma) in self.isources.items():
+            ma = sources.get(name, ma)
+            currents[name] = ma
+            powers[name] = (voltages[frm] - voltages[to]) * ma
+        return Solution(voltages, currents, powers, frozenset(self.vsources) | frozenset(self.isources))
+
+    def sweep(self, name: str, values: Iterable[float]) -> Iterable[Tuple[float, Solution]]:
+        """逐个数值求解同一个电源 (共用一次分解)"""
+        for value in values:
+            yield value, self.solve({name: value})
+
+
+def format_report(solution: Solution, probes: Optional[List[str]] = None, top: Optional[int] = 20) -> str:
+    """节点电压 + 按功耗降序的元件列表 (CLI 与 GUI 共用)；probes 默认全部节点 (最多 40 个)"""
+    nodes = probes or [name for name in solution.voltages if name != GROUND][:40]
+    lines = ["【节点电压】"]
+    lines += [f"   {name:<16} {solution.v(name):12.6f} V" for name in nodes]
+    lines += ["", "【元件】(按功耗降序，电源供电为负)", f"   {'名称':<12} {'电流 mA':>12} {'功耗 mW':>12}"]
+    ranked = sorted(solution.powers, key=lambda name: -abs(solution.powers[name]))
+    lines += [f"   {name:<12} {solution.currents[name]:12.6f} {solution.powers[name]:12.6f}"
+              for name in ranked[:top or None]]
+    if top and len(ranked) > top:
+        lines.append(f"   ... 其余 {len(ranked) - top} 个")
+    lines += ["", f"   电阻总功耗 {solution.dissipation_mw:.6f} mW"]
+    return "\n".join(lines)
@@ -0,0 +1,245 @@
+# resistor_montecarlo.py
+# 整个分压网络的蒙特卡洛容差/良率分析 - 向量化抽样 + 多进程分片 + 增量合并
+# 依赖：numpy
+#
+# 可复现性：样本按固定大小 BLOCK_SIZE 切成块，每块的随机流来自 SeedSequence(seed).spawn()；
+#           分片只是连续的若干块，大小按 样本数 / (进程数 × SHARDS_PER_WORKER) 决定 (不小于 MIN_SHARD_SIZE)，
+#           各块的均值/平方和按块顺序合并，直方图等为整数累加，
+#           因此同一 seed 在 1 核和 32 核上得到完全相同的统计量。
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from resistor_batch import BatchTopology
+
+DISTRIBUTIONS = ("normal", "uniform")
+PERCENTILES = (0.135, 1.0, 5.0, 50.0, 95.0, 99.0, 99.865)
+
+BLOCK_SIZE = 65_536         # 每块的样本数，也是每次向量化求值的规模 (决定随机流划分，修改会改变结果)
+SHARDS_PER_WORKER = 4       # 每个进程平均分到的分片数 (负载均衡与进度粒度)
+MIN_SHARD_SIZE = 262_144    # 分片样本数下限，摊薄进程间传递任务的开销
+HIST_BINS = 4096
+
+
+class VoutStats:
+    """可合并的流式统计量：均值/方差 (Chan 合并)、极值、直方图、规格内计数
+
+    每次 add_samples 的 (样本数, 均值, 平方和) 单独保留，merge 时按顺序拼接，
+    mean / m2 总是按块顺序依次合并得到，与分片方式无关。
+    """
+    __slots__ = ('count', 'moments', 'vmin', 'vmax', 'in_spec', 'hist', 'edges')
+
+    def __init__(self, edges: np.ndarray):
+        self.count = 0
+        self.moments = []
+        self.vmin = float('inf')
+        self.vmax = float('-inf')
+        self.in_spec = 0
+        self.edges = edges
+        self.hist = np.zeros(len(edges) - 1, dtype=np.int64)
+
+    def add_samples(self, vout: np.ndarray, spec):
+        n = vout.size
+        mean = float(vout.mean())
+        m2 = float(((vout - mean)**2).sum())
+        self.moments.append((n, mean, m2))
+        self.count += n
+        self.vmin = min(self.vmin, float(vout.min()))
+        self.vmax = max(self.vmax, float(vout.max()))
+        if spec is not None:
+            self.in_spec += int(np.count_nonzero((vout >= spec[0]) & (vout <= spec[1])))
+        # 超出直方图范围的样本计入两端的箱
+        clipped = np.clip(vout, self.edges[0], self.edges[-1])
+        self.hist += np.histogram(clipped, bins=self.edges)[0]
+
+    def merge(self, other: "VoutStats"):
+        self.moments.extend(other.moments)
+        self.count += other.count
+        self.vmin = min(self.vmin, other.vmin)
+        self.vmax = max(self.vmax, other.vmax)
+        self.in_spec += other.in_spec
+        self.hist += other.hist
+
+    def _combined(self):
+        count = 0
+        mean = m2_total = 0.0
+        for n, block_mean, m2 in self.moments:
+            if n == 0:
+                continue
+            total = count + n
+            delta = block_mean - mean
+            mean += delta * n / total
+            m2_total += m2 + delta**2 * count * n / total
+            count = total
+        return mean, m2_total
+
+    @property
+    def mean(self) -> float:
+        return self._combined()[0]
+
+    @property
+    def m2(self) -> float:
+        return self._combined()[1]
+
+    @property
+    def std(self) -> float:
+        return (self.m2 / (self.count - 1))**0.5 if self.count > 1 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """由直方图线性插值得到百分位数"""
+        cdf = np.cumsum(self.hist)
+        target = q / 100 * self.count
+        i = int(np.searchsorted(cdf, target, side='left'))
+        i = min(i, len(self.hist) - 1)
+        below = cdf[i - 1] if i > 0 else 0
+        frac = (target - below) / self.hist[i] if self.hist[i] else 0.0
+        value = self.edges[i] + frac * (self.edges[i + 1] - self.edges[i])
+        return float(min(max(value, self.vmin), self.vmax))
+
+
+def _draw(rng, nominal, tol_frac, uniform_mask, size):
+    """按每个元件的分布抽样：normal 视容差为 3σ，uniform 在 ±tol 内均匀"""
+    z = rng.standard_normal((size, nominal.size)) / 3.0
+    if uniform_mask.any():
+        z[:, uniform_mask] = rng.uniform(-1.0, 1.0, (size, int(uniform_mask.sum())))
+    return nominal * (1.0 + z * tol_frac)
+
+
+def _run_shard(args, on_chunk=None):
+    """工作进程入口：完成一个分片并返回其统计量；on_chunk(已完成样本数) 仅在本进程内使用"""
+    r1_network, r2_network, vin, tol_frac, uniform_mask, blocks, edges, spec = args
+    topo = BatchTopology(r1_network, r2_network)
+    nominal = topo.nominal()
+    stats = VoutStats(edges)
+    done = 0
+    for n, seed_seq in blocks:
+        rng = np.random.default_rng(seed_seq)
+        r1_eq, r2_eq = topo.equivalents(_draw(rng, nominal, tol_frac, uniform_mask, n))
+        stats.add_samples(vin * r2_eq / (r1_eq + r2_eq), spec)
+        done += n
+        if on_chunk:
+            on_chunk(done)
+    return stats
+
+
+def _per_part(value, n, name):
+    if isinstance(value, (str, int, float)):
+        return [value] * n
+    value = list(value)
+    if len(value) != n:
+        raise ValueError(f"{name} 需要 {n} 个值 (每个电阻一个)，实际 {len(value)} 个")
+    return value
+
+
+def resistance_spread(network, tolerance_pct: Union[float, Sequence[float]] = 1.0,
+                      distribution: Union[str, Sequence[str]] = "normal",
+                      samples: int = 200_000, seed: Optional[int] = 0) -> Dict[str, float]:
+    """单个网络等效阻值的蒙特卡洛分布 (本进程内，适合快速对比方案)
+
+    返回 nominal (kΩ)、std_pct、以及覆盖 99.73% 样本的相对偏差区间 lo_pct / hi_pct
+    """
+    topo = BatchTopology(network, [])
+    if topo.n_resistors == 0:
+        raise ValueError("网络中没有电阻")
+    tol_frac, uniform_mask = _part_params(topo.n_resistors, tolerance_pct, distribution)
+    nominal = topo.nominal()
+    r_nom = float(topo.equivalents(nominal)[0][0])
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    r_eq = topo.equivalents(_draw(rng, nominal, tol_frac, uniform_mask, int(samples)))[0]
+    dev = (r_eq / r_nom - 1) * 100
+    lo, hi = np.percentile(dev, [PERCENTILES[0], PERCENTILES[-1]])
+    return {"nominal": r_nom, "std_pct": float(dev.std()), "lo_pct": float(lo), "hi_pct": float(hi)}
+
+
+def _part_params(n, tolerance_pct, distribution):
+    """展开每个电阻的容差 (比例) 与均匀分布掩码"""
+    tol_frac = np.array(_per_part(tolerance_pct, n, "容差"), dtype=float) / 100
+    dists = _per_part(distribution, n, "分布类型")
+    for d in dists:
+        if d not in DISTRIBUTIONS:
+            raise ValueError(f"未知分布类型: {d} (可选 {', '.join(DISTRIBUTIONS)})")
+    return tol_frac, np.array([d == "uniform" for d in dists], dtype=bool)
+
+
+def monte_carlo(r1_network, r2_network, vin: float,
+                tolerance_pct: Union[float, Sequence[float]] = 1.0,
+                distribution: Union[str, Sequence[str]] = "normal",
+                samples: int = 1_000_000, spec: Optional[Sequence[float]] = None,
+                seed: Optional[int] = 0, workers: Optional[int] = None,
+                progress=None) -> Dict[str, object]:
+    """蒙特卡洛分析 Vout 分布与良率
+
+    tolerance_pct: 统一容差或每个电阻的容差 (%)，顺序与 BatchTopology 列顺序一致
+    distribution:  'normal' / 'uniform'，或每个电阻一个
+    spec:          (vout_min, vout_max)，给出时计算良率
+    workers:       进程数，默认 CPU 核数；只切出一个分片时在本进程内计算 (不影响结果)
+    progress:      可选回调 progress(done_samples, total_samples)，每合并一个分片调用一次；
+                   在本进程内计算时每个块也调用一次。回调抛出异常即中止计算 (用于取消)
+    """
+    topo = BatchTopology(r1_network, r2_network)
+    n = topo.n_resistors
+    if n == 0:
+        raise ValueError("网络中没有电阻")
+
+    tol_frac, uniform_mask = _part_params(n, tolerance_pct, distribution)
+
+    r1_eq, r2_eq = topo.equivalents(topo.nominal())
+    nominal_vout = float(vin * r2_eq[0] / (r1_eq[0] + r2_eq[0]))
+    # 分压比对每个电阻的相对灵敏度 ≤ 1，Σtol 即最坏情况偏差；留 50% 余量覆盖正态尾部
+    span = max(1.5 * float(tol_frac.sum()) * nominal_vout, 1e-9)
+    edges = np.linspace(nominal_vout - span, nominal_vout + span, HIST_BINS + 1)
+    spec = tuple(spec) if spec is not None else None
+
+    samples = int(samples)
+    sizes = [BLOCK_SIZE] * (samples // BLOCK_SIZE)
+    if samples % BLOCK_SIZE:
+        sizes.append(samples % BLOCK_SIZE)
+    blocks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    workers = workers or os.cpu_count() or 1
+    # 分片大小随进程数变化，但随机流按块划分，不影响结果
+    per_shard = max(MIN_SHARD_SIZE // BLOCK_SIZE, math.ceil(len(blocks) / (workers * SHARDS_PER_WORKER)))
+    jobs = [(r1_network, r2_network, vin, tol_frac, uniform_mask, blocks[i:i + per_shard], edges, spec)
+            for i in range(0, len(blocks), per_shard)]
+
+    total = VoutStats(edges)
+    if len(jobs) <= 1 or workers <= 1:
+        # 合并发生在分片完成之后，此时 total.count 仍是之前各分片的样本数
+        on_chunk = (lambda done: progress(total.count + done, samples)) if progress else None
+        results = (_run_shard(job, on_chunk) for job in jobs)
+        pool, futures = None, []
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+        futures = [pool.submit(_run_shard, job) for job in jobs]
+        results = (future.result() for future in futures)
+    try:
+        for shard in results:   # 按分片顺序增量合并
+            total.merge(shard)
+            if progress:
+                progress(total.count, samples)
+    finally:
+        if pool is not None:
+            # 中途取消时撤销尚未开始的分片且不等待正在运行的分片
+            # (逐个 cancel 而不用 shutdown(cancel_futures=True)，后者需要 Python 3.9+)
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    result = {
+        "samples": total.count,
+        "nominal": nominal_vout,
+        "mean": total.mean,
+        "std": total.std,
+        "min": total.vmin,
+        "max": total.vmax,
+        "percentiles": {q: total.percentile(q) for q in PERCENTILES},
+        "hist": total.hist,
+        "edges": edges,
+    }
+    if spec is not None:
+        result["spec"] = spec
+        result["yield_pct"] = total.in_spec / total.count * 100
+    return result
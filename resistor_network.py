@@ -0,0 +1,304 @@
+# resistor_network.py
+# 编译后的串并联网络树 - 节点缓存等效阻值/电导，单点修改只沿叶到根路径增量更新
+# 依赖：无
+#
+# 网络列表格式 (与 GUI 一致，单位 kΩ):
+#   [(value, 'series'), ('parallel', [branch1, branch2, ...]), ...]
+#   每个 branch 本身也是同样格式的网络列表，可任意嵌套。
+
+from typing import List
+
+
+# 增量更新的结果相对操作数小于此比例时视为相消，改为对子节点重新求和 (避免 0 Ω 支路残留 1e-14 级阻值)
+CANCEL_REL = 1e-9
+
+
+def _conductance(r: float) -> float:
+    # 零阻值/空支路视为不存在（与旧版 "if branch" 跳过空分支一致）
+    return 1.0 / r if r > 0 else 0.0
+
+
+class Node:
+    """网络树节点基类：r 为等效阻值，g 为等效电导，index 为在父节点 children 中的位置"""
+    __slots__ = ('parent', 'index', 'r', 'g')
+
+    def __init__(self):
+        self.parent = None
+        self.index = 0
+        self.r = 0.0
+        self.g = 0.0
+
+    def _apply(self, r_new: float):
+        """更新本节点阻值并把变化量逐级传给父节点 (O(depth))"""
+        node = self
+        while node is not None:
+            r_old, g_old = node.r, node.g
+            node.r = r_new
+            node.g = _conductance(r_new)
+            parent = node.parent
+            if parent is None:
+                break
+            r_new = parent._child_changed(r_new - r_old, node.g - g_old)
+            node = parent
+
+
+class Resistor(Node):
+    """单个电阻 (叶节点)"""
+    __slots__ = ('value',)
+
+    def __init__(self, value: float):
+        Node.__init__(self)
+        self.value = value
+        self.r = value
+        self.g = _conductance(value)
+
+    def set_value(self, value: float):
+        self.value = value
+        self._apply(value)
+
+    def to_list(self):
+        return (self.value, 'series')
+
+
+class Series(Node):
+    """串联链：r = Σ r_i"""
+    __slots__ = ('children',)
+
+    def __init__(self, children=()):
+        Node.__init__(self)
+        self.children: List[Node] = []
+        for child in children:
+            self.adopt(child)
+        self.refresh()
+
+    def adopt(self, child: Node):
+        child.parent = self
+        child.index = len(self.children)
+        self.children.append(child)
+
+    def refresh(self):
+        self.r = sum(child.r for child in self.children)
+        self.g = _conductance(self.r)
+
+    def _child_changed(self, dr: float, dg: float) -> float:
+        r = self.r + dr
+        if r <= CANCEL_REL * (self.r + abs(dr)):
+            r = sum(child.r for child in self.children)
+        return max(r, 0.0)
+
+    def to_list(self):
+        return [child.to_list() for child in self.children]
+
+
+class Parallel(Node):
+    """并联组：g = Σ g_i，每个分支是一条 Series"""
+    __slots__ = ('children',)
+
+    def __init__(self, children=()):
+        Node.__init__(self)
+        self.children: List[Node] = []
+        for child in children:
+            self.adopt(child)
+        self.refresh()
+
+    def adopt(self, child: Node):
+        child.parent = self
+        child.index = len(self.children)
+        self.children.append(child)
+
+    def refresh(self):
+        self.g = sum(child.g for child in self.children)
+        self.r = 1.0 / self.g if self.g > 0 else 0.0
+
+    def _child_changed(self, dr: float, dg: float) -> float:
+        g = self.g + dg
+        if g <= CANCEL_REL * (self.g + abs(dg)):
+            g = sum(child.g for child in self.children)
+        return 1.0 / g if g > 1e-300 else 0.0
+
+    def to_list(self):
+        return ('parallel', [child.to_list() for child in self.children])
+
+
+def _is_parallel(element) -> bool:
+    return isinstance(element, tuple) and element[0] == 'parallel'
+
+
+def _compile(node, items):
+    """用显式栈编译 (避免深层嵌套触发递归上限)，最后自底向上计算缓存值"""
+    pending = [(node, items)]
+    order = []
+    while pending:
+        node, items = pending.pop()
+        order.append(node)
+        if isinstance(node, Series):
+            for element in items:
+                if _is_parallel(element):
+                    child = Parallel()
+                    pending.append((child, element[1]))
+                else:
+                    child = Resistor(element[0] if isinstance(element, tuple) else element)
+                node.adopt(child)
+        else:
+            for branch in items:
+                child = Series()
+                pending.append((child, branch))
+                node.adopt(child)
+    for node in reversed(order):
+        node.refresh()
+
+
+def compile_element(element) -> Node:
+    """把网络列表中的一个元素编译为节点"""
+    if _is_parallel(element):
+        node = Parallel()
+        _compile(node, element[1])
+        return node
+    return Resistor(element[0] if isinstance(element, tuple) else element)
+
+
+def network_from_json(data) -> List:
+    """把从 JSON 读回的网络还原为网络列表格式 (JSON 没有元组，读回后元素都变成了列表)
+
+    [v, 'series'] → (v, 'series')，['parallel', [支路...]] → ('parallel', [支路...])，纯数字保持不变。
+    否则 _is_parallel 等按元组判断的代码会把并联组误当成单个电阻。
+    """
+    if not isinstance(data, (list, tuple)):
+        raise ValueError("网络必须是列表")
+    root: List = []
+    pending = [(data, root)]
+    while pending:
+        items, out = pending.pop()
+        for element in items:
+            if isinstance(element, (list, tuple)) and len(element) == 2 and element[0] == 'parallel':
+                if not isinstance(element[1], (list, tuple)):
+                    raise ValueError(f"无效的并联组: {element!r}")
+                branches: List = []
+                out.append(('parallel', branches))
+                for branch in element[1]:
+                    if not isinstance(branch, (list, tuple)):
+                        raise ValueError(f"无效的并联支路: {branch!r}")
+                    converted: List = []
+                    branches.append(converted)
+                    pending.append((branch, converted))
+                continue
+            value, kind = (element[0], element[1]) if isinstance(element, (list, tuple)) and len(element) == 2 \
+                else (element, None)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not (kind is None or isinstance(kind, str)):
+                raise ValueError(f"无效的网络元素: {element!r}")
+            out.append(value if kind is None else (value, kind))
+    return root
+
+
+def compile_branch(branch) -> Series:
+    """把一条支路 (网络列表) 编译为 Series 节点"""
+    node = Series()
+    _compile(node, branch)
+    return node
+
+
+def leaves(node: Node):
+    """按从左到右的顺序遍历所有电阻叶节点"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Resistor):
+            yield node
+        else:
+            stack.extend(reversed(node.children))
+
+
+class CompiledNetwork:
+    """与网络列表同步的编译树
+
+    所有修改都通过本类进行，它会同时更新 source 列表和树，
+    因此 source 仍可直接用于绘图、列表显示与保存。
+    """
+    __slots__ = ('source', 'root')
+
+    def __init__(self, network: List):
+        self.source = network
+        self.root = compile_branch(network)
+
+    @property
+    def equivalent(self) -> float:
+        """等效阻值 (kΩ)"""
+        return self.root.r
+
+    @property
+    def conductance(self) -> float:
+        return self.root.g
+
+    def __len__(self):
+        return len(self.root.children)
+
+    def node(self, idx: int) -> Node:
+        return self.root.children[idx]
+
+    def _renumber(self, start: int):
+        children = self.root.children
+        for i in range(start, len(children)):
+            children[i].index = i
+
+    def _attach(self, idx: int, child: Node):
+        child.parent = self.root
+        self.root.children.insert(idx, child)
+        self._renumber(idx)
+        self.root._apply(self.root._child_changed(child.r, child.g))
+
+    def append(self, element):
+        """在末尾追加元素"""
+        self.source.append(element)
+        self._attach(len(self.root.children), compile_element(element))
+
+    def pop(self, idx: int):
+        """删除第 idx 个元素"""
+        element = self.source.pop(idx)
+        child = self.root.children.pop(idx)
+        child.parent = None
+        self._renumber(idx)
+        self.root._apply(self.root._child_changed(-child.r, -child.g))
+        return element
+
+    def replace(self, idx: int, element):
+        """用新元素替换第 idx 个元素"""
+        old = self.root.children[idx]
+        if isinstance(old, Resistor) and not _is_parallel(element):
+            self.set_value(idx, element[0] if isinstance(element, tuple) else element)
+            self.source[idx] = element
+            return
+        self.pop(idx)
+        self.source.insert(idx, element)
+        self._attach(idx, compile_element(element))
+
+    def set_value(self, idx: int, value: float):
+        """修改第 idx 个串联电阻的阻值，只重算到根的路径"""
+        leaf = self.root.children[idx]
+        if not isinstance(leaf, Resistor):
+            raise TypeError("只能直接修改串联电阻的阻值")
+        leaf.set_value(value)
+        element = self.source[idx]
+        self.source[idx] = (value, element[1]) if isinstance(element, tuple) else value
+
+    def set_leaf(self, leaf: Resistor, value: float):
+        """修改任意深度的叶节点阻值，并同步回 source 列表"""
+        leaf.set_value(value)
+
+        # 记录叶到根的索引路径 (每个节点保存自己在父节点中的位置，O(depth))，再沿 source 的嵌套列表原位修改
+        path = []
+        node = leaf
+        while node.parent is not None:
+            path.append(node.index)
+            node = node.parent
+        path.reverse()
+
+        container = self.source
+        node = self.root
+        for i in path[:-1]:
+            container = container[i] if isinstance(node, Series) else container[1][i]
+            node = node.children[i]
+        element = container[path[-1]]
+        container[path[-1]] = (value, element[1]) if isinstance(element, tuple) else value
+
+    def to_list(self) -> List:
+        return self.root.to_list()
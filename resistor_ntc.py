@@ -0,0 +1,561 @@
+# resistor_ntc.py
+# NTC 温度-电压对照表的向量化生成与流式导出 (CSV / 二进制 / .npy)
+# 依赖：numpy
+#
+# 表按温度分块计算并直接写入文件，不经过 Tk 文本框；
+# 0.01°C 步长、-55~150°C (约 2 万行) 也只占用一个块的内存。
+
+import csv
+import math
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from resistor_engine import T0_K, ntc_model_coeffs, ntc_effective_beta, ntc_model_resistance
+from resistor_series import series_index
+
+CHUNK_ROWS = 65536
+
+# 二进制导出的记录格式 (小端)
+TABLE_DTYPE = np.dtype([('temp_c', '<f8'), ('r_ntc_ohm', '<f8'), ('vout_v', '<f8'), ('adc', '<u4')])
+
+
+def model_resistance(temp_c, model: Optional[Dict], r25: float = None, b: float = None) -> np.ndarray:
+    """温度数组 → NTC 阻值；model 为 None 时使用 R25/B (与 engine.ntc_resistance 一致)"""
+    temp_k = np.asarray(temp_c, dtype=float) + 273.15
+    if model is None:
+        return r25 * np.exp(b * (1 / temp_k - 1 / T0_K))
+    coeffs, ref = ntc_model_coeffs(model)
+    target = 1 / temp_k
+    u = (target - coeffs[0]) / coeffs[1]
+    if any(coeffs[2:]):
+        poly = np.polynomial.Polynomial(coeffs)
+        deriv = poly.deriv()
+        for _ in range(50):
+            step = (poly(u) - target) / deriv(u)
+            u = u - step
+            if np.all(np.abs(step) < 1e-13):
+                break
+    return ref * np.exp(u)
+
+
+def model_temperature(r_ohm, model: Optional[Dict], r25: float = None, b: float = None) -> np.ndarray:
+    """NTC 阻值数组 → 温度 (°C)；非正阻值得到 nan"""
+    r_ohm = np.asarray(r_ohm, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if model is None:
+            return 1 / (1 / T0_K + np.log(r_ohm / r25) / b) - 273.15
+        coeffs, ref = ntc_model_coeffs(model)
+        return 1 / np.polynomial.polynomial.polyval(np.log(r_ohm / ref), coeffs) - 273.15
+
+
+def _decimals(x: float) -> int:
+    text = f"{x:.6f}".rstrip('0')
+    return len(text) - text.index('.') - 1
+
+
+class NtcTable:
+    """NTC 位于下方的分压对照表：temp → (r_ntc, vout, adc)
+
+    行按需计算，len() 与 rows(start, stop) 供虚拟化显示和分块导出使用。
+    """
+
+    def __init__(self, vin: float, r1_ohm: float, r25: float, b: float,
+                 t_start: float = -40.0, t_stop: float = 125.0, step: float = 5.0,
+                 adc_bits: int = 12, model: Optional[Dict] = None):
+        if step <= 0:
+            raise ValueError("温度步长必须 > 0")
+        if t_stop < t_start:
+            raise ValueError("终止温度必须 ≥ 起始温度")
+        if t_start <= -273.15:
+            raise ValueError("起始温度必须高于绝对零度")
+        self.vin = vin
+        self.r1_ohm = r1_ohm
+        self.r25 = r25
+        self.b = b
+        self.model = model
+        self.t_start = t_start
+        self.step = step
+        self.adc_bits = adc_bits
+        # 允许终点有浮点误差：(125 - -40) / 0.01 = 16499.999...
+        self.n_rows = int(math.floor((t_stop - t_start) / step + 1e-9)) + 1
+        # 起点与步长的小数位数，用于消除 -40 + i*0.01 的浮点噪声并控制输出格式
+        self.decimals = max(_decimals(t_start), _decimals(step))
+
+    def __len__(self):
+        return self.n_rows
+
+    def temps(self, start: int = 0, stop: int = None) -> np.ndarray:
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        return np.round(self.t_start + self.step * np.arange(start, stop), self.decimals)
+
+    def rows(self, start: int = 0, stop: int = None) -> Dict[str, np.ndarray]:
+        """第 [start, stop) 行的各列数组"""
+        temp = self.temps(start, stop)
+        r_ntc = model_resistance(temp, self.model, self.r25, self.b)
+        vout = self.vin * r_ntc / (self.r1_ohm + r_ntc)
+        # 与 engine.ntc_table 一致：按 Vin 比例截断取码
+        adc = (vout / self.vin * (2**self.adc_bits - 1)).astype(np.uint32)
+        return {"temp_c": temp, "r_ntc_ohm": r_ntc, "vout_v": vout, "adc": adc}
+
+    def chunks(self, chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+        for start in range(0, self.n_rows, chunk_rows):
+            yield self.rows(start, start + chunk_rows)
+
+    def records(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """第 [start, stop) 行的结构化数组 (TABLE_DTYPE)"""
+        cols = self.rows(start, stop)
+        out = np.empty(len(cols["temp_c"]), dtype=TABLE_DTYPE)
+        for name in TABLE_DTYPE.names:
+            out[name] = cols[name]
+        return out
+
+
+def write_csv(table: NtcTable, path: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """分块写出 CSV，返回行数"""
+    header = f"temp_c,r_ntc_ohm,vout_v,adc_{table.adc_bits}bit"
+    temp_fmt = f"%.{table.decimals}f"
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(header + "\n")
+        for cols in table.chunks(chunk_rows):
+            np.savetxt(f, np.column_stack((cols["temp_c"], cols["r_ntc_ohm"], cols["vout_v"], cols["adc"])),
+                       fmt=(temp_fmt, "%.3f", "%.6f", "%d"), delimiter=",")
+    return len(table)
+
+
+def write_binary(table: NtcTable, path: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """分块写出二进制：.npy 带格式头可直接 np.load，其他扩展名为裸 TABLE_DTYPE 记录"""
+    if path.lower().endswith('.npy'):
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=TABLE_DTYPE, shape=(len(table),))
+        for start in range(0, len(table), chunk_rows):
+            block = table.records(start, start + chunk_rows)
+            out[start:start + len(block)] = block
+        out.flush()
+        del out
+    else:
+        with open(path, 'wb') as f:
+            for start in range(0, len(table), chunk_rows):
+                table.records(start, start + chunk_rows).tofile(f)
+    return len(table)
+
+
+# ---------------------------------------------------------------------------
+# 固件用 ADC 码 → 温度查找表
+# ---------------------------------------------------------------------------
+#
+# 电路同上 (R1 上拉，NTC 接地)。码值按 x = code / (2^bits - 1) 换算为 Vout/Vin
+# (与 NtcTable 的取码方式互逆)；绝对参考时 x = code / (2^bits - 1) · Vref / Vin。
+# 温度以定点整数存储 (默认 0.01°C)，固件端只做一次查表 + 整数线性插值。
+
+LUT_BITS = (10, 12, 14, 16)
+LUT_MODES = ("full", "uniform", "pwl")
+
+
+def adc_code_temperatures(bits: int, r1_ohm: float, r25: float, b: float,
+                          vref: float = None, vin: float = None,
+                          t_min: float = -55.0, t_max: float = 150.0,
+                          model: Optional[Dict] = None) -> np.ndarray:
+    """每个 ADC 码对应的精确温度 (°C)，超出 [t_min, t_max] 或无解的码被钳位"""
+    if bits not in LUT_BITS:
+        raise ValueError(f"ADC 位数必须是 {', '.join(map(str, LUT_BITS))} 之一")
+    full_scale = 2**bits - 1
+    x = np.arange(full_scale + 1, dtype=float) / full_scale
+    if vref is not None:
+        if not vin:
+            raise ValueError("绝对参考模式需要同时给出 vref 与 vin")
+        x *= vref / vin
+    with np.errstate(divide='ignore', invalid='ignore'):
+        temp = model_temperature(r1_ohm * x / (1 - x), model, r25, b)
+    # x→0 (NTC 短路) 为高温端，x≥1 为低温端
+    temp = np.where(x <= 0, t_max, temp)
+    temp = np.where((x >= 1) | ~np.isfinite(temp) | (temp < -273.15), t_min, temp)
+    return np.clip(temp, t_min, t_max)
+
+
+def _interp_int(codes: np.ndarray, knot_codes: np.ndarray, knot_values: np.ndarray) -> np.ndarray:
+    """与生成的 C 代码逐位一致的整数插值：v0 + (v1 - v0) * (c - c0) / (c1 - c0)，除法向零截断"""
+    seg = np.clip(np.searchsorted(knot_codes, codes, side='right') - 1, 0, len(knot_codes) - 2)
+    c0, c1 = knot_codes[seg].astype(np.int64), knot_codes[seg + 1].astype(np.int64)
+    v0, v1 = knot_values[seg].astype(np.int64), knot_values[seg + 1].astype(np.int64)
+    num = (v1 - v0) * (codes - c0)
+    return v0 + np.sign(num) * (np.abs(num) // (c1 - c0))
+
+
+class AdcLut:
+    """ADC 码 → 温度查找表
+
+    mode = 'full':    每个码一项，values[code]
+           'uniform': 每 2^shift 个码一个节点，idx = code >> shift 后线性插值
+           'pwl':     非均匀节点 codes[]，二分定位后线性插值
+    """
+
+    def __init__(self, bits, mode, knot_codes, values, scale, exact, params):
+        self.bits = bits
+        self.mode = mode
+        self.codes = knot_codes
+        self.values = values
+        self.scale = scale
+        self.shift = int(np.log2(knot_codes[1] - knot_codes[0])) if mode == 'uniform' else 0
+        self.params = params
+        self.max_error_c = float(np.max(np.abs(self.lookup(np.arange(2**bits)) / scale - exact)))
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def value_ctype(self) -> str:
+        return "int16_t" if np.abs(self.values).max() < 2**15 else "int32_t"
+
+    def lookup(self, codes) -> np.ndarray:
+        """按固件算法查表，返回定点温度"""
+        codes = np.asarray(codes, dtype=np.int64)
+        if self.mode == 'full':
+            return self.values[codes].astype(np.int64)
+        return _interp_int(codes, self.codes, self.values)
+
+
+def build_adc_lut(bits: int, r1_ohm: float, r25: float, b: float,
+                  mode: str = "pwl", max_error_c: float = 0.1, scale: int = 100,
+                  vref: float = None, vin: float = None,
+                  t_min: float = -55.0, t_max: float = 150.0,
+                  model: Optional[Dict] = None) -> AdcLut:
+    """生成 ADC 码 → 温度查找表
+
+    mode:        'full' 全表 / 'uniform' 2 的幂等间距分段 / 'pwl' 非均匀分段
+    max_error_c: uniform / pwl 的最大插值误差 (°C，含定点量化与整数除法截断)
+    scale:       定点倍数，100 表示 0.01°C
+    vref / vin:  给出时为绝对参考 (ADC 参考电压与分压供电独立)，否则为比例测量
+    model:       拟合的 NTC 模型 (见 fit_ntc_models)，给出时代替 R25/B
+    """
+    if mode not in LUT_MODES:
+        raise ValueError(f"未知查找表模式: {mode} (可选 {', '.join(LUT_MODES)})")
+    exact = adc_code_temperatures(bits, r1_ohm, r25, b, vref, vin, t_min, t_max, model)
+    fixed = np.round(exact * scale).astype(np.int64)
+    codes = np.arange(2**bits, dtype=np.int64)
+    if model is not None:
+        r25, b = model["r25"], model["b"]
+    params = {"bits": bits, "r1_ohm": r1_ohm, "r25": r25, "b": b, "vref": vref, "vin": vin,
+              "t_min": t_min, "t_max": t_max, "ratiometric": vref is None,
+              "form": model["form"] if model else "beta"}
+
+    if mode == 'full':
+        return AdcLut(bits, mode, codes, fixed, scale, exact, params)
+
+    bound = max_error_c * scale
+    if bound < 1:
+        raise ValueError(f"误差上限 {max_error_c}°C 小于定点分辨率 {1 / scale}°C")
+
+    if mode == 'uniform':
+        # 节点间距取满足误差上限的最大 2 的幂；末节点放在 2^bits 处 (取钳位值)
+        padded = np.append(fixed, fixed[-1])
+        for shift in range(bits - 1, -1, -1):
+            knots = np.arange(0, 2**bits + 1, 2**shift)
+            if np.abs(_interp_int(codes, knots, padded[knots]) - exact * scale).max() <= bound:
+                return AdcLut(bits, mode, knots, padded[knots], scale, exact, params)
+
+    # pwl: 贪心的可行斜率锥，每段从起点延伸到最远的可行终点；
+    # 构造时留出 1 个定点单位给整数截断，验证不通过时收紧后重试
+    target = exact * scale
+    slack = 1.0
+    while True:
+        eps = bound - slack
+        knots = [0]
+        start = 0
+        n = len(codes)
+        while start < n - 1:
+            lo, hi = -np.inf, np.inf
+            end = start + 1
+            y0 = fixed[start]
+            for k in range(start + 1, n):
+                dk = k - start
+                slope = (fixed[k] - y0) / dk
+                if slope < lo or slope > hi:
+                    break
+                end = k
+                lo = max(lo, (target[k] - eps - y0) / dk)
+                hi = min(hi, (target[k] + eps - y0) / dk)
+                if lo > hi:
+                    break
+            knots.append(end)
+            start = end
+        knots = np.array(knots)
+        err = np.abs(_interp_int(codes, knots, fixed[knots]) - target).max()
+        if err <= bound or eps <= 0.5:
+            return AdcLut(bits, mode, knots, fixed[knots], scale, exact, params)
+        slack += 0.5
+
+
+def _c_rows(values, per_line: int = 12) -> str:
+    items = [str(int(v)) for v in values]
+    return ",\n".join("    " + ", ".join(items[i:i + per_line]) for i in range(0, len(items), per_line))
+
+
+def write_lut_c(lut: AdcLut, path: str, name: str = "ntc_lut") -> None:
+    """写出 C 头文件：常量数组 + 查表函数 (整数运算，与 AdcLut.lookup 结果一致)"""
+    p = lut.params
+    upper = name.upper()
+    ctype = lut.value_ctype
+    # int16 值的差 × 码差不会溢出 int32，更宽的值用 int64 相乘
+    acc = "int32_t" if ctype == "int16_t" else "int64_t"
+    ref = "比例测量 (ADC 参考 = 分压供电)" if p["ratiometric"] else f"绝对参考 Vref={p['vref']}V, Vin={p['vin']}V"
+    lines = [
+        f"/* {name}: NTC ADC 码 → 温度查找表 (由 resistor_ntc.py 生成)",
+        f" * R1={p['r1_ohm']}Ω 上拉, NTC R25={p['r25']:g}Ω B={p['b']:g}K"
+        f"{'' if p['form'] == 'beta' else ' (' + p['form'] + ' 拟合模型)'}, {lut.bits}-bit ADC, {ref}",
+        f" * 模式 {lut.mode}, {len(lut)} 项, 温度单位 1/{lut.scale}°C, "
+        f"范围 {p['t_min']}~{p['t_max']}°C, 最大误差 {lut.max_error_c:.4f}°C",
+        " */",
+        f"#ifndef {upper}_H",
+        f"#define {upper}_H",
+        "",
+        "#include <stdint.h>",
+        "",
+        f"#define {upper}_BITS  {lut.bits}",
+        f"#define {upper}_SCALE {lut.scale}",
+        f"#define {upper}_SIZE  {len(lut)}",
+    ]
+    if lut.mode == 'uniform':
+        lines.append(f"#define {upper}_SHIFT {lut.shift}")
+    lines += ["", f"static const {ctype} {name}[{upper}_SIZE] = {{", _c_rows(lut.values), "};", ""]
+    if lut.mode == 'pwl':
+        lines += [f"static const uint16_t {name}_codes[{upper}_SIZE] = {{", _c_rows(lut.codes), "};", ""]
+
+    lines.append(f"static inline int32_t {name}_lookup(uint16_t code)")
+    lines.append("{")
+    if lut.mode == 'full':
+        lines.append(f"    return {name}[code];")
+    elif lut.mode == 'uniform':
+        lines += [
+            f"    uint16_t i = code >> {upper}_SHIFT;",
+            f"    {acc} v0 = {name}[i], v1 = {name}[i + 1];",
+            f"    {acc} dc = code - ((int32_t)i << {upper}_SHIFT);",
+            f"    return (int32_t)(v0 + (v1 - v0) * dc / (1 << {upper}_SHIFT));",
+        ]
+    else:
+        lines += [
+            f"    uint16_t lo = 0, hi = {upper}_SIZE - 1;",
+            "    while (hi - lo > 1) {",
+            "        uint16_t mid = (lo + hi) / 2;",
+            f"        if ({name}_codes[mid] <= code) lo = mid; else hi = mid;",
+            "    }",
+            f"    {acc} c0 = {name}_codes[lo], c1 = {name}_codes[hi];",
+            f"    {acc} v0 = {name}[lo], v1 = {name}[hi];",
+            f"    return (int32_t)(v0 + (v1 - v0) * (({acc})code - c0) / (c1 - c0));",
+        ]
+    lines += ["}", "", f"#endif /* {upper}_H */", ""]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+def write_lut_binary(lut: AdcLut, path: str) -> None:
+    """写出查找表：.npy 为 (code, value) 结构化数组；其他扩展名为裸小端数据，
+    pwl 模式先写 uint16 节点码再写温度值，full / uniform 只写温度值"""
+    vtype = '<i2' if lut.value_ctype == "int16_t" else '<i4'
+    if path.lower().endswith('.npy'):
+        out = np.empty(len(lut), dtype=[('code', '<u4'), ('value', vtype)])
+        out['code'] = lut.codes
+        out['value'] = lut.values
+        np.save(path, out)
+        return
+    with open(path, 'wb') as f:
+        if lut.mode == 'pwl':
+            lut.codes.astype('<u2').tofile(f)
+        lut.values.astype(vtype).tofile(f)
+
+
+# ---------------------------------------------------------------------------
+# R–T 数据导入与批量拟合
+# ---------------------------------------------------------------------------
+
+FIT_FORMS = ("beta", "sh", "ext")
+
+
+def _ohm_scale(header: str) -> float:
+    h = header.lower()
+    if 'mω' in h or 'mohm' in h:
+        return 1e6
+    if 'kω' in h or 'kohm' in h or '(k)' in h:
+        return 1e3
+    return 1.0
+
+
+def load_rt_csv(path: str) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """读取 R–T 表，返回 {传感器名: (温度°C 数组, 阻值Ω 数组)}
+
+    支持两种布局 (首行为表头，温度单位 °C，阻值默认 Ω，表头含 kΩ/kohm 时按 kΩ 换算)：
+      宽表: temp, R_sensor1, R_sensor2, ...     (数据手册表格，每列一个传感器)
+      长表: sensor, temp, r                      (温箱日志，表头第一列名含 sensor/id/name)
+    空单元格与无法解析的行会被跳过。
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        long_format = header[0].lower() in ('sensor', 'id', 'name', 'sensor_id', '传感器')
+        points: Dict[str, Tuple[List[float], List[float]]] = {}
+
+        if long_format:
+            scale = _ohm_scale(header[2])
+            for row in reader:
+                try:
+                    t, r = float(row[1]), float(row[2]) * scale
+                except (ValueError, IndexError):
+                    continue
+                ts, rs = points.setdefault(row[0].strip(), ([], []))
+                ts.append(t)
+                rs.append(r)
+        else:
+            scales = [_ohm_scale(h) for h in header[1:]]
+            # 列名去掉单位后缀，如 "NTC-A (kΩ)" → "NTC-A"
+            names = [re.sub(r'\s*[\(（][^\)）]*(ω|ohm)[^\)）]*[\)）]\s*$', '', h, flags=re.I) or h
+                     for h in header[1:]]
+            for name in names:
+                points[name] = ([], [])
+            for row in reader:
+                try:
+                    t = float(row[0])
+                except (ValueError, IndexError):
+                    continue
+                for name, scale, cell in zip(names, scales, row[1:]):
+                    try:
+                        r = float(cell) * scale
+                    except ValueError:
+                        continue
+                    points[name][0].append(t)
+                    points[name][1].append(r)
+
+    return {name: (np.array(ts), np.array(rs)) for name, (ts, rs) in points.items() if ts}
+
+
+def fit_ntc_models(data: Dict[str, Tuple[np.ndarray, np.ndarray]], form: str = "sh") -> Dict[str, Dict]:
+    """对多个传感器同时做线性最小二乘拟合 1/T = Σ c_i · u^i
+
+    form: 'beta' (u = ln(R/R25)，2 个系数) / 'sh' (Steinhart–Hart，u = ln R，[A, B, 0, C])
+          / 'ext' (扩展 B 值，u = ln(R/R25)，4 个系数)
+    所有传感器补零对齐成 (传感器, 点数, 系数) 的三维数组，一次批量 QR 分解求解；
+    补零的行对最小二乘没有影响。
+    返回 {名称: 模型字典}，模型可直接用于 engine.ntc_model_* 与本模块各函数，
+    另含 rms_c / max_err_c (拟合残差，°C) 与 points。
+    """
+    if form not in FIT_FORMS:
+        raise ValueError(f"未知拟合形式: {form} (可选 {', '.join(FIT_FORMS)})")
+    powers = {"beta": [0, 1], "sh": [0, 1, 3], "ext": [0, 1, 2, 3]}[form]
+
+    names = [name for name, (t, r) in data.items() if len(t) >= len(powers)]
+    if not names:
+        raise ValueError(f"每个传感器至少需要 {len(powers)} 个数据点")
+    n_max = max(len(data[name][0]) for name in names)
+
+    # 参考阻值：beta/ext 用各传感器 25°C 附近的阻值 (对数插值)，sh 用 1Ω
+    inv_t = np.zeros((len(names), n_max))
+    u = np.zeros((len(names), n_max))
+    mask = np.zeros((len(names), n_max), dtype=bool)
+    refs = np.ones(len(names))
+    for i, name in enumerate(names):
+        t, r = data[name]
+        order = np.argsort(t)
+        t, r = t[order], r[order]
+        if form != "sh":
+            refs[i] = float(np.exp(np.interp(25.0, t, np.log(r))))
+        n = len(t)
+        inv_t[i, :n] = 1 / (t + 273.15)
+        u[i, :n] = np.log(r / refs[i])
+        mask[i, :n] = True
+
+    design = np.stack([u**p for p in powers], axis=-1) * mask[..., None]
+    rhs = inv_t * mask
+    q, r_mat = np.linalg.qr(design)
+    coef = np.linalg.solve(r_mat, np.einsum('snk,sn->sk', q, rhs)[..., None])[..., 0]
+
+    fitted = 1 / np.where(mask, np.einsum('snk,sk->sn', design, coef), 1.0) - 273.15
+    measured = 1 / np.where(mask, inv_t, 1.0) - 273.15
+    err = np.where(mask, np.abs(fitted - measured), 0.0)
+
+    models = {}
+    for i, name in enumerate(names):
+        full = [0.0, 0.0, 0.0, 0.0]
+        for p, c in zip(powers, coef[i]):
+            full[p] = float(c)
+        model = {"form": form, "ref": float(refs[i]), "coeffs": full}
+        model["r25"] = float(ntc_model_resistance(25.0, model))
+        model["b"] = float(ntc_effective_beta(model))
+        n = int(mask[i].sum())
+        model["points"] = n
+        model["rms_c"] = float(np.sqrt((err[i]**2).sum() / n))
+        model["max_err_c"] = float(err[i].max())
+        models[name] = model
+    return models
+
+
+# ---------------------------------------------------------------------------
+# 上拉电阻优化
+# ---------------------------------------------------------------------------
+
+PULLUP_OBJECTIVES = ("resolution", "linearity")
+
+
+def _resistance_slope(temp_c: np.ndarray, r_ntc: np.ndarray, model: Optional[Dict], b: float) -> np.ndarray:
+    """解析 dR_ntc/dT (Ω/°C)：1/T = P(u), u = ln(R/ref) ⇒ du/dT = -1 / (T² · P'(u))"""
+    temp_k = temp_c + 273.15
+    if model is None:
+        dp = np.full_like(temp_k, 1 / b)
+    else:
+        coeffs, ref = ntc_model_coeffs(model)
+        dp = np.polynomial.Polynomial(coeffs).deriv()(np.log(r_ntc / ref))
+    return -r_ntc / (temp_k**2 * dp)
+
+
+def optimize_pullup(t_min: float, t_max: float, series: str = "E96", step: float = 0.1,
+                    vin: float = 3.3, adc_bits: int = 12, objective: str = "resolution", k: int = 5,
+                    r25: float = 10000.0, b: float = 3950.0, model: Optional[Dict] = None,
+                    r_min: float = 100.0, r_max: float = 1e6) -> List[Dict[str, float]]:
+    """在 [r_min, r_max] 内扫描全部标准上拉电阻，按目标排序返回前 k 个
+
+    电路为 R1 上拉、NTC 接地、比例测量 (ADC 码 = Vout/Vin · (2^bits - 1))。
+    所有候选 × 所有温度在一个 (候选, 温度) 数组上一次算完：
+      resolution: 窗口内最差的 ADC 码/°C 最大 (灵敏度最低点最好)
+      linearity:  Vout–T 曲线相对端点连线的最大偏差 (折算为 °C) 最小
+    每项包含 r1_ohm, min_counts_per_c, worst_temp_c, mean_counts_per_c, nonlinearity_c,
+    vout_min / vout_max (V), ntc_power_max_mw (NTC 最大自热功耗)。
+    """
+    if objective not in PULLUP_OBJECTIVES:
+        raise ValueError(f"未知优化目标: {objective} (可选 {', '.join(PULLUP_OBJECTIVES)})")
+    if t_max <= t_min:
+        raise ValueError("温度上限必须大于下限")
+
+    r1 = np.array(series_index(series).between(r_min, r_max))
+    if not len(r1):
+        raise ValueError("范围内没有标准电阻")
+    n_t = int(math.floor((t_max - t_min) / step + 1e-9)) + 1
+    temp = t_min + step * np.arange(n_t)
+
+    r_ntc = model_resistance(temp, model, r25, b)
+    dr_dt = _resistance_slope(temp, r_ntc, model, b)
+
+    r1_col = r1[:, None]
+    total = r1_col + r_ntc
+    x = r_ntc / total                                       # Vout/Vin, (候选, 温度)
+    counts_per_c = np.abs(r1_col / total**2 * dr_dt) * (2**adc_bits - 1)
+
+    worst_idx = counts_per_c.argmin(axis=1)
+    min_counts = counts_per_c[np.arange(len(r1)), worst_idx]
+
+    # 端点连线为理想直线，偏差除以平均斜率得到 °C
+    line = x[:, :1] + (x[:, -1:] - x[:, :1]) * (temp - temp[0]) / (temp[-1] - temp[0])
+    slope = np.abs(x[:, -1] - x[:, 0]) / (temp[-1] - temp[0])
+    nonlinearity = np.abs(x - line).max(axis=1) / slope
+
+    power = (vin**2 * r_ntc / total**2).max(axis=1) * 1000
+
+    order = np.argsort(-min_counts if objective == "resolution" else nonlinearity, kind='stable')[:k]
+    return [{
+        "r1_ohm": float(r1[i]),
+        "min_counts_per_c": float(min_counts[i]),
+        "worst_temp_c": float(temp[worst_idx[i]]),
+        "mean_counts_per_c": float(counts_per_c[i].mean()),
+        "nonlinearity_c": float(nonlinearity[i]),
+        "vout_min": float(vin * x[i].min()),
+        "vout_max": float(vin * x[i].max()),
+        "ntc_power_max_mw": float(power[i]),
+    } for i in order]
+
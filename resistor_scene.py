@@ -0,0 +1,447 @@
+# resistor_scene.py
+# 电路拓扑图的保留式场景 - 布局生成场景图，渲染器只把变化的图元同步到画布
+# 依赖：无 (渲染器接受任何提供 create_* / coords / itemconfigure / delete 的 Tk 风格画布)
+#
+# 每个图元有稳定的键 (如 "R1.3.body")，同时作为画布 tag。重绘时按键对比：
+#   坐标变化 → coords()；属性变化 → itemconfigure()；新出现 → create_*()；消失 → delete()。
+# 布局在世界坐标中进行，View 负责平移/缩放；视口外的图元以及缩放后过小的文字不绘制 (剔除)。
+# 分压臂先测量后放置：并联组的每条支路整棵子树展开并上下堆叠，串联行超过画布宽度时换行，
+# 因此大网络变高而不是无限变宽，自动适配不必缩到文字不可读。
+
+from typing import Dict, List, Optional, Tuple
+
+RESISTOR_W = 45
+RESISTOR_H = 16
+LEAD = 10              # 电阻两端引线 / 并联母线到组边缘的距离
+STACK_GAP = 14         # 上下相邻的支路、换行之间的空隙
+LABEL_UP = {False: 41, True: 26}   # 电阻上方标注占用的高度 (顶层两行 / 支路内一行)
+GROUP_LABEL_H = 20     # 并联组标注占用的高度 (放在最外侧支路之外)
+GROUP_FONT = ("Arial", 8, "bold")
+MIN_FONT_PX = 5        # 缩放后字号小于此值的文字不绘制
+CULL_MARGIN = 20       # 视口外留出的余量 (像素)
+ZOOM_LIMITS = (0.05, 8.0)
+FIT_MIN_SCALE = 0.75   # 自动适配的最小缩放 (7 号字仍可读)；仍放不下时从左上角显示，拖动查看其余部分
+
+
+class Item:
+    """场景中的一个图元；fixed=True 时坐标为屏幕坐标 (标题等不随平移缩放)
+
+    bbox 为世界坐标范围；文字字号随缩放变化，其世界尺寸不变，因此可以预先计算。
+    """
+    __slots__ = ('kind', 'coords', 'opts', 'fixed', 'bbox')
+
+    def __init__(self, kind: str, coords, opts: Dict, fixed: bool = False):
+        self.kind = kind
+        self.coords = tuple(coords)
+        self.opts = opts
+        self.fixed = fixed
+        self.bbox = _item_bbox(kind, self.coords, opts)
+
+
+class Scene:
+    """按绘制顺序排列的图元字典 (键 → Item)"""
+
+    def __init__(self):
+        self.items: Dict[str, Item] = {}
+
+    def add(self, key: str, kind: str, *coords, fixed: bool = False, **opts):
+        self.items[key] = Item(kind, coords, opts, fixed)
+
+    def __len__(self):
+        return len(self.items)
+
+    def bbox(self) -> Optional[Tuple[float, float, float, float]]:
+        """非固定图元的世界坐标范围 (文字按估计尺寸计入)"""
+        boxes = [item.bbox for item in self.items.values() if not item.fixed]
+        if not boxes:
+            return None
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+def _font_size(opts) -> float:
+    font = opts.get('font')
+    return float(font[1]) if font else 10.0
+
+
+def _item_bbox(kind: str, c, opts: Dict) -> Tuple[float, float, float, float]:
+    if kind == 'text':
+        lines = str(opts.get('text', '')).split('\n')
+        size = _font_size(opts)
+        half_w = max(len(line) for line in lines) * size * 0.5
+        half_h = len(lines) * size * 0.8
+        return c[0] - half_w, c[1] - half_h, c[0] + half_w, c[1] + half_h
+    xs, ys = c[0::2], c[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+# ---------------------------------------------------------------------------
+# 视图变换
+# ---------------------------------------------------------------------------
+
+class View:
+    """世界坐标 → 屏幕坐标：screen = world·scale + offset
+
+    user=False 时每次渲染自动缩小以完整显示网络；用户平移/缩放后保持用户视图，reset() 恢复自动。
+    """
+
+    def __init__(self):
+        self.scale = 1.0
+        self.dx = 0.0
+        self.dy = 0.0
+        self.user = False
+
+    def to_screen(self, coords) -> Tuple[float, ...]:
+        s, dx, dy = self.scale, self.dx, self.dy
+        return tuple(v * s + (dx if i % 2 == 0 else dy) for i, v in enumerate(coords))
+
+    def fit(self, bbox, width: float, height: float, margin: float = 10):
+        """只缩小不放大：网络放得下时保持 1:1，放不下时整体缩小并居中
+
+        缩放不低于 FIT_MIN_SCALE；此时仍放不下的方向从起点 (左/上) 开始显示。
+        """
+        x0, y0, x1, y1 = bbox
+        w, h = max(x1 - x0, 1.0), max(y1 - y0, 1.0)
+        self.scale = min(1.0, (width - 2 * margin) / w, (height - 2 * margin) / h)
+        self.scale = max(self.scale, FIT_MIN_SCALE)
+        if self.scale < 1.0 or w > width - 2 * margin or h > height - 2 * margin:
+            s = self.scale
+            self.dx = (width - w * s) / 2 - x0 * s if w * s <= width - 2 * margin else margin - x0 * s
+            self.dy = (height - h * s) / 2 - y0 * s if h * s <= height - 2 * margin else margin - y0 * s
+        else:
+            self.dx = self.dy = 0.0
+
+    def pan(self, ddx: float, ddy: float):
+        self.dx += ddx
+        self.dy += ddy
+        self.user = True
+
+    def zoom_at(self, factor: float, sx: float, sy: float):
+        """以屏幕点 (sx, sy) 为中心缩放"""
+        new_scale = min(max(self.scale * factor, ZOOM_LIMITS[0]), ZOOM_LIMITS[1])
+        factor = new_scale / self.scale
+        self.dx = sx - (sx - self.dx) * factor
+        self.dy = sy - (sy - self.dy) * factor
+        self.scale = new_scale
+        self.user = True
+
+    def reset(self):
+        self.user = False
+
+
+# ---------------------------------------------------------------------------
+# 渲染 (差量同步)
+# ---------------------------------------------------------------------------
+
+class SceneRenderer:
+    """把 Scene 同步到画布，只操作变化的图元"""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.view = View()
+        self.scene: Optional[Scene] = None
+        # 键 → (画布 id, kind, 屏幕坐标, 屏幕属性)
+        self._drawn: Dict[str, tuple] = {}
+
+    def _screen_opts(self, item: Item) -> Dict:
+        if item.fixed or 'font' not in item.opts or self.view.scale == 1.0:
+            return item.opts
+        opts = dict(item.opts)
+        font = item.opts['font']
+        opts['font'] = (font[0], max(1, round(font[1] * self.view.scale))) + tuple(font[2:])
+        return opts
+
+    def render(self, scene: Optional[Scene] = None, width: float = 0, height: float = 0) -> Dict[str, int]:
+        """同步场景；scene 为 None 时重用上一次的场景 (平移/缩放)
+
+        返回本次的操作计数 created / moved / configured / deleted / culled
+        """
+        if scene is not None:
+            self.scene = scene
+        if self.scene is None:
+            return {}
+        if not self.view.user:
+            bbox = self.scene.bbox()
+            if bbox:
+                self.view.fit(bbox, width, height)
+
+        canvas = self.canvas
+        stats = {"created": 0, "moved": 0, "configured": 0, "deleted": 0, "culled": 0}
+        visible = set()
+        scale, dx, dy = self.view.scale, self.view.dx, self.view.dy
+        # 视口换算到世界坐标后直接与预先计算的 bbox 比较，被剔除的图元不做坐标变换
+        wx0, wx1 = (-CULL_MARGIN - dx) / scale, (width + CULL_MARGIN - dx) / scale
+        wy0, wy1 = (-CULL_MARGIN - dy) / scale, (height + CULL_MARGIN - dy) / scale
+        min_font = MIN_FONT_PX / scale
+        for key, item in self.scene.items.items():
+            if item.fixed:
+                coords = item.coords
+            else:
+                x0, y0, x1, y1 = item.bbox
+                if (x1 < wx0 or x0 > wx1 or y1 < wy0 or y0 > wy1
+                        or (item.kind == 'text' and _font_size(item.opts) < min_font)):
+                    stats["culled"] += 1
+                    continue
+                coords = self.view.to_screen(item.coords)
+            visible.add(key)
+            opts = self._screen_opts(item)
+            drawn = self._drawn.get(key)
+            if drawn is not None and drawn[1] != item.kind:
+                canvas.delete(drawn[0])
+                stats["deleted"] += 1
+                drawn = None
+            if drawn is None:
+                create = getattr(canvas, f"create_{item.kind}")
+                item_id = create(*coords, tags=("scene", key), **opts)
+                self._drawn[key] = (item_id, item.kind, coords, opts)
+                stats["created"] += 1
+                continue
+            item_id, _, old_coords, old_opts = drawn
+            if coords != old_coords:
+                canvas.coords(item_id, *coords)
+                stats["moved"] += 1
+            if opts != old_opts:
+                changed = {k: v for k, v in opts.items() if old_opts.get(k) != v}
+                canvas.itemconfigure(item_id, **changed)
+                stats["configured"] += 1
+            self._drawn[key] = (item_id, item.kind, coords, opts)
+
+        for key in [k for k in self._drawn if k not in visible]:
+            canvas.delete(self._drawn.pop(key)[0])
+            stats["deleted"] += 1
+        return stats
+
+    def clear(self):
+        self.canvas.delete("scene")
+        self._drawn.clear()
+
+
+# ---------------------------------------------------------------------------
+# 分压电路布局
+# ---------------------------------------------------------------------------
+
+def _is_group(element) -> bool:
+    return isinstance(element, tuple) and element[0] == 'parallel'
+
+
+def _group_label(tag: str) -> str:
+    return f"║║ {tag}"
+
+
+class _Box:
+    """一个元件/并联组/串联段布局后的外框：入口在 (0, 0)，出口在 (w, exit)
+
+    up / down 为主线上方/下方占用的高度 (含标注)；offsets 为各子框入口相对本框入口的位置。
+    """
+    __slots__ = ('kind', 'value', 'w', 'up', 'down', 'exit', 'children', 'offsets', 'rows')
+
+    def __init__(self, kind: str, w: float, up: float, down: float, exit_y: float = 0.0,
+                 children=(), offsets=(), value=None, rows=()):
+        self.kind = kind
+        self.value = value
+        self.w = w
+        self.up = up
+        self.down = down
+        self.exit = exit_y
+        self.children = list(children)
+        self.offsets = list(offsets)
+        self.rows = list(rows)
+
+
+def _measure_series(items: List, direction: int, nested: bool, wrap: float,
+                    tags: Optional[List[str]] = None) -> _Box:
+    """串联段：元件依次排成一行，超过 wrap 宽度时换到下一行 (行尾经回线接到下一行行首)"""
+    boxes = []
+    for i, element in enumerate(items):
+        if _is_group(element):
+            boxes.append(_measure_parallel(element[1], direction, wrap, tags[i] if tags else ""))
+        else:
+            value = element[0] if isinstance(element, tuple) else element
+            boxes.append(_Box('resistor', RESISTOR_W + 2 * LEAD, LABEL_UP[nested], RESISTOR_H / 2, value=value))
+    if not boxes:
+        return _Box('series', 2 * LEAD, 0.0, 0.0)
+
+    rows = [[]]
+    width = 0.0
+    for box in boxes:
+        if rows[-1] and width + box.w > wrap:
+            rows.append([])
+            width = 0.0
+        rows[-1].append(box)
+        width += box.w
+
+    # rows: 每行 (主线 y, 行宽, 从上一行折回的回线 y)
+    offsets, row_ys = [], []
+    y = y_back = 0.0
+    for r, row in enumerate(rows):
+        if r:
+            y_back = y + max(b.down for b in rows[r - 1]) + STACK_GAP
+            y = y_back + STACK_GAP + max(b.up for b in row)
+        row_ys.append((y, sum(b.w for b in row), y_back))
+        x = 0.0
+        for box in row:
+            offsets.append((x, y))
+            x += box.w
+    last = rows[-1]
+    return _Box('series', max(w for _, w, _ in row_ys), max(b.up for b in rows[0]),
+                y + max(b.down for b in last), y, boxes, offsets, rows=row_ys)
+
+
+def _measure_parallel(branches: List, direction: int, wrap: float, tag: str = "") -> _Box:
+    """并联组：各支路完整展开，第一条在主线上，其余依次向 direction (-1 向上 / +1 向下) 堆叠"""
+    boxes = [_measure_series(branch, direction, True, wrap) for branch in branches if branch]
+    if not boxes:
+        return _Box('parallel', 2 * LEAD, 0.0, 0.0)
+    offsets = [(LEAD, 0.0)]
+    for prev, box in zip(boxes, boxes[1:]):
+        y = offsets[-1][1]
+        if direction > 0:
+            y += prev.down + STACK_GAP + box.up
+        else:
+            y -= prev.up + STACK_GAP + box.down
+        offsets.append((LEAD, y))
+    up = max(box.up - y for box, (_, y) in zip(boxes, offsets))
+    down = max(box.down + y for box, (_, y) in zip(boxes, offsets))
+    # 组标注放在最外侧支路之外
+    if direction > 0:
+        down += GROUP_LABEL_H
+    else:
+        up += GROUP_LABEL_H
+    # 组至少与其标注一样宽，相邻组的标注不重叠
+    label_w = _item_bbox('text', (0, 0), {'text': _group_label(tag), 'font': GROUP_FONT})[2] * 2 if tag else 0
+    return _Box('parallel', max(max(b.w for b in boxes) + 2 * LEAD, label_w), up, down, 0.0, boxes, offsets)
+
+
+def _place(scene: Scene, box: _Box, key: str, x: float, y: float, color: str, tag: str, direction: int):
+    """按测量结果在 (x, y) 处生成图元；tag 为该框的标注名 (顶层为 R1_2 等，支路内为空)"""
+    if box.kind == 'resistor':
+        scene.add(f"{key}.lead", 'line', x, y, x + box.w, y, width=1.5, fill=color)
+        scene.add(f"{key}.body", 'rectangle', x + LEAD, y - RESISTOR_H / 2,
+                  x + LEAD + RESISTOR_W, y + RESISTOR_H / 2, fill="#ecf0f1", outline=color, width=2)
+        if tag:
+            scene.add(f"{key}.label", 'text', x + box.w / 2, y - 28,
+                      text=f"{tag}\n{box.value}kΩ", font=("Arial", 8), fill=color)
+        else:
+            scene.add(f"{key}.value", 'text', x + box.w / 2, y - 18,
+                      text=f"{box.value}kΩ", font=("Arial", 7), fill=color)
+        return
+
+    if box.kind == 'series':
+        _place_series(scene, box, key, x, y, color, direction)
+        return
+
+    # 并联组
+    if not box.children:
+        scene.add(f"{key}.wire", 'line', x, y, x + box.w, y, width=1.5, fill=color)
+        return
+    x_in, x_out = x + LEAD, x + box.w - LEAD
+    ys = [y + dy for _, dy in box.offsets]
+    exits = [y + dy + child.exit for child, (_, dy) in zip(box.children, box.offsets)]
+    scene.add(f"{key}.in", 'line', x, y, x_in, y, width=2.5, fill=color)
+    scene.add(f"{key}.out", 'line', x_out, y, x + box.w, y, width=2.5, fill=color)
+    scene.add(f"{key}.bus_in", 'line', x_in, min(ys), x_in, max(ys), width=2, fill=color)
+    scene.add(f"{key}.bus_out", 'line', x_out, min(exits + [y]), x_out, max(exits + [y]), width=2, fill=color)
+    for j, (child, (dx, dy)) in enumerate(zip(box.children, box.offsets)):
+        _place(scene, child, f"{key}.b{j}", x + dx, y + dy, color, "", direction)
+        if x + dx + child.w < x_out:
+            scene.add(f"{key}.b{j}.tail", 'line', x + dx + child.w, exits[j], x_out, exits[j],
+                      width=1.5, fill=color)
+    if tag:
+        label_y = y + box.down - GROUP_LABEL_H / 2 if direction > 0 else y - box.up + GROUP_LABEL_H / 2
+        scene.add(f"{key}.label", 'text', x + box.w / 2, label_y,
+                  text=_group_label(tag), font=GROUP_FONT, fill=color)
+
+
+def _place_series(scene: Scene, box: _Box, key: str, x: float, y: float, color: str, direction: int,
+                  tags: Optional[List[str]] = None):
+    """串联段：逐个放置子框 (tags 给出各子框标注名)，并画出行尾 → 回线 → 下一行行首的折返线"""
+    if not box.children:
+        scene.add(f"{key}.wire", 'line', x, y, x + box.w, y, width=1.5, fill=color)
+        return
+    for k, (child, (dx, dy)) in enumerate(zip(box.children, box.offsets)):
+        _place(scene, child, f"{key}.{k}", x + dx, y + dy, color, tags[k] if tags else "", direction)
+    for r, ((y0, w0, _), (y1, _, y_back)) in enumerate(zip(box.rows, box.rows[1:])):
+        scene.add(f"{key}.wrap{r}", 'line', x + w0, y + y0, x + w0, y + y_back, x, y + y_back, x, y + y1,
+                  width=1.5, dash=(4, 2), fill=color)
+
+
+def _layout_network(scene: Scene, network: List, prefix: str, x_start: float, y_main: float,
+                    direction: int, color: str, label: str, is_ntc: bool = False,
+                    wrap: float = 600) -> _Box:
+    """布置一个分压臂：并联组的所有支路完整展开并向 direction 堆叠，过长的串联行换行
+
+    返回测量结果，出口位于 (x_start + 最后一行宽度, y_main + exit)。
+    """
+    tags = ["NTC" if (is_ntc and i == 0 and not _is_group(element)) else f"{label}_{i+1}"
+            for i, element in enumerate(network)]
+    box = _measure_series(network, direction, False, wrap, tags)
+    _place_series(scene, box, prefix, x_start, y_main, color, direction, tags)
+    return box
+
+
+def circuit_scene(r1_network: List, r2_network: List, vin: float, vout: float, r1_eq: float, r2_eq: float,
+                  is_ntc: bool = False, canvas_width: float = 1060, vadc_safe: float = 3.25,
+                  vadc_max: float = 3.3) -> Scene:
+    """分压电路拓扑图：Vin → R1 网络 → Vout 采样点 → R2 网络 → GND"""
+    scene = Scene()
+    x_start, y_center = 60, 160
+    # 两个分压臂并排，各占适配后画布宽度的一半左右
+    wrap = max(4 * (RESISTOR_W + 2 * LEAD), ((canvas_width - 20) / FIT_MIN_SCALE - 330) / 2)
+
+    # 电源符号
+    scene.add("vin.arrow", 'line', x_start, y_center, x_start + 35, y_center, width=3, arrow="last", fill="#e74c3c")
+    scene.add("vin.value", 'text', x_start - 20, y_center - 30, text=f"{vin}V",
+              font=("Arial", 14, "bold"), fill="#c0392b")
+    scene.add("vin.label", 'text', x_start - 20, y_center + 20, text="Vin", font=("Arial", 10))
+
+    r1_box = _layout_network(scene, r1_network, "R1", x_start + 50, y_center, -1, "#3498db", "R1", wrap=wrap)
+    # R1 换行时 Vout 与 R2 接在 R1 最后一行的高度上，水平方向放在整个 R1 之后
+    x_pos = x_start + 50 + (r1_box.rows[-1][1] if r1_box.rows else r1_box.w)
+    x_vout = x_start + 50 + r1_box.w + 25
+    y_out = y_center + r1_box.exit
+
+    # Vout 采样点 (突出显示)
+    scene.add("vout.wire", 'line', x_pos, y_out, x_vout + 50, y_out, width=2, fill="#27ae60")
+    scene.add("vout.probe", 'line', x_vout, y_out, x_vout, y_out - 55, width=3, dash=(5, 3), fill="#27ae60")
+    scene.add("vout.dot", 'oval', x_vout - 8, y_out - 62, x_vout + 8, y_out - 46,
+              fill="#e74c3c", outline="white", width=2)
+    scene.add("vout.value", 'text', x_vout + 35, y_out - 78, text=f"Vout = {vout:.2f}V",
+              font=("Arial", 12, "bold"), fill="#27ae60")
+    scene.add("vout.label", 'text', x_vout + 35, y_out - 63, text="ADC_IN",
+              font=("Arial", 9, "italic"), fill="#7f8c8d")
+
+    r2_box = _layout_network(scene, r2_network, "R2", x_vout + 50, y_out, 1,
+                             "#e67e22" if not is_ntc else "#8e44ad", "R2/NTC", is_ntc, wrap=wrap)
+    x_pos = x_vout + 50 + (r2_box.rows[-1][1] if r2_box.rows else r2_box.w)
+    y_gnd = y_out + r2_box.exit
+
+    # GND 符号
+    x_gnd = x_pos + 35
+    scene.add("gnd.lead", 'line', x_pos, y_gnd, x_gnd + 30, y_gnd, width=3, fill="#7f8c8d")
+    scene.add("gnd.bar", 'line', x_gnd + 30, y_gnd - 15, x_gnd + 30, y_gnd + 15, width=3, fill="#7f8c8d")
+    scene.add("gnd.foot", 'line', x_gnd + 30, y_gnd + 15, x_gnd + 42, y_gnd + 15, width=3, fill="#7f8c8d")
+    scene.add("gnd.label", 'text', x_gnd + 60, y_gnd + 30, text="GND", font=("Arial", 13, "bold"), fill="#7f8c8d")
+
+    # 保护电容
+    cap_x = x_vout - 10
+    scene.add("cap.top", 'line', cap_x, y_out + 40, cap_x + 20, y_out + 40, width=2, fill="#546e7a")
+    scene.add("cap.bottom", 'line', cap_x, y_out + 52, cap_x + 20, y_out + 52, width=2, fill="#546e7a")
+    scene.add("cap.lead", 'line', cap_x + 10, y_out + 40, cap_x + 10, y_out + 52, width=2, fill="#546e7a")
+    scene.add("cap.label", 'text', cap_x + 10, y_out + 68, text="0.1μF", font=("Arial", 9), fill="#546e7a")
+
+    # 网络等效值标注 (放在各分压臂占用范围之外)
+    if r1_eq > 0:
+        scene.add("R1.eq", 'text', x_start + 50 + r1_box.w / 2, y_center - max(r1_box.up, 90) - 30,
+                  text=f"R1_eq = {r1_eq:.2f}kΩ", font=("Arial", 10, "bold"), fill="#3498db")
+    if r2_eq > 0:
+        scene.add("R2.eq", 'text', x_vout + 50 + r2_box.w / 2, y_out + max(r2_box.down, 90) + 30,
+                  text=f"R2_eq = {r2_eq:.2f}kΩ", font=("Arial", 10, "bold"), fill="#e67e22")
+
+    # 标题与安全指示 (屏幕坐标，不随平移缩放)
+    safety_color = "#27ae60" if vout <= vadc_safe else "#f39c12" if vout <= vadc_max else "#e74c3c"
+    safety_text = "✅ 安全" if vout <= vadc_safe else "⚠️ 临界" if vout <= vadc_max else "❌ 过压"
+    scene.add("hud.title", 'text', canvas_width / 2, 25, fixed=True, text="🔋 电阻分压网络拓扑图 (支持串并联混合)",
+              font=("Arial", 15, "bold"), fill="#1a237e")
+    scene.add("hud.safety", 'text', canvas_width - 110, 25, fixed=True, text=safety_text,
+              font=("Arial", 12, "bold"), fill=safety_color)
+    return scene
@@ -0,0 +1,294 @@
+# resistor_search.py
+# 标准值组合搜索 - 两电阻分压比搜索、N 电阻并联折半搜索
+# 依赖：标准库 bisect/heapq/itertools
+#
+# 单位约定：搜索在 Ω 上进行（与 resistor_series 索引一致），返回值同样为 Ω。
+#
+# 已构建组合索引 (resistor_index) 时，两电阻分压与两电阻并联直接在映射文件上二分查找；
+# 结果 (含误差相同时的先后顺序) 与在线搜索完全一致，约束过严导致扫描过多时回退到在线搜索。
+
+import bisect
+import heapq
+import itertools
+from typing import Dict, List, Optional
+
+from resistor_index import pair_table
+from resistor_series import series_index
+
+INDEX_SCAN_LIMIT = 200_000  # 索引查询最多检查的组合数，超过后回退到在线搜索
+# 两电阻并联等于 target 时较小者在 [target, 2·target]、较大者 ≥ 2·target；
+# 候选范围上限低于 3·target 时目标附近几乎全是被拒组合，索引反而慢，直接在线搜索
+INDEX_MIN_PARALLEL_RATIO = 3.0
+
+
+def _top_k(candidates, k: int, order) -> Optional[List]:
+    """从按误差升序的候选流中取前 k 个；与第 k 个误差相同的候选也全部取出，再按 order 排序
+
+    候选流因扫描上限中断 (产出 None) 时返回 None，由调用方回退到在线搜索
+    """
+    picked = []
+    for cand in candidates:
+        if cand is None:
+            return None
+        if len(picked) >= k and cand[0] > picked[k - 1][0]:
+            break
+        picked.append(cand)
+    picked.sort(key=order)
+    return picked[:k]
+
+
+def search_divider(ratio: float, series: str = "E24", k: int = 5,
+                   r_total_min: Optional[float] = None, r_total_max: Optional[float] = None,
+                   vin: Optional[float] = None, i_max_ua: Optional[float] = None) -> List[Dict[str, float]]:
+    """搜索分压比 R2/(R1+R2) 最接近 ratio 的前 k 组标准值 (R1, R2)
+
+    对每个 R1，理想 R2 = R1·t/(1-t)，用二分定位后向下、向上各形成一条
+    误差单调递增的候选流；所有流在一个堆里做 k 路归并，
+    因此结果是全部 n² 组合中真正误差最小的 k 组，代价 O(n log n + k log n)。
+
+    r_total_min / r_total_max: R1+R2 范围 (Ω)
+    vin + i_max_ua:            静态电流上限 (µA)，等价于 R1+R2 ≥ vin / i_max
+    """
+    if not 0 < ratio < 1:
+        raise ValueError("分压比必须在 (0, 1) 之间")
+
+    values = series_index(series).values
+    n = len(values)
+
+    lo_total = r_total_min or 0.0
+    hi_total = r_total_max or float('inf')
+    if i_max_ua:
+        if vin is None:
+            raise ValueError("静态电流约束需要同时给出 vin")
+        lo_total = max(lo_total, vin / (i_max_ua * 1e-6))
+    if lo_total > hi_total:
+        return []
+
+    table = pair_table(series, "ratio")
+    if table is not None:
+        # 候选按 (误差, i, j) 排序，与下面堆归并的出堆顺序相同
+        picked = _top_k(table.nearest(ratio, lambda i, j: lo_total <= values[i] + values[j] <= hi_total,
+                                      INDEX_SCAN_LIMIT), k, order=lambda c: c)
+        if picked is not None:
+            return [_divider_item(values[i], values[j], ratio, vin) for _, i, j in picked]
+
+    scale = ratio / (1 - ratio)
+
+    def error(r1, r2):
+        return abs(r2 / (r1 + r2) - ratio)
+
+    # 堆元素: (误差, R1 下标, R2 下标, 方向 ±1)
+    heap = []
+    for i, r1 in enumerate(values):
+        if r1 >= hi_total:
+            break
+        pos = bisect.bisect_left(values, r1 * scale)
+        if pos > 0:
+            heap.append((error(r1, values[pos - 1]), i, pos - 1, -1))
+        if pos < n:
+            heap.append((error(r1, values[pos]), i, pos, 1))
+    heapq.heapify(heap)
+
+    results = []
+    while heap and len(results) < k:
+        err, i, j, step = heapq.heappop(heap)
+        r1, r2 = values[i], values[j]
+        total = r1 + r2
+
+        # 向上的流总阻值单调增，向下的流单调减：越界后整条流都可以丢弃
+        if step > 0 and total > hi_total:
+            continue
+        if step < 0 and total < lo_total:
+            continue
+
+        nxt = j + step
+        if 0 <= nxt < n:
+            heapq.heappush(heap, (error(r1, values[nxt]), i, nxt, step))
+
+        if lo_total <= total <= hi_total:
+            results.append(_divider_item(r1, r2, ratio, vin))
+
+    return results
+
+
+def _divider_item(r1, r2, ratio, vin):
+    total = r1 + r2
+    actual = r2 / total
+    item = {
+        "r1": r1,
+        "r2": r2,
+        "ratio": actual,
+        "error_pct": (actual - ratio) / ratio * 100,
+        "r_total": total,
+    }
+    if vin is not None:
+        item["current_ua"] = vin / total * 1e6
+    return item
+
+
+def _half_sums(values: List[float], size: int, distinct: bool):
+    """枚举 size 个电阻的全部组合，返回按电导和升序排列的 [(g, 组合下标)]"""
+    if size == 0:
+        return [(0.0, ())]
+    combos = itertools.combinations if distinct else itertools.combinations_with_replacement
+    conductances = [1.0 / v for v in values]
+    sums = [(sum(conductances[i] for i in combo), combo) for combo in combos(range(len(values)), size)]
+    sums.sort()
+    return sums
+
+
+def search_parallel(target_ohm: float, count: int, series: str = "E24", k: int = 5,
+                    max_ratio: Optional[float] = None, distinct: bool = False) -> List[Dict[str, object]]:
+    """搜索 count 个标准电阻并联最接近 target 的前 k 种组合 (折半搜索)
+
+    把电导和拆成两半：两侧各自枚举组合并按电导和排序，
+    再对左侧每一项在右侧二分定位理想值，沿两个方向形成误差单调递增的流，
+    堆归并后得到候选范围内最优的 k 种组合（同一组合的不同拆分会去重）。
+
+    max_ratio: 候选阻值范围 [target, target·max_ratio]，默认 4·count。
+               这是启发式上限而非精确剪枝：上限以外的大电阻只起微调作用
+               (如 1k ║ 10M)，但误差往往更小，所以默认结果只是范围内的精确前 k 名，
+               不是全系列最优；传 float('inf') 搜索整个系列，代价随候选数的 count/2 次方增长。
+    distinct:  True 时组合内阻值互不相同。
+    """
+    if count < 1:
+        raise ValueError("并联数量必须 ≥ 1")
+    if target_ohm <= 0:
+        raise ValueError("目标阻值必须 > 0")
+
+    max_ratio = max_ratio or 4.0 * count
+    values = series_index(series).between(target_ohm, target_ohm * max_ratio)
+    if not values:
+        return []
+
+    table = pair_table(series, "parallel") if count == 2 and max_ratio >= INDEX_MIN_PARALLEL_RATIO else None
+    if table is not None:
+        full, lo_v, hi_v = table.values, values[0], values[-1]
+
+        def accept(i, j):
+            return full[i] >= lo_v and full[j] <= hi_v and not (distinct and i == j)
+        # 误差相同时在线搜索先给出最大阻值更大的组合，其次较小阻值更大的组合
+        picked = _top_k(table.nearest(target_ohm, accept, INDEX_SCAN_LIMIT), k,
+                        order=lambda c: (c[0], -c[2], -c[1]))
+        if picked is not None:
+            return [{"values": (full[i], full[j]), "eq": 1.0 / (1.0 / full[i] + 1.0 / full[j]),
+                     "error_pct": (1.0 / (1.0 / full[i] + 1.0 / full[j]) - target_ohm) / target_ohm * 100}
+                    for _, i, j in picked]
+
+    target_g = 1.0 / target_ohm
+    left = _half_sums(values, count // 2, distinct)
+    right = _half_sums(values, count - count // 2, distinct)
+    right_g = [g for g, _ in right]
+    n = len(right)
+
+    def error(g):
+        return abs(1.0 / g - target_ohm) if g > 0 else float('inf')
+
+    heap = []
+    for i, (g_left, _) in enumerate(left):
+        pos = bisect.bisect_left(right_g, target_g - g_left)
+        if pos > 0:
+            heap.append((error(g_left + right_g[pos - 1]), i, pos - 1, -1))
+        if pos < n:
+            heap.append((error(g_left + right_g[pos]), i, pos, 1))
+    heapq.heapify(heap)
+
+    results = []
+    seen = set()
+    while heap and len(results) < k:
+        err, i, j, step = heapq.heappop(heap)
+        g_left, left_combo = left[i]
+        nxt = j + step
+        if 0 <= nxt < n:
+            heapq.heappush(heap, (error(g_left + right_g[nxt]), i, nxt, step))
+
+        combo = tuple(sorted(left_combo + right[j][1]))
+        if distinct and len(set(combo)) < len(combo):
+            continue
+        if combo in seen:
+            continue
+        seen.add(combo)
+
+        eq = 1.0 / (g_left + right_g[j])
+        results.append({
+            "values": tuple(values[c] for c in combo),
+            "eq": eq,
+            "error_pct": (eq - target_ohm) / target_ohm * 100,
+        })
+
+    return results
+
+
+# 电池分压器总阻值默认下限 (Ω) 与分辨率相等的相对容差
+BATTERY_R_TOTAL_MIN = 10e3
+LSB_REL_TOL = 1e-9
+
+def search_battery(vmin: float, vmax: float, vadc_safe: float, series: str = "E96",
+                   min_margin: float = 0.05, i_max_ua: Optional[float] = None,
+                   max_lsb_mv: Optional[float] = None, adc_lsb_mv: float = 3300 / 4096,
+                   r_total_min: float = BATTERY_R_TOTAL_MIN, r_total_max: float = 1e6) -> List[Dict[str, float]]:
+    """电池监测分压器的 Pareto 最优集合 (Ω)：电池电压分辨率 (mV/LSB) 与静态电流同时最小
+
+    约束: vmax 时 Vout ≤ vadc_safe - min_margin；电流 ≤ i_max_ua；
+          分辨率 ≤ max_lsb_mv；r_total_min ≤ R1+R2 ≤ r_total_max。
+    固定 R1 时增大 R2 会同时改善分辨率 (分压比变大) 和电流 (总阻值变大)，
+    所以每个 R1 只有满足约束的最大 R2 可能不被支配：逐个 R1 二分得到它，
+    再按电流升序扫描一遍取出 Pareto 前沿。结果等价于全部 n² 组合上的精确 Pareto 集，
+    代价 O(n log n)，按分辨率从好到差排列。
+    不同十倍程的同一比值 (如 10k/1.58k 与 100k/15.8k) 分辨率只差浮点舍入，
+    按相对容差 LSB_REL_TOL 视为相等，只保留电流最小的一组。
+    r_total_min 默认 BATTERY_R_TOTAL_MIN，避免前沿里出现几百 mA 的低阻组合。
+    """
+    if not 0 < vmin <= vmax:
+        raise ValueError("电池电压范围无效")
+    t_max = (vadc_safe - min_margin) / vmax
+    if t_max <= 0:
+        raise ValueError("安全裕量过大，没有可行的分压比")
+    t_max = min(t_max, 1.0)
+
+    lo_total = r_total_min
+    if i_max_ua:
+        lo_total = max(lo_total, vmax / (i_max_ua * 1e-6))
+    # 分辨率约束等价于分压比下限
+    t_min = adc_lsb_mv / max_lsb_mv if max_lsb_mv else 0.0
+
+    values = series_index(series).values
+    scale = t_max / (1 - t_max) if t_max < 1 else float('inf')
+    candidates = []
+    for r1 in values:
+        # 分压比上限 → R2 ≤ R1·t/(1-t)；总阻值上限 → R2 ≤ r_total_max - R1
+        r2_cap = min(r1 * scale * (1 + 1e-12), r_total_max - r1)
+        pos = bisect.bisect_right(values, r2_cap) - 1
+        if pos < 0:
+            continue
+        r2 = values[pos]
+        total = r1 + r2
+        ratio = r2 / total
+        if total < lo_total or ratio < t_min:
+            continue
+        candidates.append((vmax / total, adc_lsb_mv / ratio, r1, r2))
+
+    # 电流升序扫描，只保留分辨率明显更好的点 (相对容差内相等的是同一比值的更低阻十倍程)
+    candidates.sort()
+    front = []
+    best_lsb = float('inf')
+    for current, lsb, r1, r2 in candidates:
+        if lsb < best_lsb * (1 - LSB_REL_TOL):
+            best_lsb = lsb
+            front.append((current, lsb, r1, r2))
+
+    results = []
+    for current, lsb, r1, r2 in reversed(front):
+        ratio = r2 / (r1 + r2)
+        results.append({
+            "r1": r1,
+            "r2": r2,
+            "ratio": ratio,
+            "vout_min": vmin * ratio,
+            "vout_max": vmax * ratio,
+            "margin": vadc_safe - vmax * ratio,
+            "current_ua": current * 1e6,
+            "lsb_mv": lsb,
+            "source_ohm": r1 * r2 / (r1 + r2),
+        })
+    return results
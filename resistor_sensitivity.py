@@ -0,0 +1,132 @@
+# resistor_sensitivity.py
+# 解析灵敏度与最坏情况分析 - 沿网络树求 ∂Vout/∂Ri，O(N) 得到精确最坏角点
+# 依赖：无
+#
+# 链式法则：串联节点 ∂R/∂R_child = 1；并联节点 ∂R/∂R_child = (R/R_child)²。
+# 自顶向下把各节点的系数连乘到叶，一次遍历得到全部 ∂R_eq/∂Ri。
+# 等效阻值对每个电阻单调递增，Vout 对每个电阻也单调，
+# 因此按导数符号把每个电阻推到容差上/下限，就得到 2^N 个角点中的真正极值。
+
+from typing import Dict, List, Optional, Sequence, Union
+
+from resistor_network import CompiledNetwork, Node, Resistor, Series, compile_branch, leaves
+
+
+def _root(network) -> Node:
+    return network.root if isinstance(network, CompiledNetwork) else compile_branch(network)
+
+
+def leaf_derivatives(root: Node) -> List[float]:
+    """各电阻的 ∂R_eq/∂Ri (无量纲)，顺序与 leaves(root) 一致"""
+    factor = {id(root): 1.0}
+    result = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        k = factor[id(node)]
+        if isinstance(node, Resistor):
+            result.append(k)
+            continue
+        for child in node.children:
+            if isinstance(node, Series):
+                factor[id(child)] = k
+            else:
+                # 零阻值分支不参与并联 (见 resistor_network._conductance)
+                factor[id(child)] = k * (node.r / child.r)**2 if child.r > 0 else 0.0
+        stack.extend(reversed(node.children))
+    return result
+
+
+def evaluate_with(root: Node, values: Sequence[float]) -> float:
+    """用给定叶阻值 (顺序同 leaves) 重新计算等效阻值，不修改树"""
+    leaf_values = {id(leaf): v for leaf, v in zip(leaves(root), values)}
+    r = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, Resistor):
+            r[id(node)] = leaf_values[id(node)]
+        elif expanded:
+            if isinstance(node, Series):
+                r[id(node)] = max(sum(r[id(c)] for c in node.children), 0.0)
+            else:
+                g = sum(1.0 / r[id(c)] for c in node.children if r[id(c)] > 0)
+                r[id(node)] = 1.0 / g if g > 0 else 0.0
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children)
+    return r[id(root)]
+
+
+def _vout(vin, r1, r2):
+    # 与 calculate_equivalent 一致：空网络按 0.001kΩ 处理
+    r1, r2 = (r1 if r1 > 0 else 0.001), (r2 if r2 > 0 else 0.001)
+    return vin * r2 / (r1 + r2)
+
+
+def divider_sensitivity(r1_network, r2_network, vin: float,
+                        tolerance_pct: Union[float, Sequence[float]] = 1.0) -> Dict[str, object]:
+    """分压器的解析灵敏度、最坏情况与误差预算 (电阻单位 kΩ)
+
+    tolerance_pct: 统一容差或每个电阻的容差 (%)，顺序为 R1 各电阻、再 R2 各电阻
+    返回:
+      vout / vout_min / vout_max:  标称值与精确最坏情况 (V)
+      linear_pct / rss_pct:        一阶线性叠加与平方和开方估计的相对偏差 (%)
+      parts: 每个电阻一项 {ref, side, value, dv_dr (V/kΩ), sens, tol_pct, share_pct}
+             sens 为归一化灵敏度 (dVout/Vout)/(dR/R)，share_pct 为其在线性误差预算中的占比
+    """
+    roots = [('R1', _root(r1_network)), ('R2', _root(r2_network))]
+    r1_eq, r2_eq = roots[0][1].r, roots[1][1].r
+    vout = _vout(vin, r1_eq, r2_eq)
+    r1_c, r2_c = (r1_eq if r1_eq > 0 else 0.001), (r2_eq if r2_eq > 0 else 0.001)
+    dv_dside = {'R1': -vin * r2_c / (r1_c + r2_c)**2, 'R2': vin * r1_c / (r1_c + r2_c)**2}
+
+    parts = []
+    for side, root in roots:
+        for i, (leaf, d_eq) in enumerate(zip(leaves(root), leaf_derivatives(root)), 1):
+            dv_dr = dv_dside[side] * d_eq
+            parts.append({
+                "ref": f"{side}_{i}",
+                "side": side,
+                "value": leaf.value,
+                "dv_dr": dv_dr,
+                "sens": dv_dr * leaf.value / vout if vout else 0.0,
+            })
+
+    if isinstance(tolerance_pct, (int, float)):
+        tols = [float(tolerance_pct)] * len(parts)
+    else:
+        tols = [float(t) for t in tolerance_pct]
+        if len(tols) != len(parts):
+            raise ValueError(f"容差需要 {len(parts)} 个值 (每个电阻一个)，实际 {len(tols)} 个")
+
+    # 按导数符号构造两个角点，各自精确求值
+    corners = {}
+    for direction in (1, -1):
+        values = {'R1': [], 'R2': []}
+        for part, tol in zip(parts, tols):
+            sign = (part["dv_dr"] > 0) - (part["dv_dr"] < 0)
+            values[part["side"]].append(part["value"] * (1 + direction * sign * tol / 100))
+        corners[direction] = _vout(vin, evaluate_with(roots[0][1], values['R1']),
+                                   evaluate_with(roots[1][1], values['R2']))
+
+    contributions = [abs(p["sens"]) * t for p, t in zip(parts, tols)]
+    linear = sum(contributions)
+    for part, tol, c in zip(parts, tols, contributions):
+        part["tol_pct"] = tol
+        part["share_pct"] = c / linear * 100 if linear else 0.0
+
+    return {
+        "vout": vout,
+        "vout_min": corners[-1],
+        "vout_max": corners[1],
+        "linear_pct": linear,
+        "rss_pct": sum(c**2 for c in contributions)**0.5,
+        "parts": parts,
+    }
+
+
+def top_contributors(result: Dict[str, object], n: Optional[int] = 3) -> List[Dict[str, float]]:
+    """按误差预算占比降序排列的电阻"""
+    ranked = sorted(result["parts"], key=lambda p: p["share_pct"], reverse=True)
+    return ranked[:n] if n else ranked
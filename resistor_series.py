@@ -0,0 +1,132 @@
+# resistor_series.py
+# IEC 60063 标准电阻系列 (E3 ~ E192) 的对数域有序索引
+# 依赖：标准库 bisect/math；批量取整 nearest_array 需要 numpy
+#
+# 每个系列只构建一次：1Ω ~ 10MΩ 全部标准值按升序排列，同时保存 log10 值，
+# nearest / floor / ceil 都是 O(log n) 的二分查找。
+# "最接近" 按对数距离（即相对误差）判断，这与电阻按比例分档的方式一致。
+
+import bisect
+import math
+from typing import Dict, List
+
+# 一个十倍程内的基值
+E24_VALUES = [1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+              3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1]
+E192_VALUES = [1.00, 1.01, 1.02, 1.04, 1.05, 1.06, 1.07, 1.09, 1.10, 1.11, 1.13, 1.14,
+               1.15, 1.17, 1.18, 1.20, 1.21, 1.23, 1.24, 1.26, 1.27, 1.29, 1.30, 1.32,
+               1.33, 1.35, 1.37, 1.38, 1.40, 1.42, 1.43, 1.45, 1.47, 1.49, 1.50, 1.52,
+               1.54, 1.56, 1.58, 1.60, 1.62, 1.64, 1.65, 1.67, 1.69, 1.72, 1.74, 1.76,
+               1.78, 1.80, 1.82, 1.84, 1.87, 1.89, 1.91, 1.93, 1.96, 1.98, 2.00, 2.03,
+               2.05, 2.08, 2.10, 2.13, 2.15, 2.18, 2.21, 2.23, 2.26, 2.29, 2.32, 2.34,
+               2.37, 2.40, 2.43, 2.46, 2.49, 2.52, 2.55, 2.58, 2.61, 2.64, 2.67, 2.71,
+               2.74, 2.77, 2.80, 2.84, 2.87, 2.91, 2.94, 2.98, 3.01, 3.05, 3.09, 3.12,
+               3.16, 3.20, 3.24, 3.28, 3.32, 3.36, 3.40, 3.44, 3.48, 3.52, 3.57, 3.61,
+               3.65, 3.70, 3.74, 3.79, 3.83, 3.88, 3.92, 3.97, 4.02, 4.07, 4.12, 4.17,
+               4.22, 4.27, 4.32, 4.37, 4.42, 4.48, 4.53, 4.59, 4.64, 4.70, 4.75, 4.81,
+               4.87, 4.93, 4.99, 5.05, 5.11, 5.17, 5.23, 5.30, 5.36, 5.42, 5.49, 5.56,
+               5.62, 5.69, 5.76, 5.83, 5.90, 5.97, 6.04, 6.12, 6.19, 6.26, 6.34, 6.42,
+               6.49, 6.57, 6.65, 6.73, 6.81, 6.90, 6.98, 7.06, 7.15, 7.23, 7.32, 7.41,
+               7.50, 7.59, 7.68, 7.77, 7.87, 7.96, 8.06, 8.16, 8.25, 8.35, 8.45, 8.56,
+               8.66, 8.76, 8.87, 8.98, 9.09, 9.20, 9.31, 9.42, 9.53, 9.65, 9.76, 9.88]
+E96_VALUES = E192_VALUES[::2]
+E48_VALUES = E96_VALUES[::2]
+E12_VALUES = E24_VALUES[::2]
+E6_VALUES = E12_VALUES[::2]
+E3_VALUES = E6_VALUES[::2]
+
+SERIES_BASES: Dict[str, List[float]] = {
+    "E3": E3_VALUES,
+    "E6": E6_VALUES,
+    "E12": E12_VALUES,
+    "E24": E24_VALUES,
+    "E48": E48_VALUES,
+    "E96": E96_VALUES,
+    "E192": E192_VALUES,
+}
+
+# 覆盖范围 1Ω (10^0) ~ 10MΩ (10^7)
+MIN_EXP = 0
+MAX_EXP = 7
+
+
+class SeriesIndex:
+    """单个 E 系列在 1Ω ~ 10MΩ 上的有序索引 (单位 Ω)"""
+    __slots__ = ('name', 'values', 'logs')
+
+    def __init__(self, name: str, bases: List[float]):
+        self.name = name
+        # 用十进制字符串构造，避免 4.7 * 1000 = 4700.000000000001 之类的浮点噪声
+        self.values = [float(f"{base}e{exp}") for exp in range(MIN_EXP, MAX_EXP) for base in bases]
+        self.values.append(float(f"1e{MAX_EXP}"))
+        self.logs = [math.log10(v) for v in self.values]
+
+    def __len__(self):
+        return len(self.values)
+
+    def nearest_position(self, value_ohm: float) -> int:
+        """对数距离最近的标准值下标"""
+        if value_ohm <= self.values[0]:
+            return 0
+        if value_ohm >= self.values[-1]:
+            return len(self.values) - 1
+        log_v = math.log10(value_ohm)
+        hi = bisect.bisect_left(self.logs, log_v)
+        lo = hi - 1
+        return lo if log_v - self.logs[lo] <= self.logs[hi] - log_v else hi
+
+    def nearest(self, value_ohm: float) -> float:
+        """最接近的标准值"""
+        return self.values[self.nearest_position(value_ohm)]
+
+    def floor(self, value_ohm: float) -> float:
+        """不大于 value 的最大标准值（低于 1Ω 时返回 1Ω）"""
+        pos = bisect.bisect_right(self.values, value_ohm * (1 + 1e-12)) - 1
+        return self.values[max(pos, 0)]
+
+    def ceil(self, value_ohm: float) -> float:
+        """不小于 value 的最小标准值（高于 10MΩ 时返回 10MΩ）"""
+        pos = bisect.bisect_left(self.values, value_ohm * (1 - 1e-12))
+        return self.values[min(pos, len(self.values) - 1)]
+
+    def between(self, lo_ohm: float, hi_ohm: float) -> List[float]:
+        """[lo, hi] 区间内的全部标准值"""
+        start = bisect.bisect_left(self.values, lo_ohm * (1 - 1e-12))
+        stop = bisect.bisect_right(self.values, hi_ohm * (1 + 1e-12))
+        return self.values[start:stop]
+
+    def as_array(self):
+        """标准值的 numpy 数组 (Ω)"""
+        import numpy as np
+        return np.array(self.values)
+
+    def nearest_array(self, values_ohm):
+        """批量取整：对任意形状的数组一次 searchsorted 完成"""
+        import numpy as np
+        logs = np.array(self.logs)
+        table = np.array(self.values)
+        log_v = np.log10(np.clip(np.asarray(values_ohm, dtype=float), table[0], table[-1]))
+        hi = np.clip(np.searchsorted(logs, log_v, side='left'), 1, len(table) - 1)
+        lo = hi - 1
+        pick_lo = (log_v - logs[lo]) <= (logs[hi] - log_v)
+        return table[np.where(pick_lo, lo, hi)]
+
+
+_INDEXES: Dict[str, SeriesIndex] = {}
+
+
+def series_index(name: str = "E24") -> SeriesIndex:
+    """获取 (首次调用时构建) 指定系列的索引"""
+    key = name.upper()
+    index = _INDEXES.get(key)
+    if index is None:
+        if key not in SERIES_BASES:
+            raise ValueError(f"未知的标准系列: {name} (可选 {', '.join(SERIES_BASES)})")
+        index = SeriesIndex(key, SERIES_BASES[key])
+        _INDEXES[key] = index
+    return index
+
+
+def nearest(value_ohm: float, series: str = "E24") -> float:
+    """在指定系列中查找最接近的标准值 (Ω)"""
+    return series_index(series).nearest(value_ohm)
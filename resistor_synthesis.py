@@ -0,0 +1,230 @@
+# resistor_synthesis.py
+# 串并联混合网络综合 - 用最少的标准电阻逼近目标阻值
+# 依赖：标准库 bisect/math
+#
+# 任何串并联网络都可以拆成 "左子网 ⊕ 右子网" (⊕ 为串联或并联)，
+# 因此 n 个电阻能得到的阻值集合 S(n) 可由 S(a) ⊕ S(n-a) 逐级构造。
+# 检查第 n 级时只需对每个 x ∈ S(a) 在有序的 S(n-a) 中二分查找理想补值，
+# 不必把 S(n) 本身展开。各级集合不按阻值裁剪 (并联支路可以用任意大的子网)，
+# 而是按运算做分支定界：S(b) 的可达区间为 [最小叶/b, 最大叶·b]，
+# 要落入当前误差窗口 [T-ε, T+ε]，串联要求 x ∈ [T-ε-max S(b), T+ε-min S(b)]，
+# 并联要求 x ≥ 1/(1/(T-ε) - 1/max S(b)) 且 (1/(T+ε) > 1/min S(b) 时) x ≤ 1/(1/(T+ε) - 1/min S(b))，
+# 窗口随最优解收紧。组合规模超过 max_pairs 的级不展开，查询时由较小的级递归求两侧最近值。
+#
+# 单位约定：搜索在 Ω 上进行，输出的 network 与 GUI 一致使用 kΩ。
+
+import bisect
+import math
+from typing import Dict, List, Optional, Tuple
+
+from resistor_series import series_index
+
+# 表达式: ('r', 值) | ('s', 左, 右) | ('p', 左, 右)
+Expr = Tuple
+
+
+def _key(value: float) -> float:
+    # 相同阻值的不同拓扑只保留一种（先出现的即元件数最少的）
+    return float(f"{value:.12g}")
+
+
+class _Level:
+    """某一元件数下可达阻值的有序表"""
+    __slots__ = ('values', 'exprs')
+
+    def __init__(self, items: Dict[float, Tuple[float, Expr]]):
+        ordered = sorted(items.values(), key=lambda item: item[0])
+        self.values = [v for v, _ in ordered]
+        self.exprs = [e for _, e in ordered]
+
+    def __len__(self):
+        return len(self.values)
+
+    def around(self, value: float):
+        """value 两侧最近的两个下标"""
+        pos = bisect.bisect_left(self.values, value)
+        return [i for i in (pos - 1, pos) if 0 <= i < len(self.values)]
+
+
+def expr_value(expr: Expr) -> float:
+    kind = expr[0]
+    if kind == 'r':
+        return expr[1]
+    left, right = expr_value(expr[1]), expr_value(expr[2])
+    return left + right if kind == 's' else left * right / (left + right)
+
+
+def expr_parts(expr: Expr) -> int:
+    return 1 if expr[0] == 'r' else expr_parts(expr[1]) + expr_parts(expr[2])
+
+
+def expr_to_network(expr: Expr) -> List:
+    """表达式 → 网络列表 (kΩ)，相邻串联/并联会被展平"""
+    kind = expr[0]
+    if kind == 'r':
+        return [(expr[1] / 1000, 'series')]
+    if kind == 's':
+        return expr_to_network(expr[1]) + expr_to_network(expr[2])
+
+    branches = []
+    stack = [expr[2], expr[1]]
+    while stack:
+        sub = stack.pop()
+        if sub[0] == 'p':
+            stack.extend((sub[2], sub[1]))
+        else:
+            branches.append(expr_to_network(sub))
+    return [('parallel', branches)]
+
+
+def expr_to_text(expr: Expr) -> str:
+    """表达式的可读形式，例如 10k + (22k ║ 47k)"""
+    kind = expr[0]
+    if kind == 'r':
+        return f"{expr[1] / 1000:g}k"
+    # 子表达式与本层运算不同时加括号
+    parts = []
+    for sub in (expr[1], expr[2]):
+        text = expr_to_text(sub)
+        parts.append(f"({text})" if sub[0] not in ('r', kind) else text)
+    return f" {'+' if kind == 's' else '║'} ".join(parts)
+
+
+class _Levels:
+    """各元件数的可达阻值：组合规模允许的级展开为有序表，其余级按需递归查询"""
+
+    def __init__(self, leaves: List[float], max_pairs: int):
+        self.levels: Dict[int, _Level] = {1: _Level({_key(v): (v, ('r', v)) for v in leaves})}
+        self.leaf_min, self.leaf_max = leaves[0], leaves[-1]
+        self.max_pairs = max_pairs
+        self.complete = True
+
+    def span(self, n: int) -> Tuple[float, float]:
+        """n 个电阻的可达区间：全部并联最小叶 ~ 全部串联最大叶"""
+        return self.leaf_min / n, self.leaf_max * n
+
+    def expand(self, n: int):
+        """展开 S(n)；组合规模超过 max_pairs 或较小的级缺失时跳过"""
+        splits = [(a, n - a) for a in range(1, n // 2 + 1)]
+        if any(a not in self.levels or b not in self.levels for a, b in splits):
+            return
+        if sum(len(self.levels[a]) * len(self.levels[b]) for a, b in splits) > self.max_pairs:
+            return
+        items: Dict[float, Tuple[float, Expr]] = {}
+        for a, b in splits:
+            left, right = self.levels[a], self.levels[b]
+            for i, (x, ex) in enumerate(zip(left.values, left.exprs)):
+                # a == b 时 (x, y) 与 (y, x) 相同，只取一半
+                for y, ey in zip(right.values[i if a == b else 0:], right.exprs[i if a == b else 0:]):
+                    s = x + y
+                    items.setdefault(_key(s), (s, ('s', ex, ey)))
+                    p = x * y / s
+                    items.setdefault(_key(p), (p, ('p', ex, ey)))
+        self.levels[n] = _Level(items)
+
+    def near(self, n: int, value: float) -> List[Tuple[float, Expr]]:
+        """S(n) 中 value 两侧最近的值 (不大于的最大者、不小于的最小者)"""
+        level = self.levels.get(n)
+        if level is not None:
+            return [(level.values[i], level.exprs[i]) for i in level.around(value)]
+        below, above = [-math.inf, None], [math.inf, None]
+
+        def consider(v, expr):
+            if below[0] < v <= value:
+                below[:] = v, expr
+            if value <= v < above[0]:
+                above[:] = v, expr
+
+        for a in range(1, n // 2 + 1):
+            self.scan(a, n - a, value, lambda: (below[0], above[0]), consider)
+        return [(v, e) for v, e in (below, above) if e is not None]
+
+    def scan(self, a: int, b: int, target: float, window, consider):
+        """x ∈ S(a) 与 S(b) 串联/并联，结果可能落入 window() 的组合逐个交给 consider(值, 表达式)
+
+        对每个 x 只取理想补值两侧最近的 y (结果随 y 单调)，x 的范围由 S(b) 的可达区间定界。
+        """
+        left = self.levels.get(a)
+        if left is None:
+            self.complete = False
+            return
+        y_min, y_max = self.span(b)
+        xs, exprs = left.values, left.exprs
+
+        # 串联：x + y ∈ [lo, hi] ⇒ x ∈ [lo - y_max, hi - y_min]
+        i = bisect.bisect_left(xs, window()[0] - y_max)
+        while i < len(xs) and xs[i] <= window()[1] - y_min:
+            x, ex = xs[i], exprs[i]
+            for y, ey in self.near(b, target - x):
+                consider(x + y, ('s', ex, ey))
+            i += 1
+
+        # 并联：x ∥ y < y ≤ y_max；x ∥ y ≥ lo ⇒ 1/x ≤ 1/lo - 1/y_max；x ∥ y ≤ hi ⇒ 1/x ≥ 1/hi - 1/y_min
+        lo = window()[0]
+        if lo >= y_max:
+            return
+        i = bisect.bisect_left(xs, 1.0 / (1.0 / lo - 1.0 / y_max)) if lo > 0 else 0
+        while i < len(xs):
+            x, ex = xs[i], exprs[i]
+            inv = 1.0 / window()[1] - 1.0 / y_min
+            if inv > 0 and x * inv > 1.0:
+                break
+            y_ideal = 1.0 / (1.0 / target - 1.0 / x) if x > target else math.inf
+            for y, ey in self.near(b, y_ideal):
+                consider(x * y / (x + y), ('p', ex, ey))
+            i += 1
+
+
+def synthesize(target_ohm: float, series: str = "E24", max_parts: int = 4,
+               tolerance_pct: float = 0.1, max_pairs: int = 200_000) -> Optional[Dict[str, object]]:
+    """综合元件数最少、误差在 tolerance_pct 以内的串并联网络
+
+    逐级增加元件数，一旦某一级出现满足容差的方案就在该级内取误差最小者返回；
+    若到 max_parts 仍不满足，返回全程误差最小的方案 (within_tol=False)。
+    叶电阻取整个系列；组合规模超过 max_pairs 的级不展开，查询时递归求最近值，结果不变。
+    只有连折半的较小一级也无法展开 (元件数 ≥ 6) 时才会漏掉组合，此时结果中 complete=False。
+    """
+    if target_ohm <= 0:
+        raise ValueError("目标阻值必须 > 0")
+    if max_parts < 1:
+        raise ValueError("元件数上限必须 ≥ 1")
+
+    levels = _Levels(series_index(series).values, max_pairs)
+    tol = target_ohm * tolerance_pct / 100
+    best = [math.inf, None, None]  # 误差, 阻值, 表达式
+
+    def window():
+        return target_ohm - best[0], target_ohm + best[0]
+
+    def consider(value, expr):
+        err = abs(value - target_ohm)
+        if err < best[0]:
+            best[:] = err, value, expr
+
+    for n in range(1, max_parts + 1):
+        if n == 1:
+            for value, expr in levels.near(1, target_ohm):
+                consider(value, expr)
+        else:
+            for a in range(1, n // 2 + 1):
+                levels.scan(a, n - a, target_ohm, window, consider)
+
+        if best[0] <= tol:
+            break
+        # 为后续各级准备 S(n)：S(1) 已有，最后一级只需检查不必展开
+        if 1 < n < max_parts:
+            levels.expand(n)
+
+    err, value, expr = best
+    if expr is None:
+        return None
+    return {
+        "expr": expr,
+        "text": expr_to_text(expr),
+        "network": expr_to_network(expr),
+        "parts": expr_parts(expr),
+        "eq": value,
+        "error_pct": (value - target_ohm) / target_ohm * 100,
+        "within_tol": err <= tol,
+        "complete": levels.complete,
+    }
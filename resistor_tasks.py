@@ -0,0 +1,76 @@
+# resistor_tasks.py
+# 后台任务 - 在工作线程中运行耗时分析，支持进度报告与取消；不依赖 tkinter
+# 依赖：标准库 threading
+#
+# Tk 不是线程安全的：工作线程只修改任务对象自身的状态，
+# 界面线程用 after() 定时调用 poll() 取进度和结果，再在主线程里更新控件。
+
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+
+class TaskCancelled(Exception):
+    """任务已被取消 (由 progress() 在工作线程中抛出，终止计算)"""
+
+
+class BackgroundTask:
+    """在守护线程中运行 func(*args, progress=..., **kwargs)
+
+    func 可在循环中调用 progress(done, total)：报告进度，同时在已取消时抛出 TaskCancelled。
+    不报告进度的函数无法中途停止，取消后其结果被丢弃。
+    state: 'running' / 'done' / 'error' / 'cancelled'；elapsed 为运行秒数 (结束后固定)
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        self.state = "running"
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self._progress: Tuple[float, Optional[float]] = (0, None)
+        self._cancel = threading.Event()
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._thread = threading.Thread(target=self._run, args=(func, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, func, args, kwargs):
+        try:
+            result = func(*args, progress=self.progress, **kwargs)
+        except TaskCancelled:
+            self._finished = time.perf_counter()
+            self.state = "cancelled"
+        except Exception as e:
+            self._finished = time.perf_counter()
+            self.error = e
+            self.state = "cancelled" if self._cancel.is_set() else "error"
+        else:
+            self._finished = time.perf_counter()
+            self.result = result
+            # 先写结果再改状态，轮询方看到 'done' 时结果一定可用
+            self.state = "cancelled" if self._cancel.is_set() else "done"
+
+    def progress(self, done: float, total: Optional[float] = None):
+        """工作线程调用：记录进度；任务已取消时抛出 TaskCancelled"""
+        if self._cancel.is_set():
+            raise TaskCancelled()
+        self._progress = (done, total)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def elapsed(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def poll(self) -> Tuple[str, Optional[float]]:
+        """界面线程调用：返回 (state, 进度比例或 None)"""
+        done, total = self._progress
+        return self.state, (done / total if total else None)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
@@ -0,0 +1,189 @@
+# resistor_trace.py
+# 耗时埋点 - 每个操作的墙钟耗时与调用次数、可选 cProfile 剖析、滚动 JSONL 跟踪文件；不依赖 tkinter
+# 依赖：标准库 cProfile/pstats/json
+#
+# 用法：with tracer.span("draw_circuit"): ...  或  @traced("calculate_network")
+# 跟踪文件每个操作一行 JSON (ts, op, ms, depth, thread, version, pid 及附加字段)，
+# 可从工程师的机器上收集后按 version 比较；超过 TRACE_MAX_BYTES 时改名为 .1 后重新开始。
+#
+# 环境变量：
+#   RESISTOR_TRACE    跟踪文件路径；off 关闭 (默认 ~/.cache/resistor_expert/trace.jsonl)
+#   RESISTOR_PROFILE  设为 1 时启动即开启 cProfile，退出时写出 .prof 文件
+# cProfile 只剖析开启它的线程 (界面线程)；后台任务仍有耗时统计与跟踪记录。
+
+import atexit
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+TRACE_MAX_BYTES = 2_000_000
+
+
+def default_trace_path() -> Optional[str]:
+    """跟踪文件位置；返回 None 表示不写文件"""
+    env = os.environ.get("RESISTOR_TRACE")
+    if env is not None:
+        return None if env.strip().lower() in ("", "0", "off", "none") else env
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "resistor_expert", "trace.jsonl")
+
+
+class Tracer:
+    """操作耗时统计 + JSONL 跟踪 + cProfile 开关 (线程安全)"""
+
+    def __init__(self, path: Optional[str] = None, version: str = "", max_bytes: int = TRACE_MAX_BYTES):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, list] = {}   # op -> [calls, total_s, max_s]
+        self.last: Optional[Tuple[str, float]] = None
+        self._file = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._profile_thread = None
+
+    # -- 计时 ---------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def span(self, op: str, **fields):
+        """记录 with 块的耗时；嵌套的 span 在跟踪中带 depth，统计中各自计数"""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        profile = self._profile if depth == 0 and self._profile_thread == threading.get_ident() else None
+        if profile is not None:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            self._local.depth = depth
+            self.record(op, elapsed, depth, **fields)
+
+    def record(self, op: str, seconds: float, depth: int = 0, **fields):
+        with self._lock:
+            entry = self._stats.setdefault(op, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            self.last = (op, seconds)
+            if self.path is not None:
+                line = {"ts": round(time.time(), 3), "op": op, "ms": round(seconds * 1e3, 3), "depth": depth,
+                        "thread": threading.current_thread().name, "version": self.version,
+                        "pid": os.getpid()}
+                line.update(fields)
+                self._write(json.dumps(line, ensure_ascii=False, default=str))
+
+    def _write(self, line: str):
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self._file.tell() > self.max_bytes:
+                # 滚动：只保留当前文件和上一个 .1 文件
+                self._file.close()
+                self._file = None
+                os.replace(self.path, self.path + ".1")
+        except OSError:
+            # 写不了 (只读目录等) 就只保留内存统计
+            self.path = None
+            self._file = None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """op -> calls / total_ms / mean_ms / max_ms，按总耗时降序"""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda kv: -kv[1][1])
+            return {op: {"calls": calls, "total_ms": total * 1e3, "mean_ms": total / calls * 1e3,
+                         "max_ms": peak * 1e3}
+                    for op, (calls, total, peak) in items}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.last = None
+
+    # -- cProfile ------------------------------------------------------------
+
+    @property
+    def profiling(self) -> bool:
+        return self._profile is not None
+
+    def start_profile(self):
+        """开启剖析：之后在当前线程最外层 span 内的调用都计入同一份剖析数据"""
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile_thread = threading.get_ident()
+
+    def stop_profile(self, path: Optional[str] = None, top: int = 25) -> Optional[str]:
+        """关闭剖析，按累计耗时返回前 top 个函数的文本报告；给出 path 时同时写出 .prof 文件 (pstats 格式)"""
+        profile, self._profile, self._profile_thread = self._profile, None, None
+        if profile is None:
+            return None
+        try:
+            stats = pstats.Stats(profile, stream=io.StringIO())
+        except TypeError:
+            return "(剖析期间没有记录到调用)"
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                stats.dump_stats(path)
+                print(f"剖析数据已保存: {path}", file=stats.stream)
+            except OSError as e:
+                print(f"无法保存剖析文件 {path}: {e}", file=stats.stream)
+        stats.sort_stats("cumulative").print_stats(top)
+        return stats.stream.getvalue()
+
+    def profile_path(self) -> str:
+        """剖析文件默认位置：跟踪文件旁边，按时间命名"""
+        base = os.path.dirname(os.path.abspath(self.path or default_trace_path() or "trace.jsonl"))
+        return os.path.join(base, time.strftime("profile-%Y%m%d-%H%M%S.prof"))
+
+
+_tracer: Optional[Tracer] = None
+
+
+def tracer() -> Tracer:
+    """进程内共享的 Tracer (首次使用时创建，并按 RESISTOR_PROFILE 开启剖析)"""
+    global _tracer
+    if _tracer is None:
+        from resistor_engine import ENGINE_VERSION
+        _tracer = Tracer(default_trace_path(), ENGINE_VERSION)
+        if os.environ.get("RESISTOR_PROFILE", "").strip().lower() in ("1", "on", "true", "yes"):
+            _tracer.start_profile()
+            atexit.register(lambda: _tracer.profiling and _tracer.stop_profile(_tracer.profile_path()))
+    return _tracer
+
+
+def traced(op: Optional[str] = None, on_done: Optional[Callable] = None) -> Callable:
+    """装饰器：用共享 Tracer 记录函数耗时 (op 默认为函数名)
+
+    on_done(args, op, seconds) 在函数结束后调用 (例如方法把耗时显示到状态栏)，只对最外层调用触发。
+    """
+    def decorator(func):
+        name = op or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            t = tracer()
+            outer = getattr(t._local, "depth", 0) == 0
+            start = time.perf_counter()
+            try:
+                with t.span(name):
+                    return func(*args, **kwargs)
+            finally:
+                if on_done is not None and outer:
+                    on_done(args, name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,8 @@
+# 测试公共设置：仓库根目录加入 sys.path；缓存、组合索引与耗时跟踪不读写用户目录
+import os
+import sys
+
+os.environ["RESISTOR_CACHE"] = "off"
+os.environ["RESISTOR_INDEX"] = "off"
+os.environ["RESISTOR_TRACE"] = "off"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
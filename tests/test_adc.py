@@ -0,0 +1,45 @@
+# resistor_adc：可用码数排名、并列时的电流次序与同比例去重
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from resistor_adc import optimize_adc_divider
+
+
+def test_same_ratio_decades_collapse_to_lowest_current():
+    """adc 0 24 --bits 12：第一名是 102k/15.8k，10.2k/1.58k 与 1.02k/0.158k 不再挤占前几名"""
+    rows = optimize_adc_divider(0, 24, bits=[12], k=5)["tables"][12]
+    assert (rows[0]["r1"], rows[0]["r2"]) == pytest.approx((102, 15.8))
+    ratios = [round(row["ratio"], 9) for row in rows]
+    assert len(set(ratios)) == len(rows)
+    assert all(row["current_ua"] < 1000 for row in rows)
+    codes = [row["usable_codes"] for row in rows]
+    assert codes == sorted(codes, reverse=True)
+
+
+def test_equal_codes_rank_by_current():
+    """码数在浮点噪声内相同的组合按静态电流升序"""
+    rows = optimize_adc_divider(0, 24, bits=[10, 16], k=20)["tables"]
+    for table in rows.values():
+        for a, b in zip(table, table[1:]):
+            if abs(a["usable_codes"] - b["usable_codes"]) <= 1e-9 * a["usable_codes"]:
+                assert a["current_ua"] <= b["current_ua"]
+            else:
+                assert a["usable_codes"] > b["usable_codes"]
+
+
+def test_constraints_respected():
+    result = optimize_adc_divider(0, 24, bits=[12, 16], k=10, i_max_ua=50, noise_uv=100,
+                                  c_sample_pf=10, t_acq_us=1)
+    for n_bits, table in result["tables"].items():
+        assert 0 < len(table) <= 10
+        assert len(table) <= result["feasible"][n_bits]
+        for row in table:
+            assert row["current_ua"] <= 50 + 1e-6
+            assert row["vout_max"] <= 3.25 + 1e-9
+            assert row["settle_us"] <= 1 + 1e-9
+
+
+def test_invalid_range():
+    with pytest.raises(ValueError):
+        optimize_adc_divider(5, 1)
@@ -0,0 +1,58 @@
+# resistor_batch 向量化求值与逐个样本标量计算的对照
+import copy
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from resistor_batch import BatchTopology
+from resistor_engine import calculate_equivalent
+from resistor_network import CompiledNetwork, leaves
+
+R1 = [(10.0, 'series'), ('parallel', [[(22.0, 'series')], [(4.7, 'series'), ('parallel', [[(1.0, 'series')], [(3.3, 'series')]])]])]
+R2 = [('parallel', [[(15.0, 'series')], [(47.0, 'series')]]), (2.2, 'series')]
+
+
+def _with_values(network, values):
+    compiled = CompiledNetwork(copy.deepcopy(network))
+    for leaf, value in zip(list(leaves(compiled.root)), values):
+        compiled.set_leaf(leaf, float(value))
+    return compiled.source
+
+
+def test_equivalents_match_scalar():
+    topo = BatchTopology(R1, R2)
+    assert (topo.n_r1, topo.n_r2) == (5, 3)
+    rng = np.random.default_rng(1)
+    values = topo.nominal() * rng.uniform(0.5, 1.5, size=(50, topo.n_resistors))
+    values[3, 1] = 0.0   # 0 Ω 并联支路被忽略
+    r1_eq, r2_eq = topo.equivalents(values)
+    for row, a, b in zip(values, r1_eq, r2_eq):
+        assert a == pytest.approx(calculate_equivalent(_with_values(R1, row[:topo.n_r1])), rel=1e-12)
+        assert b == pytest.approx(calculate_equivalent(_with_values(R2, row[topo.n_r1:])), rel=1e-12)
+
+
+def test_evaluate_power_and_vout():
+    topo = BatchTopology(R1, R2)
+    rng = np.random.default_rng(2)
+    values = topo.nominal() * rng.uniform(0.9, 1.1, size=(20, topo.n_resistors))
+    vin = rng.uniform(3, 24, size=20)
+    out = topo.evaluate(values, vin)
+    r1_eq, r2_eq = topo.equivalents(values)
+    assert out["vout"] == pytest.approx(vin * r2_eq / (r1_eq + r2_eq), rel=1e-12)
+    # 功率守恒：各电阻功耗之和等于电源输出功率
+    assert out["power_mw"].sum(axis=1) == pytest.approx(vin * out["current_ma"], rel=1e-12)
+
+
+def test_power_closed_form_single_sample():
+    topo = BatchTopology([(1.0, 'series')], [('parallel', [[(2.0, 'series')], [(2.0, 'series')]])])
+    out = topo.evaluate(topo.nominal(), 4.0)
+    # 1k + (2k ∥ 2k) = 2k，I = 2 mA；R1 4 mW，两个 2k 各 1 mA → 2 mW
+    assert out["current_ma"][0] == pytest.approx(2.0)
+    assert out["power_mw"][0] == pytest.approx([4.0, 2.0, 2.0])
+
+
+def test_rejects_wrong_shape():
+    topo = BatchTopology(R1, R2)
+    with pytest.raises(ValueError):
+        topo.equivalents(np.ones((3, topo.n_resistors + 1)))
@@ -0,0 +1,125 @@
+# resistor_bom：元件功耗与闭式解、封装选择、位号压缩、跨设计合并与导出
+import csv
+import json
+
+import pytest
+
+from resistor_bom import BomBuilder, choose_package, compress_refs, design_parts, export_bom, format_ohms
+
+# R1 = 10k 串联 (20k ∥ 20k)，R2 = 10k；Vin = 30V → I = 30 / 30k = 1 mA
+CONFIG = {
+    "vin": 30.0,
+    "r1_network": [(10, 'series'), ('parallel', [[(20, 'series')], [(20, 'series')]])],
+    "r2_network": [(10, 'series')],
+}
+
+
+def test_design_parts_match_closed_form():
+    parts = design_parts(CONFIG)
+    assert [p["value"] for p in parts] == ["10kΩ", "20kΩ", "20kΩ", "10kΩ"]
+    series, half_a, half_b, lower = parts
+    # 串联电阻 P = I²R = 1 mA² × 10k = 10 mW，端电压 10V
+    assert series["power_mw"] == pytest.approx(10.0)
+    assert series["voltage_v"] == pytest.approx(10.0)
+    assert series["note"] == ""
+    # 两个等值并联各分一半电流：0.5 mA² × 20k = 5 mW，端电压都是并联组的 10V
+    for part in (half_a, half_b):
+        assert part["power_mw"] == pytest.approx(5.0)
+        assert part["voltage_v"] == pytest.approx(10.0)
+        assert part["note"] == "并联分担"
+    assert lower["branch"] == "R2"
+    assert lower["power_mw"] == pytest.approx(10.0)
+
+
+def test_unequal_parallel_split():
+    """10k ∥ 40k 的电流按电导分配：I_i = I · R_eq / R_i"""
+    config = {"vin": 10.0, "r1_network": [('parallel', [[(10, 'series')], [(40, 'series')]])],
+              "r2_network": [(2, 'series')]}
+    parts = design_parts(config)
+    r_eq = 10 * 40 / 50
+    current = 10.0 / (r_eq + 2)
+    for part, r in zip(parts, (10, 40)):
+        i = current * r_eq / r
+        assert part["power_mw"] == pytest.approx(i * i * r)
+        assert part["voltage_v"] == pytest.approx(current * r_eq)
+
+
+def test_ntc_and_invalid_designs():
+    parts = design_parts(dict(CONFIG, use_ntc=True))
+    assert [p["kind"] for p in parts] == ["resistor"] * 3 + ["ntc"]
+    with pytest.raises(ValueError):
+        design_parts(dict(CONFIG, vin="x"))
+    with pytest.raises(ValueError):
+        design_parts(dict(CONFIG, r2_network=[]))
+
+
+def test_choose_package():
+    assert choose_package(1, 5) == ("0603", 1 / 10)
+    assert choose_package(1, 5, min_package="0402") == ("0402", 1 / 16)
+    # 0603 降额后上限 50 mW：恰好等于仍可用，再大一点换 0805
+    assert choose_package(50, 5)[0] == "0603"
+    assert choose_package(51, 5)[0] == "0805"
+    # 电压同样约束封装
+    assert choose_package(1, 100)[0] == "0805"
+    assert choose_package(2000, 5) == (None, None)
+    with pytest.raises(ValueError):
+        choose_package(1, 1, min_package="0201")
+
+
+def test_compress_refs_and_format():
+    assert compress_refs("R", [9, 3, 1, 2, 4]) == "R1-R4, R9"
+    assert compress_refs("C", [5]) == "C5"
+    assert compress_refs("R", [1, 3, 5]) == "R1, R3, R5"
+    assert compress_refs("R", []) == ""
+    assert (format_ohms(0.47), format_ohms(4.7), format_ohms(1000)) == ("470Ω", "4.7kΩ", "1MΩ")
+
+
+def test_builder_merges_lines_and_numbers_refs():
+    builder = BomBuilder()
+    first = builder.add(CONFIG, "a")
+    second = builder.add(CONFIG, "b")
+    assert builder.add({"vin": 5}, "bad") == []
+    assert [p["ref"] for p in first] == ["R1", "R2", "R3", "R4", "C1"]
+    assert [p["ref"] for p in second] == ["R5", "R6", "R7", "R8", "C2"]
+    assert builder.designs == 2 and builder.parts == 10
+    assert builder.errors and builder.errors[0][0] == "bad"
+
+    lines = builder.lines()
+    assert [(l["kind"], l["value"], l["qty"]) for l in lines] == [
+        ("resistor", "10kΩ", 4), ("resistor", "20kΩ", 4), ("capacitor", "0.1µF", 2)]
+    ten_k, twenty_k, cap = lines
+    assert ten_k["refs"] == "R1, R4-R5, R8"
+    assert twenty_k["refs"] == "R2-R3, R6-R7"
+    assert cap["refs"] == "C1-C2"
+    assert ten_k["designs"] == 2
+    assert ten_k["max_power_mw"] == pytest.approx(10.0)
+    # 串联与 R2 的 10k 备注不同，合并行备注清空；20k 都是并联分担
+    assert ten_k["note"] == "" and twenty_k["note"] == "并联分担"
+
+
+def test_export_csv_and_json(tmp_path):
+    designs = [("a", CONFIG), ("b", CONFIG), ("bad", {"vin": -1})]
+    out = tmp_path / "bom.csv"
+    parts = tmp_path / "parts.csv"
+    seen = []
+    summary = export_bom(designs, str(out), parts_path=str(parts), progress=seen.append, capacitor=False)
+    assert summary["designs"] == 2 and summary["parts"] == 8 and summary["lines"] == 2
+    assert seen == [1, 2, 3]
+    with open(out, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["value"], r["qty"], r["refs"]) for r in rows] == [("10kΩ", "4", "R1, R4-R5, R8"),
+                                                                ("20kΩ", "4", "R2-R3, R6-R7")]
+    with open(parts, encoding="utf-8-sig", newline="") as f:
+        detail = list(csv.DictReader(f))
+    assert [r["ref"] for r in detail] == [f"R{n}" for n in range(1, 9)]
+    assert {r["design"] for r in detail} == {"a", "b"}
+    assert not list(tmp_path.glob("*.tmp*"))
+
+    out_json = tmp_path / "bom.json"
+    export_bom(designs, str(out_json))
+    data = json.loads(out_json.read_text(encoding="utf-8"))
+    assert data["designs"] == 2 and len(data["lines"]) == 3
+    assert data["errors"][0]["design"] == "bad"
+
+    with pytest.raises(ValueError):
+        export_bom(designs, str(tmp_path / "bom.xlsx"))
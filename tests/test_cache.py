@@ -0,0 +1,114 @@
+# resistor_cache：值的还原、批量提交、淘汰策略、清空失败时的退化
+import os
+import sqlite3
+import time
+
+import pytest
+
+import resistor_cache
+from resistor_cache import ResultCache, memoize
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    monkeypatch.setattr(resistor_cache, "FLUSH_SECONDS", 3600.0)
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_values_round_trip_and_copy(path):
+    cache = ResultCache(path)
+    value = {"network": [(4.7, 'series'), ('parallel', [[(10, 'series')]])], "n": None}
+    cache.put("k", value)
+    got = cache.get("k")
+    assert got == value and isinstance(got["network"][0], tuple)
+    got["network"].clear()
+    assert cache.get("k") == value
+    cache.flush()
+    # 新实例从磁盘读回
+    assert ResultCache(path).get("k") == value
+
+
+def test_writes_are_batched(path, monkeypatch):
+    monkeypatch.setattr(resistor_cache, "FLUSH_ENTRIES", 10)
+    cache = ResultCache(path)
+    for i in range(9):
+        cache.put(f"k{i}", i)
+    assert _rows(path) == 0
+    cache.put("k9", 9)
+    assert _rows(path) == 10
+    cache.put("k10", 10)
+    assert _rows(path) == 10
+    assert cache.stats()["disk_entries"] == 11
+
+
+def test_evicts_by_size_and_age(path):
+    cache = ResultCache(path)
+    for i in range(100):
+        cache.put(f"k{i:03d}", "x" * 100)
+    cache.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE results SET used = 1000 + CAST(substr(key, 2) AS INTEGER)")
+    size = cache.stats()["disk_bytes"]
+    assert size > 100 * 100
+
+    # 重新打开时按最近使用时间从旧到新删除到上限的 80%
+    small = ResultCache(path, max_bytes=size // 2, max_age=float('inf'))
+    stats = small.stats()
+    assert stats["disk_bytes"] <= size // 2 * 0.8
+    assert stats["evicted"] == 100 - stats["disk_entries"]
+    assert small.get("k099") is not None and small.get("k000") is None
+
+    # 超过 max_age 未使用的记录全部删除 (使用时间是 1970 年)
+    assert ResultCache(path, max_age=3600).stats()["disk_entries"] == 0
+
+
+def test_disk_hit_refreshes_use_time(path):
+    cache = ResultCache(path)
+    cache.put("k", 1)
+    cache.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE results SET used = 0")
+    fresh = ResultCache(path, max_age=float('inf'))
+    before = time.time()
+    assert fresh.get("k") == 1 and fresh.disk_hits == 1
+    fresh.flush()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT used FROM results").fetchone()[0] >= before
+
+
+def test_clear_failure_degrades_to_memory(path):
+    cache = ResultCache(path)
+    cache.put("k", 1)
+    cache.flush()
+    # 换成只读连接，模拟被锁定或只读的缓存文件
+    cache._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    cache._conn_pid = os.getpid()
+    error = cache.clear()
+    assert error and "readonly" in error
+    assert cache.path is None
+    assert cache.get("k") is None
+    cache.put("k", 2)
+    assert cache.get("k") == 2
+    assert ResultCache(path).clear() is None
+    assert _rows(path) == 0
+
+
+def test_memoize_normalizes_arguments(path, monkeypatch):
+    monkeypatch.setattr(resistor_cache, "_default", ResultCache(path))
+    calls = []
+
+    @memoize("1")
+    def f(a, b=3.3):
+        calls.append((a, b))
+        return [a, b]
+
+    assert f(1, 3.3) == [1, 3.3]
+    assert f(a=1) == [1, 3.3]
+    assert f(1, b=3.30000000000001) == [1, 3.3]
+    assert len(calls) == 1
+    assert f.uncached(2) == [2, 3.3] and len(calls) == 2
@@ -0,0 +1,60 @@
+# 命令行 batch：逐行出错记录、输出表头与按输入顺序输出
+import csv
+import json
+
+import pytest
+
+from resistor_divider_cli import batch_mode, solve_row
+
+
+def _run(tmp_path, text):
+    src = tmp_path / "in.jsonl"
+    src.write_text(text, encoding="utf-8")
+    out = tmp_path / "out.jsonl"
+    batch_mode([str(src), "-o", str(out), "--workers", "1", "--chunk", "2"])
+    return out
+
+
+def test_jsonl_bad_lines_reported_per_line(tmp_path):
+    text = 'oops\n{"vin": 5, "vout": 3.3}\n\n[1, 2]\n{"vin": 12, "vout": 3.3, "r1": 10}\n{"vin": 5, "vout": 6}\n'
+    out = _run(tmp_path, text)
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 5
+    assert records[0]["line"] == 1 and "第 1 行 JSON 解析失败" in records[0]["error"]
+    assert records[1]["mode"] == "pair" and "error" not in records[1]
+    assert records[2]["line"] == 4 and "不是 JSON 对象" in records[2]["error"]
+    assert records[3]["mode"] == "solve_r2" and records[3]["r2"] == pytest.approx(3.9)
+    assert "error" in records[4]
+
+
+def test_csv_header_when_first_row_is_bad(tmp_path):
+    src = tmp_path / "in.jsonl"
+    src.write_text('{bad\n{"vin": 5, "vout": 3.3, "tag": "a"}\n', encoding="utf-8")
+    out = tmp_path / "out.csv"
+    batch_mode([str(src), "-o", str(out), "--workers", "1"])
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["line"] == "1" and rows[0]["error"]
+    assert rows[1]["tag"] == "a" and rows[1]["vin"] == "5" and rows[1]["mode"] == "pair"
+
+
+def test_csv_round_trip_keeps_input_columns(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("vin,vout,r1,note\n5,3.3,,a\n12,3.3,10,b\n4.2,5,,c\n", encoding="utf-8")
+    out = tmp_path / "out.csv"
+    batch_mode([str(src), "-o", str(out), "--workers", "1"])
+    with open(out, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames[:4] == ["vin", "vout", "r1", "note"]
+        rows = list(reader)
+    assert [r["note"] for r in rows] == ["a", "b", "c"]
+    assert rows[0]["mode"] == "pair" and rows[1]["mode"] == "solve_r2"
+    assert rows[2]["error"]
+
+
+def test_solve_row_modes():
+    assert solve_row({"vin": "5", "vout": "2.5", "r1": "10", "r2": "10"})["mode"] == "check"
+    assert solve_row({"VIN": 12, "Vout": 3.3, "r2": 10})["mode"] == "solve_r1"
+    battery = solve_row({"vmin": 3.0, "vmax": 4.2, "series": "E24"})
+    assert battery["mode"] == "battery" and battery["vout_max"] <= 3.3
+    assert solve_row({"vin": 5})["error"]
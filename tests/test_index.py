@@ -0,0 +1,62 @@
+# resistor_index 构建 / 映射读回，以及索引路径与在线搜索结果一致
+import pytest
+
+pytest.importorskip("numpy")
+
+import resistor_index
+from resistor_index import PairIndex, build_index
+from resistor_search import search_divider, search_parallel
+from resistor_series import series_index
+
+
+@pytest.fixture(scope="module")
+def index_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("index") / "pairs.bin")
+    build_index(path, series=["E6", "E12"])
+    return path
+
+
+def test_tables_round_trip(index_path):
+    index = PairIndex(index_path)
+    assert index.series_names() == ["E6", "E12"]
+    assert index.table("E24", "ratio") is None
+    # 只建有查询方的表
+    assert index.table("E6", "series") is None
+    values = series_index("E6").values
+    n = len(values)
+
+    ratio = index.table("E6", "ratio")
+    assert len(ratio) == n * n
+    keys = list(ratio.keys)
+    assert keys == sorted(keys)
+    assert sorted(zip(keys, ratio.i, ratio.j)) == sorted(
+        (values[j] / (values[i] + values[j]), i, j) for i in range(n) for j in range(n))
+
+    parallel = index.table("E6", "parallel")
+    assert len(parallel) == n * (n + 1) // 2
+    for key, i, j in zip(parallel.keys, parallel.i, parallel.j):
+        assert i <= j
+        assert key == 1.0 / (1.0 / values[i] + 1.0 / values[j])
+
+
+def test_nearest_is_ordered(index_path):
+    table = PairIndex(index_path).table("E12", "parallel")
+    found = list(table.nearest(4321.0, limit=200))
+    assert found[-1] is None
+    errors = [item[0] for item in found[:-1]]
+    assert errors == sorted(errors)
+    assert errors[0] == min(abs(k - 4321.0) for k in table.keys)
+    # accept 过滤后仍按误差升序
+    odd = [item for item in table.nearest(4321.0, accept=lambda i, j: (i + j) % 2 == 1, limit=200) if item]
+    assert all((i + j) % 2 == 1 for _, i, j in odd)
+    assert [e for e, _, _ in odd] == sorted(e for e, _, _ in odd)
+
+
+def test_search_with_index_matches_online(index_path, monkeypatch):
+    cases = [(0.3, None, None), (0.1234, 10e3, 200e3)]
+    online = [search_divider(r, "E12", 8, lo, hi) for r, lo, hi in cases]
+    online_parallel = search_parallel(1000.0, 2, "E12", k=5, max_ratio=100)
+    monkeypatch.setattr(resistor_index, "_index", PairIndex(index_path))
+    monkeypatch.setattr(resistor_index, "_index_loaded", True)
+    assert [search_divider(r, "E12", 8, lo, hi) for r, lo, hi in cases] == online
+    assert search_parallel(1000.0, 2, "E12", k=5, max_ratio=100) == online_parallel
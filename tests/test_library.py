@@ -0,0 +1,59 @@
+# resistor_library 保存 / 读回 / 查询 / 批量导入
+import json
+
+import pytest
+
+from resistor_library import DesignLibrary
+
+CONFIG = {
+    "vin": 12.0,
+    "vout_target": 3.3,
+    "use_ntc": False,
+    "r1_network": [(27, 'series'), ('parallel', [[(100, 'series')], [(220, 'series'), (4.7, 'series')]])],
+    "r2_network": [(10, 'series'), (2.2, 'series')],
+}
+
+
+@pytest.fixture
+def library():
+    with DesignLibrary(":memory:") as lib:
+        yield lib
+
+
+def test_save_get_round_trip(library):
+    design_id, new = library.save(CONFIG, name="板卡 A")
+    assert new
+    design = library.get(design_id)
+    assert design["name"] == "板卡 A"
+    for key, value in CONFIG.items():
+        assert design[key] == value
+    assert library.save(CONFIG, name="重复") == (design_id, False)
+    assert library.count() == 1
+
+
+def test_query_and_iter(library):
+    library.save(CONFIG, name="a")
+    library.save(dict(CONFIG, vin=24.0), name="b")
+    r1 = 27 + 1 / (1 / 100 + 1 / 224.7)
+    ratio = 12.2 / (r1 + 12.2)
+    rows = library.query(ratio=ratio, ratio_tol_pct=0.01)
+    assert {row["name"] for row in rows} == {"a", "b"}
+    assert rows[0]["ratio"] == pytest.approx(ratio)
+    assert [row["name"] for row in library.query(vin=(20, None))] == ["b"]
+    assert library.query(max_parts=3) == []
+    assert [d["name"] for d in library.iter_designs()] == ["a", "b"]
+
+
+def test_import_json(tmp_path):
+    good = tmp_path / "resistor_config_1.json"
+    good.write_text(json.dumps(CONFIG), encoding="utf-8")
+    bad = tmp_path / "resistor_config_2.json"
+    bad.write_text("[1, 2]", encoding="utf-8")
+    with DesignLibrary(str(tmp_path / "designs.sqlite3")) as lib:
+        report = lib.import_json([str(good), str(bad), str(good)])
+        assert report["imported"] == 1
+        assert report["duplicates"] == 1
+        assert [path for path, _ in report["errors"]] == [str(bad)]
+        design = next(lib.iter_designs())
+        assert design["name"] == "resistor_config_1"
+        assert design["r1_network"] == CONFIG["r1_network"]
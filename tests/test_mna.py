@@ -0,0 +1,47 @@
+# resistor_mna 与闭式分压公式的对照 (阻值 kΩ)
+import pytest
+
+from resistor_engine import calculate_equivalent
+from resistor_mna import Netlist, SingularCircuit
+
+NETWORKS = [
+    ([(10, 'series')], [(4.7, 'series')]),
+    ([(1, 'series'), ('parallel', [[(22, 'series')], [(33, 'series'), (4.7, 'series')]])],
+     [('parallel', [[(10, 'series')], [(15, 'series')], [(68, 'series')]])]),
+    ([('parallel', [[(2.2, 'series'), ('parallel', [[(1, 'series')], [(3.3, 'series')]])], [(47, 'series')]])],
+     [(0.47, 'series'), (1.5, 'series')]),
+]
+
+
+@pytest.mark.parametrize("r1_network, r2_network", NETWORKS)
+@pytest.mark.parametrize("load_k", [None, 12.0])
+def test_divider_matches_closed_form(r1_network, r2_network, load_k):
+    vin = 5.0
+    r1, r2 = calculate_equivalent(r1_network), calculate_equivalent(r2_network)
+    if load_k is not None:
+        r2 = r2 * load_k / (r2 + load_k)
+    solution = Netlist.from_divider(vin, r1_network, r2_network, load_k=load_k).solve()
+    assert solution.v("vout") == pytest.approx(vin * r2 / (r1 + r2), rel=1e-12)
+    assert solution.v("vin", "vout") == pytest.approx(vin * r1 / (r1 + r2), rel=1e-12)
+
+
+def test_text_round_trip_and_sources():
+    net = Netlist.from_divider(3.3, *NETWORKS[1])
+    again = Netlist.parse(net.to_text("divider"))
+    assert again.solve().v("vout") == pytest.approx(net.solve().v("vout"), rel=1e-12)
+    # 线性电路：电源加倍，输出加倍
+    assert net.solve({"VIN": 6.6}).v("vout") == pytest.approx(2 * net.solve().v("vout"), rel=1e-12)
+
+
+def test_current_source_into_resistor():
+    net = Netlist.parse("I1 0 a 1m\nR1 a 0 2.2k\n")
+    assert net.solve().v("a") == pytest.approx(2.2, rel=1e-12)
+
+
+def test_floating_node_is_singular():
+    net = Netlist()
+    net.add_voltage_source("V1", "a", "0", 1.0)
+    net.add_resistor("R1", "a", "0", 1.0)
+    net.add_resistor("R2", "b", "c", 1.0)
+    with pytest.raises(SingularCircuit):
+        net.solve()
@@ -0,0 +1,75 @@
+# resistor_montecarlo 可复现性 (与进程数、分片大小无关) 与基本统计量
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import resistor_montecarlo as mc
+
+R1 = [(10.0, 'series'), ('parallel', [[(22.0, 'series')], [(47.0, 'series')]])]
+R2 = [(10.0, 'series')]
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # 小块让少量样本也能切出多个分片
+    monkeypatch.setattr(mc, "BLOCK_SIZE", 2_000)
+    monkeypatch.setattr(mc, "MIN_SHARD_SIZE", 2_000)
+
+
+def _run(workers, seed=42, **kw):
+    # Vout 标称约 1.43 V
+    return mc.monte_carlo(R1, R2, 5.0, tolerance_pct=[1, 5, 2, 0.1], distribution=["normal", "uniform", "normal", "uniform"],
+                          samples=21_500, spec=(1.42, 1.44), seed=seed, workers=workers, **kw)
+
+
+def _same(a, b):
+    for key in ("samples", "mean", "std", "min", "max", "yield_pct"):
+        assert a[key] == b[key], key
+    assert a["percentiles"] == b["percentiles"]
+    assert np.array_equal(a["hist"], b["hist"])
+
+
+def test_results_independent_of_workers_and_shards(small_blocks, monkeypatch):
+    base = _run(1)
+    assert base["samples"] == 21_500
+    _same(base, _run(3))
+    monkeypatch.setattr(mc, "SHARDS_PER_WORKER", 1)
+    _same(base, _run(2))
+    monkeypatch.setattr(mc, "MIN_SHARD_SIZE", 8_000)
+    _same(base, _run(4))
+    assert _run(1, seed=7)["mean"] != base["mean"]
+
+
+def test_statistics_match_nominal(small_blocks):
+    result = _run(1)
+    assert result["mean"] == pytest.approx(result["nominal"], rel=1e-3)
+    assert result["min"] <= result["percentiles"][50.0] <= result["max"]
+    assert int(result["hist"].sum()) == result["samples"]
+    assert 0 < result["yield_pct"] < 100
+
+
+def test_progress_exception_cancels(small_blocks):
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        _run(2, progress=progress)
+    assert len(calls) == 1
+
+
+def test_resistance_spread_uniform_bounds():
+    spread = mc.resistance_spread([(10.0, 'series')], tolerance_pct=1.0, distribution="uniform", samples=50_000)
+    assert spread["nominal"] == pytest.approx(10.0)
+    assert -1.0 <= spread["lo_pct"] < -0.99
+    assert 0.99 < spread["hi_pct"] <= 1.0
+    assert spread["std_pct"] == pytest.approx(1 / 3**0.5, rel=0.02)
+
+
+def test_rejects_bad_part_params():
+    with pytest.raises(ValueError):
+        mc.monte_carlo(R1, R2, 5.0, tolerance_pct=[1, 2], samples=10)
+    with pytest.raises(ValueError):
+        mc.monte_carlo(R1, R2, 5.0, distribution="lognormal", samples=10)
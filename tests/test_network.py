@@ -0,0 +1,67 @@
+# CompiledNetwork 增量修改与从头编译的对照 (随机编辑序列)
+import copy
+import random
+
+import pytest
+
+from resistor_engine import calculate_equivalent
+from resistor_network import CompiledNetwork, Parallel, Resistor, Series, compile_branch, leaves
+
+
+def _random_element(rng, depth=0):
+    if depth >= 3 or rng.random() < 0.6:
+        return (round(rng.choice([0.0, 0.1, 1.0, 4.7, 10.0, 220.0]) * rng.uniform(0.5, 2), 3), 'series')
+    return ('parallel', [[_random_element(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+                         for _ in range(rng.randint(1, 3))])
+
+
+def _check_indices(node):
+    for i, child in enumerate(getattr(node, 'children', ())):
+        assert child.parent is node
+        assert child.index == i
+        _check_indices(child)
+
+
+def _check(compiled):
+    fresh = compile_branch(copy.deepcopy(compiled.source))
+    assert compiled.equivalent == pytest.approx(fresh.r, rel=1e-9, abs=1e-9)
+    assert calculate_equivalent(compiled) == pytest.approx(calculate_equivalent(compiled.source), rel=1e-9)
+    assert compiled.to_list() == fresh.to_list()
+    _check_indices(compiled.root)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits_match_recompile(seed):
+    rng = random.Random(seed)
+    compiled = CompiledNetwork([_random_element(rng) for _ in range(rng.randint(0, 4))])
+    _check(compiled)
+    for _ in range(60):
+        op = rng.random()
+        if op < 0.25 or not len(compiled):
+            compiled.append(_random_element(rng))
+        elif op < 0.4:
+            compiled.pop(rng.randrange(len(compiled)))
+        elif op < 0.55:
+            compiled.replace(rng.randrange(len(compiled)), _random_element(rng))
+        else:
+            leaf_list = list(leaves(compiled.root))
+            if not leaf_list:
+                continue
+            compiled.set_leaf(rng.choice(leaf_list), round(rng.uniform(0, 100), 3))
+        _check(compiled)
+
+
+def test_set_leaf_writes_back_nested_source():
+    network = [(1.0, 'series'), ('parallel', [[(10.0, 'series')], [(2.0, 'series'), ('parallel', [[(5.0, 'series')], [(5.0, 'series')]])]])]
+    compiled = CompiledNetwork(network)
+    deep = compiled.node(1).children[1].children[1].children[0].children[0]
+    assert isinstance(deep, Resistor)
+    compiled.set_leaf(deep, 20.0)
+    assert network[1][1][1][1] == ('parallel', [[(20.0, 'series')], [(5.0, 'series')]])
+    assert compiled.equivalent == pytest.approx(1 + 1 / (1 / 10 + 1 / (2 + 4)))
+
+
+def test_zero_branches_are_ignored():
+    root = compile_branch([('parallel', [[(0.0, 'series')], [(6.0, 'series')], []])])
+    assert isinstance(root, Series) and isinstance(root.children[0], Parallel)
+    assert root.r == pytest.approx(6.0)
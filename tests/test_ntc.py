@@ -0,0 +1,160 @@
+# resistor_ntc：查找表误差上限、R–T 拟合、上拉电阻优化
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from resistor_ntc import build_adc_lut, fit_ntc_models, load_rt_csv, model_resistance, optimize_pullup, model_temperature, write_lut_binary, write_lut_c
+
+
+def _beta_temperature(bits, r1_ohm, r25, b, t_min, t_max):
+    """比例测量下每个码的 β 方程温度 (NTC 接地侧)，独立于被测实现"""
+    full_scale = 2**bits - 1
+    temps = []
+    for code in range(full_scale + 1):
+        x = code / full_scale
+        if x <= 0:
+            temps.append(t_max)
+            continue
+        if x >= 1:
+            temps.append(t_min)
+            continue
+        r = r1_ohm * x / (1 - x)
+        t = 1 / (1 / 298.15 + math.log(r / r25) / b) - 273.15
+        temps.append(min(max(t, t_min), t_max))
+    return np.array(temps)
+
+
+@pytest.mark.parametrize("mode, max_err", [("full", 0.1), ("uniform", 0.1), ("pwl", 0.1), ("pwl", 0.5)])
+def test_lut_error_bound(mode, max_err):
+    bits, r1, r25, b, scale = 12, 10e3, 10e3, 3950, 100
+    lut = build_adc_lut(bits, r1, r25, b, mode=mode, max_error_c=max_err, scale=scale,
+                        t_min=-40.0, t_max=125.0)
+    exact = _beta_temperature(bits, r1, r25, b, -40.0, 125.0)
+    error = np.abs(lut.lookup(np.arange(2**bits)) / scale - exact).max()
+    bound = 0.5 / scale if mode == "full" else max_err
+    assert error <= bound + 1e-9
+    assert lut.max_error_c == pytest.approx(error, abs=1e-9)
+    if mode == "full":
+        assert len(lut) == 2**bits
+    else:
+        assert len(lut) < 2**bits
+
+
+def test_pwl_needs_fewer_knots_for_looser_bound():
+    tight = build_adc_lut(10, 10e3, 10e3, 3950, mode="pwl", max_error_c=0.05)
+    loose = build_adc_lut(10, 10e3, 10e3, 3950, mode="pwl", max_error_c=0.5)
+    assert len(loose) < len(tight)
+
+
+def test_lut_rejects_bound_below_resolution():
+    with pytest.raises(ValueError):
+        build_adc_lut(10, 10e3, 10e3, 3950, mode="pwl", max_error_c=0.001, scale=100)
+
+
+def test_lut_files_round_trip(tmp_path):
+    lut = build_adc_lut(10, 10e3, 10e3, 3950, mode="pwl", max_error_c=0.2)
+    raw = tmp_path / "lut.bin"
+    write_lut_binary(lut, str(raw))
+    data = raw.read_bytes()
+    n = len(lut)
+    assert np.array_equal(np.frombuffer(data[:2 * n], '<u2'), lut.codes)
+    assert np.array_equal(np.frombuffer(data[2 * n:], '<i2'), lut.values)
+
+    npy = tmp_path / "lut.npy"
+    write_lut_binary(lut, str(npy))
+    table = np.load(str(npy))
+    assert np.array_equal(table['code'], lut.codes) and np.array_equal(table['value'], lut.values)
+
+    header = tmp_path / "ntc_lut.h"
+    write_lut_c(lut, str(header), name="ntc_lut")
+    text = header.read_text(encoding="utf-8")
+    assert f"#define NTC_LUT_SIZE  {n}" in text
+    assert "static inline int32_t ntc_lut_lookup(uint16_t code)" in text
+
+
+# 典型 10k NTC 的 Steinhart–Hart 系数 (ln R 以 Ω 计)
+SH_MODEL = {"form": "sh", "ref": 1.0, "coeffs": [1.125e-3, 2.347e-4, 0.0, 8.566e-8]}
+
+
+def test_sh_fit_recovers_synthetic_coefficients():
+    temps = np.arange(-40.0, 126.0, 5.0)
+    r = model_resistance(temps, SH_MODEL)
+    assert model_temperature(r, SH_MODEL) == pytest.approx(temps, abs=1e-9)
+    beta_r = model_resistance(temps[::3], None, 4700.0, 3435.0)
+    # 两个传感器点数不同 (批量求解时补零对齐)
+    models = fit_ntc_models({"a": (temps, r), "b": (temps[::3], beta_r)}, form="sh")
+    fit = models["a"]
+    assert fit["coeffs"] == pytest.approx(SH_MODEL["coeffs"], rel=1e-6)
+    assert fit["points"] == len(temps)
+    assert fit["max_err_c"] < 1e-6
+    assert fit["r25"] == pytest.approx(float(model_resistance(25.0, SH_MODEL)), rel=1e-9)
+    # 单独拟合与批量拟合结果一致
+    alone = fit_ntc_models({"b": (temps[::3], beta_r)}, form="sh")["b"]
+    assert models["b"]["coeffs"] == pytest.approx(alone["coeffs"], rel=1e-9)
+
+
+def test_beta_fit_recovers_r25_and_b():
+    temps = np.linspace(0, 100, 21)
+    r = model_resistance(temps, None, 4700.0, 3435.0)
+    fit = fit_ntc_models({"ntc": (temps, r)}, form="beta")["ntc"]
+    assert fit["r25"] == pytest.approx(4700.0, rel=1e-9)
+    assert fit["b"] == pytest.approx(3435.0, rel=1e-9)
+    assert fit["rms_c"] < 1e-9
+
+
+def test_fit_rejects_too_few_points():
+    with pytest.raises(ValueError):
+        fit_ntc_models({"x": (np.array([0.0, 25.0]), np.array([30e3, 10e3]))}, form="sh")
+
+
+def test_load_rt_csv_layouts(tmp_path):
+    wide = tmp_path / "wide.csv"
+    wide.write_text("temp,NTC-A (kΩ),NTC-B\n0,32.6,27000\n25,10,\n50,3.6,3900\nx,1,1\n", encoding="utf-8")
+    data = load_rt_csv(str(wide))
+    assert list(data) == ["NTC-A", "NTC-B"]
+    assert data["NTC-A"][1] == pytest.approx([32600, 10000, 3600])
+    assert data["NTC-B"][0] == pytest.approx([0, 50])
+
+    long = tmp_path / "long.csv"
+    long.write_text("sensor,temp,r\ns1,0,100\ns2,0,200\ns1,25,50\n", encoding="utf-8")
+    data = load_rt_csv(str(long))
+    assert data["s1"][1] == pytest.approx([100, 50])
+    assert data["s2"][0] == pytest.approx([0])
+
+
+def _scalar_pullup(r1, temps, bits=12, r25=10000.0, b=3950.0):
+    """逐点有限差分：最差 ADC 码/°C 与相对端点连线的非线性 (°C)"""
+    def x(t):
+        r = r25 * math.exp(b * (1 / (t + 273.15) - 1 / 298.15))
+        return r / (r1 + r)
+    h = 1e-4
+    counts = [abs(x(t + h) - x(t - h)) / (2 * h) * (2**bits - 1) for t in temps]
+    x0, x1 = x(temps[0]), x(temps[-1])
+    slope = abs(x1 - x0) / (temps[-1] - temps[0])
+    dev = max(abs(x(t) - (x0 + (x1 - x0) * (t - temps[0]) / (temps[-1] - temps[0]))) for t in temps)
+    return min(counts), dev / slope
+
+
+@pytest.mark.parametrize("objective", ["resolution", "linearity"])
+def test_pullup_ranking_matches_scalar(objective):
+    from resistor_series import series_index
+    temps = [0 + 0.5 * i for i in range(121)]
+    results = optimize_pullup(0, 60, series="E12", step=0.5, objective=objective, k=3, r_min=1e3, r_max=100e3)
+    reference = {r1: _scalar_pullup(r1, temps) for r1 in series_index("E12").between(1e3, 100e3)}
+    key = (lambda r1: -reference[r1][0]) if objective == "resolution" else (lambda r1: reference[r1][1])
+    assert [r["r1_ohm"] for r in results] == sorted(reference, key=key)[:3]
+    for r in results:
+        counts, nonlinearity = reference[r["r1_ohm"]]
+        assert r["min_counts_per_c"] == pytest.approx(counts, rel=1e-6)
+        assert r["nonlinearity_c"] == pytest.approx(nonlinearity, rel=1e-6)
+        assert 0 < r["vout_min"] < r["vout_max"] < 3.3
+
+
+def test_pullup_rejects_bad_window():
+    with pytest.raises(ValueError):
+        optimize_pullup(50, 10)
+    with pytest.raises(ValueError):
+        optimize_pullup(0, 50, objective="speed")
+
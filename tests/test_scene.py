@@ -0,0 +1,141 @@
+# resistor_scene：差量渲染 (假画布记录每次操作)、剔除与大网络布局
+import itertools
+
+import pytest
+
+from resistor_scene import FIT_MIN_SCALE, Scene, SceneRenderer, circuit_scene
+
+
+class FakeCanvas:
+    """Tk 风格画布的最小替身：id → (kind, coords, opts, tags)"""
+
+    def __init__(self):
+        self.items = {}
+        self._ids = itertools.count(1)
+
+    def __getattr__(self, name):
+        if not name.startswith("create_"):
+            raise AttributeError(name)
+        kind = name[len("create_"):]
+
+        def create(*coords, tags=(), **opts):
+            item_id = next(self._ids)
+            self.items[item_id] = (kind, coords, dict(opts), tags)
+            return item_id
+        return create
+
+    def coords(self, item_id, *coords):
+        kind, _, opts, tags = self.items[item_id]
+        self.items[item_id] = (kind, coords, opts, tags)
+
+    def itemconfigure(self, item_id, **opts):
+        self.items[item_id][2].update(opts)
+
+    def delete(self, what):
+        if isinstance(what, str):
+            for item_id in [i for i, item in self.items.items() if what in item[3]]:
+                del self.items[item_id]
+        else:
+            del self.items[what]
+
+    def by_key(self):
+        return {item[3][1]: item for item in self.items.values()}
+
+
+R1 = [(10, 'series'), ('parallel', [[(22, 'series')], [(4.7, 'series'), (1, 'series')]])]
+R2 = [(3.3, 'series')]
+
+
+def _scene(r1=R1, r2=R2, vout=2.0):
+    return circuit_scene(r1, r2, 5.0, vout, 12.0, 3.3)
+
+
+def _check_synced(renderer, canvas, scene):
+    # 画布上的图元与场景中可见图元一一对应，坐标为视图变换后的坐标
+    drawn = canvas.by_key()
+    assert set(drawn) == set(renderer._drawn)
+    for key, (kind, coords, opts, _) in drawn.items():
+        item = scene.items[key]
+        assert kind == item.kind
+        assert coords == (item.coords if item.fixed else renderer.view.to_screen(item.coords))
+        assert opts == renderer._screen_opts(item)
+
+
+def test_rerender_is_incremental():
+    canvas = FakeCanvas()
+    renderer = SceneRenderer(canvas)
+    scene = _scene()
+    first = renderer.render(scene, 1060, 500)
+    assert first["created"] == len(scene) and first["culled"] == 0
+    _check_synced(renderer, canvas, scene)
+
+    assert renderer.render(_scene(), 1060, 500) == {"created": 0, "moved": 0, "configured": 0,
+                                                   "deleted": 0, "culled": 0}
+
+    # 只改 Vout：只有文字与安全指示被重新配置
+    stats = renderer.render(_scene(vout=3.3), 1060, 500)
+    assert stats["created"] == stats["deleted"] == stats["moved"] == 0
+    assert stats["configured"] == 2
+    _check_synced(renderer, canvas, renderer.scene)
+
+    # 删除并联组：它的图元被删除，其余图元移动而不是重建
+    scene = _scene(r1=[(10, 'series')])
+    stats = renderer.render(scene, 1060, 500)
+    assert stats["deleted"] > 0 and stats["created"] == 0
+    _check_synced(renderer, canvas, scene)
+
+
+def test_pan_moves_and_culls():
+    canvas = FakeCanvas()
+    renderer = SceneRenderer(canvas)
+    scene = _scene()
+    renderer.render(scene, 1060, 500)
+    renderer.view.pan(-5000, 0)
+    panned = renderer.render(None, 1060, 500)
+    assert panned["created"] == 0 and panned["culled"] > 0
+    assert panned["deleted"] == panned["culled"]
+    _check_synced(renderer, canvas, scene)
+    # 恢复自动适配：被剔除的图元重新创建，其余只移动
+    renderer.view.reset()
+    stats = renderer.render(None, 1060, 500)
+    assert stats["culled"] == 0 and stats["created"] == panned["culled"]
+    _check_synced(renderer, canvas, scene)
+    renderer.clear()
+    assert canvas.items == {}
+
+
+def test_small_text_culled_and_fonts_scaled():
+    canvas = FakeCanvas()
+    renderer = SceneRenderer(canvas)
+    scene = Scene()
+    scene.add("box", 'rectangle', 0, 0, 100, 50)
+    scene.add("big", 'text', 50, 25, text="big", font=("Arial", 20))
+    scene.add("tiny", 'text', 50, 40, text="tiny", font=("Arial", 6))
+    renderer.render(scene, 400, 400)
+    renderer.view.zoom_at(0.5, 0, 0)
+    stats = renderer.render(None, 400, 400)
+    assert "tiny" not in canvas.by_key()
+    assert canvas.by_key()["big"][2]["font"] == ("Arial", 10)
+    assert stats["deleted"] == stats["culled"] == 1
+
+
+def _bodies(scene):
+    return [item.coords for key, item in scene.items.items() if key.endswith(".body")]
+
+
+def _overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+@pytest.mark.parametrize("width", [1060, 600])
+def test_large_network_wraps_without_overlap(width):
+    branch = [(1, 'series'), ('parallel', [[(2, 'series')], [(3, 'series'), (4, 'series')]])]
+    r1 = [(i + 1, 'series') for i in range(30)] + [('parallel', [branch, branch, [(5, 'series')]])]
+    scene = circuit_scene(r1, r1, 5.0, 2.5, 100.0, 100.0, canvas_width=width)
+    bodies = _bodies(scene)
+    assert len(bodies) == 2 * (30 + 2 * 4 + 1)
+    for a, b in itertools.combinations(bodies, 2):
+        assert not _overlap(a, b)
+    x0, _, x1, _ = scene.bbox()
+    # 换行后整个图在最小适配缩放下仍能横向放进画布
+    assert (x1 - x0) * FIT_MIN_SCALE <= width
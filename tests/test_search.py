@@ -0,0 +1,88 @@
+# resistor_search 与全部组合穷举的对照 (小系列)
+import itertools
+
+import pytest
+
+from resistor_search import LSB_REL_TOL, search_battery, search_divider, search_parallel
+from resistor_series import series_index
+
+
+@pytest.mark.parametrize("series", ["E6", "E12"])
+@pytest.mark.parametrize("ratio, r_total_min, r_total_max", [
+    (0.3, None, None),
+    (0.5, None, None),
+    (0.1234, 10e3, 200e3),
+    (0.8765, 1e3, 1e6),
+])
+def test_divider_matches_exhaustive(series, ratio, r_total_min, r_total_max):
+    values = series_index(series).values
+    lo, hi = r_total_min or 0.0, r_total_max or float('inf')
+    errors = sorted(abs(r2 / (r1 + r2) - ratio) for r1 in values for r2 in values if lo <= r1 + r2 <= hi)
+    results = search_divider(ratio, series, k=8, r_total_min=r_total_min, r_total_max=r_total_max)
+    assert len(results) == 8
+    assert [abs(r["ratio"] - ratio) for r in results] == pytest.approx(errors[:8], abs=1e-15)
+    for r in results:
+        assert lo <= r["r1"] + r["r2"] <= hi
+
+
+def test_divider_current_limit():
+    results = search_divider(0.25, "E12", k=5, vin=12.0, i_max_ua=100)
+    assert results
+    for r in results:
+        assert r["current_ua"] <= 100 + 1e-9
+
+
+@pytest.mark.parametrize("target, count, distinct", [
+    (1000.0, 2, False),
+    (3300.0, 3, False),
+    (47.0, 3, True),
+])
+def test_parallel_matches_exhaustive(target, count, distinct):
+    max_ratio = 4.0 * count
+    values = series_index("E6").between(target, target * max_ratio)
+    combos = (itertools.combinations(values, count) if distinct
+              else itertools.combinations_with_replacement(values, count))
+    errors = sorted(abs(1.0 / sum(1.0 / v for v in combo) - target) for combo in combos)
+    results = search_parallel(target, count, "E6", k=5, distinct=distinct)
+    assert [abs(r["eq"] - target) for r in results] == pytest.approx(errors[:5], rel=1e-12, abs=1e-12)
+    for r in results:
+        assert len(r["values"]) == count
+        assert 1.0 / sum(1.0 / v for v in r["values"]) == pytest.approx(r["eq"])
+        if distinct:
+            assert len(set(r["values"])) == count
+
+
+@pytest.mark.parametrize("count, distinct", [(2, False), (3, True)])
+def test_parallel_uncapped_matches_whole_series(count, distinct):
+    target = 1000.0
+    values = series_index("E6").between(target, float('inf'))
+    combos = (itertools.combinations(values, count) if distinct
+              else itertools.combinations_with_replacement(values, count))
+    errors = sorted(abs(1.0 / sum(1.0 / v for v in combo) - target) for combo in combos)
+    results = search_parallel(target, count, "E6", k=5, max_ratio=float('inf'), distinct=distinct)
+    assert [abs(r["eq"] - target) for r in results] == pytest.approx(errors[:5], rel=1e-12, abs=1e-12)
+    # 默认上限是启发式的：1k ║ 10M 这类微调组合在范围之外
+    capped = search_parallel(target, count, "E6", k=5, distinct=distinct)
+    assert max(max(r["values"]) for r in capped) <= 4 * count * target
+    assert abs(results[0]["error_pct"]) < abs(capped[0]["error_pct"])
+
+
+def test_battery_front_is_monotonic_and_pareto():
+    vmin, vmax, vadc_safe, margin, lsb = 3.0, 4.2, 3.3, 0.05, 3300 / 4096
+    front = search_battery(vmin, vmax, vadc_safe, series="E12", min_margin=margin)
+    assert len(front) > 1
+    for a, b in zip(front, front[1:]):
+        assert b["lsb_mv"] > a["lsb_mv"]
+        assert b["current_ua"] < a["current_ua"]
+
+    # 任何可行组合都不能在两个指标上同时严格优于前沿中的点
+    values = series_index("E12").values
+    t_max = (vadc_safe - margin) / vmax
+    feasible = [(vmax / (r1 + r2) * 1e6, lsb * (r1 + r2) / r2)
+                for r1 in values for r2 in values
+                if r2 / (r1 + r2) <= t_max and 10e3 <= r1 + r2 <= 1e6]
+    for point in front:
+        assert point["vout_max"] <= vadc_safe - margin + 1e-12
+        for current, point_lsb in feasible:
+            assert not (current < point["current_ua"] * (1 - 1e-9)
+                        and point_lsb < point["lsb_mv"] * (1 - LSB_REL_TOL))
@@ -0,0 +1,68 @@
+# resistor_sensitivity 与有限差分、全部角点枚举的对照
+import itertools
+
+import pytest
+
+from resistor_network import compile_branch, leaves
+from resistor_sensitivity import divider_sensitivity, evaluate_with, leaf_derivatives, top_contributors
+
+R1 = [(10.0, 'series'), ('parallel', [[(22.0, 'series')], [(4.7, 'series'), ('parallel', [[(1.0, 'series')], [(3.3, 'series')]])]])]
+R2 = [('parallel', [[(15.0, 'series')], [(47.0, 'series'), (2.2, 'series')]])]
+
+
+def _vout(vin, values, n_r1):
+    r1 = evaluate_with(compile_branch(R1), values[:n_r1])
+    r2 = evaluate_with(compile_branch(R2), values[n_r1:])
+    return vin * r2 / (r1 + r2)
+
+
+def _values():
+    return [leaf.value for leaf in leaves(compile_branch(R1))] + [leaf.value for leaf in leaves(compile_branch(R2))]
+
+
+def test_leaf_derivatives_match_finite_differences():
+    root = compile_branch(R1)
+    values = [leaf.value for leaf in leaves(root)]
+    assert evaluate_with(root, values) == pytest.approx(root.r)
+    for i, d in enumerate(leaf_derivatives(root)):
+        h = values[i] * 1e-6
+        up = values[:i] + [values[i] + h] + values[i + 1:]
+        down = values[:i] + [values[i] - h] + values[i + 1:]
+        assert d == pytest.approx((evaluate_with(root, up) - evaluate_with(root, down)) / (2 * h), rel=1e-6)
+
+
+def test_dv_dr_matches_finite_differences():
+    vin = 12.0
+    result = divider_sensitivity(R1, R2, vin, 1.0)
+    values = _values()
+    n_r1 = sum(1 for p in result["parts"] if p["side"] == "R1")
+    assert result["vout"] == pytest.approx(_vout(vin, values, n_r1))
+    for i, part in enumerate(result["parts"]):
+        h = values[i] * 1e-6
+        up = values[:i] + [values[i] + h] + values[i + 1:]
+        down = values[:i] + [values[i] - h] + values[i + 1:]
+        numeric = (_vout(vin, up, n_r1) - _vout(vin, down, n_r1)) / (2 * h)
+        assert part["dv_dr"] == pytest.approx(numeric, rel=1e-6)
+        assert (part["dv_dr"] > 0) == (part["side"] == "R2")
+    assert sum(p["share_pct"] for p in result["parts"]) == pytest.approx(100)
+
+
+def test_worst_case_matches_all_corners():
+    vin = 5.0
+    tols = [1.0, 5.0, 0.1, 2.0, 1.0, 0.5, 10.0, 1.0]
+    values = _values()
+    assert len(values) == len(tols)
+    n_r1 = sum(1 for _ in leaves(compile_branch(R1)))
+    corners = [_vout(vin, [v * (1 + s * t / 100) for v, s, t in zip(values, signs, tols)], n_r1)
+               for signs in itertools.product((-1, 1), repeat=len(values))]
+    result = divider_sensitivity(R1, R2, vin, tols)
+    assert result["vout_min"] == pytest.approx(min(corners), rel=1e-12)
+    assert result["vout_max"] == pytest.approx(max(corners), rel=1e-12)
+    assert result["rss_pct"] <= result["linear_pct"]
+    top = top_contributors(result, 2)
+    assert len(top) == 2 and top[0]["share_pct"] >= top[1]["share_pct"]
+
+
+def test_rejects_wrong_tolerance_count():
+    with pytest.raises(ValueError):
+        divider_sensitivity(R1, R2, 5.0, [1.0, 2.0])
@@ -0,0 +1,51 @@
+# resistor_synthesis 与逐级穷举的对照 (E6，不超过 3 个元件)
+import pytest
+
+from resistor_synthesis import expr_parts, expr_value, synthesize
+from resistor_series import series_index
+
+
+def _levels(values, max_parts):
+    """每个元件数下全部可达阻值"""
+    levels = {1: set(values)}
+    for n in range(2, max_parts + 1):
+        reach = set()
+        for a in range(1, n // 2 + 1):
+            for x in levels[a]:
+                for y in levels[n - a]:
+                    reach.add(x + y)
+                    reach.add(x * y / (x + y))
+        levels[n] = reach
+    return levels
+
+
+@pytest.fixture(scope="module")
+def e6_levels():
+    return _levels(series_index("E6").values, 3)
+
+
+@pytest.mark.parametrize("target", [1234.0, 54206.0, 7.77, 2.5e6, 330.0])
+@pytest.mark.parametrize("tolerance_pct", [0.01, 1.0])
+def test_synthesize_matches_exhaustive(e6_levels, target, tolerance_pct):
+    tol = target * tolerance_pct / 100
+    best = [min(abs(v - target) for v in e6_levels[n]) for n in (1, 2, 3)]
+    expect_parts = next((n for n, err in zip((1, 2, 3), best) if err <= tol), None)
+
+    result = synthesize(target, "E6", max_parts=3, tolerance_pct=tolerance_pct)
+    assert result["complete"]
+    assert result["eq"] == pytest.approx(expr_value(result["expr"]))
+    assert result["parts"] == expr_parts(result["expr"])
+    if expect_parts is None:
+        assert not result["within_tol"]
+        assert abs(result["eq"] - target) == pytest.approx(min(best), rel=1e-9, abs=1e-12)
+    else:
+        assert result["within_tol"]
+        assert result["parts"] == expect_parts
+        assert abs(result["eq"] - target) == pytest.approx(best[expect_parts - 1], rel=1e-9, abs=1e-12)
+
+
+def test_synthesize_rejects_invalid():
+    with pytest.raises(ValueError):
+        synthesize(0)
+    with pytest.raises(ValueError):
+        synthesize(100, max_parts=0)
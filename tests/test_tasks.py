@@ -0,0 +1,133 @@
+# 后台任务状态/取消，以及界面线程的重算合并与任务轮询 (假的 Tk root，不创建窗口)
+import threading
+import types
+
+import pytest
+
+from resistor_tasks import BackgroundTask, TaskCancelled
+
+
+def test_task_done_and_progress():
+    reported, gate = threading.Event(), threading.Event()
+
+    def work(n, progress):
+        progress(1, 4)
+        reported.set()
+        gate.wait(5)
+        return n * 2
+
+    task = BackgroundTask(work, 21)
+    reported.wait(5)
+    assert task.poll() == ("running", 0.25)
+    gate.set()
+    assert task.wait(5)
+    assert task.poll()[0] == "done" and task.result == 42
+
+
+def test_task_error_and_cancel():
+    def boom(progress):
+        raise RuntimeError("x")
+
+    task = BackgroundTask(boom)
+    task.wait(5)
+    assert task.state == "error" and isinstance(task.error, RuntimeError)
+
+    started = threading.Event()
+
+    def loop(progress):
+        started.set()
+        while True:
+            progress(0)
+
+    task = BackgroundTask(loop)
+    started.wait(5)
+    task.cancel()
+    assert task.wait(5)
+    assert task.state == "cancelled" and task.cancelled
+    elapsed = task.elapsed
+    assert task.elapsed == elapsed
+
+
+def test_cancelled_result_is_discarded():
+    gate = threading.Event()
+    task = BackgroundTask(lambda progress: gate.wait(5) or "late")
+    task.cancel()
+    gate.set()
+    task.wait(5)
+    assert task.state == "cancelled"
+    with pytest.raises(TaskCancelled):
+        task.progress(1)
+
+
+class _FakeRoot:
+    """记录 after / after_idle 回调，由测试手动执行"""
+
+    def __init__(self):
+        self.queue = []
+
+    def after_idle(self, func, *args):
+        self.queue.append((func, args))
+        return len(self.queue)
+
+    def after(self, ms, func, *args):
+        return self.after_idle(func, *args)
+
+    def run(self):
+        while self.queue:
+            func, args = self.queue.pop(0)
+            func(*args)
+
+
+class _Var:
+    def __init__(self):
+        self.value = ""
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+@pytest.fixture
+def gui():
+    pytest.importorskip("tkinter")
+    import resistor_divider_gui
+    cls = resistor_divider_gui.ResistorNetworkCalculator
+    app = types.SimpleNamespace(root=_FakeRoot(), status_var=_Var(), _calc_job=None, _calc_status=None,
+                                _tasks={}, calls=0)
+
+    def calculate_network():
+        app.calls += 1
+    app.calculate_network = calculate_network
+    for name in ("schedule_calculate", "_run_scheduled_calculate", "run_in_background", "_poll_task",
+                 "show_timing"):
+        setattr(app, name, types.MethodType(getattr(cls, name), app))
+    return app
+
+
+def test_schedule_calculate_coalesces(gui):
+    for i in range(5):
+        gui.schedule_calculate(f"状态 {i}")
+    gui.schedule_calculate()
+    assert len(gui.root.queue) == 1
+    gui.root.run()
+    assert gui.calls == 1
+    assert gui.status_var.get() == "状态 4"
+    gui.schedule_calculate()
+    gui.root.run()
+    assert gui.calls == 2
+
+
+def test_run_in_background_replaces_task(gui):
+    gate = threading.Event()
+    results = []
+    first = gui.run_in_background("分析", lambda progress: gate.wait(5) or "old", results.append)
+    second = gui.run_in_background("分析", lambda progress: "new", results.append)
+    assert first.cancelled and not second.cancelled
+    gate.set()
+    first.wait(5)
+    second.wait(5)
+    gui.root.run()
+    assert results == ["new"]
+    assert gui._tasks == {}
@@ -0,0 +1,82 @@
+# resistor_trace：统计、嵌套深度、跟踪文件滚动、写入失败退化、剖析开关
+import json
+
+import pytest
+
+import resistor_trace
+from resistor_trace import Tracer, traced
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_nested_spans_and_stats(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    t = Tracer(path, version="9.9")
+    with t.span("outer", n=3):
+        with t.span("inner"):
+            pass
+        with t.span("inner"):
+            pass
+    stats = t.stats()
+    assert stats["inner"]["calls"] == 2 and stats["outer"]["calls"] == 1
+    assert stats["outer"]["total_ms"] >= stats["inner"]["total_ms"]
+    assert t.last[0] == "outer"
+    lines = _lines(path)
+    assert [(l["op"], l["depth"]) for l in lines] == [("inner", 1), ("inner", 1), ("outer", 0)]
+    assert lines[-1]["n"] == 3 and lines[-1]["version"] == "9.9"
+    t.reset()
+    assert t.stats() == {} and t.last is None
+
+
+def test_trace_file_rolls_over(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    t = Tracer(str(path), max_bytes=1000)
+    for i in range(100):
+        t.record("op", 0.001, seq=i)
+    rolled = tmp_path / "trace.jsonl.1"
+    assert rolled.exists() and path.exists()
+    line_len = max(len(json.dumps(l)) for l in _lines(rolled)) + 1
+    assert rolled.stat().st_size <= 1000 + line_len
+    assert path.stat().st_size <= 1000
+    # 只保留当前与上一个文件，二者的记录连续且以最新一条结束
+    seqs = [l["seq"] for l in _lines(rolled) + _lines(path)]
+    assert seqs == list(range(seqs[0], 100))
+    assert not (tmp_path / "trace.jsonl.2").exists()
+
+
+def test_unwritable_trace_keeps_stats(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+    t = Tracer(str(blocker / "trace.jsonl"))
+    t.record("op", 0.002)
+    assert t.path is None
+    assert t.stats()["op"]["calls"] == 1
+
+
+def test_traced_reports_outermost_only(monkeypatch):
+    monkeypatch.setattr(resistor_trace, "_tracer", Tracer(None))
+    done = []
+
+    @traced("f", on_done=lambda args, op, s: done.append((args, op)))
+    def f(n):
+        return f(n - 1) if n else "ok"
+
+    assert f(2) == "ok"
+    assert done == [((2,), "f")]
+    assert resistor_trace.tracer().stats()["f"]["calls"] == 3
+
+
+def test_profile_report(tmp_path):
+    t = Tracer(None)
+    assert t.stop_profile() is None
+    t.start_profile()
+    assert t.profiling
+    with t.span("work"):
+        sum(i * i for i in range(1000))
+    report = t.stop_profile(str(tmp_path / "p.prof"))
+    assert not t.profiling
+    assert "cumulative" in report or "function calls" in report
+    assert (tmp_path / "p.prof").exists()